@@ -2,7 +2,9 @@
 
 from .react_agent import EssayReActAgent
 from .reasoning_engine import ReasoningEngine, ReasoningResult, ReasoningError
+from .intent_classifier import IntentClassifier
 from .action_executor import ActionExecutor, ActionResult, ActionExecutionError
+from .speculation import Speculator
 
 __all__ = [
     # Main ReAct agent
@@ -12,9 +14,11 @@ __all__ = [
     "ReasoningEngine", 
     "ReasoningResult", 
     "ReasoningError",
+    "IntentClassifier",
     
     # Action execution components
     "ActionExecutor", 
     "ActionResult", 
-    "ActionExecutionError"
+    "ActionExecutionError",
+    "Speculator"
 ] 
\ No newline at end of file
@@ -8,12 +8,15 @@ from __future__ import annotations
 import asyncio
 import logging
 import time
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from datetime import datetime
 
 from essay_agent.agent.tools.tool_registry import EnhancedToolRegistry, ENHANCED_REGISTRY
 from essay_agent.agent.memory.agent_memory import AgentMemory
+from essay_agent.llm.deadline import DeadlineExceeded, bound_timeout, check_deadline, expired
+from essay_agent.llm.tracing import span, traced
+from essay_agent.tools.base import ValidatedTool
 
 # Import Phase 2 LLM-driven components
 from essay_agent.prompts.tool_selection import comprehensive_tool_selector
@@ -77,11 +80,18 @@ class ActionExecutor:
             "llm": self._handle_llm_error
         }
     
-    async def execute_action(self, reasoning: Dict[str, Any]) -> ActionResult:
+    async def execute_action(
+        self,
+        reasoning: Dict[str, Any],
+        claim_speculative: Optional[Callable[[str, Dict[str, Any]], Awaitable[Tuple[bool, Any]]]] = None
+    ) -> ActionResult:
         """Execute chosen action with comprehensive error handling.
         
         Args:
             reasoning: Reasoning result from ReasoningEngine
+            claim_speculative: Optional ``(tool_name, prepared_args) -> (hit, result)``
+                returning a tool result computed ahead of reasoning
+                (see :class:`~essay_agent.agent.core.speculation.Speculator`)
             
         Returns:
             ActionResult with execution details and results
@@ -93,7 +103,7 @@ class ActionExecutor:
             response_type = reasoning.get("response_type", "conversation")
             
             if response_type == "tool_execution":
-                return await self._execute_tool_action(reasoning, start_time)
+                return await self._execute_tool_action(reasoning, start_time, claim_speculative)
             else:
                 return await self._execute_conversation_action(reasoning, start_time)
                 
@@ -118,12 +128,19 @@ class ActionExecutor:
                 recovery_suggestion="Please try rephrasing your request or specify what you'd like help with."
             )
     
-    async def _execute_tool_action(self, reasoning: Dict[str, Any], start_time: float) -> ActionResult:
+    async def _execute_tool_action(
+        self,
+        reasoning: Dict[str, Any],
+        start_time: float,
+        claim_speculative: Optional[Callable[[str, Dict[str, Any]], Awaitable[Tuple[bool, Any]]]] = None
+    ) -> ActionResult:
         """Execute a tool-based action with user context integration.
         
         Args:
             reasoning: Reasoning result with tool selection
             start_time: When execution started
+            claim_speculative: Optional source of a pre-computed result (see
+                :meth:`execute_action`)
             
         Returns:
             ActionResult with tool execution results
@@ -138,14 +155,19 @@ class ActionExecutor:
         if not self.tool_registry.has_tool(tool_name):
             raise ActionExecutionError(f"Tool '{tool_name}' not found in registry")
         
-        # PHASE 2 ENHANCEMENT: Integrate user context into tool arguments
-        enhanced_tool_args = await self._enhance_tool_args_with_context(tool_name, tool_args, reasoning)
+        final_tool_args = await self.prepare_tool_args(tool_name, tool_args, reasoning)
         
-        # Add missing required arguments for specific tools
-        final_tool_args = self._add_missing_tool_args(tool_name, enhanced_tool_args)
+        # Use the speculative run's result if it ran an equivalent call
+        hit, result = (False, None)
+        if claim_speculative is not None:
+            with span("speculative_claim", tool=tool_name) as claimed:
+                hit, result = await claim_speculative(tool_name, final_tool_args)
+                if claimed is not None:
+                    claimed.set(hit=hit)
         
         # Execute the tool with enhanced arguments
-        result = await self.execute_tool(tool_name, final_tool_args)
+        if not hit:
+            result = await self.execute_tool(tool_name, final_tool_args)
         
         execution_time = time.time() - start_time
         self.success_count += 1
@@ -175,7 +197,10 @@ class ActionExecutor:
             success=True
         )
         
-        logger.info(f"Tool '{tool_name}' executed successfully in {execution_time:.2f}s")
+        logger.info(
+            f"Tool '{tool_name}' executed successfully in {execution_time:.2f}s"
+            + (" (speculative result)" if hit else "")
+        )
         
         return ActionResult(
             action_type="tool_execution",
@@ -216,8 +241,31 @@ class ActionExecutor:
             confidence=reasoning.get("confidence", 1.0)
         )
     
+    @traced("action.prepare_args")
+    async def prepare_tool_args(
+        self, tool_name: str, tool_args: Dict[str, Any], reasoning: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Final arguments for *tool_name*: reasoning's args plus user context and defaults.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            tool_args: Arguments chosen by reasoning
+            reasoning: Reasoning result the tool was chosen in
+            
+        Returns:
+            Arguments to pass to :meth:`execute_tool`
+        """
+        # PHASE 2 ENHANCEMENT: Integrate user context into tool arguments
+        enhanced_tool_args = await self._enhance_tool_args_with_context(tool_name, tool_args, reasoning)
+        
+        # Add missing required arguments for specific tools
+        return self._add_missing_tool_args(tool_name, enhanced_tool_args)
+    
     async def execute_tool(self, tool_name: str, tool_args: Dict[str, Any]) -> Any:
         """Execute specific tool with validation and timeout.
+
+        The per-tool timeout is shortened to the time left before the request
+        deadline, and no tool is started once it has passed.
         
         Args:
             tool_name: Name of the tool to execute
@@ -238,20 +286,24 @@ class ActionExecutor:
             if not tool_func:
                 raise ActionExecutionError(f"Tool '{tool_name}' not available")
             
-            # Execute with timeout
-            timeout = self._get_tool_timeout(tool_name)
-            result = await asyncio.wait_for(
-                self._execute_tool_with_args(tool_func, tool_args),
-                timeout=timeout
-            )
+            # Execute with timeout, never past the request deadline
+            check_deadline(f"Tool '{tool_name}'")
+            timeout = bound_timeout(self._get_tool_timeout(tool_name))
+            with span("tool", tool=tool_name):
+                result = await asyncio.wait_for(
+                    self._execute_tool_with_args(tool_func, tool_args),
+                    timeout=timeout
+                )
             
             # Validate result
             validated_result = self._validate_tool_result(tool_name, result)
             
             return validated_result
             
-        except asyncio.TimeoutError:
-            raise ActionExecutionError(f"Tool '{tool_name}' timed out after {timeout}s")
+        except asyncio.TimeoutError as e:
+            if isinstance(e, DeadlineExceeded) or expired():
+                raise ActionExecutionError(f"Tool '{tool_name}' stopped: request deadline exceeded") from e
+            raise ActionExecutionError(f"Tool '{tool_name}' timed out after {timeout:.1f}s")
         except Exception as e:
             raise ActionExecutionError(f"Tool '{tool_name}' execution failed: {e}") from e
     
@@ -340,8 +392,11 @@ class ActionExecutor:
         """
         if asyncio.iscoroutinefunction(tool_func):
             return await tool_func(**tool_args)
-        else:
-            return tool_func(**tool_args)
+        if isinstance(tool_func, ValidatedTool):
+            # Native async path – never run the LLM round-trip on the loop.
+            return await tool_func.acall(**tool_args)
+        # Plain sync callables run in a worker so ``wait_for`` can time them out.
+        return await asyncio.to_thread(tool_func, **tool_args)
     
     def _validate_tool_result(self, tool_name: str, result: Any) -> Any:
         """Validate tool execution result.
@@ -0,0 +1,304 @@
+"""Local intent → tool classifier for skipping the LLM reasoning call.
+
+``ReasoningEngine._try_simple_reasoning`` only recognises a handful of
+phrases, so common turns ("make it shorter", "brainstorm stories for
+Stanford", "polish this") still pay for a full reasoning completion.
+
+:class:`IntentClassifier` is a small, CPU-only multinomial logistic
+regression over keyword features (unigrams, bigrams and a length bucket),
+trained on the (user input, chosen tool) pairs that ``MemoryIndexer`` logs to
+``memory_store/<user>.reasoning_history.json``.  It has no dependencies
+beyond the standard library, trains in well under a second on a few thousand
+turns and scores a message in microseconds.  When its top probability clears
+the threshold the reasoning engine uses its answer directly; otherwise the
+turn falls through to the LLM.
+
+Training / evaluation
+---------------------
+``python -m essay_agent.agent.core.intent_classifier memory_store/ --save
+memory_store/intent_classifier.json`` trains on a seeded 80/20 split of the
+logged turns, prints coverage (turns decided locally), accuracy on those
+turns and per-turn latency for a range of thresholds on the held-out part,
+then refits on every turn and saves the model.
+
+Configuration
+-------------
+* ``ESSAY_AGENT_INTENT_MODEL`` – model path (default
+  ``memory_store/intent_classifier.json``; no file → classifier off).
+* ``ESSAY_AGENT_INTENT_THRESHOLD`` (0.85) – minimum probability to skip the LLM.
+* ``ESSAY_AGENT_INTENT_CLASSIFIER=0`` – never consult the classifier.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import math
+import random
+import re
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Label for turns the reasoning engine answered conversationally (no tool)
+CONVERSATION = "conversation"
+
+DEFAULT_THRESHOLD = 0.85
+
+# Context flag on reasoning this classifier decided; such turns are logged
+# but never trained on, so the model does not learn from its own guesses.
+LOCAL_INTENT = "local_intent"
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+Pair = Tuple[str, str]
+
+
+def features(text: str) -> Dict[str, float]:
+    """Sparse keyword features of *text* (unigrams, bigrams, length bucket)."""
+
+    tokens = _TOKEN_RE.findall(text.lower())
+    feats: Dict[str, float] = {"bias": 1.0}
+    for token in tokens:
+        feats[f"w:{token}"] = 1.0
+    for first, second in zip(tokens, tokens[1:]):
+        feats[f"b:{first}_{second}"] = 1.0
+    length = len(tokens)
+    feats["len:" + ("short" if length <= 6 else "medium" if length <= 25 else "long")] = 1.0
+    return feats
+
+
+class IntentClassifier:
+    """Multinomial logistic regression from user message to chosen tool."""
+
+    def __init__(self, *, epochs: int = 30, learning_rate: float = 0.5, l2: float = 1e-4, seed: int = 0):
+        self.epochs = epochs
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.seed = seed
+        self.labels: List[str] = []
+        self.weights: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def trained(self) -> bool:
+        return bool(self.labels)
+
+    def fit(self, pairs: Sequence[Pair]) -> "IntentClassifier":
+        """Train on (user input, tool label) *pairs* with plain SGD.
+
+        Args:
+            pairs: Logged turns, e.g. from :func:`load_reasoning_logs`
+
+        Returns:
+            ``self``
+        """
+        self.labels = sorted({label for _, label in pairs})
+        self.weights = defaultdict(dict)
+        if len(self.labels) < 2:
+            return self
+
+        rows = [(features(text), label) for text, label in pairs]
+        rng = random.Random(self.seed)
+        for epoch in range(self.epochs):
+            rng.shuffle(rows)
+            rate = self.learning_rate / (1 + epoch * 0.1)
+            for feats, label in rows:
+                probs = self._probs(feats)
+                for cls in self.labels:
+                    grad = probs[cls] - (1.0 if cls == label else 0.0)
+                    if grad == 0.0:
+                        continue
+                    for name, value in feats.items():
+                        row = self.weights[name]
+                        w = row.get(cls, 0.0)
+                        row[cls] = w - rate * (grad * value + self.l2 * w)
+        self.weights = dict(self.weights)
+        return self
+
+    def _probs(self, feats: Dict[str, float]) -> Dict[str, float]:
+        scores = dict.fromkeys(self.labels, 0.0)
+        for name, value in feats.items():
+            row = self.weights.get(name)
+            if row:
+                for cls, w in row.items():
+                    scores[cls] += w * value
+        top = max(scores.values())
+        exp = {cls: math.exp(score - top) for cls, score in scores.items()}
+        total = sum(exp.values())
+        return {cls: v / total for cls, v in exp.items()}
+
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        if not self.trained:
+            return {}
+        if len(self.labels) == 1:
+            return {self.labels[0]: 1.0}
+        return self._probs(features(text))
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        """Most likely label for *text* and its probability (``(None, 0.0)`` untrained)."""
+
+        probs = self.predict_proba(text)
+        if not probs:
+            return None, 0.0
+        label = max(probs, key=probs.get)
+        return label, probs[label]
+
+    def decide(self, text: str, threshold: float = DEFAULT_THRESHOLD) -> Optional[Tuple[str, float]]:
+        """``(label, probability)`` when confident enough to skip the LLM, else ``None``."""
+
+        label, prob = self.predict(text)
+        if label is None or prob < threshold:
+            return None
+        return label, prob
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Near-zero weights carry no signal and bloat the file
+        weights = {
+            name: {cls: round(w, 6) for cls, w in row.items() if abs(w) >= 1e-6}
+            for name, row in self.weights.items()
+        }
+        return {"version": 1, "labels": self.labels, "weights": {k: v for k, v in weights.items() if v}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IntentClassifier":
+        model = cls()
+        model.labels = list(data.get("labels", []))
+        model.weights = {name: dict(row) for name, row in data.get("weights", {}).items()}
+        return model
+
+    def save(self, path: Union[str, Path]) -> None:
+        Path(path).write_text(json.dumps(self.to_dict()), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "IntentClassifier":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+# ---------------------------------------------------------------------------
+# Training data from MemoryIndexer reasoning-chain logs
+# ---------------------------------------------------------------------------
+
+
+def _label(chain: Dict[str, Any]) -> Optional[str]:
+    for step in chain.get("reasoning_steps") or []:
+        tool = step.get("tool_considered") if isinstance(step, dict) else None
+        if tool:
+            return str(tool)
+    if chain.get("final_action") == CONVERSATION:
+        return CONVERSATION
+    return None
+
+
+def _decided_locally(chain: Dict[str, Any]) -> bool:
+    return any(
+        isinstance(step, dict) and LOCAL_INTENT in (step.get("context_used") or [])
+        for step in chain.get("reasoning_steps") or []
+    )
+
+
+def load_reasoning_logs(paths: Iterable[Union[str, Path]]) -> List[Pair]:
+    """(user input, chosen tool) pairs from ``*.reasoning_history.json`` files.
+
+    Directories are searched for such files.  Only successful turns whose
+    chosen tool was logged are used; chains written before the tool was
+    recorded, and turns this classifier decided itself, are skipped.
+    """
+
+    files: List[Path] = []
+    for path in map(Path, paths):
+        files.extend(sorted(path.glob("*.reasoning_history.json")) if path.is_dir() else [path])
+
+    pairs: List[Pair] = []
+    for file in files:
+        try:
+            chains = json.loads(file.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unreadable reasoning log {file}: {e}")
+            continue
+        for chain in chains if isinstance(chains, list) else []:
+            text = (chain.get("user_input") or "").strip()
+            label = _label(chain)
+            if text and label and chain.get("success", True) and not _decided_locally(chain):
+                pairs.append((text, label))
+    return pairs
+
+
+def split(pairs: Sequence[Pair], holdout: float = 0.2, seed: int = 0) -> Tuple[List[Pair], List[Pair]]:
+    """Seeded train / held-out split."""
+
+    shuffled = list(pairs)
+    random.Random(seed).shuffle(shuffled)
+    cut = int(round(len(shuffled) * (1 - holdout)))
+    return shuffled[:cut], shuffled[cut:]
+
+
+def evaluate(
+    model: IntentClassifier, pairs: Sequence[Pair], thresholds: Sequence[float] = (0.5, 0.7, 0.85, 0.95)
+) -> Dict[str, Any]:
+    """Coverage / accuracy / latency of *model* on held-out *pairs* per threshold.
+
+    Coverage is the share of turns the classifier would decide locally;
+    accuracy is measured on those turns only (the rest go to the LLM).
+    """
+
+    start = time.perf_counter()
+    predictions = [model.predict(text) for text, _ in pairs]
+    per_turn = (time.perf_counter() - start) / max(len(pairs), 1)
+
+    rows = []
+    for threshold in thresholds:
+        decided = [(pred, gold) for (pred, prob), (_, gold) in zip(predictions, pairs) if pred and prob >= threshold]
+        correct = sum(1 for pred, gold in decided if pred == gold)
+        rows.append({
+            "threshold": threshold,
+            "coverage": round(len(decided) / len(pairs), 4) if pairs else 0.0,
+            "accuracy": round(correct / len(decided), 4) if decided else 0.0,
+            "decided": len(decided),
+        })
+    overall = sum(1 for (pred, _), (_, gold) in zip(predictions, pairs) if pred == gold)
+    return {
+        "turns": len(pairs),
+        "labels": dict(Counter(label for _, label in pairs)),
+        "top1_accuracy": round(overall / len(pairs), 4) if pairs else 0.0,
+        "latency_us": round(per_turn * 1e6, 2),
+        "thresholds": rows,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover – CLI wrapper
+    parser = argparse.ArgumentParser(description="Train / evaluate the local intent → tool classifier.")
+    parser.add_argument("logs", nargs="+", help="reasoning_history.json files or directories (e.g. memory_store/)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Held-out share for evaluation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Refit on all turns and write the model here")
+    args = parser.parse_args(argv)
+
+    pairs = load_reasoning_logs(args.logs)
+    if len(pairs) < 10:
+        raise SystemExit(f"Only {len(pairs)} labelled turns found – log more turns first.")
+    train, held_out = split(pairs, args.holdout, args.seed)
+    start = time.perf_counter()
+    model = IntentClassifier(seed=args.seed).fit(train)
+    fit_seconds = time.perf_counter() - start
+    report = evaluate(model, held_out)
+
+    print(f"{len(train)} training / {len(held_out)} held-out turns, fit in {fit_seconds:.2f}s, "
+          f"{report['latency_us']:.0f} µs per turn, top-1 accuracy {report['top1_accuracy']:.1%}")
+    print(f"{'threshold':>9} {'coverage':>9} {'accuracy':>9}")
+    for row in report["thresholds"]:
+        print(f"{row['threshold']:>9.2f} {row['coverage']:>9.1%} {row['accuracy']:>9.1%}")
+
+    if args.save:
+        IntentClassifier(seed=args.seed).fit(pairs).save(args.save)
+        print(f"Saved model trained on {len(pairs)} turns to {args.save}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
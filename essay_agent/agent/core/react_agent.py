@@ -6,10 +6,12 @@ ReAct pattern (Reasoning, Acting, Observing) for essay writing assistance.
 from __future__ import annotations
 
 import asyncio
+import functools
 import json
 import logging
+import os
 import time
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
 
 # Import agent infrastructure components
@@ -18,11 +20,15 @@ from essay_agent.agent.prompt_builder import PromptBuilder
 from essay_agent.agent.prompt_optimizer import PromptOptimizer
 from essay_agent.agent.tools.tool_registry import ENHANCED_REGISTRY
 from essay_agent.agent.tools.tool_descriptions import TOOL_DESCRIPTIONS
-from essay_agent.llm_client import get_chat_llm, call_llm
+from essay_agent.llm.budget import retry_budget
+from essay_agent.llm.deadline import DeadlineExceeded, check_deadline, request_deadline
+from essay_agent.llm.tracing import span, trace_turn, traced
+from essay_agent.llm_client import get_chat_llm, acall_llm
 
 # Import new ReAct components
 from .reasoning_engine import ReasoningEngine, ReasoningResult, ReasoningError
 from .action_executor import ActionExecutor, ActionResult, ActionExecutionError
+from .speculation import SpeculativeRun, Speculator
 
 # Import new LLM-driven components for Phase 2
 from essay_agent.prompts.response_generation import response_generator
@@ -32,6 +38,20 @@ from essay_agent.agent.school_context_injector import school_injector
 
 logger = logging.getLogger(__name__)
 
+# What reasoning reads that a context extraction can change: the profile
+# fields AgentMemory.get_user_profile() returns (the extractor's updated
+# profile is merged into these), plus the essay and school context.  An
+# extraction that ran alongside reasoning and changed one of these
+# invalidates the turn's reasoning.
+REASONING_PROFILE_FIELDS = (
+    "name",
+    "core_values",
+    "defining_moments",
+    "academic_interests",
+    "career_goals",
+)
+REASONING_CONTEXT_FIELDS = ("essay_prompt", "college", "school_context")
+
 
 class EssayReActAgent:
     """True ReAct agent for essay writing assistance.
@@ -79,11 +99,23 @@ class EssayReActAgent:
         # BUGFIX: Track actual memory access during current turn
         self.current_turn_memory_access = []
         
+        # Retry/deadline budget consumed by the most recent turn
+        self.last_turn_budget: Dict[str, Any] = {}
+        
         # Phase 2: Response deduplication and context tracking
         self.recent_responses = []  # Track recent responses for deduplication
         self.conversation_context = {}  # Track extracted user context
         self.scenario_context = {}  # Track scenario information (school, etc.)
         
+        # Run context extraction alongside observe/reason instead of before it
+        # (ESSAY_AGENT_OVERLAP_CONTEXT_EXTRACTION=0 restores the sequential order)
+        self.overlap_extraction = os.getenv("ESSAY_AGENT_OVERLAP_CONTEXT_EXTRACTION", "1") != "0"
+        self.extraction_stats = {"overlapped": 0, "reasoning_reruns": 0}
+        
+        # Start a confidently predicted tool while reasoning is in flight
+        # (ESSAY_AGENT_SPECULATIVE_TOOLS=0 disables)
+        self.speculator = Speculator.from_env(self.reasoning_engine.intent_classifier, self.tool_selector)
+        
         logger.info(f"EssayReActAgent initialized for user {user_id}")
         
     async def handle_message(self, user_input: str) -> str:
@@ -99,34 +131,65 @@ class EssayReActAgent:
         Returns:
             Natural language response from the agent
         """
+        # Every retry layer below (LLM helpers, tools, reasoning) draws from
+        # one per-turn budget so a failing step cannot multiply into minutes,
+        # and nothing runs past the request deadline (the server's, if it set
+        # a tighter one).  The turn's latency waterfall is recorded alongside.
+        with trace_turn("turn", user_id=self.user_id, interaction=self.interaction_count + 1), \
+                request_deadline(), retry_budget() as budget:
+            try:
+                return await self._handle_turn(user_input)
+            finally:
+                self.last_turn_budget = budget.report()
+                logger.info(
+                    f"Turn retry budget: {budget.attempts} attempts, {budget.retries} retries, "
+                    f"{budget.denied} denied"
+                )
+
+    async def _handle_turn(self, user_input: str) -> str:
+        """Run one Observe → Reason → Act → Respond cycle (see :meth:`handle_message`)."""
         start_time = time.time()
         self.interaction_count += 1
         
         # BUGFIX: Reset memory access tracking for this turn
         self.current_turn_memory_access = []
         
+        speculation: Optional[SpeculativeRun] = None
         try:
             logger.info(f"Starting ReAct interaction #{self.interaction_count}: {user_input[:100]}...")
             
-            # PHASE 2 ENHANCEMENT: Extract user context and detect school mentions
-            await self._extract_and_update_context(user_input)
-            
-            # 1. OBSERVE: Get current context
-            context = self._observe()
-            logger.debug(f"Observed context with {len(context)} elements")
+            # Pre-execute the predicted tool; _act uses or cancels it
+            last_tool = self.last_execution_tools[-1] if self.last_execution_tools else None
+            speculation = await self.speculator.start(
+                self.action_executor, user_input, last_tool, self._essay_prompt()
+            )
             
-            # 2. REASON: Determine what action to take
-            reasoning = await self._reason(user_input, context)
+            if self.overlap_extraction:
+                # 1-2. OBSERVE + REASON while user context is extracted alongside
+                reasoning = await self._observe_and_reason(user_input)
+            else:
+                # PHASE 2 ENHANCEMENT: Extract user context and detect school mentions
+                await self._extract_and_update_context(user_input)
+                
+                # 1. OBSERVE: Get current context
+                context = self._observe()
+                logger.debug(f"Observed context with {len(context)} elements")
+                
+                # 2. REASON: Determine what action to take
+                check_deadline("Reasoning")
+                reasoning = await self._reason(user_input, context)
             logger.debug(f"Reasoning completed: {reasoning.response_type} with confidence {reasoning.confidence}")
             
             # 3. ACT: Execute the chosen action
-            action_result = await self._act(reasoning)
+            check_deadline("Action")
+            action_result = await self._act(reasoning, speculation)
             logger.debug(f"Action executed: {action_result.action_type} success={action_result.success}")
             
             # Update tracking attributes for evaluation
             self._update_tracking_attributes(action_result, reasoning)
             
             # 4. RESPOND: Generate natural language response
+            check_deadline("Response generation")
             response = await self._respond(user_input, reasoning, action_result)
             
             # Track performance and update memory
@@ -144,7 +207,44 @@ class EssayReActAgent:
             
             logger.error(f"ReAct loop failed after {response_time:.2f}s: {e}")
             return self._generate_error_response(user_input, e)
+        finally:
+            await self.speculator.cancel(speculation)
+        
+    async def _observe_and_reason(self, user_input: str) -> ReasoningResult:
+        """Observe and reason while the turn's context extraction runs alongside.
+
+        Extraction works on a snapshot of the profile taken before observing;
+        its profile changes are merged once reasoning is done.  Reasoning is
+        re-run only if the merge changed something it reads
+        (:data:`REASONING_PROFILE_FIELDS`, :data:`REASONING_CONTEXT_FIELDS`),
+        so the common turn that adds no
+        such detail saves a full extraction round-trip.
+        """
+        self._detect_school(user_input)
+        snapshot = self.memory.get_user_profile()
+        before = self._reasoning_inputs(snapshot)
+        extraction = asyncio.create_task(self._extract_context(user_input, snapshot))
+        self.extraction_stats["overlapped"] += 1
         
+        try:
+            context = self._observe()
+            logger.debug(f"Observed context with {len(context)} elements")
+            check_deadline("Reasoning")
+            reasoning = await self._reason(user_input, context)
+        except BaseException:
+            extraction.cancel()
+            raise
+        
+        changed = await self._apply_context_update(await extraction, before)
+        if changed:
+            self.extraction_stats["reasoning_reruns"] += 1
+            logger.info(f"Context extraction changed {', '.join(changed)} – re-running reasoning")
+            context = self._observe()
+            check_deadline("Reasoning")
+            reasoning = await self._reason(user_input, context)
+        return reasoning
+    
+    @traced("observe")
     def _observe(self) -> Dict[str, Any]:
         """Get current context from memory.
         
@@ -276,6 +376,7 @@ class EssayReActAgent:
         self.current_turn_memory_access.append(access_record)
         logger.debug(f"Memory access tracked: {access_type} - {description}")
         
+    @traced("reason")
     async def _reason(self, user_input: str, context: Dict[str, Any]) -> ReasoningResult:
         """Use LLM to reason about what action to take.
         
@@ -317,7 +418,8 @@ class EssayReActAgent:
                 prompt_version="fallback"
             )
         
-    async def _act(self, reasoning: ReasoningResult) -> ActionResult:
+    @traced("act")
+    async def _act(self, reasoning: ReasoningResult, speculation: Optional[SpeculativeRun] = None) -> ActionResult:
         """Execute the chosen action.
         
         This method uses the ActionExecutor to perform the action determined
@@ -325,6 +427,8 @@ class EssayReActAgent:
         
         Args:
             reasoning: Result from reasoning phase
+            speculation: Tool run started before reasoning; its result is used
+                if reasoning chose the same call, otherwise it is cancelled
             
         Returns:
             ActionResult with execution details and results
@@ -341,7 +445,11 @@ class EssayReActAgent:
             }
             
             # Execute action using ActionExecutor
-            action_result = await self.action_executor.execute_action(reasoning_dict)
+            if speculation is not None and reasoning.response_type != "tool_execution":
+                await self.speculator.cancel(speculation)
+                speculation = None
+            claim = functools.partial(self.speculator.claim, speculation) if speculation else None
+            action_result = await self.action_executor.execute_action(reasoning_dict, claim)
             
             return action_result
             
@@ -357,6 +465,7 @@ class EssayReActAgent:
                 recovery_suggestion="Let's try a different approach."
             )
         
+    @traced("respond")
     async def _respond(self, user_input: str, reasoning: ReasoningResult, action_result: ActionResult) -> str:
         """Generate natural response with LLM-driven enhancements.
         
@@ -386,13 +495,14 @@ class EssayReActAgent:
                     
                     # Add school-specific context if relevant
                     if school_name := self._extract_school_name(user_input):
-                        response = await self.school_injector.inject_school_context(
-                            response=response,
-                            school_name=school_name,
-                            user_interests=self._get_user_interests(),
-                            user_context=self.conversation_context,
-                            response_type=action_result.tool_name if hasattr(action_result, 'tool_name') else 'general'
-                        )
+                        with span("school_injection", school=school_name):
+                            response = await self.school_injector.inject_school_context(
+                                response=response,
+                                school_name=school_name,
+                                user_interests=self._get_user_interests(),
+                                user_context=self.conversation_context,
+                                response_type=action_result.tool_name if hasattr(action_result, 'tool_name') else 'general'
+                            )
                     
                     # Cache response for deduplication
                     self._cache_response(response)
@@ -442,6 +552,7 @@ class EssayReActAgent:
     # LLM-Powered Dynamic Formatting System
     # =========================================================================
     
+    @traced("format_with_llm")
     async def _format_with_llm(self, action_result: ActionResult, reasoning: ReasoningResult) -> str:
         """Use LLM to intelligently format tool results into beautiful responses.
         
@@ -462,7 +573,9 @@ class EssayReActAgent:
         try:
             # Get LLM instance and call with correct signature
             llm = get_chat_llm()
-            response = call_llm(llm, formatting_prompt, temperature=0.7, max_tokens=1000)
+            response = await acall_llm(
+                llm, formatting_prompt, temperature=0.7, max_tokens=1000, caller="format_response"
+            )
             
             # Validate and clean response
             if response and len(response.strip()) > 20:
@@ -633,6 +746,8 @@ Transform the tool output into a beautiful response that helps the user move for
             Graceful error response
         """
         logger.error(f"System error in ReAct loop: {error}")
+        if isinstance(error, DeadlineExceeded):
+            return "That took longer than I'm allowed for a single reply, so I stopped before finishing. Could you try again, or ask for a smaller piece of the essay work?"
         return "I'm experiencing some technical difficulties, but I'm still here to help! Could you tell me what you'd like to work on with your essay, and I'll do my best to assist you."
     
     def _generate_fallback_response(self, user_input: str) -> str:
@@ -646,6 +761,7 @@ Transform the tool output into a beautiful response that helps the user move for
         """
         return self._generate_helpful_fallback(user_input, "system_fallback")
     
+    @traced("memory_write")
     async def _update_interaction_memory(
         self,
         user_input: str,
@@ -682,6 +798,11 @@ Transform the tool output into a beautiful response that helps the user move for
                 reasoning_steps=[{
                     "step": "reason",
                     "content": reasoning.reasoning,
+                    "thought": reasoning.reasoning,
+                    # Logged (input, tool) pairs train the local intent classifier;
+                    # the flags say whether that classifier made this decision
+                    "tool_considered": reasoning.chosen_tool,
+                    "context_used": reasoning.context_flags,
                     "confidence": reasoning.confidence,
                     "time": reasoning.reasoning_time
                 }, {
@@ -713,6 +834,9 @@ Transform the tool output into a beautiful response that helps the user move for
             "average_response_time": avg_response_time,
             "reasoning_metrics": self.reasoning_engine.get_performance_metrics(),
             "execution_metrics": self.action_executor.get_performance_metrics(),
+            "last_turn_retry_budget": self.last_turn_budget,
+            "context_extraction": dict(self.extraction_stats),
+            "speculation": self.speculator.get_stats(),
             "interactions_per_minute": (self.interaction_count / session_duration) * 60 if session_duration > 0 else 0
         }
     
@@ -961,14 +1085,39 @@ What would you like to focus on first? Whether you're just starting or polishing
     async def _extract_and_update_context(self, user_input: str) -> None:
         """Extract user context and update conversation state."""
         
+        profile = self.memory.get_user_profile()
+        context_update = await self._extract_context(user_input, profile)
+        await self._apply_context_update(context_update, self._reasoning_inputs(profile))
+        self._detect_school(user_input)
+    
+    @traced("context_extraction")
+    async def _extract_context(self, user_input: str, profile: Dict[str, Any]) -> Optional[Any]:
+        """Run the context extractor against *profile* without touching memory."""
+        
         try:
-            # Extract user context using the context extractor
-            context_update = await self.context_extractor.extract_and_update_context(
+            return await self.context_extractor.extract_and_update_context(
                 user_input=user_input,
-                existing_profile=self.memory.get_user_profile(),
+                existing_profile=profile,
                 conversation_history=self.memory.get_recent_history(3)
             )
-            
+        except Exception as e:
+            logger.warning(f"Context extraction failed: {e}")
+            return None
+    
+    async def _apply_context_update(self, context_update: Optional[Any], before: Dict[str, Any]) -> List[str]:
+        """Merge an extraction into conversation state and memory.
+        
+        Args:
+            context_update: Result of :meth:`_extract_context`
+            before: :meth:`_reasoning_inputs` from before the extraction
+        
+        Returns:
+            The reasoning inputs whose value differs from *before*
+        """
+        if context_update is None:
+            return []
+        
+        try:
             # Update conversation context
             self.conversation_context.update({
                 'latest_experiences': context_update.new_experiences,
@@ -981,7 +1130,51 @@ What would you like to focus on first? Whether you're just starting or polishing
             if context_update.updated_profile:
                 await self.memory.update_user_profile(context_update.updated_profile)
             
-            # Detect school mentions and update scenario context
+            logger.debug(f"Context extracted: {context_update.integration_summary}")
+            
+        except Exception as e:
+            logger.warning(f"Context extraction failed: {e}")
+            return []
+        
+        after = self._reasoning_inputs()
+        return [f for f in after if before.get(f) != after[f]]
+    
+    def _essay_prompt(self) -> Optional[str]:
+        """Prompt of the essay being worked on, if memory knows it."""
+        
+        try:
+            essay_state = self.memory.get_essay_state()
+            return (essay_state.get("prompt") or None) if isinstance(essay_state, dict) else None
+        except Exception as e:
+            logger.debug(f"Essay prompt unavailable: {e}")
+            return None
+    
+    def _reasoning_inputs(self, profile: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Profile fields and essay/school context that reasoning reads.
+        
+        Args:
+            profile: Result of ``memory.get_user_profile()`` if already loaded
+        """
+        if profile is None:
+            profile = self.memory.get_user_profile()
+        if not isinstance(profile, dict):
+            profile = {}
+        inputs = {f: profile.get(f) for f in REASONING_PROFILE_FIELDS}
+        
+        inputs["essay_prompt"] = self._essay_prompt()
+        try:
+            inputs["college"] = self.memory.get_current_college()
+        except Exception as e:
+            logger.debug(f"College unavailable: {e}")
+            inputs["college"] = None
+        inputs["school_context"] = self.scenario_context.get("school_context")
+        return inputs
+    
+    @traced("school_detection")
+    def _detect_school(self, user_input: str) -> None:
+        """Detect school mentions and update scenario context."""
+        
+        try:
             school_name = self.school_injector.extract_school_from_input(user_input)
             if school_name:
                 school_context = self.school_injector.get_school_context(school_name)
@@ -992,11 +1185,8 @@ What would you like to focus on first? Whether you're just starting or polishing
                         'programs': school_context.programs,
                         'culture': school_context.culture
                     }
-            
-            logger.debug(f"Context extracted: {context_update.integration_summary}")
-            
         except Exception as e:
-            logger.warning(f"Context extraction failed: {e}")
+            logger.warning(f"School detection failed: {e}")
     
     def _extract_school_name(self, user_input: str) -> Optional[str]:
         """Extract school name from user input or scenario context."""
@@ -8,15 +8,23 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import time
 import asyncio
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Literal, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 
-from essay_agent.llm_client import get_chat_llm
+from pydantic import BaseModel, Field
+
+from essay_agent.llm.memo import get_reasoning_cache, memo_key
+from essay_agent.llm.structured import structured_mode
+from essay_agent.llm.tracing import current_span, span, traced
+from essay_agent.llm_client import acall_llm, get_chat_llm
 from essay_agent.response_parser import safe_parse
 from ..prompt_builder import PromptBuilder  
+from .intent_classifier import CONVERSATION, DEFAULT_THRESHOLD, LOCAL_INTENT, IntentClassifier
 from ..prompt_optimizer import PromptOptimizer
 
 # Import Phase 2 LLM-driven components
@@ -40,11 +48,43 @@ class ReasoningResult:
     prompt_version: str
     
 
+class ReasoningOutput(BaseModel):
+    """Schema of the reasoning prompt's JSON answer (sent as the response format)."""
+    context_understanding: str
+    reasoning: str
+    chosen_tool: Optional[str] = None
+    tool_args: Dict[str, Any] = Field(default_factory=dict)
+    confidence: float = 0.5
+    response_type: Literal["tool_execution", "conversation"]
+    anticipated_follow_up: str = ""
+    context_flags: List[str] = Field(default_factory=list)
+
+
 class ReasoningError(Exception):
     """Raised when reasoning process fails."""
     pass
 
 
+@lru_cache(maxsize=4)
+def _read_intent_classifier(path: str, mtime: float) -> Optional[IntentClassifier]:
+    try:
+        return IntentClassifier.load(path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load intent classifier from {path}: {e}")
+        return None
+
+
+def _load_intent_classifier() -> Optional[IntentClassifier]:
+    """Shared trained intent classifier, if one is configured and present."""
+    if os.getenv("ESSAY_AGENT_INTENT_CLASSIFIER", "1") == "0":
+        return None
+    path = os.getenv("ESSAY_AGENT_INTENT_MODEL", "memory_store/intent_classifier.json")
+    if not os.path.exists(path):
+        return None
+    # Keyed on mtime so a retrained model is picked up by the next agent
+    return _read_intent_classifier(path, os.path.getmtime(path))
+
+
 class ReasoningEngine:
     """LLM-powered reasoning engine with prompt optimization.
     
@@ -63,6 +103,7 @@ class ReasoningEngine:
         self.prompt_builder = prompt_builder
         self.prompt_optimizer = prompt_optimizer
         self.llm = get_chat_llm()
+        self._model = str(getattr(self.llm, "model_name", None) or "fake")
         
         # Initialize Phase 2 LLM-driven components
         self.tool_selector = comprehensive_tool_selector
@@ -72,11 +113,17 @@ class ReasoningEngine:
         self.total_reasoning_time = 0.0
         self.success_count = 0
         
-        # Simple caching for performance
+        # Simple caching for performance; reasoning responses live in the
+        # process-wide memo so they survive the agent being rebuilt
         self.prompt_cache = {}
-        self.response_cache = {}
-        self.cache_max_size = 50
+        self.response_cache = get_reasoning_cache()
         
+        # Local intent → tool classifier (skips the LLM call when confident)
+        self.intent_classifier = _load_intent_classifier()
+        self.intent_threshold = float(os.getenv("ESSAY_AGENT_INTENT_THRESHOLD", str(DEFAULT_THRESHOLD)))
+        self.intent_stats = {"decided": 0, "fell_through": 0}
+        
+    @traced("reasoning_engine")
     async def reason_about_action(
         self, 
         user_input: str, 
@@ -104,36 +151,49 @@ class ReasoningEngine:
             # Check for fast-path simple requests
             simple_response = self._try_simple_reasoning(user_input, context)
             if simple_response:
+                self._trace_path("simple")
                 return simple_response
             
+            # Confident local intent classification skips the LLM call
+            local_response = self._try_local_intent(user_input)
+            if local_response:
+                self._trace_path("local_intent")
+                return local_response
+            
             # Build optimized reasoning prompt with context optimization
-            prompt_data = await self.prompt_builder.build_reasoning_prompt(
-                user_input=user_input,
-                context=self._optimize_context_size(context),
-                prompt_type="action_reasoning"
-            )
+            with span("reasoning.build_prompt"):
+                prompt_data = await self.prompt_builder.build_reasoning_prompt(
+                    user_input=user_input,
+                    context=self._optimize_context_size(context),
+                    prompt_type="action_reasoning"
+                )
             
             # Check cache first
-            cache_key = self._generate_cache_key(prompt_data["prompt"], user_input, context)
-            if cache_key in self.response_cache:
-                cached_response = self.response_cache[cache_key]
+            cache_key = self._generate_cache_key(prompt_data["prompt"])
+            cached_response = self.response_cache.get(cache_key)
+            if cached_response is not None:
                 logger.debug("Using cached reasoning response")
+                self._trace_path("cached")
                 reasoning_time = time.time() - start_time
                 return self._create_cached_result(cached_response, reasoning_time, prompt_data.get("version", "default"))
             
             # Get LLM reasoning response
-            llm_response = await self._call_llm_with_retry(prompt_data["prompt"])
+            self._trace_path("llm")
+            llm_start = time.time()
+            llm_response = await self._call_llm_with_retry(prompt_data["prompt"], schema=ReasoningOutput)
             
             # Cache the response
-            self._cache_response(cache_key, llm_response)
+            self._cache_response(cache_key, llm_response, cost_seconds=time.time() - llm_start)
             
             # Parse and validate response
-            reasoning_dict = self._parse_reasoning_response(llm_response)
+            with span("reasoning.parse"):
+                reasoning_dict = self._parse_reasoning_response(llm_response)
             
             # PHASE 2 ENHANCEMENT: Use context-aware tool selection for validation/enhancement
-            enhanced_reasoning = await self._enhance_with_context_aware_selection(
-                reasoning_dict, user_input, context
-            )
+            with span("reasoning.tool_selection"):
+                enhanced_reasoning = await self._enhance_with_context_aware_selection(
+                    reasoning_dict, user_input, context
+                )
             
             # Create structured result
             reasoning_time = time.time() - start_time
@@ -304,39 +364,44 @@ class ReasoningEngine:
             
             raise ReasoningError(f"Invalid reasoning response format: {e}") from e
     
-    async def _call_llm_with_retry(self, prompt: str, max_retries: int = 3) -> str:
+    async def _call_llm_with_retry(self, prompt: str, schema: Optional[type[BaseModel]] = None) -> str:
         """Call LLM with retry logic and error handling.
         
+        The call goes through :func:`acall_llm`, so it shares the provider
+        rate limits, priority lanes, circuit breaker, model routing, request
+        deadline and retry budget with every other LLM call of the process.
+        Those retries only cover errors; an empty completion is asked for
+        once more with the response cache bypassed, so a blank answer that
+        was cached is not replayed.
+        
         Args:
             prompt: The prompt to send to the LLM
-            max_retries: Maximum number of retry attempts
+            schema: Pydantic model the answer must follow; requested from the
+                provider as structured output when the client supports it
             
         Returns:
             LLM response string
             
         Raises:
-            ReasoningError: If all retries fail
+            ReasoningError: If the call fails after the client's retries or
+                the uncached retry is empty too
         """
-        last_error = None
-        
-        for attempt in range(max_retries):
-            try:
-                response = await self.llm.apredict(prompt)
-                if response and response.strip():
-                    return response.strip()
-                else:
-                    raise ValueError("Empty response from LLM")
-                    
-            except Exception as e:
-                last_error = e
-                logger.warning(f"LLM call attempt {attempt + 1} failed: {e}")
-                
-                if attempt < max_retries - 1:
-                    # Wait before retry with exponential backoff
-                    wait_time = (2 ** attempt) * 1.0
-                    await asyncio.sleep(wait_time)
-                    
-        raise ReasoningError(f"LLM call failed after {max_retries} attempts: {last_error}") from last_error
+        response = await self._acall(prompt, schema)
+        if not response or not response.strip():
+            logger.warning("Empty response from LLM; retrying without the response cache")
+            response = await self._acall(prompt, schema, cache=False)
+        
+        if not response or not response.strip():
+            raise ReasoningError("Empty response from LLM")
+        return response.strip()
+    
+    async def _acall(self, prompt: str, schema: Optional[type[BaseModel]], **kwargs: Any) -> str:
+        """Run one :func:`acall_llm` round-trip, wrapping failures in ReasoningError."""
+        try:
+            return await acall_llm(self.llm, prompt, caller="reasoning", structured=schema, **kwargs)
+        except Exception as e:
+            logger.warning(f"LLM call failed: {e}")
+            raise ReasoningError(f"LLM call failed: {e}") from e
     
     def _clean_response(self, response: str) -> str:
         """Clean and validate natural language response.
@@ -426,6 +491,47 @@ class ReasoningEngine:
         
         return None
     
+    @staticmethod
+    def _trace_path(path: str) -> None:
+        """Note on the turn's trace how reasoning was answered (simple/local_intent/cached/llm)."""
+        active = current_span()
+        if active is not None:
+            active.set(path=path)
+    
+    def _try_local_intent(self, user_input: str) -> Optional[ReasoningResult]:
+        """Decide the tool with the local intent classifier when it is confident.
+        
+        Args:
+            user_input: User's message
+            
+        Returns:
+            ReasoningResult if the classifier clears the threshold, None otherwise
+        """
+        if self.intent_classifier is None:
+            return None
+        
+        start = time.time()
+        decision = self.intent_classifier.decide(user_input, self.intent_threshold)
+        if decision is None:
+            self.intent_stats["fell_through"] += 1
+            return None
+        
+        label, probability = decision
+        self.intent_stats["decided"] += 1
+        is_conversation = label == CONVERSATION
+        return ReasoningResult(
+            context_understanding=f"Local intent classifier: {label}",
+            reasoning=f"Classified locally as '{label}' (p={probability:.2f}) - skipping LLM reasoning",
+            chosen_tool=None if is_conversation else label,
+            tool_args={} if is_conversation else {"user_input": user_input},
+            confidence=probability,
+            response_type="conversation" if is_conversation else "tool_execution",
+            anticipated_follow_up="",
+            context_flags=[LOCAL_INTENT],
+            reasoning_time=time.time() - start,
+            prompt_version="local_intent"
+        )
+    
     def _optimize_context_size(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize context size for faster LLM processing.
         
@@ -458,55 +564,37 @@ class ReasoningEngine:
         
         return optimized
     
-    def _generate_cache_key(self, prompt: str, user_input: str = "", context: Dict[str, Any] = None) -> str:
-        """Generate cache key for prompt including user context.
+    def _generate_cache_key(self, prompt: str) -> str:
+        """Generate cache key for the full reasoning prompt.
+        
+        The key covers the whole normalised prompt (which already embeds the
+        user input and context) and every model parameter that shapes the
+        answer, so different contexts never share an entry.
         
         Args:
             prompt: LLM prompt text
-            user_input: User's input for context differentiation  
-            context: Context dictionary for additional differentiation
             
         Returns:
             Cache key string
         """
-        import hashlib
-        
-        # BUGFIX: Include user input and context in cache key to prevent 
-        # identical responses for different user inputs
-        key_components = [
-            prompt[:500],  # First 500 chars of prompt
-            user_input[:200],  # First 200 chars of user input
-        ]
-        
-        # Add context hash if available
-        if context:
-            # Create a stable hash of relevant context keys
-            context_keys = ["user_profile", "conversation_history", "current_input"]
-            context_parts = []
-            for key in context_keys:
-                if key in context and context[key]:
-                    context_parts.append(f"{key}:{str(context[key])[:100]}")
-            if context_parts:
-                key_components.append(",".join(context_parts))
-        
-        # Create hash of combined components
-        combined = "|".join(key_components)
-        return hashlib.md5(combined.encode()).hexdigest()
+        return memo_key(
+            prompt,
+            model=self._model,
+            temperature=getattr(self.llm, "temperature", None),
+            max_tokens=getattr(self.llm, "max_tokens", None),
+            schema=ReasoningOutput.__name__,
+            structured=structured_mode(),
+        )
     
-    def _cache_response(self, cache_key: str, response: str) -> None:
+    def _cache_response(self, cache_key: str, response: str, cost_seconds: float = 0.0) -> None:
         """Cache LLM response.
         
         Args:
             cache_key: Cache key
             response: LLM response to cache
+            cost_seconds: How long the LLM call took (reported as saved on hits)
         """
-        if len(self.response_cache) >= self.cache_max_size:
-            # Remove oldest entries
-            keys_to_remove = list(self.response_cache.keys())[:10]
-            for key in keys_to_remove:
-                del self.response_cache[key]
-        
-        self.response_cache[cache_key] = response
+        self.response_cache.put(cache_key, response, cost_seconds=cost_seconds)
     
     def _create_cached_result(self, cached_response: str, reasoning_time: float, prompt_version: str) -> ReasoningResult:
         """Create ReasoningResult from cached response.
@@ -542,6 +630,7 @@ class ReasoningEngine:
         """
         avg_time = self.total_reasoning_time / max(self.reasoning_count, 1)
         success_rate = self.success_count / max(self.reasoning_count, 1)
+        cache_stats = self.response_cache.stats()
         
         return {
             "total_reasoning_requests": self.reasoning_count,
@@ -549,8 +638,10 @@ class ReasoningEngine:
             "success_rate": success_rate,
             "average_reasoning_time": avg_time,
             "total_reasoning_time": self.total_reasoning_time,
-            "cache_hit_ratio": len(self.response_cache) / max(self.reasoning_count, 1),
-            "cache_size": len(self.response_cache)
+            "cache_hit_ratio": cache_stats["hit_ratio"],
+            "cache_size": cache_stats["entries"],
+            "cache": cache_stats,
+            "local_intent": dict(self.intent_stats)
         }
     
     # =========================================================================
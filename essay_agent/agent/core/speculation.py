@@ -0,0 +1,299 @@
+"""Speculative tool pre-execution while reasoning is in flight.
+
+A ReAct turn runs reasoning and then the chosen tool back to back, although
+the tool is often obvious before the model answers: the user asks for an
+outline right after brainstorming, or the local intent classifier is fairly
+sure of the tool without being sure enough to skip reasoning.
+
+:class:`ToolPredictor` makes that guess.  :class:`Speculator` starts the
+predicted tool (with the arguments the executor would give it) as a task
+before reasoning and, once reasoning has chosen:
+
+* same tool and the same material arguments → the task's result is used
+  (a *hit*; the overlap between the tool and reasoning is saved);
+* anything else → the task is cancelled (a *miss*; the tool time and the
+  LLM tokens it had spent are wasted) and the turn runs normally.
+
+Reasoning's arguments are phrased by the model, so they are compared after
+normalisation (case, whitespace, trailing punctuation) and only on the
+arguments that decide what the tool produces (:data:`MATERIAL_ARGS`, after
+the executor's parameter mapping).  Every material argument reasoning set
+must equal the speculative run's; one it left unset is the value the
+speculative run took from the user's message, as the local paths do.
+
+Only the core workflow tools are speculated on: they only read the profile
+and generate text, so a discarded run has no side effects beyond its cost.
+The speculative run inherits the turn's request deadline and retry budget.
+Tools that run synchronously in a worker thread cannot be interrupted; their
+cancelled result is simply dropped.
+
+Configuration
+-------------
+* ``ESSAY_AGENT_SPECULATIVE_TOOLS=0`` – never speculate.
+* ``ESSAY_AGENT_SPECULATION_THRESHOLD`` (0.6) – minimum intent-classifier
+  probability to speculate.  Lower than the intent threshold for skipping
+  reasoning: a wrong guess here only costs wasted work, not a wrong answer.
+  The next workflow step is also speculated on below the threshold, but only
+  when the classifier gives it at least half the threshold and the keyword
+  selector agrees.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from essay_agent.llm.telemetry import token_meter
+from essay_agent.llm.tracing import span
+
+from .intent_classifier import IntentClassifier
+
+logger = logging.getLogger(__name__)
+
+# Tools without side effects beyond generating text from the profile
+SPECULATIVE_TOOLS = ("brainstorm", "outline", "draft", "revise", "polish")
+
+# brainstorm → outline → draft → revise → polish, as ComprehensiveToolSelector enforces
+WORKFLOW_NEXT = {
+    "brainstorm": "outline",
+    "outline": "draft",
+    "draft": "revise",
+    "revise": "polish",
+}
+
+# Prepared arguments (executor names) that decide a speculated tool's output
+MATERIAL_ARGS = {
+    "brainstorm": ("essay_prompt",),
+    "outline": ("chosen_story", "essay_prompt", "word_count"),
+    "draft": ("outline", "essay_prompt", "target_word_count"),
+    "revise": ("essay_draft", "revision_focus"),
+    "polish": ("essay_draft", "word_limit"),
+}
+
+DEFAULT_SPECULATION_THRESHOLD = 0.6
+
+# Share of the threshold the classifier must give the next workflow step
+WORKFLOW_AGREEMENT = 0.5
+
+
+def _normalize(value: Any) -> Any:  # noqa: ANN401
+    """Comparable form of an argument value; ``None`` for empty values."""
+
+    if isinstance(value, str):
+        value = " ".join(value.split()).casefold().rstrip(".!?")
+    elif isinstance(value, dict):
+        value = {k: v for k, v in ((k, _normalize(v)) for k, v in value.items()) if v is not None}
+    elif isinstance(value, (list, tuple)):
+        value = [_normalize(v) for v in value]
+    return None if value in ("", [], {}) else value
+
+
+class ToolPredictor:
+    """Guess the tool reasoning is about to choose, only when confident."""
+
+    def __init__(
+        self,
+        classifier: Optional[IntentClassifier] = None,
+        tool_selector: Any = None,  # noqa: ANN401
+        threshold: float = DEFAULT_SPECULATION_THRESHOLD,
+    ):
+        self.classifier = classifier
+        self.tool_selector = tool_selector
+        self.threshold = threshold
+
+    def predict(self, user_input: str, last_tool: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """``(tool, confidence)`` worth speculating on, or ``None``.
+
+        Args:
+            user_input: User's message
+            last_tool: Tool executed on the previous turn, if any
+
+        Returns:
+            The classifier's label when it clears the threshold, otherwise the
+            next workflow step when the classifier leans towards it
+            (:data:`WORKFLOW_AGREEMENT`) and the message asks for exactly that step
+        """
+        if self.classifier is None:
+            return None
+        label, probability = self.classifier.predict(user_input)
+        if label in SPECULATIVE_TOOLS and probability >= self.threshold:
+            return label, probability
+
+        next_step = WORKFLOW_NEXT.get(last_tool or "")
+        if next_step is None or self.tool_selector is None or label != next_step:
+            return None
+        if probability < self.threshold * WORKFLOW_AGREEMENT:
+            return None
+        keyword_tools = self.tool_selector._get_workflow_aware_fallback(user_input, 1)
+        if keyword_tools and keyword_tools[0] == next_step:
+            return next_step, probability
+        return None
+
+
+class SpeculativeRun:
+    """One tool started ahead of reasoning."""
+
+    def __init__(self, tool_name: str, tool_args: Dict[str, Any], confidence: float):
+        self.tool_name = tool_name
+        self.tool_args = tool_args
+        self.confidence = confidence
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.meter = None
+        self.task: Optional[asyncio.Task] = None
+
+    def matches(self, tool_name: Optional[str], tool_args: Dict[str, Any]) -> bool:
+        """Whether reasoning's prepared call would produce this run's result."""
+
+        if tool_name != self.tool_name:
+            return False
+        for key in MATERIAL_ARGS.get(tool_name, ()):
+            wanted = _normalize(tool_args.get(key))
+            if wanted is not None and wanted != _normalize(self.tool_args.get(key)):
+                return False
+        return True
+
+    async def _run(self, executor: Any) -> Any:  # noqa: ANN401
+        with span("speculative_tool", tool=self.tool_name), token_meter() as self.meter:
+            try:
+                return await executor.execute_tool(self.tool_name, dict(self.tool_args))
+            finally:
+                self.finished_at = time.perf_counter()
+
+
+class Speculator:
+    """Starts, claims and cancels speculative tool runs; keeps hit-rate counters."""
+
+    def __init__(self, predictor: ToolPredictor, *, enabled: bool = True):
+        self.predictor = predictor
+        self.enabled = enabled
+        self.stats = {
+            "started": 0,
+            "hits": 0,
+            "misses": 0,
+            "failed": 0,
+            "saved_seconds": 0.0,
+            "wasted_seconds": 0.0,
+            "wasted_tokens": 0,
+        }
+
+    @classmethod
+    def from_env(cls, classifier: Optional[IntentClassifier], tool_selector: Any) -> "Speculator":  # noqa: ANN401
+        threshold = float(os.getenv("ESSAY_AGENT_SPECULATION_THRESHOLD", str(DEFAULT_SPECULATION_THRESHOLD)))
+        return cls(
+            ToolPredictor(classifier, tool_selector, threshold),
+            enabled=os.getenv("ESSAY_AGENT_SPECULATIVE_TOOLS", "1") != "0",
+        )
+
+    async def start(
+        self,
+        executor: Any,  # noqa: ANN401
+        user_input: str,
+        last_tool: Optional[str] = None,
+        essay_prompt: Optional[str] = None,
+    ) -> Optional[SpeculativeRun]:
+        """Start the predicted tool in the background, if there is a confident prediction.
+
+        Args:
+            executor: ActionExecutor that will run the turn's action
+            user_input: User's message
+            last_tool: Tool executed on the previous turn, if any
+            essay_prompt: Essay prompt of the current essay, if known
+
+        Returns:
+            The in-flight run, or None when nothing was started
+        """
+        if not self.enabled:
+            return None
+        try:
+            prediction = self.predictor.predict(user_input, last_tool)
+            if prediction is None or not executor.tool_registry.has_tool(prediction[0]):
+                return None
+            tool_name, confidence = prediction
+            # Same arguments _act would build for a locally decided tool
+            tool_args = {"user_input": user_input}
+            if essay_prompt:
+                tool_args["essay_prompt"] = essay_prompt
+            tool_args = await executor.prepare_tool_args(tool_name, tool_args, {"confidence": confidence})
+        except Exception as e:
+            logger.debug(f"Not speculating: {e}")
+            return None
+
+        run = SpeculativeRun(tool_name, tool_args, confidence)
+        run.task = asyncio.create_task(run._run(executor))
+        self.stats["started"] += 1
+        logger.debug(f"Speculatively started '{tool_name}' (confidence {confidence:.2f})")
+        return run
+
+    async def claim(
+        self, run: Optional[SpeculativeRun], tool_name: Optional[str], tool_args: Dict[str, Any]
+    ) -> Tuple[bool, Any]:
+        """Use *run*'s result if reasoning chose the same tool with the same material arguments.
+
+        Args:
+            run: Speculative run of this turn (None if none was started)
+            tool_name: Tool reasoning chose
+            tool_args: Prepared arguments for that tool
+
+        Returns:
+            ``(True, result)`` on a hit; ``(False, None)`` when the caller
+            must run the tool itself (the run is cancelled or had failed)
+        """
+        if run is None or run.task is None:
+            return False, None
+        if not run.matches(tool_name, tool_args):
+            await self.cancel(run)
+            return False, None
+
+        claimed_at = time.perf_counter()
+        task, run.task = run.task, None
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+            self._wasted(run, claimed_at)
+            return False, None
+        except Exception as e:
+            logger.info(f"Speculative '{run.tool_name}' failed ({e}) – running it again")
+            self.stats["failed"] += 1
+            self._wasted(run, claimed_at)
+            return False, None
+
+        self.stats["hits"] += 1
+        # Tool time that overlapped reasoning instead of following it
+        self.stats["saved_seconds"] += min(run.finished_at or claimed_at, claimed_at) - run.started_at
+        return True, result
+
+    async def cancel(self, run: Optional[SpeculativeRun]) -> None:
+        """Cancel *run* if it is still unclaimed and count it as a miss."""
+
+        if run is None or run.task is None:
+            return
+        task, run.task = run.task, None
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                raise
+        except Exception:
+            pass
+        self.stats["misses"] += 1
+        self._wasted(run, time.perf_counter())
+        logger.debug(f"Cancelled speculative '{run.tool_name}'")
+
+    def _wasted(self, run: SpeculativeRun, until: float) -> None:
+        self.stats["wasted_seconds"] += (run.finished_at or until) - run.started_at
+        if run.meter is not None:
+            self.stats["wasted_tokens"] += run.meter.total_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        decided = stats["hits"] + stats["misses"] + stats["failed"]
+        stats["hit_rate"] = round(stats["hits"] / decided, 4) if decided else 0.0
+        stats["saved_seconds"] = round(stats["saved_seconds"], 3)
+        stats["wasted_seconds"] = round(stats["wasted_seconds"], 3)
+        return stats
@@ -18,6 +18,7 @@ from essay_agent.memory.semantic_search import SemanticSearchIndex
 from essay_agent.memory.conversation import JSONConversationMemory
 from essay_agent.memory.context_manager import ContextWindowManager
 from essay_agent.memory.user_profile_schema import UserProfile
+from essay_agent.llm.tracing import traced
 
 # Import ReAct components
 from .react_models import (
@@ -82,6 +83,7 @@ class AgentMemory:
     # Core ReAct Memory Operations
     # ================================================================
     
+    @traced("memory.store_reasoning_chain")
     def store_reasoning_chain(self, reasoning: Optional[Dict[str, Any]] = None, 
                                 user_input: str = "", reasoning_steps: List[Dict] = None,
                                 final_action: str = "", success: bool = True, **kwargs) -> str:
@@ -224,6 +226,7 @@ class AgentMemory:
     # Context Retrieval and Pattern Detection
     # ================================================================
     
+    @traced("memory.get_relevant_context")
     def get_relevant_context(self, query: str, max_tokens: int = 2000,
                            context_types: Optional[List[str]] = None) -> RetrievedContext:
         """Get relevant context for ReAct reasoning.
@@ -251,6 +254,7 @@ class AgentMemory:
             logger.error(f"Error retrieving context: {e}")
             return self._get_simple_context(query, max_tokens)
     
+    @traced("memory.retrieve_context")
     def retrieve_context(self, user_input: str = "", context_size: int = 2000, 
                         include_patterns: bool = True, include_recent_tools: bool = True, 
                         **kwargs) -> RetrievedContext:
@@ -404,6 +408,7 @@ class AgentMemory:
         except Exception as e:
             logger.error(f"Error updating context: {e}")
     
+    @traced("memory.get_user_profile")
     def get_user_profile(self) -> Dict[str, Any]:
         """Get user profile data.
         
@@ -430,6 +435,7 @@ class AgentMemory:
             logger.error(f"Error getting user profile: {e}")
             return {}
     
+    @traced("memory.get_essay_state")
     def get_essay_state(self) -> Dict[str, Any]:
         """Get current essay work state.
         
@@ -458,6 +464,7 @@ class AgentMemory:
             logger.error(f"Error getting essay state: {e}")
             return {"stage": "planning", "word_count": 0, "drafts": []}
     
+    @traced("memory.get_recent_history")
     def get_recent_history(self, turns: int = 5) -> List[Dict[str, Any]]:
         """Get recent conversation turns.
         
@@ -711,6 +718,7 @@ class AgentMemory:
     # ReAct Agent Integration Methods
     # ================================================================
     
+    @traced("memory.update_user_profile")
     async def update_user_profile(self, updated_profile: Dict[str, Any]) -> None:
         """Update user profile with new information from context extraction.
         
@@ -796,6 +804,7 @@ class AgentMemory:
         except Exception as e:
             logger.error(f"Error updating user profile: {e}")
     
+    @traced("memory.store_tool_execution")
     async def store_tool_execution(
         self,
         tool_name: str,
@@ -836,6 +845,7 @@ class AgentMemory:
         except Exception as e:
             logger.error(f"Error storing tool execution: {e}")
     
+    @traced("memory.store_conversation_turn")
     async def store_conversation_turn(
         self,
         user_input: str,
@@ -866,6 +876,7 @@ class AgentMemory:
     # Context Manager Methods (for existing compatibility)
     # ================================================================
     
+    @traced("memory.save_context")
     def _save_context(self) -> None:
         """Save context to persistent storage."""
         try:
@@ -876,6 +887,7 @@ class AgentMemory:
         except Exception as e:
             logger.error(f"Error saving context: {e}")
     
+    @traced("memory.load_context")
     def _load_context(self) -> None:
         """Load context from persistent storage."""
         try:
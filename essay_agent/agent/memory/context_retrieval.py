@@ -11,7 +11,7 @@ import logging
 from typing import Any, Dict, List, Optional, Set, Tuple
 from pathlib import Path
 
-import tiktoken
+from essay_agent.llm.tokenizer import count_tokens, get_tokenizer
 
 # Import existing memory infrastructure
 from essay_agent.memory.hierarchical import HierarchicalMemory
@@ -19,6 +19,7 @@ from essay_agent.memory.semantic_search import SemanticSearchIndex
 from essay_agent.memory.conversation import JSONConversationMemory  
 from essay_agent.memory.context_manager import ContextWindowManager
 from essay_agent.memory.user_profile_schema import CoreValue, DefiningMoment
+from essay_agent.llm.tracing import traced
 
 # Import ReAct models
 from .react_models import (
@@ -43,7 +44,7 @@ class ContextRetriever:
         """
         self.user_id = user_id
         self.memory_dir = Path("memory_store")
-        self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.tokenizer = get_tokenizer()
         
         # Initialize memory components
         try:
@@ -61,6 +62,7 @@ class ContextRetriever:
             self.conversation_memory = None
             self.context_manager = None
     
+    @traced("context_retrieval.retrieve_context")
     def retrieve_context(self, 
                         query: str, 
                         context_types: Optional[List[str]] = None,
@@ -114,6 +116,7 @@ class ContextRetriever:
             optimization_applied=optimization_applied
         )
     
+    @traced("context_retrieval.get_conversation_context")
     def _get_conversation_context(self, query: str) -> List[ContextElement]:
         """Get relevant conversation context."""
         elements = []
@@ -140,7 +143,7 @@ class ContextRetriever:
             
             for i, message in enumerate(recent_messages):
                 content = f"{message.type}: {message.content}"
-                tokens = len(self.encoding.encode(content))
+                tokens = count_tokens(content)
                 
                 # Simple relevance based on keyword overlap
                 relevance = self._calculate_keyword_overlap(query, content)
@@ -157,6 +160,7 @@ class ContextRetriever:
         
         return elements
     
+    @traced("context_retrieval.get_semantic_context")
     def _get_semantic_context(self, query: str) -> List[ContextElement]:
         """Get relevant semantic context from user profile."""
         elements = []
@@ -189,7 +193,7 @@ class ContextRetriever:
                 else:
                     continue
                 
-                tokens = len(self.encoding.encode(text))
+                tokens = count_tokens(text)
                 relevance = self._calculate_semantic_relevance(query, text)
                 
                 elements.append(ContextElement(
@@ -204,6 +208,7 @@ class ContextRetriever:
         
         return elements
     
+    @traced("context_retrieval.get_tool_history_context")
     def _get_tool_history_context(self, query: str) -> List[ContextElement]:
         """Get relevant tool execution history."""
         elements = []
@@ -232,7 +237,7 @@ class ContextRetriever:
                     }
                     
                     text = f"Tool: {tool_name} - {reasoning}"
-                    tokens = len(self.encoding.encode(text))
+                    tokens = count_tokens(text)
                     relevance = self._calculate_keyword_overlap(query, text)
                     
                     elements.append(ContextElement(
@@ -247,6 +252,7 @@ class ContextRetriever:
         
         return elements
     
+    @traced("context_retrieval.get_reasoning_history_context")
     def _get_reasoning_history_context(self, query: str) -> List[ContextElement]:
         """Get relevant reasoning chain history."""
         elements = []
@@ -275,7 +281,7 @@ class ContextRetriever:
                     }
                     
                     text = f"Similar request: {user_input} -> {final_action}"
-                    tokens = len(self.encoding.encode(text))
+                    tokens = count_tokens(text)
                     relevance = self._calculate_keyword_overlap(query, text)
                     
                     elements.append(ContextElement(
@@ -295,6 +301,7 @@ class ContextRetriever:
         # Sort by relevance score (descending)
         return sorted(elements, key=lambda x: x.relevance_score, reverse=True)
     
+    @traced("context_retrieval.optimize_context_window")
     def _optimize_context_window(self, 
                                  elements: List[ContextElement], 
                                  max_tokens: int) -> Tuple[List[ContextElement], bool]:
@@ -380,25 +387,16 @@ class ContextRetriever:
     
     def _truncate_text(self, text: str, max_tokens: int) -> Optional[str]:
         """Truncate text to fit token budget."""
-        tokens = self.encoding.encode(text)
-        
-        if len(tokens) <= max_tokens:
+        if count_tokens(text) <= max_tokens:
             return text
         
         if max_tokens < 10:  # Too small to be useful
             return None
         
-        # Truncate tokens and decode back to text
-        truncated_tokens = tokens[:max_tokens]
         try:
-            return self.encoding.decode(truncated_tokens)
+            return self.tokenizer.truncate(text, max_tokens)
         except Exception:
-            # If decoding fails, truncate more conservatively
-            truncated_tokens = tokens[:max_tokens - 10]
-            try:
-                return self.encoding.decode(truncated_tokens)
-            except Exception:
-                return None
+            return None
     
     def _calculate_keyword_overlap(self, query: str, text: str) -> float:
         """Calculate relevance based on keyword overlap."""
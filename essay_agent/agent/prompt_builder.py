@@ -9,8 +9,11 @@ import logging
 import asyncio
 from datetime import datetime
 
+from essay_agent.llm.tokenizer import count_tokens
+
 from .prompts import (
     ADVANCED_REASONING_PROMPT,
+    CURRENT_TURN_MARKER,
     ENHANCED_CONVERSATION_PROMPT,
     TOOL_SPECIFIC_PROMPTS,
     ERROR_RECOVERY_STRATEGIES,
@@ -35,6 +38,17 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Every tool attribute format_tool_descriptions renders into the catalog
+_CATALOG_FIELDS = ("category", "description", "when_to_use", "input_requirements", "confidence_threshold")
+
+
+def _catalog_key(tool_registry: Dict[str, Any]) -> tuple:
+    """Cache key that changes whenever the rendered tool catalog would."""
+    return tuple(
+        (name, tuple(repr(getattr(desc, field, None)) for field in _CATALOG_FIELDS))
+        for name, desc in tool_registry.items()
+    )
+
 
 class PromptBuilder:
     """Dynamic prompt construction with context awareness.
@@ -54,6 +68,7 @@ class PromptBuilder:
         self.memory = memory
         self.tool_registry = tool_registry or TOOL_DESCRIPTIONS
         self.context_injector = ContextInjector()
+        self._tool_block: Optional[Tuple[tuple, str]] = None
         self._token_limits = {
             'gpt-4': 8192,
             'gpt-3.5-turbo': 4096,
@@ -92,7 +107,7 @@ class PromptBuilder:
             conversation_context = await self._get_conversation_context(safe_context)
             memory_context = await self._get_memory_context(safe_context)
             user_state = self._format_user_state(safe_context)
-            tool_descriptions = format_tool_descriptions(self.tool_registry)
+            tool_descriptions = self._tool_descriptions()
             performance_context = await self._get_performance_context(safe_context)
             
             # 4. Create formatting dictionary with all required keys
@@ -121,7 +136,8 @@ class PromptBuilder:
             return {
                 "prompt": optimized_prompt,
                 "version": prompt_type,
-                "task_type": task_type
+                "task_type": task_type,
+                "static_prefix_chars": optimized_prompt.find(CURRENT_TURN_MARKER),
             }
             
         except Exception as e:
@@ -131,7 +147,7 @@ class PromptBuilder:
                 conversation_context="Context unavailable",
                 memory_context="Memory unavailable", 
                 user_state="State unavailable",
-                tool_descriptions=format_tool_descriptions(self.tool_registry),
+                tool_descriptions=self._tool_descriptions(),
                 performance_context="Performance data unavailable",
                 user_input=user_input
             )
@@ -225,6 +241,17 @@ Execute the {tool_name} tool with enhanced context awareness.
                 memory_context="Memory unavailable"
             )
     
+    def _tool_descriptions(self) -> str:
+        """Formatted tool catalog, rebuilt only when the registry changes.
+
+        The catalog is the bulk of the static prompt prefix, so it must be
+        byte-identical from turn to turn for provider prompt caching to hit.
+        """
+        key = _catalog_key(self.tool_registry)
+        if self._tool_block is None or self._tool_block[0] != key:
+            self._tool_block = (key, format_tool_descriptions(self.tool_registry))
+        return self._tool_block[1]
+
     def inject_context(self, template: str, context: Dict[str, Any]) -> str:
         """Inject context data into a prompt template.
         
@@ -248,8 +275,8 @@ Execute the {tool_name} tool with enhanced context awareness.
             Optimized prompt string
         """
         try:
-            # Estimate tokens (rough approximation: 1 token ≈ 4 characters)
-            estimated_tokens = len(prompt) // 4
+            # Real token count from the shared tokenizer (memoized per process)
+            estimated_tokens = count_tokens(prompt, model)
             token_limit = self._token_limits.get(model, self._token_limits['default'])
             
             # Reserve 25% for response
@@ -13,28 +13,15 @@ from datetime import datetime
 # ADVANCED REACT REASONING TEMPLATES
 # ============================================================================
 
-# Enhanced main reasoning prompt with sophisticated context awareness
+# Enhanced main reasoning prompt with sophisticated context awareness.
+# Static blocks first, per-turn content last (provider prompt-cache friendly).
 ADVANCED_REASONING_PROMPT = """
 You are an intelligent essay writing agent with deep expertise in college application essays.
 Your goal is to help students craft authentic, compelling essays that showcase their unique voice and experiences.
 
-CONVERSATION CONTEXT:
-{conversation_context}
-
-MEMORY CONTEXT:
-{memory_context}
-
-CURRENT USER STATE:
-{user_state}
-
 AVAILABLE TOOLS:
 {tool_descriptions}
 
-RECENT PERFORMANCE PATTERNS:
-{performance_context}
-
-USER REQUEST: "{user_input}"
-
 ===== REASONING FRAMEWORK =====
 Apply sophisticated reasoning using these steps:
 
@@ -69,8 +56,31 @@ Respond in JSON format:
     "anticipated_follow_up": "What you expect might happen next",
     "context_flags": ["any_important_context_indicators"]
 }}
+
+===== CURRENT TURN =====
+
+CONVERSATION CONTEXT:
+{conversation_context}
+
+MEMORY CONTEXT:
+{memory_context}
+
+CURRENT USER STATE:
+{user_state}
+
+RECENT PERFORMANCE PATTERNS:
+{performance_context}
+
+USER REQUEST: "{user_input}"
+
+Apply the reasoning framework above and respond with the JSON object only.
 """
 
+# Everything before this marker in a rendered reasoning prompt is identical
+# across turns and users (persona, tool catalog, framework, schema), so the
+# provider's prompt cache can serve it; per-turn content follows it.
+CURRENT_TURN_MARKER = "===== CURRENT TURN ====="
+
 # Context-aware conversation prompt for non-tool interactions
 ENHANCED_CONVERSATION_PROMPT = """
 You are an expert essay writing coach having a natural conversation with a student.
@@ -327,11 +337,12 @@ def format_tool_descriptions(tool_descriptions: Dict[str, Any]) -> str:
             categories[category] = []
         categories[category].append((tool_name, desc))
     
-    # Format each category
-    for category, tools in categories.items():
+    # Format each category (sorted so the block is byte-identical whatever
+    # order the registry was populated in – it sits in the cached prefix)
+    for category, tools in sorted(categories.items(), key=lambda item: str(item[0])):
         formatted_tools.append(f"\n{category.upper().replace('_', ' ')} TOOLS:")
         
-        for tool_name, desc in tools:
+        for tool_name, desc in sorted(tools, key=lambda item: str(item[0])):
             # Core info
             formatted_tools.append(f"  • {tool_name}: {getattr(desc, 'description', 'No description')}")
             
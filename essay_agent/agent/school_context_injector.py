@@ -12,7 +12,7 @@ import time
 from typing import Any, Dict, List, Optional, Set
 from dataclasses import dataclass
 
-from essay_agent.llm_client import get_chat_llm, call_llm
+from essay_agent.llm_client import get_chat_llm, acall_llm
 
 logger = logging.getLogger(__name__)
 
@@ -228,7 +228,7 @@ class SchoolContextInjector:
         Enhanced response:
         """
         
-        enhanced = call_llm(self.llm, enhancement_prompt, temperature=0.5, max_tokens=1000)
+        enhanced = await acall_llm(self.llm, enhancement_prompt, temperature=0.5, max_tokens=1000)
         return enhanced.strip()
     
     async def _enhance_outline_with_school(
@@ -260,7 +260,7 @@ class SchoolContextInjector:
         Enhanced response:
         """
         
-        enhanced = call_llm(self.llm, enhancement_prompt, temperature=0.5, max_tokens=1000)
+        enhanced = await acall_llm(self.llm, enhancement_prompt, temperature=0.5, max_tokens=1000)
         return enhanced.strip()
     
     async def _enhance_draft_with_school(
@@ -293,7 +293,7 @@ class SchoolContextInjector:
         Enhanced response:
         """
         
-        enhanced = call_llm(self.llm, enhancement_prompt, temperature=0.5, max_tokens=1200)
+        enhanced = await acall_llm(self.llm, enhancement_prompt, temperature=0.5, max_tokens=1200)
         return enhanced.strip()
     
     async def _enhance_general_with_school(
@@ -331,7 +331,7 @@ class SchoolContextInjector:
         Enhanced response:
         """
         
-        enhanced = call_llm(self.llm, enhancement_prompt, temperature=0.5, max_tokens=1000)
+        enhanced = await acall_llm(self.llm, enhancement_prompt, temperature=0.5, max_tokens=1000)
         return enhanced.strip()
     
     def _normalize_school_name(self, school_name: str) -> str:
@@ -7,13 +7,15 @@ successfully executes tools and integrates with the existing CLI system.
 import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 from datetime import datetime
 import os
 
 from essay_agent.tools import REGISTRY as TOOL_REGISTRY
 from essay_agent.memory.smart_memory import SmartMemory
-from essay_agent.llm_client import get_chat_llm
+from essay_agent.llm.budget import retry_budget
+from essay_agent.llm.deadline import DeadlineExceeded
+from essay_agent.llm_client import acall_llm, get_chat_llm, stream_llm
 from essay_agent.utils.logging import debug_print
 from essay_agent.reasoning.bulletproof_reasoning import BulletproofReasoning, ReasoningResult
 from essay_agent.tools.integration import build_params, execute_tool, format_tool_result
@@ -24,6 +26,19 @@ from essay_agent.agents.response_enhancer import ResponseEnhancer
 logger = logging.getLogger(__name__)
 
 
+_ERROR_RESPONSE = (
+    "I apologize, but I encountered an error. Let me try to help you in a different way. "
+    "What would you like to work on with your essay?"
+)
+
+
+async def _collect(chunks: AsyncIterator[str], parts: list[str]) -> AsyncIterator[str]:
+    """Pass *chunks* through, keeping a copy of each in *parts*."""
+    async for text in chunks:
+        parts.append(text)
+        yield text
+
+
 class ReasoningFallbackError(RuntimeError):
     """Raised when reasoning engine cannot decide and keyword fallback is disabled."""
 
@@ -56,6 +71,7 @@ class AutonomousEssayAgent:
         # Simple performance tracking
         self.session_start = datetime.now()
         self.interaction_count = 0
+        self.last_turn_budget: Dict[str, Any] = {}
         
         # Evaluation tracking (required by evaluation system)
         self.last_execution_tools = []
@@ -84,42 +100,94 @@ class AutonomousEssayAgent:
         Returns:
             Agent's response
         """
-        start_time = datetime.now()
         self.interaction_count += 1
         
-        try:
-            # === IMMEDIATE MEMORY UPDATE ===
-            # Save the user's input immediately so it's available for reasoning.
-            self.memory.add_message("user", user_input)
-
-            # ReAct Loop: Observe → Reason → Act → Respond
-            context = await self._observe(user_input)
-            reasoning = await self._reason(user_input, context)
-            action_result = await self._act(reasoning, user_input)
-            response = await self._respond(action_result, user_input)
-            
-            # === POST-RESPONSE MEMORY UPDATE ===
-            # Save the agent's response to complete the conversation turn.
-            self.memory.add_message("assistant", response)
-            
-            # learning hook
-            self.memory.learn({
-                "user_input": user_input,
-                "agent_response": response,
-                "tool_result": action_result if isinstance(action_result, dict) else {},
-            })
-            # Enhance tone before returning to user ---------------------------
-            context_meta = {
-                "college": self.memory.get("college", ""),
-                "essay_prompt": self.memory.get("essay_prompt", ""),
-            }
-            polite_level = int(os.getenv("ESSAY_AGENT_POLITENESS_LEVEL", "1"))
-            enhanced = ResponseEnhancer.enhance(response, context=context_meta, politeness_level=polite_level)
-            return enhanced
-            
-        except Exception as e:
-            logger.error(f"Error handling message: {e}")
-            return "I apologize, but I encountered an error. Let me try to help you in a different way. What would you like to work on with your essay?"
+        # One retry/deadline budget for every retry layer in this turn
+        with retry_budget() as budget:
+            try:
+                # ReAct Loop: Observe → Reason → Act → Respond
+                action_result = await self._begin_turn(user_input)
+                response = await self._respond(action_result, user_input)
+                return self._finish_turn(user_input, response, action_result)
+                
+            except DeadlineExceeded:
+                # The caller owns the deadline (the server answers 504)
+                raise
+            except Exception as e:
+                logger.error(f"Error handling message: {e}")
+                return _ERROR_RESPONSE
+            finally:
+                self.last_turn_budget = budget.report()
+
+    async def handle_message_stream(self, user_input: str) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming variant of :meth:`handle_message`.
+
+        Yields ``{"type": "token", "text": ...}`` events while the response is
+        composed, then one ``{"type": "done", "response": ...}`` event carrying
+        the final (tone-enhanced) text, which the tokens join to.  Memory
+        persistence happens exactly as in :meth:`handle_message`, once the
+        full response is known.
+        """
+        self.interaction_count += 1
+
+        # Same per-turn retry/deadline budget as the non-streaming turn
+        with retry_budget() as budget:
+            try:
+                action_result = await self._begin_turn(user_input)
+                parts: list[str] = []
+                shown: list[str] = []
+                raw = _collect(self._respond_stream(action_result, user_input), parts)
+                async for text in ResponseEnhancer.astream(raw, **self._tone()):
+                    shown.append(text)
+                    yield {"type": "token", "text": text}
+                self._remember_turn(user_input, "".join(parts), action_result)
+                response = "".join(shown)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                logger.error(f"Error handling message: {e}")
+                response = _ERROR_RESPONSE
+            finally:
+                self.last_turn_budget = budget.report()
+        yield {"type": "done", "response": response}
+
+    async def _begin_turn(self, user_input: str) -> Dict[str, Any]:
+        """Observe → Reason → Act for one turn, returning the action result."""
+        # === IMMEDIATE MEMORY UPDATE ===
+        # Save the user's input immediately so it's available for reasoning.
+        self.memory.add_message("user", user_input)
+
+        context = await self._observe(user_input)
+        reasoning = await self._reason(user_input, context)
+        return await self._act(reasoning, user_input)
+
+    def _finish_turn(self, user_input: str, response: str, action_result: Any) -> str:
+        """Persist the completed turn and return the tone-enhanced response."""
+        self._remember_turn(user_input, response, action_result)
+        # Enhance tone before returning to user ---------------------------
+        return ResponseEnhancer.enhance(response, **self._tone())
+
+    def _remember_turn(self, user_input: str, response: str, action_result: Any) -> None:
+        """Save the agent's (pre-enhancement) response and feed the learning hook."""
+        # === POST-RESPONSE MEMORY UPDATE ===
+        # Save the agent's response to complete the conversation turn.
+        self.memory.add_message("assistant", response)
+        
+        # learning hook
+        self.memory.learn({
+            "user_input": user_input,
+            "agent_response": response,
+            "tool_result": action_result if isinstance(action_result, dict) else {},
+        })
+
+    def _tone(self) -> Dict[str, Any]:
+        """Keyword arguments for :class:`ResponseEnhancer` in this session."""
+        context_meta = {
+            "college": self.memory.get("college", ""),
+            "essay_prompt": self.memory.get("essay_prompt", ""),
+        }
+        polite_level = int(os.getenv("ESSAY_AGENT_POLITENESS_LEVEL", "1"))
+        return {"context": context_meta, "politeness_level": polite_level}
     
     def _sync_snapshot(self, snap):
         # convert to dict & inject session info
@@ -182,7 +250,7 @@ class AutonomousEssayAgent:
             plan_list = planner.parse_response("{}", offline=True)
         else:
             try:
-                raw = await self.llm.apredict(prompt_str)
+                raw = await acall_llm(self.llm, prompt_str, caller="planner")
             except Exception as exc:  # pragma: no cover
                 logger.error("Planner LLM call failed: %s", exc)
                 raw = "{}"
@@ -267,6 +335,8 @@ class AutonomousEssayAgent:
             
             return {"type": "tool_result", "tool_name": tool_name, "result": result}
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Tool execution failed for {tool_name}: {e}")
             return {
@@ -316,7 +386,8 @@ class AutonomousEssayAgent:
         logger.info(f"Executing {tool_name} with unified state approach")
         
         try:
-            result = tool._run(state)
+            # Sync tools call call_llm, which must not wait for quota on the loop
+            result = await asyncio.to_thread(tool._run, state)
             
             # Save updated state
             manager.save_state(state)
@@ -478,6 +549,30 @@ class AutonomousEssayAgent:
         else:
             return "I'm here to help you with your essay writing. What would you like to work on?"
     
+    async def _respond_stream(self, action_result: Dict[str, Any], user_input: str) -> AsyncIterator[str]:
+        """Streaming counterpart of :meth:`_respond`.
+
+        Tool results are composed token-by-token; every other result type is
+        already a complete string and is yielded in one piece.
+        """
+        if isinstance(action_result, dict):
+            result_type = action_result.get("type")
+            target = None
+            if result_type == "tool_result":
+                target = action_result
+            elif result_type == "tool_result_sequence":
+                target = next((r for r in reversed(action_result["results"]) if r["type"] == "tool_result"), None)
+            if target is not None:
+                async for text in self._compose_response_stream(
+                    tool_name=target.get("tool_name"),
+                    tool_result=target.get("result"),
+                    user_input=user_input,
+                ):
+                    yield text
+                return
+
+        yield await self._respond(action_result, user_input)
+
     async def _compose_response(self, tool_name: str, tool_result: Dict[str, Any], user_input: str) -> str:
         """Compose a natural, contextual response using tool results and full context.
         
@@ -490,33 +585,60 @@ class AutonomousEssayAgent:
             Natural language response composed with full context
         """
         try:
-            # Gather all available context
-            from essay_agent.memory import load_user_profile
-            user_profile = load_user_profile(self.user_id)
-            essay_prompt = self.memory.get("essay_prompt", "")
-            college = self.memory.get("college", "")
-            recent_chat = self.memory.get_recent_chat(k=3)
-            
-            # Create comprehensive composition prompt
-            composition_prompt = self._build_composition_prompt(
-                tool_name=tool_name,
-                tool_result=tool_result,
-                user_input=user_input,
-                user_profile=user_profile,
-                essay_prompt=essay_prompt,
-                college=college,
-                recent_chat=recent_chat
-            )
+            composition_prompt = self._composition_prompt(tool_name, tool_result, user_input)
             
             # Generate contextual response using LLM
-            response = await self.llm.apredict(composition_prompt)
+            response = await acall_llm(self.llm, composition_prompt, caller="response_composition")
             return response
             
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logger.error(f"Response composition failed: {e}")
             # Fallback to simple formatting if composition fails
             from essay_agent.tools.integration import format_tool_result
             return format_tool_result(tool_name, tool_result)
+
+    async def _compose_response_stream(
+        self, tool_name: str, tool_result: Dict[str, Any], user_input: str
+    ) -> AsyncIterator[str]:
+        """Streaming mode of :meth:`_compose_response`.
+
+        Falls back to the formatted tool result when composition fails before
+        any text was produced; a mid-stream failure ends the stream early.
+        """
+        emitted = False
+        try:
+            composition_prompt = self._composition_prompt(tool_name, tool_result, user_input)
+            async for text in stream_llm(self.llm, composition_prompt, caller="response_composition"):
+                emitted = True
+                yield text
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.error(f"Response composition failed: {e}")
+            if not emitted:
+                from essay_agent.tools.integration import format_tool_result
+                yield format_tool_result(tool_name, tool_result)
+
+    def _composition_prompt(self, tool_name: str, tool_result: Dict[str, Any], user_input: str) -> str:
+        """Gather memory/profile context and build the composition prompt."""
+        from essay_agent.memory import load_user_profile
+        user_profile = load_user_profile(self.user_id)
+        essay_prompt = self.memory.get("essay_prompt", "")
+        college = self.memory.get("college", "")
+        recent_chat = self.memory.get_recent_chat(k=3)
+        
+        # Create comprehensive composition prompt
+        return self._build_composition_prompt(
+            tool_name=tool_name,
+            tool_result=tool_result,
+            user_input=user_input,
+            user_profile=user_profile,
+            essay_prompt=essay_prompt,
+            college=college,
+            recent_chat=recent_chat
+        )
     
     def _build_composition_prompt(
         self,
@@ -8,11 +8,11 @@ Usage:
 If ESSAY_AGENT_OFFLINE_TEST=1 the enhancer is a no-op so that unit tests
 remain deterministic.
 """
-from typing import Any, Dict
+from typing import Any, AsyncIterable, AsyncIterator, Dict
 import os
 import json
 
-from essay_agent.llm_client import get_chat_llm, call_llm
+from essay_agent.llm_client import get_chat_llm, call_llm, stream_llm
 from essay_agent.prompts.response_enhancer import ENHANCER_PROMPT
 
 _OFFLINE = os.getenv("ESSAY_AGENT_OFFLINE_TEST", "0") == "1"
@@ -32,17 +32,61 @@ class ResponseEnhancer:
         if _OFFLINE or not raw_text.strip():
             return raw_text  # deterministic path in tests
 
-        ctx = context or {}
-        prompt = ENHANCER_PROMPT.format(
-            raw_reply=raw_text,
-            context=json_safe(ctx),
-            politeness_level=politeness_level,
-        )
+        prompt = _prompt(raw_text, context, politeness_level)
         llm = get_chat_llm(temperature=0.2)
         improved = call_llm(llm, prompt).strip()
         # Guard: fall back if LLM returned empty string
         return improved or raw_text
 
+    @staticmethod
+    async def astream(
+        chunks: AsyncIterable[str], context: Dict[str, Any] | None = None, politeness_level: int = 1
+    ) -> AsyncIterator[str]:
+        """Streaming variant of :meth:`enhance` over a streamed reply.
+
+        The yielded chunks always join to what :meth:`enhance` returns for the
+        joined *chunks*.  When the enhancer is a no-op the reply's own chunks
+        pass straight through; otherwise the reply is collected and the
+        rewrite is streamed instead, since it replaces the text wholesale.
+        """
+        if _OFFLINE:
+            async for text in chunks:
+                yield text
+            return
+
+        raw_text = "".join([text async for text in chunks])
+        if not raw_text.strip():
+            if raw_text:
+                yield raw_text
+            return
+
+        prompt = _prompt(raw_text, context, politeness_level)
+        llm = get_chat_llm(temperature=0.2)
+        started = False
+        pending = ""  # trailing whitespace held back, as enhance() strips it
+        async for chunk in stream_llm(llm, prompt, caller="response_enhancer"):
+            if not started:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                started = True
+            text = pending + chunk
+            body = text.rstrip()
+            pending = text[len(body):]
+            if body:
+                yield body
+        # Guard: fall back if LLM returned empty string
+        if not started:
+            yield raw_text
+
+
+def _prompt(raw_text: str, context: Dict[str, Any] | None, politeness_level: int) -> str:
+    return ENHANCER_PROMPT.format(
+        raw_reply=raw_text,
+        context=json_safe(context or {}),
+        politeness_level=politeness_level,
+    )
+
 
 def json_safe(data: Any) -> str:  # noqa: D401
     """Safe JSON repr limited to 300 chars to avoid blowing prompt budget."""
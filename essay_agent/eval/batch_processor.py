@@ -23,6 +23,9 @@ from .conversation_runner import ConversationRunner, ConversationResult
 from .conversational_scenarios import ConversationScenario, ScenarioCategory
 from .real_profiles import UserProfile, get_profile_by_id
 from ..utils.logging import debug_print
+from ..llm_client import get_rate_limit_stats
+from ..llm.budget import retry_budget, spend_retry
+from ..llm.priority import BATCH, priority
 
 
 class BatchStatus(Enum):
@@ -57,6 +60,7 @@ class EvaluationTask:
     error: Optional[str] = None
     retry_count: int = 0
     max_retries: int = 2
+    retry_report: Dict[str, Any] = field(default_factory=dict)
     
     @property
     def duration_seconds(self) -> Optional[float]:
@@ -180,7 +184,8 @@ class BatchProcessor:
         max_parallel: int = 5,
         rate_limit_delay: float = 1.0,
         enable_llm_evaluation: bool = True,
-        progress_callback: Optional[Callable[[BatchProgress], None]] = None
+        progress_callback: Optional[Callable[[BatchProgress], None]] = None,
+        task_retry_budget: int = 20
     ):
         """
         Initialize batch processor.
@@ -190,11 +195,13 @@ class BatchProcessor:
             rate_limit_delay: Delay between API calls (seconds)
             enable_llm_evaluation: Whether to use LLM evaluation
             progress_callback: Callback for progress updates
+            task_retry_budget: Retries (task + LLM + tool) allowed per task
         """
         self.max_parallel = max_parallel
         self.rate_limit_delay = rate_limit_delay
         self.enable_llm_evaluation = enable_llm_evaluation
         self.progress_callback = progress_callback
+        self.task_retry_budget = task_retry_budget
         
         # Initialize components
         self.llm_evaluator = LLMEvaluator() if enable_llm_evaluation else None
@@ -361,11 +368,18 @@ class BatchProcessor:
         peak_parallel = 0
         
         async def process_single_task(task: EvaluationTask) -> EvaluationTask:
+            nonlocal peak_parallel
             async with semaphore:
                 current_parallel = len([t for t in self.running_tasks.values() if not t.done()])
                 peak_parallel = max(peak_parallel, current_parallel)
                 
-                return await self._execute_evaluation_task(task, completed_durations, progress)
+                # Task-wide retry budget: task retries and every retry inside
+                # its conversation turns draw from the same allowance.  Eval
+                # traffic runs in the batch lane so live /chat turns go first.
+                with retry_budget(max_retries=self.task_retry_budget, deadline=0) as budget, priority(BATCH):
+                    result = await self._execute_evaluation_task(task, completed_durations, progress)
+                task.retry_report = budget.report()
+                return result
         
         # Start all tasks
         task_futures = []
@@ -453,8 +467,8 @@ class BatchProcessor:
             
             debug_print(True, f"Task {task.task_id} failed: {e}")
             
-            # Retry if possible
-            if task.is_retryable():
+            # Retry if possible (and the task's retry budget allows it)
+            if task.is_retryable() and spend_retry("batch"):
                 task.retry_count += 1
                 task.status = EvaluationStatus.PENDING
                 progress.failed_tasks -= 1
@@ -736,5 +750,6 @@ class BatchProcessor:
             'max_parallel': self.max_parallel,
             'rate_limit_delay': self.rate_limit_delay,
             'llm_evaluation_enabled': self.enable_llm_evaluation,
+            'llm_rate_limits': get_rate_limit_stats(),
             'current_batch_id': self.current_batch_id
         } 
\ No newline at end of file
@@ -17,7 +17,7 @@ from enum import Enum
 
 from pydantic import BaseModel, Field, validator
 
-from ..llm_client import get_chat_llm, track_cost, call_llm, count_tokens, truncate_context
+from ..llm_client import get_chat_llm, track_cost, acall_llm, abatch_call_llm, count_tokens, truncate_context
 from ..memory.user_profile_schema import UserProfile
 from .conversational_scenarios import ConversationScenario, ConversationPhase
 from .conversation_runner import ConversationTurn, ConversationResult
@@ -124,13 +124,10 @@ class LLMEvaluator:
         start_time = time.time()
         
         try:
-            # Evaluate individual turns
-            turn_evaluations = []
-            for turn in conversation_history:
-                turn_eval = await self.evaluate_turn_effectiveness(
-                    turn, user_profile, scenario, context
-                )
-                turn_evaluations.append(turn_eval)
+            # Evaluate individual turns (independent prompts, scored concurrently)
+            turn_evaluations = await self.evaluate_turns(
+                conversation_history, user_profile, scenario, context
+            )
             
             # Evaluate overall conversation
             overall_evaluation = await self._evaluate_conversation_holistically(
@@ -151,6 +148,44 @@ class LLMEvaluator:
             # Return fallback evaluation
             return self._create_fallback_evaluation(conversation_history, scenario)
     
+    async def evaluate_turns(
+        self,
+        turns: List[ConversationTurn],
+        user_profile: UserProfile,
+        scenario: ConversationScenario,
+        context: Optional[Dict[str, Any]] = None,
+        max_concurrency: Optional[int] = None,
+    ) -> List[TurnEvaluation]:
+        """Evaluate several turns with one bounded-concurrency batch.
+
+        Results keep turn order; a turn whose call or parse fails gets the
+        same fallback evaluation as :meth:`evaluate_turn_effectiveness`.
+        """
+
+        prompts = [
+            self._build_turn_evaluation_prompt(turn, user_profile, scenario, context)
+            for turn in turns
+        ]
+        with track_cost() as (llm, cb):
+            responses = await abatch_call_llm(llm, prompts, max_concurrency, caller="eval:turn")
+            self.total_cost += cb.total_cost
+
+        evaluations = []
+        for turn, response in zip(turns, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                turn_eval = TurnEvaluation(
+                    turn_number=turn.turn_number,
+                    **self._parse_turn_evaluation_response(response)
+                )
+                turn_eval.calculate_overall_score()
+                evaluations.append(turn_eval)
+            except Exception as e:
+                debug_print(True, f"Turn evaluation failed: {e}")
+                evaluations.append(self._create_fallback_turn_evaluation(turn))
+        return evaluations
+
     async def evaluate_turn_effectiveness(
         self,
         turn: ConversationTurn,
@@ -177,7 +212,7 @@ class LLMEvaluator:
         
         try:
             with track_cost() as (llm, cb):
-                response = call_llm(llm, evaluation_prompt)
+                response = await acall_llm(llm, evaluation_prompt, caller="eval:turn")
                 self.total_cost += cb.total_cost
             
             # Parse structured response
@@ -218,7 +253,7 @@ class LLMEvaluator:
         
         try:
             with track_cost() as (llm, cb):
-                response = call_llm(llm, goal_evaluation_prompt)
+                response = await acall_llm(llm, goal_evaluation_prompt, caller="eval:goal")
                 self.total_cost += cb.total_cost
             
             # Extract goal achievement score
@@ -319,7 +354,7 @@ Provide scores and specific, actionable feedback:"""
         
         try:
             with track_cost() as (llm, cb):
-                response = call_llm(llm, conversation_prompt)
+                response = await acall_llm(llm, conversation_prompt, caller="eval:conversation")
                 self.total_cost += cb.total_cost
             
             evaluation_data = self._parse_conversation_evaluation_response(response)
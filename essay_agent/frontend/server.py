@@ -18,11 +18,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 import uvicorn
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from essay_agent.agent_autonomous import AutonomousEssayAgent
+from essay_agent.llm.deadline import HEADER as DEADLINE_HEADER, DeadlineExceeded, parse_timeout, request_deadline
+from essay_agent.llm.tracing import get_trace_recorder, render_waterfall, trace_turn
+from essay_agent.llm_client import render_metrics
 from essay_agent.memory.smart_memory import SmartMemory
 from essay_agent.intelligence.context_engine import ContextEngine
 from essay_agent.state_manager import EssayStateManager
@@ -155,6 +158,29 @@ async def debug_logging_middleware(request, call_next):
         })
         raise
 
+# Request deadline: the agent, its tools and every LLM call stop when the
+# client's ``X-Request-Timeout`` (or ESSAY_AGENT_REQUEST_DEADLINE_SECONDS)
+# runs out instead of working on after the client has given up.
+@app.middleware("http")
+async def request_deadline_middleware(request, call_next):
+    with request_deadline(parse_timeout(request.headers.get(DEADLINE_HEADER))):
+        try:
+            return await call_next(request)
+        except DeadlineExceeded as e:
+            return JSONResponse(status_code=504, content={"detail": str(e)})
+
+# Latency waterfall per chat request (see /debug/traces).  A streamed body
+# is produced after the handler returns, so /chat/stream only covers setup.
+@app.middleware("http")
+async def trace_middleware(request, call_next):
+    if not request.url.path.startswith("/chat"):
+        return await call_next(request)
+    with trace_turn("request", method=request.method, path=request.url.path) as root:
+        response = await call_next(request)
+        if root is not None:
+            root.set(status_code=response.status_code)
+        return response
+
 # Request/Response models
 class ChatRequest(BaseModel):
     message: str
@@ -615,6 +641,21 @@ class DebugAgent(AutonomousEssayAgent):
 # Global agent instance
 agent: Optional[DebugAgent] = None
 
+def get_unified_agent(user_id: str, essay_context: dict) -> AutonomousEssayAgent:
+    """Return the shared agent, (re)creating it when the user changes."""
+    global agent
+
+    if agent is None or agent.user_id != user_id:
+        # Use regular AutonomousEssayAgent instead of DebugAgent for unified state
+        agent = AutonomousEssayAgent(user_id)
+
+        # Set up essay context in agent memory
+        if essay_context.get('college'):
+            agent.memory.set("college", essay_context['college'])
+        if essay_context.get('essay_prompt'):
+            agent.memory.set("essay_prompt", essay_context['essay_prompt'])
+    return agent
+
 async def process_message_with_unified_state(
     user_id: str, 
     message: str, 
@@ -631,17 +672,7 @@ async def process_message_with_unified_state(
             "essay_context": essay_context
         })
         
-        # Initialize agent if needed (use the updated AutonomousEssayAgent)
-        if agent is None or agent.user_id != user_id:
-            # Use regular AutonomousEssayAgent instead of DebugAgent for unified state
-            from essay_agent.agent_autonomous import AutonomousEssayAgent
-            agent = AutonomousEssayAgent(user_id)
-            
-            # Set up essay context in agent memory
-            if essay_context.get('college'):
-                agent.memory.set("college", essay_context['college'])
-            if essay_context.get('essay_prompt'):
-                agent.memory.set("essay_prompt", essay_context['essay_prompt'])
+        agent = get_unified_agent(user_id, essay_context)
         
         # Process message through updated agent (now supports unified state)
         response = await agent.handle_message(message)
@@ -661,6 +692,8 @@ async def process_message_with_unified_state(
         
         return response
         
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         await emit_debug_event("unified_state_processing_error", {
             "user_id": user_id,
@@ -1227,6 +1260,9 @@ async def chat_endpoint(request: ChatRequest):
         
         return ChatResponse(response=response, debug_data=debug_data)
         
+    except DeadlineExceeded as e:
+        logger.warning(f"Chat request hit its deadline: {e}")
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         error_details = {
             "error": str(e),
@@ -1238,6 +1274,84 @@ async def chat_endpoint(request: ChatRequest):
         logger.error(f"Chat endpoint error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """Stream the agent's reply as Server-Sent Events.
+
+    Emits ``token`` events (``{"text": ...}``) as the response is composed and
+    a final ``done`` event (``{"response": ...}``) with the complete,
+    tone-enhanced reply.  Persistence matches ``/chat``.
+    """
+    global current_essay_context
+
+    await emit_debug_event("chat_stream_request_received", {
+        "user_id": request.user_id,
+        "message_length": len(request.message),
+        "has_essay_context": bool(request.essay_context)
+    })
+
+    if request.essay_context:
+        current_essay_context.update(request.essay_context)
+
+    contextualized_message = await build_contextualized_message(
+        request.message,
+        request.user_id,
+        current_essay_context
+    )
+
+    async def event_stream():
+        start_time = datetime.now()
+        first_token_seconds = None
+        response = ""
+        try:
+            stream_agent = get_unified_agent(request.user_id, current_essay_context)
+            async for event in stream_agent.handle_message_stream(contextualized_message):
+                if event["type"] == "token":
+                    if first_token_seconds is None:
+                        first_token_seconds = (datetime.now() - start_time).total_seconds()
+                    yield _sse("token", {"text": event["text"]})
+                else:
+                    response = event["response"]
+
+            debug_state["chat_history"].append({
+                "user": request.message,
+                "agent": response,
+                "timestamp": datetime.now().isoformat(),
+                "essay_context": current_essay_context.copy() if current_essay_context else None
+            })
+            await save_essay_conversation_internal()
+
+            await emit_debug_event("chat_stream_complete", {
+                "response_length": len(response),
+                "first_token_seconds": first_token_seconds,
+                "total_seconds": (datetime.now() - start_time).total_seconds()
+            })
+            yield _sse("done", {"response": response})
+
+        except Exception as e:
+            await emit_debug_event("chat_stream_error", {
+                "error": str(e),
+                "traceback": traceback.format_exc(),
+                "user_input": request.message
+            })
+            logger.error(f"Chat stream error: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Per-call-site LLM latency / token telemetry in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Enhanced debug endpoints
 @app.get("/debug/full-state")
 async def get_full_debug_state():
@@ -1247,6 +1361,17 @@ async def get_full_debug_state():
     })
     return debug_state
 
+@app.get("/debug/traces")
+async def get_recent_traces(limit: int = 20, format: str = "json"):
+    """Get the latency waterfalls of the most recent turns (``format=text`` for a plain rendering)."""
+    recorder = get_trace_recorder()
+    traces = recorder.recent(limit)
+    if format == "text":
+        return PlainTextResponse("\n\n".join(
+            f"{t['trace_id']} {t['started_at']}\n{render_waterfall(t)}" for t in traces
+        ))
+    return {"traces": traces, "stats": recorder.stats()}
+
 @app.get("/debug/live-events")
 async def get_live_events(limit: int = 50):
     """Get recent live debug events."""
@@ -1331,7 +1456,8 @@ async def manual_tool_execution(request: dict):
             # Execute the tool with state
             tool_class = tool_classes[tool_name]
             tool = tool_class()
-            result = tool._run(state)
+            # Off the event loop: the tool's sync LLM calls may wait for quota
+            result = await asyncio.to_thread(tool._run, state)
             
             # Save updated state
             manager.save_state(state)
@@ -1630,7 +1756,7 @@ async def execute_unified_tool(tool_name: str, request: dict):
         
         # Execute tool with unified state
         start_time = datetime.now()
-        result = tool._run(state)
+        result = await asyncio.to_thread(tool._run, state)
         execution_time = (datetime.now() - start_time).total_seconds() * 1000
         
         # Save updated state
@@ -0,0 +1,117 @@
+"""essay_agent.llm – infrastructure shared by :pymod:`essay_agent.llm_client`.
+
+The public entry points for the rest of the codebase remain in
+``essay_agent.llm_client``; this package holds the building blocks that the
+client composes (client pooling, rate limiting, response caching, request
+coalescing, a shared HTTP connection pool, retry/circuit-breaking, per-turn retry budgets, request deadlines, record/replay
+cassettes, token counting, call-site telemetry, priority lanes, model routing, micro-batching, structured output, a shared reasoning memo, per-turn latency tracing and related helpers) so they can be unit-tested in isolation.
+"""
+
+from .budget import RetryBudget, current_budget, retry_budget  # noqa: F401
+from .cache import LLMCache, cache_key, cache_policy, current_cache_policy  # noqa: F401
+from .cassette import Cassette, CassetteLLM, CassetteMissError, request_key  # noqa: F401
+from .client_pool import ClientPool, make_key  # noqa: F401
+from .deadline import DeadlineExceeded, bound_timeout, check_deadline, request_deadline  # noqa: F401
+from .http_pool import HttpPool, HttpPoolConfig, get_http_pool  # noqa: F401
+from .memo import MemoCache, get_reasoning_cache, memo_key  # noqa: F401
+from .micro_batch import MicroBatcher  # noqa: F401
+from .priority import BACKGROUND, BATCH, INTERACTIVE, LanePolicy, current_priority, priority  # noqa: F401
+from .rate_limiter import (  # noqa: F401
+    AdaptiveConcurrency,
+    LoopBlockedError,
+    ModelLimits,
+    RateLimiter,
+    TokenBucket,
+    is_rate_limit_error,
+)
+from .resilience import (  # noqa: F401
+    CircuitBreaker,
+    CircuitOpenError,
+    Hedger,
+    RetryPolicy,
+    classify_error,
+    retry_after,
+)
+from .router import ModelRouter, Route, replay_report  # noqa: F401
+from .structured import parse_report, parse_stats, response_format  # noqa: F401
+from .single_flight import SingleFlight  # noqa: F401
+from .telemetry import (  # noqa: F401
+    Telemetry,
+    TokenMeter,
+    call_site,
+    current_call_site,
+    get_telemetry,
+    token_meter,
+    track_llm_call,
+)
+from .tokenizer import Tokenizer, count_tokens_batch, get_tokenizer, truncate_to_tokens  # noqa: F401
+from .tracing import TraceRecorder, get_trace_recorder, render_waterfall, span, trace_turn, traced  # noqa: F401
+
+__all__ = [
+    "AdaptiveConcurrency",
+    "BACKGROUND",
+    "BATCH",
+    "Cassette",
+    "CassetteLLM",
+    "CassetteMissError",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ClientPool",
+    "DeadlineExceeded",
+    "Hedger",
+    "HttpPool",
+    "HttpPoolConfig",
+    "INTERACTIVE",
+    "LLMCache",
+    "LanePolicy",
+    "LoopBlockedError",
+    "MemoCache",
+    "MicroBatcher",
+    "ModelLimits",
+    "ModelRouter",
+    "RateLimiter",
+    "RetryBudget",
+    "RetryPolicy",
+    "Route",
+    "SingleFlight",
+    "Telemetry",
+    "TokenBucket",
+    "TokenMeter",
+    "Tokenizer",
+    "TraceRecorder",
+    "bound_timeout",
+    "cache_key",
+    "cache_policy",
+    "call_site",
+    "check_deadline",
+    "classify_error",
+    "count_tokens_batch",
+    "current_budget",
+    "current_cache_policy",
+    "current_call_site",
+    "current_priority",
+    "get_http_pool",
+    "get_reasoning_cache",
+    "get_telemetry",
+    "get_tokenizer",
+    "get_trace_recorder",
+    "is_rate_limit_error",
+    "make_key",
+    "memo_key",
+    "parse_report",
+    "parse_stats",
+    "priority",
+    "render_waterfall",
+    "replay_report",
+    "request_deadline",
+    "request_key",
+    "response_format",
+    "retry_after",
+    "retry_budget",
+    "span",
+    "token_meter",
+    "trace_turn",
+    "traced",
+    "track_llm_call",
+    "truncate_to_tokens",
+]
@@ -0,0 +1,217 @@
+"""essay_agent.llm.budget
+
+Request-scoped retry/deadline budget shared by every retry layer.
+
+A single user turn can nest retries at several levels – the ``tenacity``
+wrapper around LLM helpers, ``ValidatedTool`` attempts, the reasoning
+engine's own loop and batch-evaluation task retries.  Each layer on its own
+is reasonable; multiplied together one failing step can fan out into dozens
+of upstream calls and minutes of latency.
+
+:func:`retry_budget` opens a :class:`RetryBudget` in a context variable, so
+it follows the turn through ``await`` chains, ``asyncio`` tasks and
+``asyncio.to_thread`` workers.  Every layer asks :func:`spend_retry` before
+retrying; once the turn's retries or deadline are used up the answer is
+``False`` and the layer fails fast with the error it already has.  Budgets
+nest: a turn inside a batch task draws from both.  Outside any budget the
+helpers always allow the retry, so standalone callers behave as before.
+The request deadline (:pymod:`essay_agent.llm.deadline`) applies on top of
+any budget: once it has passed no layer retries, and back-off sleeps never
+outlast it.  It is also the budget's only time limit inside a request, so
+there is a single cut-off; outside one the budget's default deadline is the
+configured request deadline.
+
+>>> with retry_budget(max_retries=4, deadline=60) as budget:
+...     await agent.handle_message("Help me brainstorm")
+>>> budget.report()
+{'attempts': 3, 'retries': 1, 'denied': 0, ...}
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from .deadline import current_deadline, default_seconds, expired, remaining
+
+_DEFAULT_MAX_RETRIES = int(os.getenv("ESSAY_AGENT_TURN_RETRY_BUDGET", "6"))
+_DEADLINE_ENV = os.getenv("ESSAY_AGENT_TURN_RETRY_DEADLINE_SECONDS")
+# Derived from the request deadline unless set explicitly
+_DEFAULT_DEADLINE = (float(_DEADLINE_ENV) or None) if _DEADLINE_ENV is not None else default_seconds()
+
+_BUDGET: contextvars.ContextVar[Optional["RetryBudget"]] = contextvars.ContextVar(
+    "essay_agent_retry_budget", default=None
+)
+
+
+class RetryBudget:
+    """Retry allowance and deadline for one unit of work (turn, batch task)."""
+
+    def __init__(
+        self,
+        max_retries: Optional[int] = None,
+        deadline: Optional[float] = None,
+        *,
+        parent: Optional["RetryBudget"] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_retries = max_retries
+        self.parent = parent
+        self._clock = clock
+        self._started = clock()
+        self._deadline_at = None if deadline is None else self._started + deadline
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.retries = 0
+        self.denied = 0
+        self.by_layer: Dict[str, Dict[str, int]] = {}
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def remaining_time(self) -> Optional[float]:
+        """Seconds left before the deadline (``None`` if unbounded)."""
+
+        own = None if self._deadline_at is None else max(0.0, self._deadline_at - self._clock())
+        inherited = self.parent.remaining_time() if self.parent is not None else None
+        if own is None:
+            return inherited
+        return own if inherited is None else min(own, inherited)
+
+    def _has_allowance(self) -> bool:
+        if self.max_retries is not None and self.retries >= self.max_retries:
+            return False
+        if self._deadline_at is not None and self._clock() >= self._deadline_at:
+            return False
+        return self.parent is None or self.parent._has_allowance()
+
+    @property
+    def exhausted(self) -> bool:
+        with self._lock:
+            return not self._has_allowance()
+
+    # ------------------------------------------------------------------
+    # Accounting
+    # ------------------------------------------------------------------
+
+    def _layer(self, layer: str) -> Dict[str, int]:
+        return self.by_layer.setdefault(layer, {"attempts": 0, "retries": 0, "denied": 0})
+
+    def record_attempt(self, layer: str) -> None:
+        with self._lock:
+            self.attempts += 1
+            self._layer(layer)["attempts"] += 1
+        if self.parent is not None:
+            self.parent.record_attempt(layer)
+
+    def try_spend(self, layer: str) -> bool:
+        """Take one retry for *layer*; ``False`` means give up now."""
+
+        with self._lock:
+            allowed = self._has_allowance()
+            stats = self._layer(layer)
+            if not allowed:
+                self.denied += 1
+                stats["denied"] += 1
+                return False
+            self.retries += 1
+            stats["retries"] += 1
+        if self.parent is not None:
+            self.parent._charge(layer)
+        return True
+
+    def _charge(self, layer: str) -> None:
+        with self._lock:
+            self.retries += 1
+            self._layer(layer)["retries"] += 1
+        if self.parent is not None:
+            self.parent._charge(layer)
+
+    def clamp_delay(self, delay: float) -> float:
+        """Shorten a back-off sleep so it never runs past the deadline."""
+
+        remaining = self.remaining_time()
+        return delay if remaining is None else max(0.0, min(delay, remaining))
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "denied": self.denied,
+                "max_retries": self.max_retries,
+                "elapsed_seconds": round(self._clock() - self._started, 3),
+                "exhausted": not self._has_allowance(),
+                "by_layer": {k: dict(v) for k, v in self.by_layer.items()},
+            }
+
+
+# ---------------------------------------------------------------------------
+# Context helpers
+# ---------------------------------------------------------------------------
+
+
+@contextlib.contextmanager
+def retry_budget(
+    max_retries: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> Iterator[RetryBudget]:
+    """Open a budget for the enclosed work (defaults from the environment).
+
+    ``ESSAY_AGENT_TURN_RETRY_BUDGET`` (retries, default 6) applies when
+    *max_retries* is omitted.  Without a *deadline* the budget has no clock
+    of its own inside a :func:`~essay_agent.llm.deadline.request_deadline`
+    (that deadline already stops retries); elsewhere it uses
+    ``ESSAY_AGENT_TURN_RETRY_DEADLINE_SECONDS``, which defaults to the request
+    deadline.  A deadline of ``0`` means none.
+    """
+
+    if deadline is None:
+        deadline = None if current_deadline() is not None else _DEFAULT_DEADLINE
+    budget = RetryBudget(
+        _DEFAULT_MAX_RETRIES if max_retries is None else max_retries,
+        deadline or None,
+        parent=_BUDGET.get(),
+    )
+    token = _BUDGET.set(budget)
+    try:
+        yield budget
+    finally:
+        _BUDGET.reset(token)
+
+
+def current_budget() -> Optional[RetryBudget]:
+    """Return the innermost active :class:`RetryBudget`, if any."""
+
+    return _BUDGET.get()
+
+
+def record_attempt(layer: str) -> None:
+    budget = _BUDGET.get()
+    if budget is not None:
+        budget.record_attempt(layer)
+
+
+def spend_retry(layer: str) -> bool:
+    """Ask the active budget for one retry.
+
+    ``False`` once the request deadline has passed; otherwise always ``True``
+    without a budget.
+    """
+
+    if expired():
+        return False
+    budget = _BUDGET.get()
+    return True if budget is None else budget.try_spend(layer)
+
+
+def clamp_delay(delay: float) -> float:
+    budget = _BUDGET.get()
+    if budget is not None:
+        delay = budget.clamp_delay(delay)
+    left = remaining()
+    return delay if left is None else min(delay, left)
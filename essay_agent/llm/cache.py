@@ -0,0 +1,326 @@
+"""essay_agent.llm.cache
+
+Bounded, observable SQLite cache for LangChain LLM calls.
+
+``langchain.cache.SQLiteCache`` appends every prompt/response pair to a single
+table forever: no TTL, no size cap, default rollback journal, and keys that
+embed the ``repr`` of the shared httpx clients (``<httpx.Client object at
+0x7f…>``) so entries written by one process are never hit by the next.
+:class:`LLMCache` fixes each of these:
+
+* WAL journal with ``synchronous=NORMAL`` – readers never block the writer.
+* Keys are a SHA-256 of the prompt and a *normalised* LLM string (memory
+  addresses stripped), so they stay stable across restarts.
+* Payloads are zlib-compressed LangChain-serialised generations.
+* Entries expire after ``ttl_seconds``; least-recently-used rows are evicted
+  once ``max_entries`` or ``max_bytes`` is exceeded.
+* Per-call-site opt-out through :func:`cache_policy` (a context variable, so
+  it follows ``asyncio`` tasks and ``asyncio.to_thread`` workers).
+* Hit/miss/byte counters via :meth:`LLMCache.stats`.
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+from .telemetry import mark_cache_hit
+
+logger = logging.getLogger(__name__)
+
+# ``None`` → follow the cache's default; ``True``/``False`` → forced for the
+# current context (call site, task or thread spawned from it).
+_CACHE_ENABLED: contextvars.ContextVar[Optional[bool]] = contextvars.ContextVar(
+    "essay_agent_llm_cache_enabled", default=None
+)
+
+_ADDRESS_RE = re.compile(r" at 0x[0-9a-fA-F]+")
+
+# Table used by ``langchain.cache.SQLiteCache`` in the same default file.
+_LEGACY_TABLE = "full_llm_cache"
+
+
+@contextlib.contextmanager
+def cache_policy(enabled: bool) -> Iterator[None]:
+    """Force caching on/off for LLM calls made inside the block.
+
+    >>> with cache_policy(False):
+    ...     fresh = call_llm(llm, prompt)  # always reaches the provider
+    """
+
+    token = _CACHE_ENABLED.set(enabled)
+    try:
+        yield
+    finally:
+        _CACHE_ENABLED.reset(token)
+
+
+def current_cache_policy() -> Optional[bool]:
+    """Return the :func:`cache_policy` override active here, if any."""
+
+    return _CACHE_ENABLED.get()
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Return the stable lookup key for *prompt* under *llm_string*."""
+
+    normalised = _ADDRESS_RE.sub("", llm_string)
+    digest = hashlib.sha256()
+    digest.update(normalised.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LLMCache(BaseCache):
+    """SQLite-backed LangChain cache with LRU/TTL eviction and counters."""
+
+    def __init__(
+        self,
+        path: str = ".essay_agent_cache.sqlite",
+        *,
+        max_entries: int = 50_000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 30 * 24 * 3600,
+        enabled: bool = True,
+        compress_level: int = 6,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be positive")
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.compress_level = compress_level
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._conn = self._connect(path)
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.bypassed = 0
+        self.writes = 0
+        self.evictions = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+        row = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        self._entries, self._bytes = int(row[0]), int(row[1])
+
+    # ------------------------------------------------------------------
+    # Setup
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        # Files written by ``langchain.cache.SQLiteCache`` keep its unbounded
+        # table; its keys never match ours, so drop it and reclaim the space.
+        legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (_LEGACY_TABLE,)
+        ).fetchone()
+        if legacy is not None:
+            logger.info("Dropping legacy %s table from %s", _LEGACY_TABLE, path)
+            conn.execute(f"DROP TABLE {_LEGACY_TABLE}")
+            conn.execute("VACUUM")
+        return conn
+
+    # ------------------------------------------------------------------
+    # BaseCache interface
+    # ------------------------------------------------------------------
+
+    def active(self) -> bool:
+        """Return whether caching applies to the current context."""
+
+        override = _CACHE_ENABLED.get()
+        return self.enabled if override is None else override
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        if not self.active():
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        generations = self._read(cache_key(prompt, llm_string), count_miss=True)
+        if generations is not None:
+            mark_cache_hit()
+        return generations
+
+    def peek(self, prompt: str, llm_string: str) -> Optional[RETURN_VAL_TYPE]:
+        """Look up an entry *before* the LLM call (and its rate limiting).
+
+        Counts hits like :meth:`lookup` but not misses, because a miss goes
+        on to the LLM call whose own :meth:`lookup` records it.  The caller
+        flags the round-trip as a cache hit.
+        """
+
+        if not self.active():
+            return None
+        return self._read(cache_key(prompt, llm_string), count_miss=False)
+
+    def _read(self, key: str, *, count_miss: bool) -> Optional[RETURN_VAL_TYPE]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += count_miss
+                return None
+            value, size, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._entries -= 1
+                self._bytes -= size
+                self.expired += 1
+                self.misses += count_miss
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            self.bytes_read += size
+
+        try:
+            return [loads(item) for item in json.loads(zlib.decompress(value))]
+        except Exception:  # noqa: BLE001 – corrupt / incompatible row
+            logger.warning("Dropping undecodable LLM cache entry %s", key[:12])
+            with self._lock:
+                self._delete(key)
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if not self.active():
+            return
+        # A blank completion is a provider hiccup, not an answer worth replaying.
+        if not any(getattr(gen, "text", "").strip() for gen in return_val):
+            return
+
+        key = cache_key(prompt, llm_string)
+        payload = zlib.compress(
+            json.dumps([dumps(gen) for gen in return_val]).encode("utf-8"), self.compress_level
+        )
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        now = self._clock()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now),
+            )
+            if old is None:
+                self._entries += 1
+            else:
+                self._bytes -= old[0]
+            self._bytes += size
+            self.writes += 1
+            self.bytes_written += size
+            if self._entries > self.max_entries or self._bytes > self.max_bytes:
+                self._evict(now)
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._entries = self._bytes = 0
+
+    # ------------------------------------------------------------------
+    # Eviction & stats
+    # ------------------------------------------------------------------
+
+    def _delete(self, key: str) -> None:
+        row = self._conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self._entries -= 1
+            self._bytes -= row[0]
+
+    def _evict(self, now: float) -> None:
+        """Drop expired rows, then LRU rows down to 90 % of each bound.
+
+        Evicting below the limit (rather than exactly to it) amortises the
+        sweep over many writes instead of running it on every insert.
+        """
+
+        if self.ttl_seconds is not None:
+            self._drop(
+                self._conn.execute(
+                    "SELECT key, size FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+                ).fetchall()
+            )
+
+        target_entries = int(self.max_entries * 0.9)
+        target_bytes = int(self.max_bytes * 0.9)
+        if self._entries <= self.max_entries and self._bytes <= self.max_bytes:
+            return
+
+        victims = []
+        entries, total = self._entries, self._bytes
+        for key, size in self._conn.execute("SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"):
+            if entries <= target_entries and total <= target_bytes:
+                break
+            victims.append((key, size))
+            entries -= 1
+            total -= size
+        self._drop(victims)
+
+    def _drop(self, rows: Sequence[tuple[str, int]]) -> None:
+        if not rows:
+            return
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", [(key,) for key, _ in rows])
+        self._entries -= len(rows)
+        self._bytes -= sum(size for _, size in rows)
+        self.evictions += len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": self._entries,
+                "stored_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "bypassed": self.bypassed,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "bytes_read": self.bytes_read,
+                "bytes_written": self.bytes_written,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,325 @@
+"""essay_agent.llm.cassette
+
+Record/replay ("cassette") layer for LLM calls.
+
+Offline mode used to hand every caller ``FakeListLLM(["FAKE_RESPONSE"])``,
+which sends each parser down its fallback branch: the offline pipeline does
+different work from production and its timings are meaningless.  A cassette
+captures real traffic once – prompt, parameters, exact response text, latency
+and token counts – and replays it later on a machine with no network:
+
+* **record** – calls go to the real client and every round-trip is appended
+  to a JSONL file.
+* **replay** – responses come from the file byte-for-byte after sleeping for
+  the recorded latency multiplied by ``latency_scale`` (``0`` → instant).
+
+Entries are matched on a hash of (client configuration, call kwargs, prompt).
+Identical requests recorded several times replay in their recorded order, and
+the last recording repeats once they are exhausted.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+from .cache import cache_policy
+from .telemetry import current_call_site
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMissError(LookupError):
+    """Raised in strict replay mode when no recording matches a request."""
+
+
+def _prompt_text(prompt: Any) -> str:  # noqa: ANN401
+    """Stable textual form of a str / message-list / PromptValue prompt."""
+
+    if isinstance(prompt, str):
+        return prompt
+    if hasattr(prompt, "to_messages"):
+        prompt = prompt.to_messages()
+    if isinstance(prompt, (list, tuple)):
+        parts = []
+        for msg in prompt:
+            if isinstance(msg, BaseMessage):
+                parts.append({"role": msg.type, "content": msg.content})
+            elif isinstance(msg, (list, tuple)) and len(msg) == 2:
+                parts.append({"role": str(msg[0]), "content": msg[1]})
+            else:
+                parts.append({"role": "user", "content": str(msg)})
+        return json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return str(prompt)
+
+
+def request_key(config: Dict[str, Any], prompt: Any, kwargs: Dict[str, Any]) -> str:  # noqa: ANN401
+    """Hash identifying one request for matching recordings to replays."""
+
+    payload = json.dumps(
+        {"config": config, "kwargs": kwargs, "prompt": _prompt_text(prompt)},
+        sort_keys=True,
+        default=str,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """A JSONL file of recorded LLM round-trips."""
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = REPLAY,
+        *,
+        latency_scale: float = 1.0,
+        strict: bool = False,
+        sleep: Any = time.sleep,  # noqa: ANN401
+        async_sleep: Any = asyncio.sleep,  # noqa: ANN401
+    ) -> None:
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected 'record' or 'replay'")
+        self.path = path
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        if mode == REPLAY or os.path.exists(path):
+            self._load()
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        """Build from ``ESSAY_AGENT_CASSETTE*`` variables; ``None`` if unset."""
+
+        path = os.getenv("ESSAY_AGENT_CASSETTE")
+        if not path:
+            return None
+        return cls(
+            path,
+            os.getenv("ESSAY_AGENT_CASSETTE_MODE", REPLAY),
+            latency_scale=float(os.getenv("ESSAY_AGENT_CASSETTE_LATENCY_SCALE", "1.0")),
+            strict=os.getenv("ESSAY_AGENT_CASSETTE_STRICT", "0") == "1",
+        )
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            if self.mode == REPLAY:
+                raise FileNotFoundError(f"Cassette not found: {self.path}")
+            return
+        with open(self.path, "r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    # ------------------------------------------------------------------
+    # Record / lookup
+    # ------------------------------------------------------------------
+
+    def record(
+        self,
+        key: str,
+        *,
+        config: Dict[str, Any],
+        prompt: Any,  # noqa: ANN401
+        kwargs: Dict[str, Any],
+        response: str,
+        latency: float,
+        usage: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        entry = {
+            "key": key,
+            "model": config.get("model_name") or config.get("model"),
+            "site": current_call_site(),
+            "config": config,
+            "kwargs": kwargs,
+            "prompt": _prompt_text(prompt),
+            "response": response,
+            "latency": round(latency, 6),
+            "usage": usage or {},
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(entry, default=str, ensure_ascii=False)
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+            self._entries[key].append(entry)
+            self.recorded += 1
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            index = min(self._cursor[key], len(entries) - 1)
+            self._cursor[key] += 1
+            self.replayed += 1
+            return entries[index]
+
+    def replay_delay(self, entry: Dict[str, Any]) -> float:
+        return max(0.0, float(entry.get("latency", 0.0)) * self.latency_scale)
+
+    def rewind(self) -> None:
+        """Restart every key's replay sequence from its first recording."""
+
+        with self._lock:
+            self._cursor.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "mode": self.mode,
+                "entries": sum(len(v) for v in self._entries.values()),
+                "recorded": self.recorded,
+                "replayed": self.replayed,
+                "misses": self.misses,
+                "latency_scale": self.latency_scale,
+            }
+
+
+class CassetteLLM:
+    """Drop-in stand-in for a chat/completion client backed by a cassette.
+
+    Exposes the subset of the LangChain interface the codebase calls
+    (``invoke``/``ainvoke``/``predict``/``apredict``/``stream``/``astream``).
+    In record mode *inner* is the real client (called with the response cache
+    disabled so recorded latencies are real round-trips); in replay mode it is
+    only used (if given) to answer requests the cassette has no recording for.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        config: Dict[str, Any],
+        inner: Any = None,  # noqa: ANN401
+        *,
+        chat: bool = True,
+        fallback_response: str = "FAKE_RESPONSE",
+    ) -> None:
+        self.cassette = cassette
+        self.config = dict(config)
+        self.inner = inner
+        self.chat = chat
+        self.fallback_response = fallback_response
+        self.model_name = str(config.get("model_name") or config.get("model") or "")
+        self.temperature = config.get("temperature")
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _wrap(self, text: str) -> Any:  # noqa: ANN401
+        return AIMessage(content=text) if self.chat else text
+
+    @staticmethod
+    def _text(result: Any) -> str:  # noqa: ANN401
+        return result.content if hasattr(result, "content") else str(result)
+
+    @staticmethod
+    def _usage(result: Any) -> Dict[str, Any]:  # noqa: ANN401
+        meta = getattr(result, "response_metadata", None) or {}
+        return dict(meta.get("token_usage") or {})
+
+    def _miss(self, key: str) -> str:
+        if self.cassette.strict:
+            raise CassetteMissError(f"No cassette recording for request {key[:12]} ({self.model_name})")
+        return self.fallback_response
+
+    # ------------------------------------------------------------------
+    # Sync interface
+    # ------------------------------------------------------------------
+
+    def invoke(self, prompt: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        key = request_key(self.config, prompt, kwargs)
+        if self.cassette.mode == RECORD:
+            start = time.perf_counter()
+            with cache_policy(False):
+                result = self.inner.invoke(prompt, **kwargs)
+            self.cassette.record(
+                key, config=self.config, prompt=prompt, kwargs=kwargs, response=self._text(result),
+                latency=time.perf_counter() - start, usage=self._usage(result),
+            )
+            return result
+
+        entry = self.cassette.lookup(key)
+        if entry is None:
+            if self.inner is not None and not self.cassette.strict:
+                return self.inner.invoke(prompt, **kwargs)
+            return self._wrap(self._miss(key))
+        self.cassette._sleep(self.cassette.replay_delay(entry))
+        return self._wrap(entry["response"])
+
+    def predict(self, prompt: str, **kwargs: Any) -> str:
+        return self._text(self.invoke(prompt, **kwargs))
+
+    def stream(self, prompt: Any, **kwargs: Any) -> Iterator[Any]:  # noqa: ANN401
+        yield self.invoke(prompt, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Async interface
+    # ------------------------------------------------------------------
+
+    async def ainvoke(self, prompt: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+        key = request_key(self.config, prompt, kwargs)
+        if self.cassette.mode == RECORD:
+            start = time.perf_counter()
+            with cache_policy(False):
+                result = await self.inner.ainvoke(prompt, **kwargs)
+            self.cassette.record(
+                key, config=self.config, prompt=prompt, kwargs=kwargs, response=self._text(result),
+                latency=time.perf_counter() - start, usage=self._usage(result),
+            )
+            return result
+
+        entry = self.cassette.lookup(key)
+        if entry is None:
+            if self.inner is not None and not self.cassette.strict:
+                return await self.inner.ainvoke(prompt, **kwargs)
+            return self._wrap(self._miss(key))
+        await self.cassette._async_sleep(self.cassette.replay_delay(entry))
+        return self._wrap(entry["response"])
+
+    async def apredict(self, prompt: str, **kwargs: Any) -> str:
+        return self._text(await self.ainvoke(prompt, **kwargs))
+
+    async def astream(self, prompt: Any, **kwargs: Any) -> AsyncIterator[Any]:  # noqa: ANN401
+        if self.cassette.mode == RECORD:
+            # Record the assembled text so replays of streamed calls match
+            # replays of non-streamed ones.
+            key = request_key(self.config, prompt, kwargs)
+            start = time.perf_counter()
+            parts: List[str] = []
+            async for chunk in self.inner.astream(prompt, **kwargs):
+                parts.append(self._text(chunk))
+                yield chunk
+            self.cassette.record(
+                key, config=self.config, prompt=prompt, kwargs=kwargs, response="".join(parts),
+                latency=time.perf_counter() - start,
+            )
+            return
+        yield await self.ainvoke(prompt, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"CassetteLLM(model={self.model_name!r}, mode={self.cassette.mode!r})"
@@ -0,0 +1,100 @@
+"""essay_agent.llm.client_pool
+
+Bounded LRU pool of LLM client objects keyed by their construction parameters.
+
+``functools.lru_cache(maxsize=1)`` on the old factories meant that any caller
+asking for a different temperature evicted the only cached ``ChatOpenAI`` and
+forced a rebuild; under mixed traffic nearly every call constructed a new
+client.  :class:`ClientPool` keeps up to *maxsize* distinct configurations
+alive and reports hit/miss/eviction counters so reuse can be verified.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+PoolKey = Tuple[Tuple[str, Hashable], ...]
+
+
+def _freeze(value: Any) -> Hashable:  # noqa: ANN401
+    """Convert *value* into something hashable for use in a pool key."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    try:
+        hash(value)
+    except TypeError:
+        return repr(value)
+    return value
+
+
+def make_key(**params: Any) -> PoolKey:
+    """Return a stable, order-independent key for *params*."""
+    return tuple(sorted((name, _freeze(value)) for name, value in params.items()))
+
+
+class ClientPool:
+    """Thread-safe LRU pool of objects built by *factory*.
+
+    ``factory`` receives the same keyword arguments that were used to build the
+    key, so ``pool.get(model="gpt-4o", temperature=0.2)`` calls
+    ``factory(model="gpt-4o", temperature=0.2)`` on a miss.
+    """
+
+    def __init__(self, factory: Callable[..., Any], maxsize: int = 16) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self._factory = factory
+        self.maxsize = maxsize
+        self._items: "OrderedDict[PoolKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, **params: Any) -> Any:  # noqa: ANN401
+        key = make_key(**params)
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+
+        # Build outside the lock – client construction can be slow and must not
+        # stall lookups for other configurations.
+        client = self._factory(**params)
+
+        with self._lock:
+            existing = self._items.get(key)
+            if existing is not None:
+                # Another thread won the race; keep its instance.
+                self._items.move_to_end(key)
+                return existing
+            self._items[key] = client
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        return client
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
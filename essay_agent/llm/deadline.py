@@ -0,0 +1,124 @@
+"""essay_agent.llm.deadline
+
+End-to-end request deadline shared by every layer of a turn.
+
+Each layer of a ``/chat`` request used to pick its own time limit – the
+action executor's per-tool timeout, the 60 s minimum forced on every tool,
+``ValidatedTool`` attempts with back-off, ``tenacity`` waits around LLM
+helpers – so a client that gave up after 30 s still left minutes of work
+running behind it.
+
+:func:`request_deadline` stores an absolute ``time.monotonic()`` deadline in
+a context variable, so it follows the request through ``await`` chains,
+``asyncio`` tasks and ``asyncio.to_thread`` workers.  Layers size their own
+limits with :func:`bound_timeout` (their timeout, never past the deadline),
+ask :func:`expired` before starting more work and raise
+:class:`DeadlineExceeded` via :func:`check_deadline`.  The retry budget
+(:pymod:`essay_agent.llm.budget`) denies retries and shortens back-off
+sleeps against the same deadline.  Deadlines nest: an inner one can only
+tighten the outer.  Outside any deadline every helper is a no-op.
+
+>>> with request_deadline(30):
+...     await agent.handle_message("Help me brainstorm")
+
+Configuration
+-------------
+``ESSAY_AGENT_REQUEST_DEADLINE_SECONDS`` (default 120; ``0`` means none) is
+used when :func:`request_deadline` is called without a value.  The HTTP
+server takes a per-request value from the ``X-Request-Timeout`` header.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import contextvars
+import os
+import time
+from typing import Iterator, Optional
+
+_DEFAULT_SECONDS = float(os.getenv("ESSAY_AGENT_REQUEST_DEADLINE_SECONDS", "120")) or None
+
+HEADER = "X-Request-Timeout"
+
+_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "essay_agent_request_deadline", default=None
+)
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """The request's deadline passed before the work could finish.
+
+    Subclasses :class:`asyncio.TimeoutError` so existing timeout handlers
+    (tool fallbacks, executor errors) treat it like any other timeout.
+    """
+
+
+@contextlib.contextmanager
+def request_deadline(seconds: Optional[float] = None) -> Iterator[Optional[float]]:
+    """Bound the enclosed work to *seconds* from now (default from the environment).
+
+    Yields the absolute monotonic deadline in effect, which is the earlier of
+    this one and any enclosing deadline (``None`` when unbounded).
+    """
+
+    seconds = _DEFAULT_SECONDS if seconds is None else (seconds or None)
+    outer = _DEADLINE.get()
+    deadline = outer
+    if seconds is not None:
+        own = time.monotonic() + max(0.0, seconds)
+        deadline = own if outer is None else min(own, outer)
+    token = _DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _DEADLINE.reset(token)
+
+
+def parse_timeout(value: Optional[str]) -> Optional[float]:
+    """Seconds from an ``X-Request-Timeout`` header value (``None`` if absent/invalid)."""
+
+    try:
+        seconds = float(value) if value else None
+    except ValueError:
+        return None
+    return seconds if seconds is not None and seconds > 0 else None
+
+
+def default_seconds() -> Optional[float]:
+    """Configured default request deadline in seconds (``None`` when disabled)."""
+
+    return _DEFAULT_SECONDS
+
+
+def current_deadline() -> Optional[float]:
+    """Absolute ``time.monotonic()`` deadline of the current request, if any."""
+
+    return _DEADLINE.get()
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the deadline (``None`` if unbounded)."""
+
+    deadline = _DEADLINE.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def expired() -> bool:
+    deadline = _DEADLINE.get()
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def check_deadline(what: str = "request") -> None:
+    """Raise :class:`DeadlineExceeded` if the deadline has passed."""
+
+    if expired():
+        raise DeadlineExceeded(f"{what} stopped: request deadline exceeded")
+
+
+def bound_timeout(timeout: Optional[float]) -> Optional[float]:
+    """*timeout* shortened to the time left (``None`` only if both are unbounded)."""
+
+    left = remaining()
+    if left is None:
+        return timeout
+    return left if timeout is None else min(timeout, left)
@@ -0,0 +1,202 @@
+"""essay_agent.llm.http_pool
+
+One process-wide, tuned HTTP connection pool for every provider client.
+
+``ChatOpenAI`` / ``OpenAI`` / ``OpenAIEmbeddings`` objects each build their
+own ``httpx`` client unless one is handed to them, so every pooled LLM
+instance and every embeddings object paid its own TCP + TLS handshake and
+started with cold connections.  :class:`HttpPool` owns a single sync and a
+single async ``httpx`` client – connection limits, keep-alive expiry and
+timeouts tuned for many concurrent, mostly small, provider calls, and HTTP/2
+when the ``h2`` package is installed and enabled – which
+:pymod:`essay_agent.llm_client` and :pymod:`essay_agent.memory.semantic_search`
+pass to every client they build.
+
+Connection reuse is measured, not assumed: each request carries an
+``httpcore`` trace hook, so :meth:`HttpPool.stats` reports requests, new TCP
+connections and TLS handshakes, and the resulting reuse ratio.
+
+Configuration
+-------------
+* ``ESSAY_AGENT_HTTP_MAX_CONNECTIONS`` (100) / ``ESSAY_AGENT_HTTP_MAX_KEEPALIVE``
+  (20) – pool limits per client.
+* ``ESSAY_AGENT_HTTP_KEEPALIVE_EXPIRY`` (60) – seconds an idle connection is
+  kept open.
+* ``ESSAY_AGENT_HTTP_CONNECT_TIMEOUT`` (10) / ``ESSAY_AGENT_HTTP_TIMEOUT`` (120)
+  – connect and read/write timeouts in seconds.
+* ``ESSAY_AGENT_HTTP2=1`` – negotiate HTTP/2 (falls back to HTTP/1.1 with a
+  warning when ``h2`` is missing).
+"""
+from __future__ import annotations
+
+import importlib.util
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_CONNECT = "connection.connect_tcp.complete"
+_TLS = "connection.start_tls.complete"
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    """Limits and timeouts of the shared clients (times in seconds)."""
+
+    max_connections: int = 100
+    max_keepalive: int = 20
+    keepalive_expiry: float = 60.0
+    connect_timeout: float = 10.0
+    timeout: float = 120.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "HttpPoolConfig":
+        return cls(
+            max_connections=int(os.getenv("ESSAY_AGENT_HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive=int(os.getenv("ESSAY_AGENT_HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("ESSAY_AGENT_HTTP_KEEPALIVE_EXPIRY", "60")),
+            connect_timeout=float(os.getenv("ESSAY_AGENT_HTTP_CONNECT_TIMEOUT", "10")),
+            timeout=float(os.getenv("ESSAY_AGENT_HTTP_TIMEOUT", "120")),
+            http2=os.getenv("ESSAY_AGENT_HTTP2", "0") == "1",
+        )
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class HttpPool:
+    """Lazily built shared ``httpx.Client`` / ``httpx.AsyncClient`` pair."""
+
+    def __init__(self, config: Optional[HttpPoolConfig] = None, *, transport: Any = None) -> None:  # noqa: ANN401
+        self.config = config or HttpPoolConfig()
+        # Tests route the clients to an in-process app / local server
+        self._transport = transport
+        self._lock = threading.Lock()
+        self._sync: Any = None
+        self._async: Any = None
+        self._stats = {"requests": 0, "connections": 0, "tls_handshakes": 0}
+
+    @classmethod
+    def from_env(cls) -> "HttpPool":
+        return cls(HttpPoolConfig.from_env())
+
+    # ------------------------------------------------------------------
+    # Client construction
+    # ------------------------------------------------------------------
+
+    def _client_kwargs(self, httpx: Any) -> Dict[str, Any]:  # noqa: ANN401
+        cfg = self.config
+        http2 = cfg.http2
+        if http2 and not http2_available():
+            logger.warning("ESSAY_AGENT_HTTP2=1 but the 'h2' package is not installed – using HTTP/1.1")
+            http2 = False
+        return {
+            "limits": httpx.Limits(
+                max_connections=cfg.max_connections,
+                max_keepalive_connections=cfg.max_keepalive,
+                keepalive_expiry=cfg.keepalive_expiry,
+            ),
+            "timeout": httpx.Timeout(cfg.timeout, connect=cfg.connect_timeout),
+            "http2": http2,
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        if event == _CONNECT:
+            self._count("connections")
+        elif event == _TLS:
+            self._count("tls_handshakes")
+
+    async def _atrace(self, event: str, info: Dict[str, Any]) -> None:
+        self._trace(event, info)
+
+    def _on_request(self, request: Any) -> None:  # noqa: ANN401
+        self._count("requests")
+        request.extensions["trace"] = self._trace
+
+    async def _aon_request(self, request: Any) -> None:  # noqa: ANN401
+        self._count("requests")
+        request.extensions["trace"] = self._atrace
+
+    def clients(self) -> Tuple[Any, Any]:
+        """Return the shared ``(sync, async)`` clients, or ``(None, None)`` without httpx."""
+
+        with self._lock:
+            if self._sync is None:
+                try:
+                    import httpx
+                except ModuleNotFoundError:  # pragma: no cover – openai pulls httpx in
+                    return None, None
+                kwargs = self._client_kwargs(httpx)
+                sync_transport = async_transport = None
+                if self._transport is not None:
+                    sync_transport, async_transport = self._transport
+                self._sync = httpx.Client(
+                    event_hooks={"request": [self._on_request]}, transport=sync_transport, **kwargs
+                )
+                self._async = httpx.AsyncClient(
+                    event_hooks={"request": [self._aon_request]}, transport=async_transport, **kwargs
+                )
+            return self._sync, self._async
+
+    def openai_kwargs(self, *, fields: Optional[Any] = None) -> Dict[str, Any]:  # noqa: ANN401
+        """``http_client`` / ``http_async_client`` kwargs for an OpenAI-backed LangChain class.
+
+        Pass the class's field names as *fields* to drop the async client for
+        older classes that only accept ``http_client``.
+        """
+
+        sync_client, async_client = self.clients()
+        if sync_client is None:  # pragma: no cover
+            return {}
+        kwargs = {"http_client": sync_client, "http_async_client": async_client}
+        if fields is not None:
+            kwargs = {k: v for k, v in kwargs.items() if k in fields}
+        return kwargs
+
+    def close(self) -> None:
+        """Close the sync client and forget both (the async one is left to GC)."""
+
+        with self._lock:
+            if self._sync is not None:
+                self._sync.close()
+            self._sync = self._async = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            built = self._sync is not None
+        requests = stats["requests"]
+        stats["reuse_ratio"] = round(1 - stats["connections"] / requests, 4) if requests else 0.0
+        stats.update(
+            built=built,
+            http2=self.config.http2 and http2_available(),
+            max_connections=self.config.max_connections,
+            max_keepalive=self.config.max_keepalive,
+            keepalive_expiry=self.config.keepalive_expiry,
+        )
+        return stats
+
+
+_POOL = HttpPool.from_env()
+
+
+def get_http_pool() -> HttpPool:
+    """Return the process-wide pool shared by every provider client."""
+
+    return _POOL
+
+
+def model_fields(cls: type) -> set:
+    """Field names of a pydantic v1/v2 model class (empty if unknown)."""
+
+    found = getattr(cls, "model_fields", None) or getattr(cls, "__fields__", None) or {}
+    return set(found)
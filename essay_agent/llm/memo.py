@@ -0,0 +1,205 @@
+"""essay_agent.llm.memo
+
+Process-shared, byte-bounded LRU + TTL memo for parsed-before LLM answers.
+
+``ReasoningEngine`` used to keep its reasoning responses in a per-instance
+``dict``: lost whenever the server rebuilt the agent, keyed on an MD5 of the
+first 500 prompt characters plus 200 input characters (two turns with the same
+prompt head but different context collided and got each other's answer), and
+"evicted" the first ten keys once 50 were stored, whatever their use.
+
+:class:`MemoCache` fixes each of these:
+
+* One instance per purpose, shared by every agent in the process
+  (:func:`get_reasoning_cache`).
+* Keys are a SHA-256 of the *whole* normalised prompt and the model
+  parameters that shape the answer (:func:`memo_key`) – whitespace-only
+  differences still hit, anything else misses.
+* Least-recently-used entries are evicted once ``max_entries`` or
+  ``max_bytes`` is exceeded; entries expire after ``ttl_seconds``.
+* :meth:`MemoCache.stats` reports hits, misses, evictions, bytes, lookup
+  latency and the upstream time saved by hits.
+
+Configuration
+-------------
+* ``ESSAY_AGENT_REASONING_CACHE=0`` – disable the reasoning memo.
+* ``ESSAY_AGENT_REASONING_CACHE_MAX_BYTES`` (4 MiB) /
+  ``ESSAY_AGENT_REASONING_CACHE_MAX_ENTRIES`` (512) – size bounds.
+* ``ESSAY_AGENT_REASONING_CACHE_TTL_SECONDS`` (900) – entry lifetime.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+_SPACE_RE = re.compile(r"[ \t]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def normalise_prompt(prompt: str) -> str:
+    """Collapse whitespace differences that do not change what the model sees."""
+
+    text = prompt.replace("\r\n", "\n").replace("\r", "\n")
+    text = "\n".join(_SPACE_RE.sub(" ", line).strip() for line in text.split("\n"))
+    return _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+
+def memo_key(prompt: str, **params: Any) -> str:  # noqa: ANN401
+    """Stable key for *prompt* (normalised, in full) under model *params*."""
+
+    digest = hashlib.sha256()
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(normalise_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class MemoCache:
+    """Thread-safe in-memory LRU of string values with TTL and byte bound."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 512,
+        max_bytes: int = 4 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 900.0,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (value, size, stored_at, cost_seconds)
+        self._entries: "OrderedDict[str, Tuple[str, int, float, float]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "lookup_seconds": 0.0,
+            "saved_seconds": 0.0,
+            "miss_cost_seconds": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "MemoCache":
+        """Build from ``ESSAY_AGENT_<PREFIX>_CACHE*`` variables."""
+
+        env = f"ESSAY_AGENT_{prefix}_CACHE"
+        ttl = float(os.getenv(f"{env}_TTL_SECONDS", "900"))
+        return cls(
+            max_entries=int(os.getenv(f"{env}_MAX_ENTRIES", "512")),
+            max_bytes=int(os.getenv(f"{env}_MAX_BYTES", str(4 * 1024 * 1024))),
+            ttl_seconds=ttl or None,
+            enabled=os.getenv(env, "1") != "0",
+        )
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the value for *key* (refreshing its recency) or ``None``."""
+
+        if not self.enabled:
+            return None
+        start = time.perf_counter()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._expired(entry):
+                self._remove(key)
+                self._stats["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._stats["misses"] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["saved_seconds"] += entry[3]
+            self._stats["lookup_seconds"] += time.perf_counter() - start
+        return None if entry is None else entry[0]
+
+    def put(self, key: str, value: str, *, cost_seconds: float = 0.0) -> None:
+        """Store *value*; *cost_seconds* is what producing it took (reported as saved on hits)."""
+
+        if not self.enabled:
+            return
+        size = len(key) + len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, self._clock(), cost_seconds)
+            self._bytes += size
+            self._stats["stores"] += 1
+            self._stats["miss_cost_seconds"] += cost_seconds
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def _expired(self, entry: Tuple[str, int, float, float]) -> bool:
+        return self.ttl_seconds is not None and self._clock() - entry[2] >= self.ttl_seconds
+
+    def _remove(self, key: str) -> None:
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            entries, used = len(self._entries), self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "bytes": used,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "stores": stats["stores"],
+            "evictions": stats["evictions"],
+            "expirations": stats["expirations"],
+            "hit_ratio": round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            "avg_lookup_ms": round(stats["lookup_seconds"] / lookups * 1000, 4) if lookups else 0.0,
+            "avg_miss_cost_seconds": (
+                round(stats["miss_cost_seconds"] / stats["stores"], 4) if stats["stores"] else 0.0
+            ),
+            "saved_seconds": round(stats["saved_seconds"], 3),
+        }
+
+
+_REASONING_CACHE = MemoCache.from_env("REASONING")
+
+
+def get_reasoning_cache() -> MemoCache:
+    """Return the process-wide memo of reasoning responses."""
+
+    return _REASONING_CACHE
@@ -0,0 +1,231 @@
+"""essay_agent.llm.micro_batch
+
+Micro-batching of small, structurally identical prompts across callers.
+
+Some per-turn calls are tiny classification prompts – tool selection,
+profile-fact extraction – issued once per user turn.  Under load dozens of
+them are in flight at the same moment, each paying a full round-trip and a
+request against the RPM quota.  :class:`MicroBatcher` collects concurrent
+prompts of the same *kind* for a few milliseconds and sends them as one
+multi-item prompt::
+
+    <micro_batch> … <item id="0">…</item> <item id="1">…</item> …
+
+The model answers ``{"results": [{"id": 0, "response": …}, …]}`` and every
+caller receives the text it would have got from its own call.  Items that
+are missing or unparsable in the batched answer – or every item, when the
+batched call fails – are re-sent individually, so batching never changes
+what a caller can observe beyond latency.
+
+Batching is adaptive: a call whose kind has nothing else pending or in
+flight is sent straight away, so a lightly loaded process pays no window
+delay.  Only calls that arrive while another of their kind is outstanding
+wait (at most ``window`` seconds, or until ``max_items`` are queued).
+
+Disabled unless ``ESSAY_AGENT_MICROBATCH=1``; ``ESSAY_AGENT_MICROBATCH_WINDOW_MS``
+and ``ESSAY_AGENT_MICROBATCH_MAX_ITEMS`` tune the window and batch size.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+
+BATCH_MARKER = "<micro_batch>"
+
+_HEADER = """<micro_batch>
+The items below are independent requests from different users. Answer each one
+on its own, exactly as if it were the only request, following its own
+instructions and output format.
+
+Return one JSON object and nothing else:
+{{"results": [{{"id": <item id>, "response": <the complete answer to that item as a JSON string>}}, ...]}}
+Include every id from 0 to {last}.
+</micro_batch>
+"""
+
+
+def build_batch_prompt(prompts: Sequence[str]) -> str:
+    """Combine *prompts* into one multi-item prompt."""
+
+    items = "\n".join(f'<item id="{i}">\n{prompt.strip()}\n</item>' for i, prompt in enumerate(prompts))
+    return _HEADER.format(last=len(prompts) - 1) + "\n" + items
+
+
+def split_batch_prompt(prompt: str) -> List[str]:
+    """Inverse of :func:`build_batch_prompt` (used by the mock server)."""
+
+    return [m.group(1).strip() for m in re.finditer(r'<item id="\d+">\n(.*?)\n</item>', prompt, re.DOTALL)]
+
+
+def parse_batch_response(text: str, count: int) -> Dict[int, str]:
+    """Map item id → answer text; ids that cannot be recovered are omitted."""
+
+    raw = text.strip()
+    if raw.startswith("```"):
+        raw = raw.strip("`")
+        raw = raw[raw.find("{"):] if "{" in raw else raw
+    start, end = raw.find("{"), raw.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        data = json.loads(raw[start:end + 1])
+    except json.JSONDecodeError:
+        return {}
+    results = data.get("results") if isinstance(data, dict) else None
+    if not isinstance(results, list):
+        return {}
+    out: Dict[int, str] = {}
+    for row in results:
+        if not isinstance(row, dict) or "response" not in row:
+            continue
+        try:
+            index = int(row.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < count and index not in out:
+            answer = row["response"]
+            out[index] = answer if isinstance(answer, str) else json.dumps(answer)
+    return out
+
+
+@dataclass
+class _Pending:
+    prompt: str
+    single: Callable[[], Awaitable[str]]
+    send_batch: Callable[[str, int], Awaitable[str]]
+    future: "asyncio.Future[str]"
+
+
+@dataclass
+class _Group:
+    pending: List[_Pending] = field(default_factory=list)
+    in_flight: int = 0
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class MicroBatcher:
+    """Coalesce concurrent small prompts that share a batching key."""
+
+    def __init__(self, *, window: float = 0.005, max_items: int = 16, enabled: bool = True) -> None:
+        self.window = window
+        self.max_items = max(2, int(max_items))
+        self.enabled = enabled
+        self._groups: Dict[Any, _Group] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+        self._lock = threading.Lock()
+        self._stats = {"submitted": 0, "direct": 0, "batches": 0, "batched_items": 0, "fallbacks": 0}
+
+    @classmethod
+    def from_env(cls) -> "MicroBatcher":
+        return cls(
+            window=float(os.getenv("ESSAY_AGENT_MICROBATCH_WINDOW_MS", "5")) / 1000.0,
+            max_items=int(os.getenv("ESSAY_AGENT_MICROBATCH_MAX_ITEMS", "16")),
+            enabled=os.getenv("ESSAY_AGENT_MICROBATCH", "0") == "1",
+        )
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[name] += n
+
+    async def submit(
+        self,
+        key: Any,  # noqa: ANN401
+        prompt: str,
+        single: Callable[[], Awaitable[str]],
+        send_batch: Callable[[str, int], Awaitable[str]],
+    ) -> str:
+        """Return the answer to *prompt*, batched with concurrent same-*key* prompts.
+
+        *single* sends the prompt on its own; it is used when there is no one
+        to batch with and as the per-item fallback.  ``send_batch(prompt, n)``
+        sends a combined prompt of *n* items and returns the raw answer.
+        """
+
+        self._count("submitted")
+        if not self.enabled:
+            return await single()
+        loop = asyncio.get_running_loop()
+        group_key = (id(loop), key)
+        group = self._groups.setdefault(group_key, _Group())
+
+        if not group.pending and group.in_flight == 0:
+            # Nothing to batch with – no reason to wait.
+            self._count("direct")
+            group.in_flight += 1
+            try:
+                return await single()
+            finally:
+                group.in_flight -= 1
+                self._maybe_forget(group_key, group)
+
+        item = _Pending(prompt, single, send_batch, loop.create_future())
+        group.pending.append(item)
+        if len(group.pending) >= self.max_items:
+            self._flush(group_key)
+        elif group.timer is None:
+            group.timer = loop.call_later(self.window, self._flush, group_key)
+        return await item.future
+
+    def _maybe_forget(self, group_key: Any, group: _Group) -> None:
+        if not group.pending and group.in_flight == 0 and group.timer is None:
+            self._groups.pop(group_key, None)
+
+    def _flush(self, group_key: Any) -> None:
+        group = self._groups.get(group_key)
+        if group is None:
+            return
+        if group.timer is not None:
+            group.timer.cancel()
+            group.timer = None
+        batch, group.pending = group.pending, []
+        if batch:
+            group.in_flight += 1
+            # The batch runs in the context of the call that opened the window
+            # (its call site, priority lane and retry budget).
+            task = asyncio.get_running_loop().create_task(self._run(group_key, group, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group_key: Any, group: _Group, batch: List[_Pending]) -> None:
+        try:
+            if len(batch) == 1:
+                answers: Dict[int, str] = {}
+            else:
+                self._count("batches")
+                try:
+                    text = await batch[0].send_batch(build_batch_prompt([p.prompt for p in batch]), len(batch))
+                    answers = parse_batch_response(text, len(batch))
+                except Exception:  # noqa: BLE001 – every item falls back below
+                    answers = {}
+                self._count("batched_items", len(answers))
+
+            missing = [i for i in range(len(batch)) if i not in answers]
+            if len(batch) > 1:
+                self._count("fallbacks", len(missing))
+            singles = await asyncio.gather(*(batch[i].single() for i in missing), return_exceptions=True)
+            for i, result in zip(missing, singles):
+                answers[i] = result  # type: ignore[assignment]
+
+            for i, item in enumerate(batch):
+                if item.future.done():
+                    continue
+                result = answers[i]
+                if isinstance(result, BaseException):
+                    item.future.set_exception(result)
+                else:
+                    item.future.set_result(result)
+        finally:
+            group.in_flight -= 1
+            self._maybe_forget(group_key, group)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["enabled"] = self.enabled
+        stats["avg_batch_size"] = round(stats["batched_items"] / stats["batches"], 3) if stats["batches"] else 0.0
+        return stats
@@ -0,0 +1,429 @@
+"""essay_agent.llm.mock_server
+
+Local OpenAI-compatible stand-in for load testing.
+
+Point ``ChatOpenAI`` at it and the whole HTTP path – connection pooling,
+retries, rate limiting, concurrency caps, SSE streaming – runs for real,
+while the network and the bill stay out of the picture::
+
+    python -m essay_agent.llm.mock_server --profile flaky --port 8901
+    OPENAI_API_KEY=mock OPENAI_API_BASE=http://127.0.0.1:8901/v1 essay-agent ...
+
+Responses are schema-valid JSON for tool prompts.  When a prompt carries an
+``<example_output>`` block (see :func:`essay_agent.prompts.templates.inject_example`)
+the matching :data:`~essay_agent.prompts.example_registry.EXAMPLE_REGISTRY`
+entry is returned; otherwise the tool named in the prompt is looked up, and a
+plain-text reply is the last resort.  Micro-batched prompts (see
+:pymod:`essay_agent.llm.micro_batch`) get one ``results`` entry per item.
+
+Behaviour is controlled by a :class:`MockProfile` – latency distribution,
+time-to-first-token and inter-chunk delay for streams, and 429 / 5xx
+injection rates (429s carry ``Retry-After``).  Profiles can be swapped at
+runtime through ``PUT /mock/profile``; counters – including the number of
+distinct client connections seen – are exposed on ``GET /mock/stats``.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_EXAMPLE_BLOCK_RE = re.compile(r"<example_output>\s*(.*?)\s*</example_output>", re.DOTALL)
+
+
+@dataclass(frozen=True)
+class MockProfile:
+    """Latency and failure behaviour of the mock endpoint (times in ms)."""
+
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    # "fixed" | "uniform" (± jitter) | "lognormal" (median latency, sigma = jitter / latency)
+    latency_distribution: str = "fixed"
+    ttft_ms: float = 0.0
+    chunk_delay_ms: float = 0.0
+    chunk_chars: int = 16
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    retry_after_s: float = 1.0
+    seed: Optional[int] = None
+
+
+PROFILES: Dict[str, MockProfile] = {
+    "instant": MockProfile(),
+    "realistic": MockProfile(
+        latency_ms=900, latency_jitter_ms=400, latency_distribution="lognormal",
+        ttft_ms=350, chunk_delay_ms=25,
+    ),
+    "flaky": MockProfile(
+        latency_ms=600, latency_jitter_ms=300, latency_distribution="uniform",
+        ttft_ms=250, chunk_delay_ms=20, rate_limit_rate=0.05, server_error_rate=0.03,
+    ),
+    "throttled": MockProfile(latency_ms=300, rate_limit_rate=0.3, retry_after_s=2.0),
+}
+
+
+# ---------------------------------------------------------------------------
+# Response content
+# ---------------------------------------------------------------------------
+
+def _prompt_from_messages(messages: List[Dict[str, Any]]) -> str:
+    parts = []
+    for message in messages:
+        content = message.get("content") or ""
+        if isinstance(content, list):  # multi-part content
+            content = " ".join(str(p.get("text", "")) for p in content if isinstance(p, dict))
+        parts.append(str(content))
+    return "\n".join(parts)
+
+
+def _examples() -> Dict[str, str]:
+    from essay_agent.prompts.example_registry import EXAMPLE_REGISTRY
+
+    return EXAMPLE_REGISTRY
+
+
+def pick_response(prompt: str) -> Tuple[str, str]:
+    """Return ``(tool_name, response_text)`` for *prompt*.
+
+    ``tool_name`` is ``"text"`` when no registry entry applies.
+    """
+
+    examples = _examples()
+    block = _EXAMPLE_BLOCK_RE.search(prompt)
+    if block:
+        embedded = block.group(1)
+        for name, example in examples.items():
+            if example in embedded:
+                return name, example
+
+    lowered = prompt.lower()
+    best: Optional[Tuple[int, str]] = None
+    for name in examples:
+        for variant in {name, name.replace("_", " ")}:
+            if re.search(rf"\b{re.escape(variant)}\b", lowered):
+                candidate = (len(variant), name)
+                best = max(best, candidate) if best else candidate
+    if best:
+        return best[1], examples[best[1]]
+    return "text", "This is a mock response from the local OpenAI-compatible server."
+
+
+def pick_batch_response(prompt: str) -> str:
+    """Answer every item of a micro-batched prompt as :func:`pick_response` would."""
+
+    from essay_agent.llm.micro_batch import split_batch_prompt
+
+    items = split_batch_prompt(prompt)
+    return json.dumps({"results": [{"id": i, "response": pick_response(item)[1]} for i, item in enumerate(items)]})
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def _embedding(text: str, dims: int) -> List[float]:
+    """Deterministic unit-ish vector derived from *text*."""
+
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    vec = [rng.uniform(-1.0, 1.0) for _ in range(dims)]
+    norm = sum(v * v for v in vec) ** 0.5 or 1.0
+    return [v / norm for v in vec]
+
+
+# ---------------------------------------------------------------------------
+# Server state
+# ---------------------------------------------------------------------------
+
+class MockState:
+    """Mutable profile, RNG and request counters shared by the handlers."""
+
+    def __init__(self, profile: MockProfile) -> None:
+        self._lock = threading.Lock()
+        self.set_profile(profile)
+
+    def set_profile(self, profile: MockProfile) -> None:
+        with self._lock:
+            self.profile = profile
+            self._rng = random.Random(profile.seed)
+            self.reset()
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.streamed = 0
+        self.rate_limited = 0
+        self.server_errors = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.by_tool: Dict[str, int] = {}
+        self.peers: set = set()
+
+    def latency(self) -> float:
+        """Sample one response latency in seconds."""
+
+        p = self.profile
+        with self._lock:
+            if p.latency_distribution == "uniform":
+                ms = self._rng.uniform(p.latency_ms - p.latency_jitter_ms, p.latency_ms + p.latency_jitter_ms)
+            elif p.latency_distribution == "lognormal" and p.latency_ms > 0:
+                sigma = p.latency_jitter_ms / p.latency_ms
+                ms = p.latency_ms * self._rng.lognormvariate(0.0, sigma)
+            else:
+                ms = p.latency_ms
+        return max(0.0, ms) / 1000.0
+
+    def fault(self) -> Optional[JSONResponse]:
+        """Return an injected error response, or ``None`` to serve normally."""
+
+        p = self.profile
+        with self._lock:
+            roll = self._rng.random()
+            if roll < p.rate_limit_rate:
+                self.rate_limited += 1
+                return JSONResponse(
+                    status_code=429,
+                    headers={"Retry-After": f"{p.retry_after_s:g}"},
+                    content={"error": {"message": "Rate limit reached (mock)", "type": "requests", "code": "rate_limit_exceeded"}},
+                )
+            if roll < p.rate_limit_rate + p.server_error_rate:
+                self.server_errors += 1
+                status = self._rng.choice((500, 502, 503))
+                return JSONResponse(
+                    status_code=status,
+                    content={"error": {"message": f"Injected {status} (mock)", "type": "server_error", "code": None}},
+                )
+        return None
+
+    def enter(self, tool: str, *, stream: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self.streamed += int(stream)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.by_tool[tool] = self.by_tool.get(tool, 0) + 1
+
+    def connected(self, peer: Any) -> None:  # noqa: ANN401
+        """Note the client address of a request; distinct addresses ≈ TCP connections."""
+
+        with self._lock:
+            self.peers.add(tuple(peer) if peer else None)
+
+    def leave(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "profile": asdict(self.profile),
+                "requests": self.requests,
+                "streamed": self.streamed,
+                "rate_limited": self.rate_limited,
+                "server_errors": self.server_errors,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "by_tool": dict(self.by_tool),
+                "connections": len(self.peers),
+            }
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+def create_app(profile: MockProfile | str = "instant") -> FastAPI:
+    """Build the mock OpenAI app for *profile* (a :class:`MockProfile` or preset name)."""
+
+    state = MockState(PROFILES[profile] if isinstance(profile, str) else profile)
+    app = FastAPI(title="essay-agent mock OpenAI")
+    app.state.mock = state
+
+    @app.middleware("http")
+    async def _track_connection(request: Request, call_next):
+        state.connected(request.scope.get("client"))
+        return await call_next(request)
+
+    async def _stream_chat(model: str, text: str, completion_id: str) -> AsyncIterator[str]:
+        p = state.profile
+        try:
+            await asyncio.sleep(p.ttft_ms / 1000.0)
+            size = max(1, p.chunk_chars)
+            pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+            head = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+            first = {**head, "choices": [{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}]}
+            yield f"data: {json.dumps(first)}\n\n"
+            for i, piece in enumerate(pieces):
+                if i:
+                    await asyncio.sleep(p.chunk_delay_ms / 1000.0)
+                chunk = {**head, "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            last = {**head, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]}
+            yield f"data: {json.dumps(last)}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            state.leave()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        fault = state.fault()
+        if fault is not None:
+            return fault
+
+        model = body.get("model", "gpt-4o")
+        prompt = _prompt_from_messages(body.get("messages") or [])
+        if prompt.lstrip().startswith("<micro_batch>"):
+            tool, text = "micro_batch", pick_batch_response(prompt)
+        else:
+            tool, text = pick_response(prompt)
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        stream = bool(body.get("stream"))
+        state.enter(tool, stream=stream)
+        if stream:
+            return StreamingResponse(_stream_chat(model, text, completion_id), media_type="text/event-stream")
+
+        try:
+            await asyncio.sleep(state.latency())
+        finally:
+            state.leave()
+        prompt_tokens, completion_tokens = _count_tokens(prompt), _count_tokens(text)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v1/completions")
+    async def completions(request: Request):
+        body = await request.json()
+        fault = state.fault()
+        if fault is not None:
+            return fault
+
+        prompts = body.get("prompt") or ""
+        prompts = prompts if isinstance(prompts, list) else [prompts]
+        choices = []
+        for i, prompt in enumerate(prompts):
+            tool, text = pick_response(str(prompt))
+            state.enter(tool, stream=False)
+            state.leave()
+            choices.append({"index": i, "text": text, "finish_reason": "stop", "logprobs": None})
+        await asyncio.sleep(state.latency())
+        prompt_tokens = sum(_count_tokens(str(p)) for p in prompts)
+        completion_tokens = sum(_count_tokens(c["text"]) for c in choices)
+        return {
+            "id": f"cmpl-mock-{uuid.uuid4().hex[:12]}",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo-instruct"),
+            "choices": choices,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        fault = state.fault()
+        if fault is not None:
+            return fault
+
+        inputs = body.get("input") or ""
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        dims = int(body.get("dimensions") or 1536)
+        state.enter("embeddings", stream=False)
+        try:
+            await asyncio.sleep(state.latency())
+        finally:
+            state.leave()
+        data = [
+            {"object": "embedding", "index": i, "embedding": _embedding(json.dumps(item), dims)}
+            for i, item in enumerate(inputs)
+        ]
+        tokens = sum(_count_tokens(json.dumps(item)) for item in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "text-embedding-ada-002"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "gpt-4o", "object": "model", "owned_by": "mock"}]}
+
+    @app.get("/mock/stats")
+    async def mock_stats():
+        return state.stats()
+
+    @app.put("/mock/profile")
+    async def set_profile(request: Request):
+        body = await request.json()
+        preset = body.pop("preset", None)
+        if preset is not None and preset not in PROFILES:
+            return JSONResponse(
+                status_code=400,
+                content={"error": {
+                    "message": f"Unknown preset {preset!r}; expected one of {', '.join(sorted(PROFILES))}",
+                    "type": "invalid_request_error",
+                    "code": "unknown_preset",
+                }},
+            )
+        base = PROFILES[preset] if preset is not None else state.profile
+        known = {f.name for f in fields(MockProfile)}
+        state.set_profile(replace(base, **{k: v for k, v in body.items() if k in known}))
+        return state.stats()
+
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover – CLI wrapper
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible mock server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--profile", default="realistic", choices=sorted(PROFILES))
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--jitter-ms", type=float)
+    parser.add_argument("--rate-limit-rate", type=float)
+    parser.add_argument("--server-error-rate", type=float)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    overrides = {
+        "latency_ms": args.latency_ms,
+        "latency_jitter_ms": args.jitter_ms,
+        "rate_limit_rate": args.rate_limit_rate,
+        "server_error_rate": args.server_error_rate,
+        "seed": args.seed,
+    }
+    profile = replace(PROFILES[args.profile], **{k: v for k, v in overrides.items() if v is not None})
+
+    import uvicorn
+
+    print(f"Mock OpenAI on http://{args.host}:{args.port}/v1 – profile {args.profile}")
+    uvicorn.run(create_app(profile), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
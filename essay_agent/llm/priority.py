@@ -0,0 +1,94 @@
+"""essay_agent.llm.priority
+
+Priority lanes for LLM traffic sharing one provider quota.
+
+``/chat`` turns, background agent work (``WorkflowOrchestrator``, memory
+upkeep) and evaluation batches all draw from the same per-model RPM/TPM
+buckets.  Without priorities a 200-conversation ``eval batch`` run queues
+ahead of a student waiting on a reply.  Every call therefore runs in one of
+three lanes:
+
+* ``interactive`` – a user is waiting; reserves quota immediately (the old
+  behaviour) and is never held back for the other lanes.
+* ``background`` – work the user will see later; yields to waiting
+  interactive calls and leaves a slice of each bucket untouched.
+* ``batch`` – evaluation / bulk jobs; yields to both other lanes, uses at
+  most half of the concurrency window and only the quota left above a larger
+  reserve, so it runs on leftover capacity.  Because batch never drains the
+  buckets, a batch process sharing an API key with the server also leaves the
+  server headroom.
+
+The lane is a context variable like :func:`~essay_agent.llm.telemetry.call_site`,
+so it follows ``await`` chains, tasks and worker threads.  Outside any
+:func:`priority` block calls use ``ESSAY_AGENT_PRIORITY`` (default
+``interactive``), which lets an eval process mark all of its traffic at once.
+
+>>> with priority(BATCH):
+...     results = await abatch_call_llm(llm, prompts)
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+BATCH = "batch"
+LANES = (INTERACTIVE, BACKGROUND, BATCH)
+
+
+@dataclass(frozen=True)
+class LanePolicy:
+    """How a lane shares the limiter with higher-priority lanes."""
+
+    rank: int
+    # Fraction of each RPM/TPM bucket the lane must leave untouched.
+    headroom: float = 0.0
+    # Fraction of the model's concurrency window the lane may occupy.
+    concurrency_share: float = 1.0
+    # Multiplier on retry back-off so low lanes step aside after errors.
+    retry_backoff: float = 1.0
+
+
+DEFAULT_LANE_POLICIES: Dict[str, LanePolicy] = {
+    INTERACTIVE: LanePolicy(rank=0),
+    BACKGROUND: LanePolicy(rank=1, headroom=0.1, concurrency_share=0.75, retry_backoff=1.5),
+    BATCH: LanePolicy(rank=2, headroom=0.25, concurrency_share=0.5, retry_backoff=2.0),
+}
+
+_LANE: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("essay_agent_llm_priority", default=None)
+
+
+def _validate(lane: str) -> str:
+    if lane not in LANES:
+        raise ValueError(f"unknown priority lane {lane!r}; expected one of {', '.join(LANES)}")
+    return lane
+
+
+_DEFAULT_LANE = _validate(os.getenv("ESSAY_AGENT_PRIORITY", INTERACTIVE))
+
+
+@contextlib.contextmanager
+def priority(lane: str) -> Iterator[None]:
+    """Run LLM calls made inside the block in *lane*; the innermost block wins."""
+
+    token = _LANE.set(_validate(lane))
+    try:
+        yield
+    finally:
+        _LANE.reset(token)
+
+
+def current_priority() -> str:
+    """Return the active lane (``ESSAY_AGENT_PRIORITY`` outside any block)."""
+
+    return _LANE.get() or _DEFAULT_LANE
+
+
+def priority_is_set() -> bool:
+    """``True`` inside an explicit :func:`priority` block."""
+
+    return _LANE.get() is not None
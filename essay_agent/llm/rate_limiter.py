@@ -0,0 +1,593 @@
+"""essay_agent.llm.rate_limiter
+
+Per-model request/token rate limiting with adaptive concurrency.
+
+Every model gets two token buckets – requests-per-minute (RPM) and
+tokens-per-minute (TPM) – plus an AIMD concurrency window that halves when the
+provider answers with HTTP 429 and grows by roughly one slot per window of
+successful calls.
+
+Buckets work by *reservation*: a caller takes its share immediately (the
+balance may go negative) and then sleeps for the returned delay **outside** of
+any lock.  Concurrent callers therefore never queue behind a process-wide lock
+the way the old ``time.sleep`` limiter did, and an asyncio caller only ever
+awaits ``asyncio.sleep``.
+
+Calls are scheduled by priority lane (see :pymod:`essay_agent.llm.priority`):
+interactive calls reserve as above, while background and batch calls only
+*take* quota that is actually available above their lane's reserve, never
+while a higher lane is waiting, and within their share of the concurrency
+window.  Queue depth and wait time are tracked per lane.
+
+Both an ``async`` API (FastAPI handlers, agents, batch evaluation) and a
+blocking API (legacy synchronous helpers) are provided; they share state so
+all traffic in the process draws from the same provider quota.  The blocking
+API never sleeps on a thread that is running an event loop: there it only
+takes quota and a slot that are free right now and otherwise raises
+:class:`LoopBlockedError`, so one throttled legacy call cannot freeze every
+request the loop serves.  Quota reserved by a caller that is cancelled (or
+fails) before it gets a slot is refunded.
+
+Example
+-------
+>>> limiter = RateLimiter.from_env()
+>>> async with limiter.limit("gpt-4o", tokens=1200):
+...     ...  # call the provider
+"""
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+from .priority import DEFAULT_LANE_POLICIES, LANES, LanePolicy, current_priority
+
+# Polling interval used while waiting for a free concurrency slot.  Slots are
+# released from arbitrary threads / event loops so a short poll is simpler and
+# more robust than cross-loop wake-ups.
+_SLOT_POLL_INTERVAL = 0.02
+# Upper bound on one sleep of a lower-lane caller waiting for leftover quota,
+# so it re-checks for higher-lane waiters and refunds reasonably often.
+_LANE_POLL_MAX = 0.25
+
+
+# ---------------------------------------------------------------------------
+# Limits configuration
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class ModelLimits:
+    """Provider quota for a single model."""
+
+    rpm: float
+    tpm: float
+    initial_concurrency: int = 8
+    max_concurrency: int = 64
+
+
+# Conservative defaults matching OpenAI's lower usage tiers.  Override with
+# ``ESSAY_AGENT_RPM`` / ``ESSAY_AGENT_TPM`` when the account has more headroom.
+DEFAULT_MODEL_LIMITS: Dict[str, ModelLimits] = {
+    "gpt-4o-mini": ModelLimits(rpm=500, tpm=200_000),
+    "gpt-4o": ModelLimits(rpm=500, tpm=30_000),
+    "gpt-4-turbo": ModelLimits(rpm=500, tpm=30_000),
+    "gpt-4": ModelLimits(rpm=500, tpm=10_000),
+    "gpt-3.5-turbo": ModelLimits(rpm=3_500, tpm=200_000),
+}
+FALLBACK_LIMITS = ModelLimits(rpm=500, tpm=30_000)
+
+
+class LoopBlockedError(RuntimeError):
+    """Raised by :meth:`RateLimiter.acquire_sync` instead of sleeping on a running event loop."""
+
+    def __init__(self, model: str, retry_in: float) -> None:
+        super().__init__(
+            f"Quota for {model} frees up in {retry_in:.2f}s; a synchronous call on a running "
+            "event loop cannot wait for it – use the async API (acall_llm)"
+        )
+        self.model = model
+        self.retry_in = retry_in
+
+
+def loop_running() -> bool:
+    """Return ``True`` when called from a thread that is running an event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    """Return ``True`` when *exc* looks like a provider 429 / rate-limit error."""
+
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status == 429:
+        return True
+    if "RateLimit" in type(exc).__name__:
+        return True
+    message = str(exc).lower()
+    return "rate limit" in message or "429" in message
+
+
+# ---------------------------------------------------------------------------
+# Primitives
+# ---------------------------------------------------------------------------
+
+
+class TokenBucket:
+    """Thread-safe token bucket using reservations instead of blocking."""
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("capacity and refill_per_second must be positive")
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+        self._updated = now
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take *amount* tokens and return the seconds to wait before using them.
+
+        Requests larger than the bucket are clamped to its capacity so a single
+        oversized prompt waits for a full refill instead of forever.
+        """
+        amount = min(max(float(amount), 0.0), self.capacity)
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.refill_per_second
+
+    def try_take(self, amount: float = 1.0, keep: float = 0.0) -> float:
+        """Take *amount* only if *keep* tokens remain afterwards.
+
+        Returns ``0.0`` when the tokens were taken, otherwise the seconds until
+        they would be available (nothing is taken).  Unlike :meth:`reserve`
+        this never puts the bucket into debt, so it cannot delay later callers.
+        """
+        amount = min(max(float(amount), 0.0), self.capacity)
+        keep = min(max(float(keep), 0.0), self.capacity - amount)
+        with self._lock:
+            self._refill()
+            missing = amount + keep - self._tokens
+            if missing <= 0:
+                self._tokens -= amount
+                return 0.0
+            return missing / self.refill_per_second
+
+    def refund(self, amount: float) -> None:
+        """Return unused tokens (e.g. when the real usage was lower)."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + max(float(amount), 0.0))
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+class AdaptiveConcurrency:
+    """AIMD concurrency window: additive increase, multiplicative decrease."""
+
+    def __init__(self, initial: int = 8, minimum: int = 1, maximum: int = 64) -> None:
+        self.minimum = max(1, int(minimum))
+        self.maximum = max(self.minimum, int(maximum))
+        self._limit = float(min(max(initial, self.minimum), self.maximum))
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.in_flight < int(self._limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._limit = min(float(self.maximum), self._limit + 1.0 / self._limit)
+
+    def on_rate_limited(self) -> None:
+        with self._lock:
+            self._limit = max(float(self.minimum), self._limit / 2.0)
+
+
+@dataclass
+class _LaneState:
+    waiting: int = 0
+    in_flight: int = 0
+    acquired: int = 0
+    throttled: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+@dataclass
+class _ModelState:
+    limits: ModelLimits
+    requests: TokenBucket
+    tokens: TokenBucket
+    concurrency: AdaptiveConcurrency
+    acquired: int = 0
+    throttled: int = 0
+    successes: int = 0
+    failures: int = 0
+    rate_limited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    lanes: Dict[str, _LaneState] = field(default_factory=lambda: {lane: _LaneState() for lane in LANES})
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def record_wait(self, waited: float, lane: str) -> None:
+        with self.lock:
+            lane_state = self.lanes[lane]
+            self.acquired += 1
+            lane_state.acquired += 1
+            if waited > 0:
+                self.throttled += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+                lane_state.throttled += 1
+                lane_state.total_wait += waited
+                lane_state.max_wait = max(lane_state.max_wait, waited)
+
+    def enter(self, lane: str, delta: int) -> None:
+        with self.lock:
+            self.lanes[lane].waiting += delta
+
+    def higher_lane_waiting(self, rank: int, policies: Dict[str, LanePolicy]) -> bool:
+        with self.lock:
+            return any(s.waiting for name, s in self.lanes.items() if policies[name].rank < rank)
+
+
+# ---------------------------------------------------------------------------
+# Limiter
+# ---------------------------------------------------------------------------
+
+
+class RateLimiter:
+    """Process-wide limiter keyed by model name."""
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, ModelLimits]] = None,
+        *,
+        default: ModelLimits = FALLBACK_LIMITS,
+        clock: Callable[[], float] = time.monotonic,
+        lane_policies: Optional[Dict[str, LanePolicy]] = None,
+    ) -> None:
+        self._limits = dict(DEFAULT_MODEL_LIMITS if limits is None else limits)
+        self._lanes = dict(DEFAULT_LANE_POLICIES if lane_policies is None else lane_policies)
+        self._default = default
+        self._clock = clock
+        self._models: Dict[str, _ModelState] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Build a limiter honouring ``ESSAY_AGENT_*`` overrides.
+
+        ``ESSAY_AGENT_RPM`` / ``ESSAY_AGENT_TPM`` / ``ESSAY_AGENT_MAX_CONCURRENCY``
+        override every model.  The legacy ``ESSAY_AGENT_MIN_REQUEST_INTERVAL``
+        is still honoured and translated into an RPM cap.
+        """
+        rpm_env = os.getenv("ESSAY_AGENT_RPM")
+        tpm_env = os.getenv("ESSAY_AGENT_TPM")
+        conc_env = os.getenv("ESSAY_AGENT_MAX_CONCURRENCY")
+        interval_env = os.getenv("ESSAY_AGENT_MIN_REQUEST_INTERVAL")
+        if rpm_env is None and interval_env and float(interval_env) > 0:
+            rpm_env = str(60.0 / float(interval_env))
+
+        def _override(base: ModelLimits) -> ModelLimits:
+            max_conc = int(conc_env) if conc_env else base.max_concurrency
+            return ModelLimits(
+                rpm=float(rpm_env) if rpm_env else base.rpm,
+                tpm=float(tpm_env) if tpm_env else base.tpm,
+                initial_concurrency=min(base.initial_concurrency, max_conc),
+                max_concurrency=max_conc,
+            )
+
+        limits = {name: _override(lim) for name, lim in DEFAULT_MODEL_LIMITS.items()}
+        return cls(limits, default=_override(FALLBACK_LIMITS))
+
+    # ------------------------------------------------------------------
+    # State helpers
+    # ------------------------------------------------------------------
+
+    def limits_for(self, model: str) -> ModelLimits:
+        if model in self._limits:
+            return self._limits[model]
+        # Longest-prefix match so dated snapshots ("gpt-4o-2024-08-06") map to
+        # their family.
+        matches = [name for name in self._limits if model.startswith(name)]
+        if matches:
+            return self._limits[max(matches, key=len)]
+        return self._default
+
+    def _state(self, model: str) -> _ModelState:
+        state = self._models.get(model)
+        if state is not None:
+            return state
+        with self._lock:
+            state = self._models.get(model)
+            if state is None:
+                lim = self.limits_for(model)
+                state = _ModelState(
+                    limits=lim,
+                    requests=TokenBucket(lim.rpm, lim.rpm / 60.0, clock=self._clock),
+                    tokens=TokenBucket(lim.tpm, lim.tpm / 60.0, clock=self._clock),
+                    concurrency=AdaptiveConcurrency(lim.initial_concurrency, 1, lim.max_concurrency),
+                )
+                self._models[model] = state
+            return state
+
+    def _reserve(self, state: _ModelState, tokens: int) -> float:
+        return max(state.requests.reserve(1), state.tokens.reserve(tokens))
+
+    def _try_take(self, state: _ModelState, tokens: int, policy: LanePolicy) -> float:
+        """Take quota for a lower lane only if its headroom stays untouched."""
+
+        if state.higher_lane_waiting(policy.rank, self._lanes):
+            return _SLOT_POLL_INTERVAL
+        delay = state.requests.try_take(1, policy.headroom * state.requests.capacity)
+        if delay > 0:
+            return delay
+        delay = state.tokens.try_take(tokens, policy.headroom * state.tokens.capacity)
+        if delay > 0:
+            state.requests.refund(1)
+        return delay
+
+    def _try_slot(self, state: _ModelState, lane: str, policy: LanePolicy) -> bool:
+        if policy.rank > 0:
+            if state.higher_lane_waiting(policy.rank, self._lanes):
+                return False
+            share = max(1, int(state.concurrency.limit * policy.concurrency_share))
+            with state.lock:
+                if state.lanes[lane].in_flight >= share:
+                    return False
+        if not state.concurrency.try_acquire():
+            return False
+        with state.lock:
+            state.lanes[lane].in_flight += 1
+        return True
+
+    def _lane(self, lane: Optional[str]) -> tuple[str, LanePolicy]:
+        lane = lane or current_priority()
+        return lane, self._lanes[lane]
+
+    # ------------------------------------------------------------------
+    # Acquire / release
+    # ------------------------------------------------------------------
+
+    def _refund(self, state: _ModelState, tokens: int) -> None:
+        state.requests.refund(1)
+        state.tokens.refund(tokens)
+
+    async def acquire(self, model: str, tokens: int = 0, *, lane: Optional[str] = None) -> float:
+        """Wait (without blocking the loop) until *model* may be called.
+
+        *lane* defaults to :func:`~essay_agent.llm.priority.current_priority`.
+        Returns the total seconds spent waiting.  A caller cancelled while
+        waiting gives its reserved quota back.
+        """
+        lane, policy = self._lane(lane)
+        state = self._state(model)
+        start = self._clock()
+        reserved = False
+        state.enter(lane, 1)
+        try:
+            if policy.rank == 0:
+                delay = self._reserve(state, tokens)
+                reserved = True
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                while (delay := self._try_take(state, tokens, policy)) > 0:
+                    await asyncio.sleep(min(delay, _LANE_POLL_MAX))
+                reserved = True
+            while not self._try_slot(state, lane, policy):
+                await asyncio.sleep(_SLOT_POLL_INTERVAL)
+        except BaseException:
+            if reserved:
+                self._refund(state, tokens)
+            raise
+        finally:
+            state.enter(lane, -1)
+        waited = self._clock() - start
+        state.record_wait(waited, lane)
+        return waited
+
+    def acquire_sync(self, model: str, tokens: int = 0, *, lane: Optional[str] = None) -> float:
+        """Blocking variant of :meth:`acquire` for synchronous call paths.
+
+        Called on a thread that runs an event loop it does not wait at all:
+        quota and a slot are taken only if free right now, otherwise
+        :class:`LoopBlockedError` is raised (nothing is reserved).
+        """
+        lane, policy = self._lane(lane)
+        state = self._state(model)
+        if loop_running():
+            return self._acquire_now(model, state, tokens, lane, policy)
+        start = self._clock()
+        reserved = False
+        state.enter(lane, 1)
+        try:
+            if policy.rank == 0:
+                delay = self._reserve(state, tokens)
+                reserved = True
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                while (delay := self._try_take(state, tokens, policy)) > 0:
+                    time.sleep(min(delay, _LANE_POLL_MAX))
+                reserved = True
+            while not self._try_slot(state, lane, policy):
+                time.sleep(_SLOT_POLL_INTERVAL)
+        except BaseException:
+            if reserved:
+                self._refund(state, tokens)
+            raise
+        finally:
+            state.enter(lane, -1)
+        waited = self._clock() - start
+        state.record_wait(waited, lane)
+        return waited
+
+    def _acquire_now(self, model: str, state: _ModelState, tokens: int, lane: str, policy: LanePolicy) -> float:
+        """Non-waiting acquire for synchronous callers on an event-loop thread."""
+
+        delay = self._try_take(state, tokens, policy)
+        if delay > 0:
+            with state.lock:
+                state.throttled += 1
+                state.lanes[lane].throttled += 1
+            raise LoopBlockedError(model, delay)
+        if not self._try_slot(state, lane, policy):
+            self._refund(state, tokens)
+            raise LoopBlockedError(model, _SLOT_POLL_INTERVAL)
+        state.record_wait(0.0, lane)
+        return 0.0
+
+    def release(self, model: str, error: Optional[BaseException] = None, *, lane: Optional[str] = None) -> None:
+        """Free the slot taken by ``acquire`` and adapt concurrency.
+
+        Provider 429s shrink the window; successes grow it; other failures are
+        neutral because they say nothing about quota.
+        """
+        lane, _ = self._lane(lane)
+        state = self._state(model)
+        state.concurrency.release()
+        with state.lock:
+            lane_state = state.lanes[lane]
+            lane_state.in_flight = max(0, lane_state.in_flight - 1)
+        if error is None:
+            state.concurrency.on_success()
+            with state.lock:
+                state.successes += 1
+        else:
+            with state.lock:
+                state.failures += 1
+            if is_rate_limit_error(error):
+                state.concurrency.on_rate_limited()
+                with state.lock:
+                    state.rate_limited += 1
+
+    @contextlib.asynccontextmanager
+    async def limit(self, model: str, tokens: int = 0, *, lane: Optional[str] = None) -> AsyncIterator[float]:
+        """``async with`` wrapper around :meth:`acquire` / :meth:`release`."""
+        lane = lane or current_priority()
+        waited = await self.acquire(model, tokens, lane=lane)
+        try:
+            yield waited
+        except BaseException as exc:
+            self.release(model, exc, lane=lane)
+            raise
+        else:
+            self.release(model, lane=lane)
+
+    @contextlib.contextmanager
+    def limit_sync(self, model: str, tokens: int = 0, *, lane: Optional[str] = None) -> Iterator[float]:
+        """``with`` wrapper around :meth:`acquire_sync` / :meth:`release`."""
+        lane = lane or current_priority()
+        waited = self.acquire_sync(model, tokens, lane=lane)
+        try:
+            yield waited
+        except BaseException as exc:
+            self.release(model, exc, lane=lane)
+            raise
+        else:
+            self.release(model, lane=lane)
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-model wait-time and concurrency metrics."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for model, state in list(self._models.items()):
+            with state.lock:
+                out[model] = {
+                    "rpm": state.limits.rpm,
+                    "tpm": state.limits.tpm,
+                    "acquired": state.acquired,
+                    "throttled": state.throttled,
+                    "successes": state.successes,
+                    "failures": state.failures,
+                    "rate_limited": state.rate_limited,
+                    "total_wait_seconds": round(state.total_wait, 6),
+                    "avg_wait_seconds": round(state.total_wait / state.acquired, 6) if state.acquired else 0.0,
+                    "max_wait_seconds": round(state.max_wait, 6),
+                    "lanes": {
+                        lane: {
+                            "queue_depth": s.waiting,
+                            "in_flight": s.in_flight,
+                            "acquired": s.acquired,
+                            "throttled": s.throttled,
+                            "total_wait_seconds": round(s.total_wait, 6),
+                            "avg_wait_seconds": round(s.total_wait / s.acquired, 6) if s.acquired else 0.0,
+                            "max_wait_seconds": round(s.max_wait, 6),
+                        }
+                        for lane, s in state.lanes.items()
+                    },
+                }
+            out[model].update(
+                {
+                    "concurrency_limit": state.concurrency.limit,
+                    "in_flight": state.concurrency.in_flight,
+                    "requests_available": round(state.requests.available, 3),
+                    "tokens_available": round(state.tokens.available, 3),
+                }
+            )
+        return out
+
+    def queue_depths(self) -> Dict[str, int]:
+        """Callers currently waiting for quota or a slot, per lane (all models)."""
+        depths = {lane: 0 for lane in self._lanes}
+        for state in list(self._models.values()):
+            with state.lock:
+                for lane, s in state.lanes.items():
+                    depths[lane] = depths.get(lane, 0) + s.waiting
+        return depths
+
+    def retry_backoff(self, lane: Optional[str] = None) -> float:
+        """Retry back-off multiplier for *lane* (see :class:`LanePolicy`)."""
+        return self._lane(lane)[1].retry_backoff
+
+    def reset(self) -> None:
+        """Drop all per-model state (used by tests)."""
+        with self._lock:
+            self._models.clear()
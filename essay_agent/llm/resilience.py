@@ -0,0 +1,396 @@
+"""essay_agent.llm.resilience
+
+Error-class-aware retries, circuit breaking and hedged requests.
+
+The old ``_retryable`` decorator retried *every* exception eight times with
+waits of up to 30 s, so an auth failure or a malformed request held a turn
+for minutes while a genuine 429 got no special treatment.  This module
+splits that into three cooperating pieces:
+
+* :func:`classify_error` maps an exception (following ``__cause__`` chains,
+  since helpers re-wrap provider errors) onto a small set of classes.  Only
+  rate-limit, timeout, connection and 5xx errors are retried, each with its
+  own attempt budget, and waits honour ``Retry-After`` when the provider
+  sends it (:class:`RetryPolicy`).  A request running out of its own
+  deadline (:class:`~essay_agent.llm.deadline.DeadlineExceeded`) is never
+  a provider failure: it is not retried, does not trip a breaker and does
+  not trigger router fallbacks.
+* :class:`CircuitBreaker` fails fast once a model keeps failing on the
+  provider side, then lets one probe through after a cool-down.
+* :class:`Hedger` sends a second, identical request when the first has run
+  past the model's recent p95 latency and returns whichever finishes first.
+  The number of hedges is capped as a fraction of calls so a slow provider
+  is not hit with twice the load.
+"""
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from .deadline import DeadlineExceeded
+from .rate_limiter import is_rate_limit_error
+
+T = TypeVar("T")
+
+RATE_LIMIT = "rate_limit"
+TIMEOUT = "timeout"
+CONNECTION = "connection"
+SERVER = "server"
+CLIENT = "client"
+CIRCUIT_OPEN = "circuit_open"
+DEADLINE = "deadline"  # the caller ran out of time, not the provider
+UNKNOWN = "unknown"
+
+# Classes that indicate the provider (not the request) is unhealthy.
+PROVIDER_FAILURES = frozenset({TIMEOUT, CONNECTION, SERVER})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a model whose circuit breaker is open."""
+
+    def __init__(self, model: str, retry_in: float) -> None:
+        super().__init__(f"Circuit open for {model}; retry in {retry_in:.1f}s")
+        self.model = model
+        self.retry_in = retry_in
+
+
+# ---------------------------------------------------------------------------
+# Classification
+# ---------------------------------------------------------------------------
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _classify_one(exc: BaseException) -> str:
+    if isinstance(exc, CircuitOpenError):
+        return CIRCUIT_OPEN
+    if isinstance(exc, DeadlineExceeded):
+        return DEADLINE
+    status = _status_code(exc)
+    if status == 429 or is_rate_limit_error(exc):
+        return RATE_LIMIT
+    if status is not None:
+        if status >= 500:
+            return SERVER
+        if status in (408, 409):  # request timeout / lock conflict – safe to retry
+            return TIMEOUT
+        if 400 <= status < 500:
+            return CLIENT
+    name = type(exc).__name__
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)) or "Timeout" in name:
+        return TIMEOUT
+    if isinstance(exc, ConnectionError) or "Connection" in name or "RemoteProtocol" in name:
+        return CONNECTION
+    if "InternalServer" in name or "ServiceUnavailable" in name:
+        return SERVER
+    if any(tag in name for tag in ("Authentication", "PermissionDenied", "BadRequest", "NotFound", "UnprocessableEntity")):
+        return CLIENT
+    return UNKNOWN
+
+
+def classify_error(exc: BaseException) -> str:
+    """Return the error class of *exc*, looking through wrapper exceptions."""
+
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        kind = _classify_one(current)
+        if kind != UNKNOWN:
+            return kind
+        current = current.__cause__ or current.__context__
+    return UNKNOWN
+
+
+def retry_after(exc: BaseException, *, now: Optional[float] = None) -> Optional[float]:
+    """Seconds the provider asked us to wait (``Retry-After``), if any."""
+
+    current: Optional[BaseException] = exc
+    seen = set()
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        headers = getattr(getattr(current, "response", None), "headers", None) or getattr(current, "headers", None)
+        if headers:
+            millis = headers.get("retry-after-ms")
+            if millis is not None:
+                try:
+                    return max(0.0, float(millis) / 1000.0)
+                except (TypeError, ValueError):
+                    pass
+            value = headers.get("retry-after")
+            if value is not None:
+                try:
+                    return max(0.0, float(value))
+                except (TypeError, ValueError):
+                    parsed = email.utils.parsedate_to_datetime(value) if isinstance(value, str) else None
+                    if parsed is not None:
+                        return max(0.0, parsed.timestamp() - (now if now is not None else time.time()))
+        current = current.__cause__ or current.__context__
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Retry policy (tenacity-compatible callables)
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Per-class attempt budgets and jittered exponential back-off.
+
+    ``should_retry``, ``stop`` and ``wait`` plug straight into
+    :func:`tenacity.retry`.
+    """
+
+    max_attempts: Dict[str, int] = field(
+        default_factory=lambda: {RATE_LIMIT: 6, SERVER: 4, CONNECTION: 4, TIMEOUT: 3}
+    )
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    jitter: float = 0.25
+    rng: random.Random = field(default_factory=random.Random, compare=False)
+
+    def should_retry(self, exc: BaseException) -> bool:
+        return classify_error(exc) in self.max_attempts
+
+    def stop(self, retry_state: Any) -> bool:  # noqa: ANN401
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        if exc is None:
+            return True
+        return retry_state.attempt_number >= self.max_attempts.get(classify_error(exc), 1)
+
+    def wait(self, retry_state: Any) -> float:  # noqa: ANN401
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        hinted = retry_after(exc) if exc is not None else None
+        if hinted is not None:
+            return min(hinted, self.max_delay)
+        delay = min(self.max_delay, self.base_delay * 2 ** (retry_state.attempt_number - 1))
+        return delay * (1 + self.jitter * self.rng.random())
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed → open → half-open → closed.
+
+    After ``failure_threshold`` consecutive provider-side failures calls fail
+    fast with :class:`CircuitOpenError` for ``reset_timeout`` seconds; then a
+    single probe is allowed and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str = "",
+        *,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise :class:`CircuitOpenError` unless a call may proceed."""
+
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._probe_in_flight = False
+
+    def record_failure(self, exc: BaseException) -> None:
+        """Count *exc* if it is a provider-side failure; ignore the rest."""
+
+        if classify_error(exc) not in PROVIDER_FAILURES:
+            with self._lock:
+                self._probe_in_flight = False
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.opened += 1
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._current_state(),
+                "consecutive_failures": self._failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+# ---------------------------------------------------------------------------
+# Hedged requests
+# ---------------------------------------------------------------------------
+
+
+class LatencyTracker:
+    """Sliding window of recent successful latencies for one key."""
+
+    def __init__(self, window: int = 200) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        with self._lock:
+            if not self._samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class Hedger:
+    """Issue a backup request once the primary outlives the recent p95."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        percentile: float = 95.0,
+        min_samples: int = 20,
+        max_hedge_ratio: float = 0.1,
+        min_delay: float = 0.05,
+    ) -> None:
+        self.enabled = enabled
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.min_delay = min_delay
+        self._trackers: Dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def tracker(self, key: str) -> LatencyTracker:
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if tracker is None:
+                tracker = self._trackers[key] = LatencyTracker()
+            return tracker
+
+    def observe(self, key: str, seconds: float) -> None:
+        self.tracker(key).observe(seconds)
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        """Seconds to wait before hedging *key*, or ``None`` to not hedge."""
+
+        if not self.enabled:
+            return None
+        tracker = self.tracker(key)
+        if len(tracker) < self.min_samples:
+            return None
+        with self._lock:
+            if self.hedged >= self.max_hedge_ratio * max(self.calls, 1):
+                return None
+        p = tracker.percentile(self.percentile)
+        return None if p is None else max(self.min_delay, p)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[T]]) -> T:
+        """Await ``factory()``, racing a second copy if the first is slow."""
+
+        with self._lock:
+            self.calls += 1
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return await factory()
+
+        primary = asyncio.ensure_future(factory())
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            self.hedged += 1
+        backup = asyncio.ensure_future(factory())
+        pending = {primary, backup}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return task.result()
+            # Both failed – surface the primary's error.
+            return primary.result()
+        finally:
+            for task in (primary, backup):
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            keys = list(self._trackers)
+            base = {
+                "enabled": self.enabled,
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedge_ratio": round(self.hedged / self.calls, 4) if self.calls else 0.0,
+            }
+        base["p95_seconds"] = {k: self.tracker(k).percentile(self.percentile) for k in keys}
+        return base
@@ -0,0 +1,297 @@
+"""essay_agent.llm.router
+
+Call-site model routing: cheap/fast model for lightweight calls.
+
+Every request used to go to the one configured model (``ESSAY_AGENT_MODEL``),
+including work that needs no frontier model – extracting profile facts,
+reformatting a reply, picking a tool, repairing JSON, autocompleting a
+sentence.  :class:`ModelRouter` maps :func:`~essay_agent.llm.telemetry.call_site`
+tags to a :class:`Route`; a call whose site matches and whose prompt fits the
+route's token limit is sent to the route's model instead of the caller's.
+
+Latency-sensitive routes carry a ``timeout``: if the routed model times out,
+is rate-limited or has its circuit open, :pymod:`essay_agent.llm_client`
+re-sends the call to the caller's original model, so routing can only save
+time, never cost a failed turn.
+
+Configuration
+-------------
+* ``ESSAY_AGENT_ROUTING=0`` disables routing.
+* ``ESSAY_AGENT_FAST_MODEL`` – model used by the default routes
+  (``gpt-4o-mini``).
+* ``ESSAY_AGENT_ROUTES`` – JSON object overriding / extending the table, e.g.
+  ``{"tool:*": "gpt-4o-mini", "json_repair": {"model": "gpt-4o-mini",
+  "max_prompt_tokens": 2000, "timeout": 5}}``; ``null`` removes a route.
+
+Offline harness
+---------------
+``python -m essay_agent.llm.router CASSETTE.jsonl`` replays a recorded
+cassette (see :pymod:`essay_agent.llm.cassette`) through the router and
+reports, per call site, how many calls would be re-routed and the resulting
+latency and per-model token deltas.  Latency of a re-routed call comes from a
+recording of the same prompt on the routed model when the cassette has one,
+otherwise from the models' recorded seconds-per-output-token ratio, falling
+back to ``--latency-ratio``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .resilience import CIRCUIT_OPEN, RATE_LIMIT, TIMEOUT, classify_error
+from .tokenizer import count_tokens
+
+# Error classes after which a routed call is retried on the caller's model.
+FALLBACK_ERRORS = frozenset({TIMEOUT, RATE_LIMIT, CIRCUIT_OPEN})
+
+
+@dataclass(frozen=True)
+class Route:
+    """Where calls from one call site go."""
+
+    model: str
+    # Prompts larger than this stay on the caller's model.
+    max_prompt_tokens: int = 4000
+    # Seconds before falling back to the caller's model (``None`` = no fallback).
+    timeout: Optional[float] = None
+
+
+def default_routes(fast_model: str) -> Dict[str, Route]:
+    """Lightweight classification / formatting call sites."""
+
+    return {
+        "context_extraction": Route(fast_model, max_prompt_tokens=4000, timeout=8.0),
+        "format_response": Route(fast_model, max_prompt_tokens=4000, timeout=8.0),
+        "tool_selection": Route(fast_model, max_prompt_tokens=6000, timeout=8.0),
+        "json_repair": Route(fast_model, max_prompt_tokens=4000, timeout=10.0),
+        "tool:smart_autocomplete": Route(fast_model, max_prompt_tokens=2000, timeout=3.0),
+    }
+
+
+def _parse_routes(raw: str, fast_model: str) -> Dict[str, Optional[Route]]:
+    out: Dict[str, Optional[Route]] = {}
+    for site, spec in json.loads(raw).items():
+        if spec is None:
+            out[site] = None
+        elif isinstance(spec, str):
+            out[site] = Route(spec)
+        else:
+            out[site] = Route(
+                spec.get("model", fast_model),
+                max_prompt_tokens=int(spec.get("max_prompt_tokens", 4000)),
+                timeout=spec.get("timeout"),
+            )
+    return out
+
+
+class ModelRouter:
+    """Pick the model for a call from its call-site tag and prompt size.
+
+    Site keys match exactly, or by prefix when they end in ``*``
+    (``"tool:*"``); the longest matching key wins.  *factory* builds the
+    client for ``(original_llm, route)`` and *routable* says which clients may
+    be swapped at all (offline fakes and replay cassettes are left alone).
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Dict[str, Route]] = None,
+        *,
+        enabled: bool = True,
+        factory: Optional[Callable[[Any, Route], Any]] = None,
+        routable: Optional[Callable[[Any], bool]] = None,
+    ) -> None:
+        self.routes: Dict[str, Route] = dict(routes or {})
+        self.enabled = enabled
+        self.factory = factory
+        self.routable = routable
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"routed": 0, "too_large": 0, "fallbacks": 0})
+
+    @classmethod
+    def from_env(cls, **kwargs: Any) -> "ModelRouter":
+        fast_model = os.getenv("ESSAY_AGENT_FAST_MODEL", "gpt-4o-mini")
+        routes: Dict[str, Optional[Route]] = dict(default_routes(fast_model))
+        raw = os.getenv("ESSAY_AGENT_ROUTES")
+        if raw:
+            routes.update(_parse_routes(raw, fast_model))
+        return cls(
+            {site: route for site, route in routes.items() if route is not None},
+            enabled=os.getenv("ESSAY_AGENT_ROUTING", "1") == "1",
+            **kwargs,
+        )
+
+    def _match(self, site: str) -> Optional[Route]:
+        route = self.routes.get(site)
+        if route is not None:
+            return route
+        prefixes = [key for key in self.routes if key.endswith("*") and site.startswith(key[:-1])]
+        return self.routes[max(prefixes, key=len)] if prefixes else None
+
+    def route(self, site: str, model: str, prompt_tokens: int) -> Optional[Route]:
+        """Return the route for a call, or ``None`` to keep *model*."""
+
+        if not self.enabled:
+            return None
+        route = self._match(site)
+        if route is None or route.model == model:
+            return None
+        with self._lock:
+            if prompt_tokens > route.max_prompt_tokens:
+                self._stats[site]["too_large"] += 1
+                return None
+            self._stats[site]["routed"] += 1
+        return route
+
+    def client_for(self, llm: Any, route: Route) -> Any:  # noqa: ANN401
+        return self.factory(llm, route) if self.factory is not None else llm
+
+    def can_route(self, llm: Any) -> bool:  # noqa: ANN401
+        return self.enabled and bool(self.routes) and (self.routable is None or self.routable(llm))
+
+    @staticmethod
+    def should_fall_back(route: Route, exc: BaseException) -> bool:
+        return route.timeout is not None and classify_error(exc) in FALLBACK_ERRORS
+
+    def record_fallback(self, site: str) -> None:
+        with self._lock:
+            self._stats[site]["fallbacks"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "routes": {site: route.model for site, route in sorted(self.routes.items())},
+                "sites": {site: dict(counts) for site, counts in sorted(self._stats.items())},
+            }
+
+
+# ---------------------------------------------------------------------------
+# Offline replay harness
+# ---------------------------------------------------------------------------
+
+
+def _tokens(entry: Dict[str, Any], fields: tuple, fallback_text: str) -> int:
+    usage = entry.get("usage") or {}
+    for field in fields:
+        if usage.get(field) is not None:
+            return int(usage[field])
+    return count_tokens(fallback_text, entry.get("model") or "gpt-4")
+
+
+_PROMPT_FIELDS = ("input_tokens", "prompt_tokens")
+_COMPLETION_FIELDS = ("output_tokens", "completion_tokens")
+
+
+def replay_report(
+    entries: Iterable[Dict[str, Any]],
+    router: ModelRouter,
+    *,
+    latency_ratio: float = 0.5,
+) -> Dict[str, Any]:
+    """Simulate *router* over recorded cassette *entries*.
+
+    Returns ``{"sites": {site: {...}}, "total": {...}}`` where each summary
+    holds call counts, recorded vs routed latency (seconds) and prompt /
+    completion tokens per model before and after routing.
+    """
+
+    entries = list(entries)
+    by_prompt: Dict[tuple, Dict[str, Any]] = {}
+    per_token: Dict[str, List[float]] = defaultdict(list)
+    for entry in entries:
+        by_prompt.setdefault((entry.get("model"), entry.get("prompt")), entry)
+        completion = _tokens(entry, _COMPLETION_FIELDS, entry.get("response", ""))
+        if completion:
+            per_token[entry.get("model")].append(float(entry.get("latency", 0.0)) / completion)
+    speed = {model: sum(v) / len(v) for model, v in per_token.items() if v}
+
+    def empty() -> Dict[str, Any]:
+        return {
+            "calls": 0,
+            "routed": 0,
+            "latency_before": 0.0,
+            "latency_after": 0.0,
+            "tokens_before": defaultdict(int),
+            "tokens_after": defaultdict(int),
+        }
+
+    sites: Dict[str, Dict[str, Any]] = defaultdict(empty)
+    total = empty()
+    for entry in entries:
+        site = entry.get("site") or "unlabelled"
+        model = entry.get("model") or "unknown"
+        latency = float(entry.get("latency", 0.0))
+        prompt_tokens = _tokens(entry, _PROMPT_FIELDS, entry.get("prompt", ""))
+        tokens = prompt_tokens + _tokens(entry, _COMPLETION_FIELDS, entry.get("response", ""))
+
+        route = router.route(site, model, prompt_tokens)
+        target, new_latency = model, latency
+        if route is not None:
+            target = route.model
+            twin = by_prompt.get((route.model, entry.get("prompt")))
+            if twin is not None:
+                new_latency = float(twin.get("latency", 0.0))
+            elif speed.get(model) and speed.get(route.model):
+                new_latency = latency * speed[route.model] / speed[model]
+            else:
+                new_latency = latency * latency_ratio
+
+        for summary in (sites[site], total):
+            summary["calls"] += 1
+            summary["routed"] += route is not None
+            summary["latency_before"] += latency
+            summary["latency_after"] += new_latency
+            summary["tokens_before"][model] += tokens
+            summary["tokens_after"][target] += tokens
+
+    def finish(summary: Dict[str, Any]) -> Dict[str, Any]:
+        models = set(summary["tokens_before"]) | set(summary["tokens_after"])
+        return {
+            "calls": summary["calls"],
+            "routed": summary["routed"],
+            "latency_before": round(summary["latency_before"], 6),
+            "latency_after": round(summary["latency_after"], 6),
+            "latency_delta": round(summary["latency_after"] - summary["latency_before"], 6),
+            "token_delta": {
+                model: summary["tokens_after"].get(model, 0) - summary["tokens_before"].get(model, 0)
+                for model in sorted(models)
+            },
+        }
+
+    return {"sites": {site: finish(s) for site, s in sorted(sites.items())}, "total": finish(total)}
+
+
+def _load_entries(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover – CLI wrapper
+    parser = argparse.ArgumentParser(description="Replay a recorded cassette through the model router.")
+    parser.add_argument("cassette", help="JSONL cassette recorded with ESSAY_AGENT_CASSETTE_MODE=record")
+    parser.add_argument("--latency-ratio", type=float, default=0.5,
+                        help="Routed/original latency ratio when the cassette cannot tell (default 0.5)")
+    parser.add_argument("--json", action="store_true", help="Print the raw report as JSON")
+    args = parser.parse_args(argv)
+
+    router = ModelRouter.from_env()
+    router.enabled = True
+    report = replay_report(_load_entries(args.cassette), router, latency_ratio=args.latency_ratio)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'site':<28} {'calls':>6} {'routed':>6} {'latency s':>20}  token delta")
+    for site, row in list(report["sites"].items()) + [("TOTAL", report["total"])]:
+        latency = f"{row['latency_before']:.2f} -> {row['latency_after']:.2f}"
+        deltas = ", ".join(f"{m}: {d:+d}" for m, d in row["token_delta"].items() if d)
+        print(f"{site:<28} {row['calls']:>6} {row['routed']:>6} {latency:>20}  {deltas or '-'}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,149 @@
+"""essay_agent.llm.single_flight
+
+Coalesce concurrent identical LLM requests into one upstream call.
+
+The response cache only helps once a result has landed.  When a user
+double-submits, ``/chat`` and ``/chat/unified`` race, or several evaluation
+tasks render the same prompt, identical requests are in flight at the same
+time and each one pays for its own completion.  :class:`SingleFlight` lets the
+first caller (the *leader*) make the request while later callers with the
+same key wait for, and share, its result or exception.
+
+Both blocking threads and ``asyncio`` tasks are supported; the two never
+share a flight because a thread cannot await a future owned by an event loop.
+An async flight whose waiters have all been cancelled is cancelled too, so an
+abandoned request stops spending tokens and rate-limiter slots.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[BaseException] = None
+    waiters: int = 0
+
+
+@dataclass
+class _AsyncCall:
+    task: "asyncio.Task[Any]"
+    waiters: int = 0
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sync_calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, _AsyncCall] = {}
+        self.calls = 0
+        self.upstream = 0
+        self.coalesced = 0
+
+    # ------------------------------------------------------------------
+    # Blocking callers
+    # ------------------------------------------------------------------
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run *fn* once per concurrent *key*; followers block for its result."""
+
+        with self._lock:
+            self.calls += 1
+            call = self._sync_calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._sync_calls[key] = _Call()
+                self.upstream += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:  # noqa: BLE001 – re-raised to every waiter
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._sync_calls.pop(key, None)
+            call.done.set()
+
+    # ------------------------------------------------------------------
+    # Async callers
+    # ------------------------------------------------------------------
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Async counterpart of :meth:`do`.
+
+        The upstream coroutine runs as its own task and every caller awaits
+        it through :func:`asyncio.shield`, so cancelling one waiter (e.g. a
+        client disconnect) does not cancel the request the others share.
+        When the last waiter leaves before it finishes, the task is cancelled.
+        """
+
+        loop = asyncio.get_running_loop()
+        scoped = (id(loop), key)
+        with self._lock:
+            self.calls += 1
+            call = self._async_calls.get(scoped)
+            if call is not None:
+                self.coalesced += 1
+            else:
+                call = self._async_calls[scoped] = _AsyncCall(loop.create_task(self._run(scoped, fn)))
+                self.upstream += 1
+            call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = call.waiters == 0 and not call.task.done()
+                if abandoned and self._async_calls.get(scoped) is call:
+                    # Later callers with this key start a fresh flight
+                    del self._async_calls[scoped]
+            if abandoned:
+                call.task.cancel()
+
+    async def _run(self, scoped: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            return await fn()
+        finally:
+            with self._lock:
+                call = self._async_calls.get(scoped)
+                if call is not None and call.task is asyncio.current_task():
+                    del self._async_calls[scoped]
+
+    # ------------------------------------------------------------------
+    # Stats
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "upstream_calls": self.upstream,
+                "coalesced_calls": self.coalesced,
+                "in_flight": len(self._sync_calls) + len(self._async_calls),
+                "saved_ratio": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls = self.upstream = self.coalesced = 0
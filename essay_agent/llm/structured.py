@@ -0,0 +1,260 @@
+"""essay_agent.llm.structured
+
+Provider structured output (JSON mode / JSON schema) for JSON-producing calls.
+
+The reasoning prompt and the main tool prompts ask for JSON in free text and
+the code behind them (``ReasoningEngine._parse_reasoning_response``,
+:func:`essay_agent.response_parser.safe_parse`,
+:func:`essay_agent.utils.json_repair.fix`) copes when the model wraps it in
+prose, fences it, drops a key or truncates it – in the worst case with an
+extra LLM repair call that doubles the latency of the turn.
+
+:func:`response_format` turns the schema a caller already has – a Pydantic
+model or a JSON-schema ``dict`` – into an OpenAI ``response_format`` so the
+provider constrains decoding instead.  Callers pass ``structured=<schema>`` to
+:func:`essay_agent.llm_client.call_llm` / ``acall_llm`` / ``chat``; clients
+that cannot take a ``response_format`` (offline fakes, test doubles) are
+called exactly as before.
+
+Every structured call records whether its raw text parsed and validated on
+the first try, and every LLM repair pass is counted, so parse-failure and
+repair-call rates can be compared per call site (:func:`parse_stats`).
+
+Configuration
+-------------
+``ESSAY_AGENT_STRUCTURED_OUTPUT`` – ``schema`` (default; ``json_schema``
+response format, non-strict), ``json`` (``json_object`` mode only) or ``off``.
+
+Offline harness
+---------------
+``python -m essay_agent.llm.structured BEFORE.jsonl [AFTER.jsonl]`` reads
+recorded cassettes (see :pymod:`essay_agent.llm.cassette`) and reports, per
+call site, how many JSON responses failed to parse and how many repair calls
+were made – run it on a cassette recorded with ``ESSAY_AGENT_STRUCTURED_OUTPUT=off``
+and one recorded with the default to see the difference.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from .telemetry import current_call_site
+
+SCHEMA = "schema"
+JSON = "json"
+OFF = "off"
+MODES = (SCHEMA, JSON, OFF)
+
+REPAIR_SITE = "json_repair"
+
+_FENCE_RE = re.compile(r"^```(?:[a-zA-Z0-9]+)?\s*(.*?)\s*```$", re.DOTALL)
+
+
+def structured_mode() -> str:
+    mode = os.getenv("ESSAY_AGENT_STRUCTURED_OUTPUT", SCHEMA).strip().lower()
+    return mode if mode in MODES else SCHEMA
+
+
+@lru_cache(maxsize=128)
+def _model_schema(model: type) -> Dict[str, Any]:
+    return model.model_json_schema()
+
+
+def _schema_of(schema: Any) -> Dict[str, Any]:  # noqa: ANN401
+    if isinstance(schema, dict):
+        return schema
+    return _model_schema(schema)
+
+
+def _schema_name(schema: Any) -> str:  # noqa: ANN401
+    name = schema.get("title", "response") if isinstance(schema, dict) else schema.__name__
+    # OpenAI allows [a-zA-Z0-9_-]{1,64}
+    return re.sub(r"[^a-zA-Z0-9_-]", "_", str(name))[:64] or "response"
+
+
+def response_format(schema: Any, mode: Optional[str] = None) -> Optional[Dict[str, Any]]:  # noqa: ANN401
+    """OpenAI ``response_format`` for *schema* (Pydantic model class or JSON-schema dict).
+
+    Returns ``None`` when structured output is switched off.
+    """
+
+    mode = mode or structured_mode()
+    if mode == OFF:
+        return None
+    if mode == JSON or schema is None:
+        return {"type": "json_object"}
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": _schema_name(schema), "schema": _schema_of(schema), "strict": False},
+    }
+
+
+def _loads(text: str) -> Any:  # noqa: ANN401
+    raw = text.strip() if isinstance(text, str) else str(text)
+    match = _FENCE_RE.match(raw)
+    if match:
+        raw = match.group(1)
+    return json.loads(raw)
+
+
+def parses(text: str, schema: Any = None) -> bool:  # noqa: ANN401
+    """Whether *text* is, as returned, a JSON object valid for *schema*."""
+
+    try:
+        data = _loads(text)
+    except (TypeError, ValueError):
+        return False
+    if not isinstance(data, dict):
+        return False
+    if schema is None:
+        return True
+    if isinstance(schema, dict):
+        return all(key in data for key in schema.get("required", ()))
+    try:
+        schema.model_validate(data)
+    except Exception:  # noqa: BLE001 – pydantic.ValidationError and friends
+        return False
+    return True
+
+
+class ParseStats:
+    """Per-call-site counts of structured responses, parse failures and repair calls."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "failures": 0, "repairs": 0})
+
+    def record(self, text: str, schema: Any = None, *, site: Optional[str] = None) -> bool:  # noqa: ANN401
+        ok = parses(text, schema)
+        with self._lock:
+            row = self._sites[site or current_call_site()]
+            row["calls"] += 1
+            row["failures"] += not ok
+        return ok
+
+    def record_repair(self, site: Optional[str] = None) -> None:
+        with self._lock:
+            self._sites[site or current_call_site()]["repairs"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sites = {site: dict(row) for site, row in sorted(self._sites.items())}
+        return {
+            "mode": structured_mode(),
+            "sites": {site: _rates(row) for site, row in sites.items()},
+            "total": _rates(_sum(sites.values())),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sites.clear()
+
+
+def _sum(rows: Iterable[Dict[str, int]]) -> Dict[str, int]:
+    total = {"calls": 0, "failures": 0, "repairs": 0}
+    for row in rows:
+        for key in total:
+            total[key] += row.get(key, 0)
+    return total
+
+
+def _rates(row: Dict[str, int]) -> Dict[str, Any]:
+    calls = row["calls"]
+    return {
+        **row,
+        "failure_rate": round(row["failures"] / calls, 4) if calls else 0.0,
+        "repair_rate": round(row["repairs"] / calls, 4) if calls else 0.0,
+    }
+
+
+_STATS = ParseStats()
+
+
+def record_parse(text: str, schema: Any = None, *, site: Optional[str] = None) -> bool:  # noqa: ANN401
+    """Record whether a structured response parsed first time; returns that verdict."""
+
+    return _STATS.record(text, schema, site=site)
+
+
+def record_repair(site: Optional[str] = None) -> None:
+    """Count one LLM repair pass against *site* (default: current call site)."""
+
+    _STATS.record_repair(site)
+
+
+def parse_stats() -> Dict[str, Any]:
+    return _STATS.stats()
+
+
+# ---------------------------------------------------------------------------
+# Cassette report
+# ---------------------------------------------------------------------------
+
+
+def _expects_json(entry: Dict[str, Any]) -> bool:
+    kwargs = entry.get("kwargs") or {}
+    if kwargs.get("response_format"):
+        return True
+    # Recordings made before structured output: the prompt asks for JSON.
+    return "json" in str(entry.get("prompt", "")).lower()
+
+
+def parse_report(entries: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Parse-failure and repair-call counts over recorded cassette *entries*.
+
+    A call counts when it asked for a response format or its prompt asks for
+    JSON; it fails when its recorded response is not a JSON object.  Repair calls are the recordings made from the
+    ``json_repair`` site.
+    """
+
+    sites: Dict[str, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "failures": 0, "repairs": 0})
+    repairs = 0
+    for entry in entries:
+        site = entry.get("site") or "unlabelled"
+        if site == REPAIR_SITE:
+            repairs += 1
+            continue
+        if not _expects_json(entry):
+            continue
+        sites[site]["calls"] += 1
+        sites[site]["failures"] += not parses(entry.get("response", ""))
+    total = _sum(sites.values())
+    total["repairs"] = repairs
+    return {"sites": {s: _rates(r) for s, r in sorted(sites.items())}, "total": _rates(total)}
+
+
+def _load_entries(path: str) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover – CLI wrapper
+    parser = argparse.ArgumentParser(description="Parse-failure and repair-call rates of recorded cassettes.")
+    parser.add_argument("cassettes", nargs="+", help="JSONL cassettes, e.g. before.jsonl after.jsonl")
+    parser.add_argument("--json", action="store_true", help="Print the raw reports as JSON")
+    args = parser.parse_args(argv)
+
+    reports = {path: parse_report(_load_entries(path)) for path in args.cassettes}
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    for path, report in reports.items():
+        print(f"== {path}")
+        print(f"{'site':<28} {'calls':>6} {'failures':>9} {'fail rate':>10}")
+        for site, row in report["sites"].items():
+            print(f"{site:<28} {row['calls']:>6} {row['failures']:>9} {row['failure_rate']:>10.2%}")
+        total = report["total"]
+        print(
+            f"{'TOTAL':<28} {total['calls']:>6} {total['failures']:>9} {total['failure_rate']:>10.2%}"
+            f"   repair calls: {total['repairs']} ({total['repair_rate']:.2%})"
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,444 @@
+"""essay_agent.llm.telemetry
+
+Per-call-site latency and token telemetry for LLM requests.
+
+``track_cost`` only reports totals for a block, so it cannot say whether the
+reasoning call, context extraction, response formatting, JSON repair or a
+tool is eating a turn's latency and tokens.  Every provider round-trip made
+through :pymod:`essay_agent.llm_client` is now recorded with:
+
+* ``site`` – the caller tag from :func:`call_site` (or ``caller=`` on
+  ``call_llm``/``acall_llm``), ``"unlabelled"`` otherwise;
+* ``model`` – the model the request was sent to;
+* prompt / completion tokens (provider usage when reported, otherwise the
+  shared tokenizer), rate-limiter queue wait, upstream latency, cache hits,
+  retries and errors by class;
+* prompt tokens the provider served from its prefix cache, giving the
+  cached-prefix ratio that the static-first prompt layouts aim to raise.
+
+Rate-limiter queue wait is additionally broken down by priority lane
+(``interactive`` / ``background`` / ``batch``), alongside the limiter's
+current per-lane queue depth.
+
+:func:`token_meter` additionally tallies the calls made inside one block
+(following its tasks), e.g. the tokens a cancelled speculative tool run
+spent.
+
+Aggregation is in-process: a handful of counters and two fixed-bucket
+histograms per ``(site, model)`` pair, updated under one lock – a few
+microseconds per request, cheap enough to leave on in production
+(``ESSAY_AGENT_TELEMETRY=0`` turns it off).  :meth:`Telemetry.render_prometheus`
+produces the Prometheus text exposition format served at ``/metrics``.
+
+>>> with call_site("reasoning"):
+...     await acall_llm(llm, prompt)
+>>> get_telemetry().stats()["reasoning"]["gpt-4o"]["calls"]
+1
+"""
+from __future__ import annotations
+
+import asyncio
+import bisect
+import contextlib
+import contextvars
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .priority import current_priority
+from .resilience import classify_error
+from .tokenizer import count_tokens
+
+UNLABELLED = "unlabelled"
+
+# Seconds; chosen around typical chat-completion latencies (sub-second cache
+# hits up to multi-minute long generations).
+LATENCY_BUCKETS: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0)
+QUEUE_WAIT_BUCKETS: Tuple[float, ...] = (0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_SITE: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("essay_agent_llm_call_site", default=None)
+# The record of the round-trip in progress, so the response cache can flag a
+# hit.  A mutable object (not a flag) so the mark survives the context copy
+# LangChain makes when it runs cache lookups in an executor.
+_CURRENT: contextvars.ContextVar[Optional["CallRecord"]] = contextvars.ContextVar(
+    "essay_agent_llm_call_record", default=None
+)
+_METER: contextvars.ContextVar[Optional["TokenMeter"]] = contextvars.ContextVar(
+    "essay_agent_llm_token_meter", default=None
+)
+
+
+@contextlib.contextmanager
+def call_site(tag: str) -> Iterator[None]:
+    """Label LLM calls made inside the block with *tag*.
+
+    Tags nest; the innermost wins.  Like :func:`cache_policy` this is a
+    context variable, so it follows ``await`` chains, tasks and
+    ``asyncio.to_thread`` workers.
+    """
+
+    token = _SITE.set(tag)
+    try:
+        yield
+    finally:
+        _SITE.reset(token)
+
+
+def current_call_site() -> str:
+    """Return the active :func:`call_site` tag (``"unlabelled"`` if none)."""
+
+    return _SITE.get() or UNLABELLED
+
+
+class TokenMeter:
+    """Calls and tokens spent inside a :func:`token_meter` block."""
+
+    __slots__ = ("calls", "prompt_tokens", "completion_tokens")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+@contextlib.contextmanager
+def token_meter() -> Iterator[TokenMeter]:
+    """Tally LLM calls made inside the block (and tasks it starts).
+
+    Unlike the per-site series this isolates one unit of work from
+    concurrent calls at the same site.  Meters nest; only the innermost
+    counts a call.
+    """
+
+    meter = TokenMeter()
+    token = _METER.set(meter)
+    try:
+        yield meter
+    finally:
+        _METER.reset(token)
+
+
+def mark_cache_hit() -> None:
+    """Flag the round-trip in progress as served from the response cache."""
+
+    record = _CURRENT.get()
+    if record is not None:
+        record.cache_hit = True
+
+
+class Histogram:
+    """Cumulative fixed-bucket histogram (Prometheus semantics)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        running = 0
+        out = []
+        for bound, n in zip((*map(_fmt, self.bounds), "+Inf"), self.counts):
+            running += n
+            out.append((bound, running))
+        return out
+
+    def quantile(self, q: float) -> float:
+        """Upper bucket bound containing the *q* quantile (0 if empty)."""
+
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        running = 0
+        for bound, n in zip((*self.bounds, float("inf")), self.counts):
+            running += n
+            if running >= rank:
+                return bound
+        return float("inf")
+
+
+class _Series:
+    __slots__ = (
+        "calls", "errors", "cache_hits", "retries", "prompt_tokens", "cached_prompt_tokens",
+        "completion_tokens", "latency", "queue_wait", "error_classes",
+    )
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queue_wait = Histogram(QUEUE_WAIT_BUCKETS)
+        self.error_classes: Dict[str, int] = {}
+
+
+class CallRecord:
+    """Mutable measurements of one round-trip, filled in by the caller."""
+
+    __slots__ = ("site", "model", "prompt", "lane", "queue_wait", "cache_hit", "completion", "usage")
+
+    def __init__(self, site: str, model: str, prompt: str, lane: Optional[str] = None) -> None:
+        self.site = site
+        self.model = model
+        self.prompt = prompt
+        self.lane = lane or current_priority()
+        self.queue_wait = 0.0
+        self.cache_hit = False
+        self.completion = ""
+        self.usage: Optional[Dict[str, Any]] = None
+
+    def set_response(self, response: Any) -> None:  # noqa: ANN401
+        """Capture provider token usage from a LangChain message, if present."""
+
+        usage = getattr(response, "usage_metadata", None)
+        if isinstance(usage, dict):
+            self.usage = usage
+            if "cache_read" not in (usage.get("input_token_details") or {}):
+                # Older langchain-openai only exposes the raw OpenAI usage block
+                raw = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+                cached = (raw.get("prompt_tokens_details") or {}).get("cached_tokens")
+                if cached is not None:
+                    self.usage = {**usage, "input_token_details": {"cache_read": cached}}
+
+
+class Telemetry:
+    """In-process aggregation of LLM call measurements by ``(site, model)``."""
+
+    def __init__(self, *, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._lane_wait: Dict[str, Histogram] = {}
+
+    def _get(self, site: str, model: str) -> _Series:
+        series = self._series.get((site, model))
+        if series is None:
+            series = self._series[(site, model)] = _Series()
+        return series
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def track(
+        self,
+        model: str,
+        prompt: str,
+        *,
+        site: Optional[str] = None,
+        lane: Optional[str] = None,
+        bind: bool = True,
+    ) -> Iterator[CallRecord]:
+        """Measure one round-trip; the block fills in the yielded record.
+
+        Upstream latency is the block's wall time minus ``record.queue_wait``.
+        ``bind=False`` skips publishing the record for :func:`mark_cache_hit`
+        (needed in async generators, which may resume in another context).
+        """
+
+        record = CallRecord(site or current_call_site(), model, prompt, lane)
+        if not self.enabled:
+            yield record
+            return
+        token = _CURRENT.set(record) if bind else None
+        start = time.perf_counter()
+        error: Optional[BaseException] = None
+        try:
+            yield record
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            if token is not None:
+                _CURRENT.reset(token)
+            self.observe(record, time.perf_counter() - start - record.queue_wait, error)
+
+    def observe(self, record: CallRecord, latency: float, error: Optional[BaseException] = None) -> None:
+        usage = record.usage or {}
+        prompt_tokens = usage.get("input_tokens")
+        completion_tokens = usage.get("output_tokens")
+        if prompt_tokens is None:
+            prompt_tokens = count_tokens(record.prompt, record.model)
+        if completion_tokens is None:
+            completion_tokens = count_tokens(record.completion, record.model) if record.completion else 0
+        cached_tokens = (usage.get("input_token_details") or {}).get("cache_read") or 0
+        if error is None:
+            kind = None
+        elif isinstance(error, (asyncio.CancelledError, GeneratorExit)):  # lost hedge, abandoned stream
+            kind = "cancelled"
+        else:
+            kind = classify_error(error)
+
+        meter = _METER.get()
+        if meter is not None:
+            meter.calls += 1
+            meter.prompt_tokens += int(prompt_tokens)
+            meter.completion_tokens += int(completion_tokens)
+
+        with self._lock:
+            series = self._get(record.site, record.model)
+            series.calls += 1
+            series.prompt_tokens += int(prompt_tokens)
+            series.cached_prompt_tokens += int(cached_tokens)
+            series.completion_tokens += int(completion_tokens)
+            series.latency.observe(max(latency, 0.0))
+            series.queue_wait.observe(record.queue_wait)
+            lane_wait = self._lane_wait.get(record.lane)
+            if lane_wait is None:
+                lane_wait = self._lane_wait[record.lane] = Histogram(QUEUE_WAIT_BUCKETS)
+            lane_wait.observe(record.queue_wait)
+            if record.cache_hit:
+                series.cache_hits += 1
+            if kind is not None:
+                series.errors += 1
+                series.error_classes[kind] = series.error_classes.get(kind, 0) + 1
+
+    def record_retry(self, model: str, *, site: Optional[str] = None) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._get(site or current_call_site(), model).retries += 1
+
+    # ------------------------------------------------------------------
+    # Export
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Nested ``{site: {model: {...}}}`` summary with approximate p50/p95."""
+
+        out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        with self._lock:
+            for (site, model), s in sorted(self._series.items()):
+                out.setdefault(site, {})[model] = {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "error_classes": dict(s.error_classes),
+                    "cache_hits": s.cache_hits,
+                    "retries": s.retries,
+                    "prompt_tokens": s.prompt_tokens,
+                    "cached_prompt_tokens": s.cached_prompt_tokens,
+                    "cached_prefix_ratio": round(s.cached_prompt_tokens / s.prompt_tokens, 4) if s.prompt_tokens else 0.0,
+                    "completion_tokens": s.completion_tokens,
+                    "latency_seconds_sum": round(s.latency.sum, 6),
+                    "latency_p50": s.latency.quantile(0.5),
+                    "latency_p95": s.latency.quantile(0.95),
+                    "queue_wait_seconds_sum": round(s.queue_wait.sum, 6),
+                }
+        return out
+
+    def lane_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Rate-limiter queue wait per priority lane."""
+
+        with self._lock:
+            return {
+                lane: {
+                    "calls": h.count,
+                    "queue_wait_seconds_sum": round(h.sum, 6),
+                    "queue_wait_p50": h.quantile(0.5),
+                    "queue_wait_p95": h.quantile(0.95),
+                }
+                for lane, h in sorted(self._lane_wait.items())
+            }
+
+    def render_prometheus(self, prefix: str = "essay_agent_llm", queue_depths: Optional[Dict[str, int]] = None) -> str:
+        """Return all series in the Prometheus text exposition format (0.0.4).
+
+        *queue_depths* (``{lane: waiting}``, e.g. from
+        :meth:`RateLimiter.queue_depths`) is exported as a gauge.
+        """
+
+        with self._lock:
+            lanes = [(lane, h.cumulative(), h.sum, h.count) for lane, h in sorted(self._lane_wait.items())]
+            items = sorted(self._series.items())
+            counters = {
+                "requests_total": ("LLM round-trips.", [(k, s.calls) for k, s in items]),
+                "errors_total": ("LLM round-trips that raised.", [(k, s.errors) for k, s in items]),
+                "cache_hits_total": ("Round-trips served from the response cache.", [(k, s.cache_hits) for k, s in items]),
+                "retries_total": ("Retries scheduled by the llm_client retry policy.", [(k, s.retries) for k, s in items]),
+                "prompt_tokens_total": ("Prompt tokens sent.", [(k, s.prompt_tokens) for k, s in items]),
+                "cached_prompt_tokens_total": ("Prompt tokens served from the provider's prefix cache.", [(k, s.cached_prompt_tokens) for k, s in items]),
+                "completion_tokens_total": ("Completion tokens received.", [(k, s.completion_tokens) for k, s in items]),
+            }
+            histograms = {
+                "latency_seconds": ("Upstream latency excluding queue wait.", [(k, s.latency.cumulative(), s.latency.sum, s.latency.count) for k, s in items]),
+                "queue_wait_seconds": ("Time spent waiting for the rate limiter.", [(k, s.queue_wait.cumulative(), s.queue_wait.sum, s.queue_wait.count) for k, s in items]),
+            }
+
+        lines: List[str] = []
+        for name, (help_text, rows) in counters.items():
+            metric = f"{prefix}_{name}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            lines += [f"{metric}{{{_labels(site, model)}}} {value}" for (site, model), value in rows]
+        for name, (help_text, rows) in histograms.items():
+            metric = f"{prefix}_{name}"
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for (site, model), buckets, total, count in rows:
+                labels = _labels(site, model)
+                lines += [f'{metric}_bucket{{{labels},le="{le}"}} {n}' for le, n in buckets]
+                lines.append(f"{metric}_sum{{{labels}}} {_fmt(total)}")
+                lines.append(f"{metric}_count{{{labels}}} {count}")
+        metric = f"{prefix}_lane_queue_wait_seconds"
+        lines += [f"# HELP {metric} Time spent waiting for the rate limiter, by priority lane.", f"# TYPE {metric} histogram"]
+        for lane, buckets, total, count in lanes:
+            labels = f'lane="{_escape(lane)}"'
+            lines += [f'{metric}_bucket{{{labels},le="{le}"}} {n}' for le, n in buckets]
+            lines.append(f"{metric}_sum{{{labels}}} {_fmt(total)}")
+            lines.append(f"{metric}_count{{{labels}}} {count}")
+        if queue_depths is not None:
+            metric = f"{prefix}_lane_queue_depth"
+            lines += [f"# HELP {metric} Calls waiting for rate-limiter quota, by priority lane.", f"# TYPE {metric} gauge"]
+            lines += [f'{metric}{{lane="{_escape(lane)}"}} {depth}' for lane, depth in sorted(queue_depths.items())]
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self._lane_wait.clear()
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(site: str, model: str) -> str:
+    return f'site="{_escape(site)}",model="{_escape(model)}"'
+
+
+_TELEMETRY = Telemetry(enabled=os.getenv("ESSAY_AGENT_TELEMETRY", "1") == "1")
+
+
+def get_telemetry() -> Telemetry:
+    """Return the process-wide :class:`Telemetry` recorder."""
+
+    return _TELEMETRY
+
+
+def track_llm_call(model: str, prompt: str, *, site: Optional[str] = None):  # noqa: ANN201
+    """Record a provider call made outside :pymod:`essay_agent.llm_client`.
+
+    >>> with track_llm_call(model, prompt, site="reasoning") as call:
+    ...     call.completion = await llm.apredict(prompt)
+    """
+
+    return _TELEMETRY.track(model, prompt, site=site)
@@ -0,0 +1,240 @@
+"""essay_agent.llm.tokenizer
+
+One process-wide tokenizer for every token count in the codebase.
+
+Token counting used to happen in four places with four strategies –
+``llm_client.count_tokens`` resolved an encoding on every call,
+``ContextRetriever`` and ``ContextWindowManager`` each built their own
+encoder, and ``PromptBuilder.optimize_for_tokens`` guessed ``len / 4``.  The
+same system prompt and profile blocks were re-encoded several times per turn,
+and without network access (tiktoken downloads BPE files on first use) every
+call paid for a failed download before falling back.
+
+:class:`Tokenizer` resolves each model's encoding once, remembers load
+failures (falling back to the ``len / 4`` heuristic), memoizes counts for
+repeated strings in a bounded LRU, and batches misses through
+``encode_ordinary_batch``.
+
+>>> count_tokens(system_prompt, model="gpt-4o")  # encoded once, then memoized
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_ENCODING = "cl100k_base"
+CHARS_PER_TOKEN = 4
+
+
+def _load_encoding(name: str) -> Any:  # noqa: ANN401
+    import tiktoken
+
+    return tiktoken.get_encoding(name)
+
+
+def _encoding_name_for_model(model: str) -> str:
+    try:
+        from tiktoken.model import encoding_name_for_model
+
+        return encoding_name_for_model(model)
+    except Exception:  # noqa: BLE001 – unknown model / tiktoken missing
+        return FALLBACK_ENCODING
+
+
+def _as_text(value: Any) -> str:  # noqa: ANN401
+    """Flatten chat-message lists (``[{"role": …, "content": …}]``) to text."""
+
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        return "\n".join(
+            str(item.get("content", "")) if isinstance(item, dict) else str(getattr(item, "content", item))
+            for item in value
+        )
+    return str(value)
+
+
+class Tokenizer:
+    """Cached token counting shared by every caller in the process.
+
+    Counts for strings up to ``memo_max_chars`` are memoized (keyed by
+    encoding, so models sharing an encoding share entries); longer texts are
+    counted directly so the memo never pins large essays in memory.
+    """
+
+    def __init__(
+        self,
+        *,
+        memo_size: int = 8192,
+        memo_max_chars: int = 16_384,
+        loader: Callable[[str], Any] = _load_encoding,
+    ) -> None:
+        self.memo_size = memo_size
+        self.memo_max_chars = memo_max_chars
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._model_names: Dict[str, str] = {}
+        self._encodings: Dict[str, Any] = {}
+        self._memo: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.encoded_chars = 0
+
+    # ------------------------------------------------------------------
+    # Encodings
+    # ------------------------------------------------------------------
+
+    def encoding_name(self, model: str) -> str:
+        name = self._model_names.get(model)
+        if name is None:
+            name = self._model_names[model] = _encoding_name_for_model(model)
+        return name
+
+    def encoding(self, model: str = "gpt-4") -> Any:  # noqa: ANN401
+        """Return the encoding for *model*, or ``None`` if it cannot be loaded."""
+
+        name = self.encoding_name(model)
+        if name in self._encodings:
+            return self._encodings[name]
+        with self._lock:
+            if name not in self._encodings:
+                try:
+                    self._encodings[name] = self._loader(name)
+                except Exception as exc:  # noqa: BLE001 – offline / missing BPE file
+                    logger.warning("Tokenizer %s unavailable (%s); estimating %d chars/token", name, exc, CHARS_PER_TOKEN)
+                    self._encodings[name] = None
+        return self._encodings[name]
+
+    # ------------------------------------------------------------------
+    # Counting
+    # ------------------------------------------------------------------
+
+    def _encode_count(self, encoding: Any, text: str) -> int:  # noqa: ANN401
+        self.encoded_chars += len(text)
+        if encoding is None:
+            return len(text) // CHARS_PER_TOKEN
+        return len(encoding.encode_ordinary(text))
+
+    def _memo_get(self, key: Tuple[str, str]) -> Optional[int]:
+        with self._lock:
+            value = self._memo.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._memo.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def _memo_put(self, key: Tuple[str, str], value: int) -> None:
+        with self._lock:
+            self._memo[key] = value
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+    def count(self, text: str, model: str = "gpt-4") -> int:
+        """Number of tokens in *text* under *model*'s encoding."""
+
+        if not text:
+            return 0
+        text = _as_text(text)
+        encoding = self.encoding(model)
+        if len(text) > self.memo_max_chars:
+            return self._encode_count(encoding, text)
+        key = (self.encoding_name(model), text)
+        cached = self._memo_get(key)
+        if cached is not None:
+            return cached
+        value = self._encode_count(encoding, text)
+        self._memo_put(key, value)
+        return value
+
+    def count_many(self, texts: Sequence[str], model: str = "gpt-4") -> List[int]:
+        """Count several texts at once, encoding memo misses in one batch."""
+
+        encoding = self.encoding(model)
+        name = self.encoding_name(model)
+        texts = [_as_text(t) for t in texts]
+        counts: List[Optional[int]] = [None] * len(texts)
+        pending: List[int] = []
+        for i, text in enumerate(texts):
+            if not text:
+                counts[i] = 0
+            elif len(text) <= self.memo_max_chars and (cached := self._memo_get((name, text))) is not None:
+                counts[i] = cached
+            else:
+                pending.append(i)
+
+        if pending:
+            batch = [texts[i] for i in pending]
+            self.encoded_chars += sum(len(t) for t in batch)
+            if encoding is None:
+                values = [len(t) // CHARS_PER_TOKEN for t in batch]
+            else:
+                values = [len(tokens) for tokens in encoding.encode_ordinary_batch(batch)]
+            for i, value in zip(pending, values):
+                counts[i] = value
+                if len(texts[i]) <= self.memo_max_chars:
+                    self._memo_put((name, texts[i]), value)
+        return [int(c or 0) for c in counts]
+
+    def truncate(self, text: str, max_tokens: int, model: str = "gpt-4") -> str:
+        """Return the longest prefix of *text* within *max_tokens* tokens."""
+
+        if max_tokens <= 0:
+            return ""
+        encoding = self.encoding(model)
+        if encoding is None:
+            return text[: max_tokens * CHARS_PER_TOKEN]
+        tokens = encoding.encode_ordinary(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens])
+
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "encodings": {k: v is not None for k, v in self._encodings.items()},
+                "memo_entries": len(self._memo),
+                "memo_size": self.memo_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "encoded_chars": self.encoded_chars,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+            self.hits = self.misses = self.encoded_chars = 0
+
+
+_TOKENIZER = Tokenizer(memo_size=int(os.getenv("ESSAY_AGENT_TOKEN_MEMO_SIZE", "8192")))
+
+
+def get_tokenizer() -> Tokenizer:
+    """Return the process-wide :class:`Tokenizer`."""
+
+    return _TOKENIZER
+
+
+def count_tokens(text: str, model: str = "gpt-4") -> int:
+    return _TOKENIZER.count(text, model)
+
+
+def count_tokens_batch(texts: Sequence[str], model: str = "gpt-4") -> List[int]:
+    return _TOKENIZER.count_many(texts, model)
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4") -> str:
+    return _TOKENIZER.truncate(text, max_tokens, model)
@@ -0,0 +1,277 @@
+"""essay_agent.llm.tracing
+
+Per-turn latency waterfalls across the agent pipeline.
+
+Call-site telemetry (:pymod:`essay_agent.llm.telemetry`) aggregates LLM
+round-trips, but a slow turn also spends time in memory loads, context
+retrieval, prompt building, argument mapping, tool execution, response
+formatting and memory writes, and aggregates cannot say which of those a
+particular turn was stuck in.
+
+:func:`trace_turn` opens a root span for one turn; :func:`span` (or the
+:func:`traced` decorator) records a timed child of whatever span is active.
+The active span lives in a context variable, so spans nest across ``await``
+chains, tasks and ``asyncio.to_thread`` workers without being passed around,
+and concurrent work (overlapped extraction, hedged LLM requests) shows up as
+overlapping siblings.  Outside a traced turn :func:`span` is a single
+context-variable lookup, so library code can be instrumented unconditionally.
+
+Finished turns are kept in a small in-process ring buffer
+(:meth:`TraceRecorder.recent`, served at ``/debug/traces``) and, if
+configured, appended as one JSON object per line for offline analysis.
+There is no external collector.
+
+>>> with trace_turn("turn", user_id="sam"):
+...     with span("reason"):
+...         await acall_llm(llm, prompt)
+>>> print(render_waterfall(get_trace_recorder().recent(1)[0]))
+
+Configuration
+-------------
+* ``ESSAY_AGENT_TRACING=0`` – record nothing.
+* ``ESSAY_AGENT_TRACE_KEEP`` (50) – finished turns kept in memory.
+* ``ESSAY_AGENT_TRACE_FILE`` – JSONL file each finished turn is appended to.
+"""
+from __future__ import annotations
+
+import collections
+import contextlib
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_SPAN: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("essay_agent_trace_span", default=None)
+
+
+class Span:
+    """One timed step of a turn and the steps it contains."""
+
+    __slots__ = ("name", "attrs", "start", "end", "error", "children")
+
+    def __init__(self, name: str, attrs: Optional[Dict[str, Any]] = None) -> None:
+        self.name = name
+        self.attrs: Dict[str, Any] = dict(attrs or {})
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.error: Optional[str] = None
+        self.children: List[Span] = []
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    def set(self, **attrs: Any) -> None:  # noqa: ANN401
+        """Attach attributes (tool name, cache hit, ...) to the span."""
+
+        self.attrs.update(attrs)
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """JSON-friendly tree; times in ms relative to *origin* (default: this span)."""
+
+        origin = self.start if origin is None else origin
+        out: Dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            # Still running when the turn finished (e.g. a cancelled background task)
+            "duration_ms": None if self.end is None else round((self.end - self.start) * 1000, 3),
+        }
+        if self.attrs:
+            out["attrs"] = {k: v if isinstance(v, (str, int, float, bool, type(None))) else str(v)
+                            for k, v in self.attrs.items()}
+        if self.error:
+            out["error"] = self.error
+        if self.children:
+            out["children"] = [child.to_dict(origin) for child in list(self.children)]
+        return out
+
+
+def current_span() -> Optional[Span]:
+    """Return the innermost active span (``None`` outside a traced turn)."""
+
+    return _SPAN.get()
+
+
+@contextlib.contextmanager
+def _enter(node: Span) -> Iterator[Span]:
+    token = _SPAN.set(node)
+    try:
+        yield node
+    except BaseException as exc:
+        node.error = type(exc).__name__
+        raise
+    finally:
+        node.end = time.perf_counter()
+        _SPAN.reset(token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:  # noqa: ANN401
+    """Time the block as a child of the active span.
+
+    Yields the new :class:`Span` (to :meth:`~Span.set` attributes on), or
+    ``None`` – and records nothing – when no turn is being traced.
+    """
+
+    parent = _SPAN.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, attrs)
+    parent.children.append(child)
+    with _enter(child):
+        yield child
+
+
+def traced(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator form of :func:`span` for sync and ``async`` functions.
+
+    The span is named *name* or the function's qualified name.
+    """
+
+    def decorate(fn: F) -> F:
+        label = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+                if _SPAN.get() is None:
+                    return await fn(*args, **kwargs)
+                with span(label):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+            if _SPAN.get() is None:
+                return fn(*args, **kwargs)
+            with span(label):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+class TraceRecorder:
+    """Keeps the last *keep* turn waterfalls and optionally appends them to a JSONL file."""
+
+    def __init__(self, *, keep: int = 50, path: Optional[str] = None, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.path = path
+        self._lock = threading.Lock()
+        self._traces: Deque[Dict[str, Any]] = collections.deque(maxlen=max(keep, 1))
+        self._recorded = 0
+
+    @classmethod
+    def from_env(cls) -> "TraceRecorder":
+        return cls(
+            keep=int(os.getenv("ESSAY_AGENT_TRACE_KEEP", "50")),
+            path=os.getenv("ESSAY_AGENT_TRACE_FILE") or None,
+            enabled=os.getenv("ESSAY_AGENT_TRACING", "1") != "0",
+        )
+
+    @contextlib.contextmanager
+    def trace(self, name: str = "turn", **attrs: Any) -> Iterator[Optional[Span]]:  # noqa: ANN401
+        """Record the block as one turn.
+
+        Inside an already traced turn (a server request wrapping an agent
+        turn) this is an ordinary child :func:`span`.
+        """
+
+        if not self.enabled:
+            yield None
+            return
+        if _SPAN.get() is not None:
+            with span(name, **attrs) as child:
+                yield child
+            return
+
+        root = Span(name, attrs)
+        started_at = datetime.now(timezone.utc).isoformat()
+        try:
+            with _enter(root):
+                yield root
+        finally:
+            self._record({"trace_id": uuid.uuid4().hex[:16], "started_at": started_at, **root.to_dict()})
+
+    def _record(self, trace: Dict[str, Any]) -> None:
+        with self._lock:
+            self._traces.append(trace)
+            self._recorded += 1
+        if self.path:
+            try:
+                with open(self.path, "a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(trace, default=str) + "\n")
+            except OSError as e:
+                logger.warning(f"Could not append trace to {self.path}: {e}")
+
+    def recent(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The last *limit* (default: all kept) waterfalls, oldest first."""
+
+        with self._lock:
+            traces = list(self._traces)
+        return traces[-limit:] if limit else traces
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "recorded": self._recorded,
+                "kept": len(self._traces),
+                "keep": self._traces.maxlen,
+                "path": self.path,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+
+
+_RECORDER = TraceRecorder.from_env()
+
+
+def get_trace_recorder() -> TraceRecorder:
+    """Return the process-wide :class:`TraceRecorder`."""
+
+    return _RECORDER
+
+
+def trace_turn(name: str = "turn", **attrs: Any):  # noqa: ANN201, ANN401
+    """Trace one turn into the process-wide recorder (see :meth:`TraceRecorder.trace`)."""
+
+    return _RECORDER.trace(name, **attrs)
+
+
+def render_waterfall(trace: Dict[str, Any], width: int = 40) -> str:
+    """Plain-text waterfall of one recorded *trace*, one row per span."""
+
+    total = trace.get("duration_ms") or 0.0
+    scale = width / total if total else 0.0
+    rows: List[str] = []
+
+    def walk(node: Dict[str, Any], depth: int) -> None:
+        start, duration = node["start_ms"], node["duration_ms"]
+        offset = min(int(start * scale), width - 1) if scale else 0
+        length = max(1, int((duration if duration is not None else total - start) * scale)) if scale else 1
+        bar = " " * offset + ("#" if duration is not None else "?") * min(length, width - offset)
+        label = ("  " * depth + node["name"])[:40]
+        shown = "running" if duration is None else f"{duration:.1f}ms"
+        rows.append(f"{label:<40} {start:>9.1f}ms {shown:>10} |{bar:<{width}}|" + (" !" if node.get("error") else ""))
+        for child in node.get("children", []):
+            walk(child, depth + 1)
+
+    walk(trace, 0)
+    return "\n".join(rows)
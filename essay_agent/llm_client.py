@@ -6,12 +6,50 @@ This module centralises configuration for GPT-4-based ChatOpenAI / OpenAI models
 so the rest of the codebase can import a pre-configured client instead of
 instantiating LLMs ad-hoc.  Key features:
 
-* Automatic SQLite or in-memory cache using ``langchain.cache``.
+* Bounded SQLite response cache (WAL, LRU/TTL eviction, compressed payloads)
+  with per-call opt-out – see :pymod:`essay_agent.llm.cache`.  Hits are served
+  before the rate limiter, so they never wait for or consume provider quota.
+* Bounded client pool keyed by model & parameters, sharing one tuned HTTP
+  connection pool (keep-alive, optional HTTP/2) across every pooled client –
+  see :pymod:`essay_agent.llm.http_pool`.
 * Cost & token accounting via ``get_openai_callback`` context manager.
 * Exponential back-off retry decorator (via *tenacity*) wrapping common helpers.
-* Rate limiting to prevent API quota exhaustion.
-* Graceful degradation: when ``OPENAI_API_KEY`` is absent, falls back to
-  ``FakeListLLM`` to allow offline / CI execution without hitting the network.
+* Native async helpers (:func:`acall_llm`, :func:`achat`) so coroutine code can
+  await the provider without blocking the event loop, plus
+  :func:`stream_llm` for token-by-token delivery.
+* Bounded-concurrency fan-out (:func:`batch_call_llm`, :func:`abatch_call_llm`)
+  returning results in order, with per-prompt failures kept in place.
+* Opt-in micro-batching (:func:`acall_llm_batched`): small classification
+  prompts from concurrent turns share one multi-item request – see
+  :pymod:`essay_agent.llm.micro_batch`.
+* Provider structured output: ``structured=<schema>`` sends a JSON-schema /
+  JSON-mode ``response_format`` and records parse-failure rates (see
+  :pymod:`essay_agent.llm.structured`).
+* Single-flight coalescing: concurrent identical requests share one upstream
+  call (see :pymod:`essay_agent.llm.single_flight`).
+* Per-model RPM/TPM rate limiting with adaptive concurrency (see
+  :pymod:`essay_agent.llm.rate_limiter`), scheduled by priority lane so
+  interactive turns go ahead of background and batch work (``priority=`` or
+  :func:`priority`, see :pymod:`essay_agent.llm.priority`).
+* Call-site model routing: lightweight calls (context extraction, response
+  formatting, tool selection, JSON repair, autocomplete) go to a cheaper,
+  faster model and fall back to the caller's model on timeout – see
+  :pymod:`essay_agent.llm.router`.
+* Error-class-aware retries honouring ``Retry-After``, per-model circuit
+  breakers and optional hedged requests (see :pymod:`essay_agent.llm.resilience`).
+* Record/replay cassettes (``ESSAY_AGENT_CASSETTE``) so offline runs replay
+  real responses and latencies – see :pymod:`essay_agent.llm.cassette`.
+* Request deadlines: inside :func:`~essay_agent.llm.deadline.request_deadline`
+  calls stop with ``DeadlineExceeded`` once it passes, async calls are cut
+  off at it and retries never outlast it – see :pymod:`essay_agent.llm.deadline`.
+* Per-call-site latency/token telemetry (``caller=`` or :func:`call_site`)
+  exported in Prometheus format – see :pymod:`essay_agent.llm.telemetry`.
+* Inside a traced turn every provider round-trip is an ``llm`` span (site,
+  model, queue wait, cache hit) in its waterfall – see
+  :pymod:`essay_agent.llm.tracing`.
+* Graceful degradation: when ``OPENAI_API_KEY`` is absent (and no cassette is
+  configured), falls back to ``FakeListLLM`` to allow offline / CI execution
+  without hitting the network.
 
 Example
 -------
@@ -22,19 +60,40 @@ Example
 """
 from __future__ import annotations
 
+import asyncio
 import contextlib
-import functools
+import contextvars
+import inspect
+import json
 import os
-import time
 import threading
-from typing import Any, Generator, Union, cast
-import tiktoken  # Add tiktoken for token counting
-
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Generator, Sequence, Union, cast
+
+from tenacity import retry, retry_if_exception
+
+from essay_agent.llm.budget import clamp_delay, record_attempt, spend_retry
+from essay_agent.llm.cache import LLMCache, cache_policy, current_cache_policy
+from essay_agent.llm.cassette import REPLAY, Cassette, CassetteLLM
+from essay_agent.llm.client_pool import ClientPool, make_key
+from essay_agent.llm.deadline import DeadlineExceeded, check_deadline, expired, remaining
+from essay_agent.llm.http_pool import get_http_pool
+from essay_agent.llm.micro_batch import MicroBatcher
+from essay_agent.llm.priority import BATCH, priority, priority_is_set
+from essay_agent.llm.rate_limiter import RateLimiter
+from essay_agent.llm.resilience import CircuitBreaker, Hedger, RetryPolicy, retry_after
+from essay_agent.llm.structured import parse_stats, record_parse, response_format
+from essay_agent.llm.router import ModelRouter, Route
+from essay_agent.llm.single_flight import SingleFlight
+from essay_agent.llm.telemetry import call_site, current_call_site, get_telemetry, mark_cache_hit
+from essay_agent.llm.tokenizer import count_tokens as _count_tokens, get_tokenizer
+from essay_agent.llm.tracing import get_trace_recorder, span
 
 # LangChain cache -----------------------------------------------------------------
-from langchain.cache import InMemoryCache, SQLiteCache
 from langchain.globals import set_llm_cache
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.load import dumps
 
 # Callback helper for cost tracking ------------------------------------------------
 # New import path (LangChain >= 0.1.17)
@@ -64,145 +123,415 @@ _DEFAULT_MODEL = os.getenv("ESSAY_AGENT_MODEL", "gpt-4o")
 _CACHE_PATH = os.getenv("ESSAY_AGENT_CACHE_PATH", ".essay_agent_cache.sqlite")
 _USE_CACHE = os.getenv("ESSAY_AGENT_CACHE", "1") == "1"
 
-# BUGFIX: Add evaluation mode to disable caching during conversations
-_EVALUATION_MODE = os.getenv("ESSAY_AGENT_EVALUATION_MODE", "0") == "1"
+# Cache bounds – keep disk use flat under months of production traffic.
+_CACHE_MAX_ENTRIES = int(os.getenv("ESSAY_AGENT_CACHE_MAX_ENTRIES", "50000"))
+_CACHE_MAX_BYTES = int(float(os.getenv("ESSAY_AGENT_CACHE_MAX_MB", "256")) * 1024 * 1024)
+_CACHE_TTL_SECONDS = float(os.getenv("ESSAY_AGENT_CACHE_TTL_HOURS", str(24 * 30))) * 3600
+
+# Rate limiting configuration – per-model RPM/TPM buckets shared by every
+# caller in the process (sync helpers, async agents, batch evaluation).
+_LIMITER = RateLimiter.from_env()
+
+# Record/replay cassette (``ESSAY_AGENT_CASSETTE=path`` plus
+# ``ESSAY_AGENT_CASSETTE_MODE=record|replay``); ``None`` when not configured.
+_CASSETTE = Cassette.from_env()
+
+# Concurrent identical (client, params, prompt) calls share one request.
+_COALESCE = os.getenv("ESSAY_AGENT_COALESCE", "1") == "1"
+_SINGLE_FLIGHT = SingleFlight()
+
+# Per-(call site, model) latency / token / cache / retry telemetry.
+_TELEMETRY = get_telemetry()
+
+# Retries only for rate-limit / timeout / connection / 5xx errors; client
+# errors (bad request, auth, replay misses, …) surface immediately.
+_RETRY_POLICY = RetryPolicy(max_delay=float(os.getenv("ESSAY_AGENT_RETRY_MAX_DELAY", "20")))
+
+# One breaker per model: after N consecutive provider failures calls fail fast
+# for the cool-down instead of queueing up behind a dead endpoint.
+_BREAKER_FAILURES = int(os.getenv("ESSAY_AGENT_BREAKER_FAILURES", "5"))
+_BREAKER_RESET_SECONDS = float(os.getenv("ESSAY_AGENT_BREAKER_RESET_SECONDS", "30"))
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+# Hedged requests for async calls that outlive the model's recent p95 latency
+# (opt-in: each hedge is an extra billed request, capped at 10 % of calls).
+_HEDGER = Hedger(enabled=os.getenv("ESSAY_AGENT_HEDGE", "0") == "1")
+
+# Call-site → model routing table (``ESSAY_AGENT_ROUTING`` / ``_FAST_MODEL`` /
+# ``_ROUTES``); the client factory and routable check are bound further down.
+_ROUTER = ModelRouter.from_env()
+
+# Concurrent small prompts of one kind share a request (``ESSAY_AGENT_MICROBATCH=1``).
+_MICRO_BATCHER = MicroBatcher.from_env()
+
+# Attempts allowed for a streamed completion that fails *before* its first
+# token; once text has reached the caller a failure is surfaced instead.
+_STREAM_ATTEMPTS = int(os.getenv("ESSAY_AGENT_STREAM_ATTEMPTS", "3"))
+
+# Default fan-out for :func:`batch_call_llm` / :func:`abatch_call_llm`; the
+# rate limiter still decides how many requests actually reach each model.
+_BATCH_CONCURRENCY = int(os.getenv("ESSAY_AGENT_BATCH_CONCURRENCY", "8"))
+
+# Completion tokens assumed when a caller does not pass ``max_tokens``; used
+# only to size the TPM reservation before the request is sent.
+_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("ESSAY_AGENT_COMPLETION_TOKEN_ESTIMATE", "512"))
+
+# Initialise the global cache exactly once at import time.  Call sites that
+# need fresh completions opt out with ``call_llm(..., cache=False)`` or the
+# :func:`cache_policy` context manager rather than flipping a global flag.
+# ``ESSAY_AGENT_EVALUATION_MODE=1`` still starts the process with caching off.
+_CACHE: LLMCache | None = None
+if _USE_CACHE:
+    _CACHE = LLMCache(
+        _CACHE_PATH,
+        max_entries=_CACHE_MAX_ENTRIES,
+        max_bytes=_CACHE_MAX_BYTES,
+        ttl_seconds=_CACHE_TTL_SECONDS or None,
+        enabled=os.getenv("ESSAY_AGENT_EVALUATION_MODE", "0") != "1",
+    )
+set_llm_cache(_CACHE)
 
-# Rate limiting configuration
-_MIN_REQUEST_INTERVAL = float(os.getenv("ESSAY_AGENT_MIN_REQUEST_INTERVAL", "1.0"))  # seconds between requests
-_last_request_time = 0.0
-_request_lock = threading.Lock()
 
-# Initialise global cache exactly once at import time.  SQLite is persistent,
-# while the in-memory cache avoids disk I/O when disabled.
-# BUGFIX: Disable caching in evaluation mode to prevent identical responses
-if _USE_CACHE and not _EVALUATION_MODE:
-    set_llm_cache(SQLiteCache(_CACHE_PATH))
-else:  # pragma: no cover
-    set_llm_cache(InMemoryCache())
+def _model_name(llm: Any) -> str:
+    """Best-effort model identifier used to key the rate limiter."""
 
+    return str(getattr(llm, "model_name", None) or getattr(llm, "model", None) or _DEFAULT_MODEL)
 
-def _rate_limit():
-    """Enforce minimum interval between API requests to prevent rate limiting."""
-    global _last_request_time
-    
-    with _request_lock:
-        current_time = time.time()
-        time_since_last = current_time - _last_request_time
-        
-        if time_since_last < _MIN_REQUEST_INTERVAL:
-            sleep_time = _MIN_REQUEST_INTERVAL - time_since_last
-            time.sleep(sleep_time)
-        
-        _last_request_time = time.time()
+
+def _estimate_tokens(prompt: str, model: str, kwargs: dict[str, Any]) -> int:
+    """Prompt tokens plus the completion budget the request may consume."""
+
+    completion = kwargs.get("max_tokens") or _COMPLETION_TOKEN_ESTIMATE
+    return count_tokens(prompt, model) + int(completion)
+
+
+def _should_coalesce() -> bool:
+    """Coalesce unless the caller asked for fresh, uncached completions."""
+
+    if not _COALESCE:
+        return False
+    override = current_cache_policy()
+    if override is not None:
+        return override
+    return _CACHE is None or _CACHE.enabled
+
+
+def _flight_key(llm: Any, prompt: Any, kwargs: dict[str, Any]) -> tuple:
+    # Pooled clients are one object per configuration, so identity captures
+    # model & construction parameters; per-call kwargs complete the key.
+    # Message-list prompts (e.g. json_repair) are frozen to stay hashable.
+    if not isinstance(prompt, str):
+        prompt = json.dumps(prompt, sort_keys=True, default=str)
+    return (id(llm), prompt, make_key(**kwargs))
+
+
+def get_single_flight_stats() -> dict[str, Any]:
+    """Return how many calls were coalesced onto an in-flight request."""
+
+    return _SINGLE_FLIGHT.stats()
+
+
+def _breaker(model: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _BREAKERS.get(model)
+        if breaker is None:
+            breaker = _BREAKERS[model] = CircuitBreaker(
+                model, failure_threshold=_BREAKER_FAILURES, reset_timeout=_BREAKER_RESET_SECONDS
+            )
+        return breaker
+
+
+def get_resilience_stats() -> dict[str, Any]:
+    """Return circuit-breaker states per model and hedging counters."""
+
+    with _breakers_lock:
+        breakers = dict(_BREAKERS)
+    return {
+        "breakers": {model: breaker.stats() for model, breaker in breakers.items()},
+        "hedging": _HEDGER.stats(),
+    }
+
+
+def get_telemetry_stats() -> dict[str, Any]:
+    """Return per-call-site, per-model LLM telemetry (calls, tokens, latency)."""
+
+    return _TELEMETRY.stats()
+
+
+def render_metrics() -> str:
+    """Return LLM telemetry in the Prometheus text exposition format."""
+
+    return _TELEMETRY.render_prometheus(queue_depths=_LIMITER.queue_depths())
+
+
+def get_recent_traces(limit: int | None = None) -> list[dict[str, Any]]:
+    """Return the last *limit* per-turn latency waterfalls, oldest first."""
+
+    return get_trace_recorder().recent(limit)
+
+
+def get_structured_output_stats() -> dict[str, Any]:
+    """Return per-call-site parse-failure and JSON-repair rates of structured calls."""
+
+    return parse_stats()
+
+
+def get_micro_batch_stats() -> dict[str, Any]:
+    """Return how many prompts were micro-batched and how many fell back."""
+
+    return _MICRO_BATCHER.stats()
+
+
+def get_routing_stats() -> dict[str, Any]:
+    """Return the routing table and routed / fallback counts per call site."""
+
+    return _ROUTER.stats()
+
+
+def get_priority_stats() -> dict[str, Any]:
+    """Return current queue depth and observed rate-limiter wait per priority lane."""
+
+    return {"queue_depth": _LIMITER.queue_depths(), "queue_wait": _TELEMETRY.lane_stats()}
+
+
+def get_http_pool_stats() -> dict[str, Any]:
+    """Return requests, new connections, TLS handshakes and reuse of the shared HTTP pool."""
+
+    return get_http_pool().stats()
+
+
+def get_tokenizer_stats() -> dict[str, Any]:
+    """Return memo hit/miss counters of the shared tokenizer."""
+
+    return get_tokenizer().stats()
+
+
+def get_cassette_stats() -> dict[str, Any]:
+    """Return record/replay counters for the active cassette (if any)."""
+
+    return _CASSETTE.stats() if _CASSETTE is not None else {"mode": "off"}
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide :class:`RateLimiter`."""
+
+    return _LIMITER
+
+
+def get_rate_limit_stats() -> dict[str, dict[str, Any]]:
+    """Return per-model wait-time / concurrency metrics from the limiter."""
+
+    return _LIMITER.stats()
 
 
 # ---------------------------------------------------------------------------
 # Retry wrapper – applies to helper functions (not to the LLM instance itself)
 # ---------------------------------------------------------------------------
 
-def _retryable(fn):  # noqa: D401
-    """Function decorator adding exponential back-off retry behaviour with rate limiting."""
+def _should_retry(exc: BaseException) -> bool:
+    # Past the request deadline another attempt cannot finish in time.
+    return not isinstance(exc, DeadlineExceeded) and _RETRY_POLICY.should_retry(exc)
+
+
+def _stop(retry_state: Any) -> bool:  # noqa: ANN401
+    # Policy first so a spent per-class allowance never consumes turn budget.
+    return _RETRY_POLICY.stop(retry_state) or not spend_retry("llm")
 
-    @functools.wraps(fn)
-    def wrapper(*args, **kwargs):
-        # Apply rate limiting before each request
-        _rate_limit()
-        return fn(*args, **kwargs)
+
+def _wait(retry_state: Any) -> float:  # noqa: ANN401
+    # Background / batch lanes back off longer so retries favour interactive turns.
+    lane = retry_state.kwargs.get("priority")
+    return clamp_delay(_RETRY_POLICY.wait(retry_state) * _LIMITER.retry_backoff(lane))
+
+
+def _before_attempt(retry_state: Any) -> None:  # noqa: ANN401
+    record_attempt("llm")
+    if retry_state.attempt_number > 1:
+        args = retry_state.args
+        model = _model_name(args[0]) if args and not isinstance(args[0], str) else _DEFAULT_MODEL
+        _TELEMETRY.record_retry(model, site=retry_state.kwargs.get("caller"))
+
+
+def _retryable(fn):  # noqa: D401
+    """Function decorator retrying transient provider errors.
+
+    Which errors are retried, how often and how long to wait (``Retry-After``
+    first, jittered exponential back-off otherwise) is decided by
+    :class:`~essay_agent.llm.resilience.RetryPolicy`; every retry is also
+    drawn from the caller's :func:`~essay_agent.llm.budget.retry_budget`
+    and stops at the request deadline.  Rate limiting and the circuit breaker apply per attempt inside
+    :func:`_invoke`, so waiting for quota never holds a lock shared with other
+    callers.
+    """
 
     return cast(
         Any,
         retry(
-            wait=wait_exponential(multiplier=1, min=2, max=30),  # Longer waits for better stability
-            stop=stop_after_attempt(8),  # More attempts for better resilience
-            retry=retry_if_exception_type((
-                ConnectionError,
-                TimeoutError,
-                # Add common OpenAI API exceptions
-                Exception,  # Broad catch for API issues - we'll refine this
-            )),
-        )(wrapper),
+            retry=retry_if_exception(_should_retry),
+            wait=_wait,
+            stop=_stop,
+            before=_before_attempt,
+        )(fn),
     )
 
 
 # ---------------------------------------------------------------------------
-# Factory helpers – cached so callers share the same object & callback stats
+# Factory helpers – pooled so callers share objects, connections & callback stats
 # ---------------------------------------------------------------------------
 
+# Distinct (model, temperature, max_tokens, …) configurations kept alive at once.
+_CLIENT_POOL_SIZE = int(os.getenv("ESSAY_AGENT_CLIENT_POOL_SIZE", "16"))
+
+def _http_kwargs() -> dict[str, Any]:
+    """Shared-pool ``http_client`` / ``http_async_client`` kwargs.
+
+    Pooled ``ChatOpenAI`` / ``OpenAI`` objects differ only in request
+    parameters, so they all ride on one tuned connection pool (see
+    :pymod:`essay_agent.llm.http_pool`) instead of each opening – and
+    TLS-handshaking – their own.
+    """
+
+    return get_http_pool().openai_kwargs()
+
 
-@functools.lru_cache(maxsize=1)
-def _chat_llm(**overrides: Any):  # noqa: D401
-    """Return a singleton ChatOpenAI instance (or ``FakeListLLM`` offline)."""
+def _build_chat_llm(*, online: bool, model_name: str, **overrides: Any):  # noqa: D401
+    """Construct a ChatOpenAI instance (or ``FakeListLLM`` offline).
 
-    api_key = os.getenv("OPENAI_API_KEY")
-    if api_key:
+    With a cassette configured the client is wrapped in :class:`CassetteLLM`:
+    replay never touches the network, record captures each round-trip.
+    """
+
+    config = {"model_name": model_name, **overrides}
+    if _CASSETTE is not None and _CASSETTE.mode == REPLAY:
+        return CassetteLLM(_CASSETTE, config, chat=True)
+
+    if online:
         try:
-            # Pop temperature from overrides if provided to avoid duplicate keys
-            temperature = overrides.pop("temperature", 0.2)
             llm = ChatOpenAI(
-                model_name=_DEFAULT_MODEL,
-                temperature=temperature,
+                model_name=model_name,
                 max_retries=0,  # we handle retries at helper-function level
+                **_http_kwargs(),
                 **overrides,
             )
             # Backward-compat alias ------------------------------------
             if not hasattr(llm, "predict"):
                 llm.predict = lambda prompt, **kw: llm.invoke(prompt, **kw)  # type: ignore[assignment]
-            return llm
         except Exception as exc:  # noqa: BLE001
             raise ValueError(f"Failed to instantiate ChatOpenAI: {exc}") from exc
+        if _CASSETTE is not None:
+            return CassetteLLM(_CASSETTE, config, llm, chat=True)
+        return llm
 
     # Offline fall-back – deterministic fake responses enable CI tests
     return FakeListLLM(responses=["FAKE_RESPONSE"])  # type: ignore[return-value]
 
 
-@functools.lru_cache(maxsize=1)
-def _completion_llm(**overrides: Any):  # noqa: D401
-    """Return a singleton completions-style OpenAI LLM (or fake offline)."""
+def _build_completion_llm(*, online: bool, **overrides: Any):  # noqa: D401
+    """Construct a completions-style OpenAI LLM (or fake offline)."""
 
-    api_key = os.getenv("OPENAI_API_KEY")
-    if api_key:
+    if _CASSETTE is not None and _CASSETTE.mode == REPLAY:
+        return CassetteLLM(_CASSETTE, overrides, chat=False)
+
+    if online:
         try:
-            return OpenAI(max_retries=0, **overrides)  # type: ignore[return-value]
+            llm = OpenAI(max_retries=0, **_http_kwargs(), **overrides)  # type: ignore[return-value]
         except Exception as exc:  # noqa: BLE001
             raise ValueError(f"Failed to instantiate OpenAI LLM: {exc}") from exc
+        if _CASSETTE is not None:
+            return CassetteLLM(_CASSETTE, overrides, llm, chat=False)
+        return llm
 
     return FakeListLLM(responses=["FAKE_RESPONSE"])  # type: ignore[return-value]
 
 
+_CHAT_POOL = ClientPool(_build_chat_llm, maxsize=_CLIENT_POOL_SIZE)
+_COMPLETION_POOL = ClientPool(_build_completion_llm, maxsize=_CLIENT_POOL_SIZE)
+
+
+def _routed_client(llm: Any, route: Route) -> Any:  # noqa: ANN401
+    """Pooled chat client for *route*, keeping the caller's temperature."""
+
+    overrides: dict[str, Any] = {}
+    temperature = getattr(llm, "temperature", None)
+    if temperature is not None:
+        overrides["temperature"] = temperature
+    if route.timeout is not None:
+        overrides["request_timeout"] = route.timeout
+    return get_chat_llm(model_name=route.model, **overrides)
+
+
+def _is_routable(llm: Any) -> bool:  # noqa: ANN401
+    # Only pooled chat clients are swapped; fakes and caller-built test
+    # doubles keep whatever model they were given.
+    return isinstance(llm, ChatOpenAI) or (isinstance(llm, CassetteLLM) and llm.chat)
+
+
+_ROUTER.factory = _routed_client
+_ROUTER.routable = _is_routable
+
+
+def structured_kwargs(llm: Any, schema: Any) -> dict[str, Any]:  # noqa: ANN401
+    """``{"response_format": ...}`` for *schema* when *llm* accepts one, else ``{}``.
+
+    For callers that invoke a client directly instead of via :func:`call_llm`
+    (which does this itself for ``structured=`` calls).
+    """
+
+    fmt = response_format(schema)
+    if fmt is None or not _is_routable(llm):
+        return {}
+    return {"response_format": fmt}
+
+
 # Public APIs ----------------------------------------------------------------------
 
 
 def get_chat_llm(**overrides: Any):  # noqa: D401
-    """Return a cached **chat** LLM instance (GPT-4 by default)."""
+    """Return a pooled **chat** LLM instance (GPT-4 by default).
 
-    return _chat_llm(**overrides)
+    Instances are keyed by model and every override, so callers asking for
+    different temperatures each keep their own client instead of evicting a
+    shared singleton.
+    """
+
+    params = dict(overrides)
+    model = params.pop("model_name", None) or params.pop("model", None) or _DEFAULT_MODEL
+    params.pop("model", None)
+    params.setdefault("temperature", 0.2)
+    return _CHAT_POOL.get(online=bool(os.getenv("OPENAI_API_KEY")), model_name=model, **params)
 
 
 def get_completion_llm(**overrides: Any):  # noqa: D401
-    """Return a cached **completions** LLM instance (legacy OpenAI)."""
+    """Return a pooled **completions** LLM instance (legacy OpenAI)."""
+
+    return _COMPLETION_POOL.get(online=bool(os.getenv("OPENAI_API_KEY")), **overrides)
+
+
+def get_client_pool_stats() -> dict[str, dict[str, Any]]:
+    """Return hit/miss/eviction counters for the chat & completion pools."""
+
+    return {"chat": _CHAT_POOL.stats(), "completion": _COMPLETION_POOL.stats()}
 
-    return _completion_llm(**overrides)
+
+def get_cache_stats() -> dict[str, Any]:
+    """Return hit/miss/byte counters for the response cache."""
+
+    return _CACHE.stats() if _CACHE is not None else {"enabled": False}
 
 
 def set_evaluation_mode(enabled: bool = True):
-    """Enable/disable evaluation mode to control caching behavior.
-    
+    """Enable/disable evaluation mode (process-wide cache default).
+
+    Prefer ``cache_policy(False)`` or ``call_llm(..., cache=False)`` around the
+    specific calls that need fresh completions; this toggle remains for
+    existing scripts and only flips the cache's default.
+
     Args:
         enabled: If True, disables LLM caching to ensure unique responses
     """
-    global _EVALUATION_MODE
-    _EVALUATION_MODE = enabled
-    
-    # Update cache based on evaluation mode
-    if enabled:
-        # Use in-memory cache for evaluation (no persistence)
-        set_llm_cache(InMemoryCache())
-    else:
-        # Restore persistent cache for normal usage
-        if _USE_CACHE:
-            set_llm_cache(SQLiteCache(_CACHE_PATH))
-        else:
-            set_llm_cache(InMemoryCache())
+    if _CACHE is not None:
+        _CACHE.enabled = not enabled
 
 
 def get_evaluation_mode() -> bool:
@@ -211,8 +540,7 @@ def get_evaluation_mode() -> bool:
     Returns:
         True if evaluation mode is active
     """
-    global _EVALUATION_MODE
-    return _EVALUATION_MODE
+    return _CACHE is None or not _CACHE.enabled
 
 
 @contextlib.contextmanager
@@ -240,7 +568,18 @@ def chat(prompt: str, **kwargs: Any) -> str:  # noqa: D401
 
     llm = get_chat_llm()
     try:
-        return call_llm(llm, prompt, **kwargs)
+        return _invoke(llm, prompt, **kwargs)
+    except Exception as exc:  # noqa: BLE001
+        raise RuntimeError(str(exc)) from exc
+
+
+@_retryable
+async def achat(prompt: str, **kwargs: Any) -> str:  # noqa: D401
+    """Async counterpart of :func:`chat`; awaits the provider natively."""
+
+    llm = get_chat_llm()
+    try:
+        return await _ainvoke(llm, prompt, **kwargs)
     except Exception as exc:  # noqa: BLE001
         raise RuntimeError(str(exc)) from exc
 
@@ -252,14 +591,445 @@ def chat(prompt: str, **kwargs: Any) -> str:  # noqa: D401
 
 @_retryable
 def call_llm(llm: Any, prompt: str, **kwargs: Any) -> str:  # noqa: D401, ANN401
-    """Call ``llm.invoke`` and normalise the return value to *str*."""
+    """Call ``llm.invoke`` and normalise the return value to *str*.
+
+    Pass ``cache=False`` to bypass the response cache for this call (or
+    ``cache=True`` to force it on while evaluation mode is active),
+    ``caller="..."`` to label the call in telemetry (see :func:`call_site`),
+    ``priority="background"`` / ``"batch"`` to schedule it behind
+    interactive traffic (see :func:`priority`), and ``structured=<Pydantic
+    model or JSON-schema dict>`` to request provider structured output
+    (see :pymod:`essay_agent.llm.structured`).
+    """
+
+    return _invoke(llm, prompt, **kwargs)
+
+
+def _invoke(llm: Any, prompt: str, **kwargs: Any) -> str:  # noqa: ANN401
+    """Single provider round-trip gated by the shared rate limiter."""
+
+    caller = kwargs.pop("caller", None)
+    if caller is not None:
+        with call_site(caller):
+            return _invoke(llm, prompt, **kwargs)
+
+    lane = kwargs.pop("priority", None)
+    if lane is not None:
+        with priority(lane):
+            return _invoke(llm, prompt, **kwargs)
+
+    cache = kwargs.pop("cache", None)
+    if cache is not None:
+        with cache_policy(cache):
+            return _invoke(llm, prompt, **kwargs)
+
+    structured = kwargs.pop("structured", None)
+    if structured is not None:
+        kwargs.update(structured_kwargs(llm, structured))
+        text = _invoke(llm, prompt, **kwargs)
+        record_parse(text, structured)
+        return text
+
+    route = _route(llm, prompt)
+    if route is None:
+        return _invoke_direct(llm, prompt, **kwargs)
+    try:
+        return _invoke_direct(_ROUTER.client_for(llm, route), prompt, **kwargs)
+    except Exception as exc:  # noqa: BLE001
+        if expired() or not _ROUTER.should_fall_back(route, exc):
+            raise
+        _ROUTER.record_fallback(current_call_site())
+        return _invoke_direct(llm, prompt, **kwargs)
+
+
+def _route(llm: Any, prompt: Any) -> Route | None:  # noqa: ANN401
+    if not _ROUTER.can_route(llm):
+        return None
+    model = _model_name(llm)
+    return _ROUTER.route(current_call_site(), model, count_tokens(prompt, model))
+
+
+def _invoke_direct(llm: Any, prompt: str, **kwargs: Any) -> str:  # noqa: ANN401
+    if _should_coalesce():
+        return _SINGLE_FLIGHT.do(
+            _flight_key(llm, prompt, kwargs), lambda: _invoke_once(llm, prompt, **kwargs)
+        )
+    return _invoke_once(llm, prompt, **kwargs)
+
+
+def _invoke_once(llm: Any, prompt: str, **kwargs: Any) -> str:  # noqa: ANN401
+    # Offline fakes never touch the provider quota.
+    if isinstance(llm, FakeListLLM):
+        with _TELEMETRY.track("fake", prompt) as call:
+            call.completion = _normalise(_dispatch(llm, prompt, **kwargs))
+        return call.completion
+
+    check_deadline("LLM call")
+    model = _model_name(llm)
+    cached = _serve_cached(llm, model, prompt, kwargs)
+    if cached is not None:
+        return cached
+    breaker = _breaker(model)
+    breaker.before_call()
+    try:
+        with span("llm", site=current_call_site(), model=model) as traced_call, \
+                _TELEMETRY.track(model, prompt) as call:
+            with _LIMITER.limit_sync(model, _estimate_tokens(prompt, model, kwargs)) as waited:
+                call.queue_wait = waited
+                start = time.perf_counter()
+                result = _dispatch(llm, prompt, **kwargs)
+                _HEDGER.observe(model, time.perf_counter() - start)
+            call.set_response(result)
+            call.completion = _normalise(result)
+            _trace_call(traced_call, call)
+    except BaseException as exc:
+        breaker.record_failure(exc)
+        raise
+    breaker.record_success()
+    return call.completion
+
+
+def _peek_cache(llm: Any, prompt: Any, kwargs: dict[str, Any]) -> Any:  # noqa: ANN401
+    """Cached generations for this request, looked up the way LangChain would.
+
+    Only chat models using the process-wide cache are checked; anything else
+    (or a LangChain version whose internals differ) falls through to the
+    normal call, whose own lookup still applies.
+    """
+
+    if _CACHE is None or not isinstance(llm, BaseChatModel) or getattr(llm, "cache", None) not in (None, True):
+        return None
+    try:
+        params = dict(kwargs)
+        stop = params.pop("stop", None)
+        messages = llm._convert_input(prompt).to_messages()
+        return _CACHE.peek(dumps(messages), llm._get_llm_string(stop=stop, **params))
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def _serve_cached(llm: Any, model: str, prompt: Any, kwargs: dict[str, Any]) -> str | None:  # noqa: ANN401
+    """Answer from the response cache without taking rate-limiter quota or a slot.
+
+    Cache hits skip the limiter, the circuit breaker and hedging: they cost
+    the provider nothing and must not queue behind calls that do.
+    """
+
+    generations = _peek_cache(llm, prompt, kwargs)
+    if not generations:
+        return None
+    with span("llm", site=current_call_site(), model=model) as traced_call, \
+            _TELEMETRY.track(model, prompt) as call:
+        mark_cache_hit()
+        result = getattr(generations[0], "message", None) or getattr(generations[0], "text", "")
+        call.set_response(result)
+        call.completion = _normalise(result)
+        _trace_call(traced_call, call)
+    return call.completion
+
+
+def _trace_call(traced_call: Any, call: Any) -> None:  # noqa: ANN401
+    """Copy the round-trip's queue wait and cache hit onto its trace span."""
+
+    if traced_call is not None:
+        traced_call.set(queue_wait_ms=round(call.queue_wait * 1000, 3), cache_hit=call.cache_hit)
+
+
+@_retryable
+async def acall_llm(llm: Any, prompt: str, **kwargs: Any) -> str:  # noqa: D401, ANN401
+    """Await ``llm.ainvoke`` and normalise the return value to *str*.
+
+    Use this from ``async def`` code instead of :func:`call_llm`: the sync
+    helper blocks the event loop for the full provider round-trip (and any
+    rate-limit wait), stalling every other request served by the process.
+    Caching (including ``cache=False``) and ``track_cost`` accounting behave
+    exactly as for the sync path.
+    """
+
+    return await _ainvoke(llm, prompt, **kwargs)
+
+
+async def _ainvoke(llm: Any, prompt: str, **kwargs: Any) -> str:  # noqa: ANN401
+    """Async single round-trip gated by the shared rate limiter."""
+
+    caller = kwargs.pop("caller", None)
+    if caller is not None:
+        with call_site(caller):
+            return await _ainvoke(llm, prompt, **kwargs)
+
+    lane = kwargs.pop("priority", None)
+    if lane is not None:
+        with priority(lane):
+            return await _ainvoke(llm, prompt, **kwargs)
+
+    cache = kwargs.pop("cache", None)
+    if cache is not None:
+        with cache_policy(cache):
+            return await _ainvoke(llm, prompt, **kwargs)
+
+    structured = kwargs.pop("structured", None)
+    if structured is not None:
+        kwargs.update(structured_kwargs(llm, structured))
+        text = await _ainvoke(llm, prompt, **kwargs)
+        record_parse(text, structured)
+        return text
 
+    route = _route(llm, prompt)
+    if route is None:
+        return await _ainvoke_direct(llm, prompt, **kwargs)
+    try:
+        routed = _ainvoke_direct(_ROUTER.client_for(llm, route), prompt, **kwargs)
+        # The async path also bounds rate-limiter wait on the routed model.
+        return await (asyncio.wait_for(routed, route.timeout) if route.timeout is not None else routed)
+    except Exception as exc:  # noqa: BLE001
+        if expired() or not _ROUTER.should_fall_back(route, exc):
+            raise
+        _ROUTER.record_fallback(current_call_site())
+        return await _ainvoke_direct(llm, prompt, **kwargs)
+
+
+async def _ainvoke_direct(llm: Any, prompt: str, **kwargs: Any) -> str:  # noqa: ANN401
+    if _should_coalesce():
+        return await _SINGLE_FLIGHT.ado(
+            _flight_key(llm, prompt, kwargs), lambda: _ainvoke_once(llm, prompt, **kwargs)
+        )
+    return await _ainvoke_once(llm, prompt, **kwargs)
+
+
+async def _ainvoke_once(llm: Any, prompt: str, **kwargs: Any) -> str:  # noqa: ANN401
+    if isinstance(llm, FakeListLLM):
+        with _TELEMETRY.track("fake", prompt) as call:
+            call.completion = _normalise(await _adispatch(llm, prompt, **kwargs))
+        return call.completion
+
+    check_deadline("LLM call")
+    model = _model_name(llm)
+    cached = _serve_cached(llm, model, prompt, kwargs)
+    if cached is not None:
+        return cached
+    attempt = _HEDGER.run(model, lambda: _aattempt(llm, model, prompt, kwargs))
+    left = remaining()
+    if left is None:
+        return await attempt
+    # Cut the call (rate-limit wait included) off at the request deadline.
+    try:
+        return await asyncio.wait_for(attempt, left)
+    except asyncio.TimeoutError:
+        if not expired():
+            raise
+        raise DeadlineExceeded(f"LLM call to {model} stopped: request deadline exceeded") from None
+
+
+async def _aattempt(llm: Any, model: str, prompt: str, kwargs: dict[str, Any]) -> str:  # noqa: ANN401
+    """One breaker-guarded, rate-limited request (a hedge runs two of these)."""
+
+    breaker = _breaker(model)
+    breaker.before_call()
+    try:
+        with span("llm", site=current_call_site(), model=model) as traced_call, \
+                _TELEMETRY.track(model, prompt) as call:
+            async with _LIMITER.limit(model, _estimate_tokens(prompt, model, kwargs)) as waited:
+                call.queue_wait = waited
+                start = time.perf_counter()
+                result = await _adispatch(llm, prompt, **kwargs)
+                _HEDGER.observe(model, time.perf_counter() - start)
+            call.set_response(result)
+            call.completion = _normalise(result)
+            _trace_call(traced_call, call)
+    except BaseException as exc:  # cancelled hedges must release a half-open probe
+        breaker.record_failure(exc)
+        raise
+    breaker.record_success()
+    return call.completion
+
+
+# ---------------------------------------------------------------------------
+# Batch helpers ---------------------------------------------------------------
+# ---------------------------------------------------------------------------
+
+
+def batch_call_llm(
+    llm: Any,  # noqa: ANN401
+    prompts: Sequence[str],
+    max_concurrency: int | None = None,
+    **kwargs: Any,
+) -> list[str | Exception]:
+    """Run :func:`call_llm` for every prompt with at most *max_concurrency* in flight.
+
+    Results come back in prompt order.  A prompt that still fails after its
+    retries yields the exception in its slot instead of aborting the batch, so
+    callers keep the partial results::
+
+        results = batch_call_llm(llm, prompts, max_concurrency=4, caller="qa")
+        scores = [parse(r) for r in results if not isinstance(r, Exception)]
+
+    Every request shares the rate limiter, response cache, single-flight
+    coalescing and retry policy with the rest of the process.  Context
+    (``cache_policy``, ``call_site``, the turn's retry budget) is copied into
+    each worker.  *kwargs* (``cache=``, ``caller=``, ``priority=``, model
+    parameters) apply to every prompt.  Unless the caller picked a lane, the
+    fan-out runs in the ``batch`` lane so it only uses leftover quota.
+    """
+
+    if not prompts:
+        return []
+    if "priority" not in kwargs and not priority_is_set():
+        kwargs["priority"] = BATCH
+    workers = max(1, min(max_concurrency or _BATCH_CONCURRENCY, len(prompts)))
+
+    def _one(prompt: str) -> str | Exception:
+        try:
+            return call_llm(llm, prompt, **kwargs)
+        except Exception as exc:  # noqa: BLE001 – reported in the result slot
+            return exc
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-batch") as pool:
+        futures = [pool.submit(contextvars.copy_context().run, _one, prompt) for prompt in prompts]
+        return [future.result() for future in futures]
+
+
+async def abatch_call_llm(
+    llm: Any,  # noqa: ANN401
+    prompts: Sequence[str],
+    max_concurrency: int | None = None,
+    **kwargs: Any,
+) -> list[str | Exception]:
+    """Async counterpart of :func:`batch_call_llm` built on :func:`acall_llm`.
+
+    >>> results = await abatch_call_llm(llm, prompts, max_concurrency=4)
+    """
+
+    if not prompts:
+        return []
+    if "priority" not in kwargs and not priority_is_set():
+        kwargs["priority"] = BATCH
+    gate = asyncio.Semaphore(max(1, max_concurrency or _BATCH_CONCURRENCY))
+
+    async def _one(prompt: str) -> str | Exception:
+        async with gate:
+            try:
+                return await acall_llm(llm, prompt, **kwargs)
+            except Exception as exc:  # noqa: BLE001 – reported in the result slot
+                return exc
+
+    return list(await asyncio.gather(*(_one(prompt) for prompt in prompts)))
+
+
+async def acall_llm_batched(llm: Any, prompt: str, *, kind: str | None = None, **kwargs: Any) -> str:  # noqa: ANN401
+    """:func:`acall_llm` that may share one request with concurrent same-*kind* calls.
+
+    Meant for tiny, structurally identical prompts issued once per turn
+    (tool selection, profile-fact extraction).  With micro-batching enabled
+    (``ESSAY_AGENT_MICROBATCH=1``) calls of the same *kind* (default: the
+    ``caller`` / call-site tag), client and parameters that overlap in time
+    are sent as one multi-item prompt and demultiplexed; anything the batched
+    answer does not cover is re-sent on its own.  Otherwise this is exactly
+    ``acall_llm(llm, prompt, **kwargs)``.
+    """
+
+    key = (kind or kwargs.get("caller") or current_call_site(), id(llm), make_key(**kwargs))
+
+    async def single() -> str:
+        return await acall_llm(llm, prompt, **kwargs)
+
+    async def send_batch(batch_prompt: str, count: int) -> str:
+        batch_kwargs = dict(kwargs)
+        if batch_kwargs.get("max_tokens"):
+            batch_kwargs["max_tokens"] = int(batch_kwargs["max_tokens"]) * count + 16 * count
+        return await acall_llm(llm, batch_prompt, **batch_kwargs)
+
+    return await _MICRO_BATCHER.submit(key, prompt, single, send_batch)
+
+
+async def stream_llm(llm: Any, prompt: str, **kwargs: Any) -> AsyncIterator[str]:  # noqa: ANN401
+    """Yield completion text chunks as the provider produces them.
+
+    Time-to-first-token replaces total generation time as the latency the user
+    sees.  The request holds a rate-limiter slot for the life of the stream;
+    failures before the first chunk are retried with back-off, later ones are
+    raised because the caller has already shown partial output.  Like
+    :func:`acall_llm`, every attempt passes the model's circuit breaker and
+    the request deadline, and every retry is drawn from the turn's
+    :func:`~essay_agent.llm.budget.retry_budget`.  Streamed completions
+    bypass the response cache and single-flight coalescing.
+
+    >>> async for token in stream_llm(get_chat_llm(), "Say hello"):
+    ...     print(token, end="")
+    """
+
+    kwargs.pop("cache", None)
+    caller = kwargs.pop("caller", None)
+    lane = kwargs.pop("priority", None)
+    if not hasattr(llm, "astream"):
+        yield await acall_llm(llm, prompt, caller=caller, priority=lane, **kwargs)
+        return
+
+    model = _model_name(llm)
+    fake = isinstance(llm, FakeListLLM)
+    label = "fake" if fake else model
+    breaker = None if fake else _breaker(model)
+    attempt = 0
+    while True:
+        emitted = False
+        record_attempt("llm")
+        check_deadline("LLM stream")
+        if breaker is not None:
+            breaker.before_call()
+        if fake:
+            gate: Any = contextlib.nullcontext()
+        else:
+            gate = _LIMITER.limit(model, _estimate_tokens(prompt, model, kwargs), lane=lane)
+        try:
+            with _TELEMETRY.track(label, prompt, site=caller, lane=lane, bind=False) as call:
+                async with gate as waited:
+                    call.queue_wait = waited or 0.0
+                    async for chunk in llm.astream(prompt, **kwargs):
+                        text = _normalise(chunk)
+                        if text:
+                            emitted = True
+                            call.completion += text
+                            yield text
+        except BaseException as exc:  # a closed stream must release a half-open probe too
+            if breaker is not None:
+                breaker.record_failure(exc)
+            attempt += 1
+            # Policy first so a spent per-class allowance never consumes turn budget
+            if (not isinstance(exc, Exception) or emitted or attempt >= _STREAM_ATTEMPTS
+                    or not _should_retry(exc) or not spend_retry("llm")):
+                raise
+            _TELEMETRY.record_retry(label, site=caller)
+            hinted = retry_after(exc)
+            await asyncio.sleep(clamp_delay(min(hinted if hinted is not None else 2 ** attempt, _RETRY_POLICY.max_delay)))
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return
+
+
+async def _adispatch(llm: Any, prompt: str, **kwargs: Any) -> Any:  # noqa: ANN401
+    for name in ("ainvoke", "apredict"):
+        method = getattr(llm, name, None)
+        if method is None:
+            continue
+        result = method(prompt, **kwargs)
+        if inspect.isawaitable(result):
+            return await result
+        # Test doubles occasionally expose sync mocks under async names.
+        return result
+    # Sync-only clients: keep the loop responsive by running them in a worker.
+    return await asyncio.to_thread(_dispatch, llm, prompt, **kwargs)
+
+
+def _dispatch(llm: Any, prompt: str, **kwargs: Any) -> Any:  # noqa: ANN401
     if hasattr(llm, "invoke"):
-        result = llm.invoke(prompt, **kwargs)
-    elif hasattr(llm, "predict"):
-        result = llm.predict(prompt, **kwargs)  # type: ignore[attr-defined]
-    else:
-        raise AttributeError("LLM instance has neither invoke nor predict method")
+        return llm.invoke(prompt, **kwargs)
+    if hasattr(llm, "predict"):
+        return llm.predict(prompt, **kwargs)  # type: ignore[attr-defined]
+    raise AttributeError("LLM instance has neither invoke nor predict method")
+
+
+def _normalise(result: Any) -> str:  # noqa: ANN401
+    """Normalise chat/completion return values to plain text."""
 
     # ChatOpenAI returns an AIMessage; FakeListLLM returns str
     if hasattr(result, "content"):
@@ -272,13 +1042,12 @@ ChatLLM_T = Union["ChatOpenAI", FakeListLLM]  # type: ignore[name-defined]
 CompletionLLM_T = Union["OpenAI", FakeListLLM]  # type: ignore[name-defined] 
 
 def count_tokens(text: str, model: str = "gpt-4") -> int:
-    """Count tokens in text using tiktoken."""
-    try:
-        encoding = tiktoken.encoding_for_model(model)
-        return len(encoding.encode(text))
-    except Exception:
-        # Fallback: rough estimate (1 token ≈ 4 characters)
-        return len(text) // 4
+    """Count tokens in text using the shared cached tokenizer.
+
+    Falls back to a rough estimate (1 token ≈ 4 characters) when the encoding
+    cannot be loaded – see :pymod:`essay_agent.llm.tokenizer`.
+    """
+    return _count_tokens(text, model)
 
 def truncate_context(context: str, max_tokens: int = 25000, model: str = "gpt-4") -> str:
     """Truncate context to fit within token limit, preserving important parts."""
@@ -12,12 +12,13 @@ import json
 import logging
 from typing import Any, Dict, List, Tuple
 
-import tiktoken
 from filelock import FileLock
 from pydantic import BaseModel, Field, field_validator
 
 from langchain.memory import ConversationTokenBufferMemory
 
+from essay_agent.llm.tokenizer import count_tokens
+
 __all__ = ["ContextManagerError", "ContextWindowManager"]
 
 logger = logging.getLogger(__name__)
@@ -47,8 +48,6 @@ class _SessionState(BaseModel):
 class ContextWindowManager:  # pylint: disable=too-many-instance-attributes
     """Manage conversation context with token budget & per-essay sessions."""
 
-    _ENCODING_FALLBACK = "cl100k_base"
-
     def __init__(
         self,
         user_id: str,
@@ -67,13 +66,6 @@ class ContextWindowManager:  # pylint: disable=too-many-instance-attributes
         self.storage_dir = Path(storage_dir)
         self.storage_dir.mkdir(exist_ok=True)
 
-        # tiktoken encoding ---------------------------------------------------
-        try:
-            self._enc = tiktoken.encoding_for_model(model_name)
-        except KeyError:
-            self._enc = tiktoken.get_encoding(self._ENCODING_FALLBACK)
-            logger.warning("Encoding for %s not found; using %s", model_name, self._ENCODING_FALLBACK)
-
         # Load state -----------------------------------------------------------
         self._state: _SessionState = self._load_state()
 
@@ -193,4 +185,5 @@ class ContextWindowManager:  # pylint: disable=too-many-instance-attributes
     # --------------------- token helper --------------------------
 
     def _count_tokens(self, text: str) -> int:
-        return len(self._enc.encode(text)) 
\ No newline at end of file
+        # Shared process-wide tokenizer: encodings load once, repeats are memoized
+        return count_tokens(text, self.model_name) 
\ No newline at end of file
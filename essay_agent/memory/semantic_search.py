@@ -40,6 +40,8 @@ try:
 except ImportError as exc:  # pragma: no cover – dev environment issue
     raise ImportError("LangChain>=0.1.0 and faiss-cpu must be installed") from exc
 
+from essay_agent.llm.http_pool import get_http_pool, model_fields
+
 from . import _profile_path  # storage root helper
 from .user_profile_schema import CoreValue, DefiningMoment, UserProfile
 
@@ -221,8 +223,9 @@ class SemanticSearchIndex:  # pylint: disable=too-few-public-methods
     @staticmethod
     def _get_default_embeddings() -> "Embeddings":  # noqa: D401
         if os.getenv("OPENAI_API_KEY"):
-            # Use OpenAI embeddings when API key available
-            return OpenAIEmbeddings()
+            # Use OpenAI embeddings when API key available, on the shared
+            # connection pool used by the chat clients
+            return OpenAIEmbeddings(**get_http_pool().openai_kwargs(fields=model_fields(OpenAIEmbeddings)))
         return _DeterministicEmbeddings()
 
     @staticmethod
@@ -13,7 +13,7 @@ from typing import Any, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 import re
 
-from essay_agent.llm_client import get_chat_llm, call_llm
+from essay_agent.llm_client import get_chat_llm, acall_llm_batched
 from essay_agent.response_parser import safe_parse
 
 logger = logging.getLogger(__name__)
@@ -273,7 +273,9 @@ class UserContextExtractor:
         Only include details that are explicitly mentioned or clearly implied. Don't make assumptions.
         """
         
-        response = call_llm(self.llm, extraction_prompt, temperature=0.3, max_tokens=600)
+        response = await acall_llm_batched(
+            self.llm, extraction_prompt, temperature=0.3, max_tokens=600, caller="context_extraction"
+        )
         
         # Parse JSON response
         try:
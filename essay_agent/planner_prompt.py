@@ -7,9 +7,44 @@ Builds a concise prompt containing full context and parses the
 returned JSON plan.
 """
 
+import functools
 import json
 import os
-from typing import Any, Dict, List
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Everything before this line in a rendered prompt is static across turns.
+CURRENT_TURN_MARKER = "### CURRENT TURN"
+
+_TEMPLATE_PATH = Path(__file__).resolve().parent / "prompts" / "planner" / "100x_planner_prompt.txt"
+
+# Fallback inline template (should not happen in prod) – same static-first layout
+_INLINE_TEMPLATE = (
+    "{{ role }}\n\nAvailable tools: {{ tools }}\n\nINSTRUCTIONS: 1) decide plan 2) output JSON only.\n\n"
+    + CURRENT_TURN_MARKER
+    + "\n\nContext:\n  last_tool_used: {{ last_tool }}\n  tool_stats: {{ tool_stats }}\n  failure_count: {{ failure_count }}\n"
+    "  college: {{ college }}\n  essay_prompt: {{ essay_prompt }}\n  recent_chat:\n"
+    "{% for line in recent_chat %}    - {{ line }}\n{% endfor %}\nUser message:\n{{ user_input }}\nJSON RESPONSE ONLY:"
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_template() -> Tuple[str, Optional[Any]]:
+    """Read and compile the planner template once per process."""
+
+    template_str = _TEMPLATE_PATH.read_text(encoding="utf-8") if _TEMPLATE_PATH.exists() else _INLINE_TEMPLATE
+    try:
+        from jinja2 import Template  # Optional dependency
+    except ModuleNotFoundError:  # pragma: no cover – fallback rendering
+        return template_str, None
+    return template_str, Template(template_str)
+
+
+def split_static_prefix(prompt: str) -> Tuple[str, str]:
+    """Split a rendered planner prompt into (static prefix, per-turn suffix)."""
+
+    head, marker, tail = prompt.partition(CURRENT_TURN_MARKER)
+    return (head, marker + tail) if marker else ("", prompt)
 
 
 class PlannerPrompt:  # pylint: disable=too-few-public-methods
@@ -30,8 +65,10 @@ class PlannerPrompt:  # pylint: disable=too-few-public-methods
     def build_prompt(self, user_input: str, context: Dict[str, Any]) -> str:  # noqa: D401
         """Return the raw prompt string sent to GPT.
 
-        The prompt embeds structured context followed by the user message and
-        STRICT instructions to output pure JSON.
+        Static blocks (role, rules, tool catalog, schema, few-shot examples)
+        come first and are byte-identical on every call, so the provider's
+        prompt cache can reuse them; the per-turn context and user message
+        follow :data:`CURRENT_TURN_MARKER` at the end.
         """
         recent_chat = context.get("recent_chat", [])[-3:]
         last_tool = context.get("last_tool", "none")
@@ -44,22 +81,9 @@ class PlannerPrompt:  # pylint: disable=too-few-public-methods
         tool_stats = context.get("tool_stats", "")
         failure_count = context.get("failure_count", 0)
 
-        # Render using Jinja template -----------------------------------------
-        from pathlib import Path
-        try:
-            from jinja2 import Template  # Optional dependency
-        except ModuleNotFoundError:  # pragma: no cover – fallback rendering
-            Template = None  # type: ignore[assignment]
-
-        tmpl_path = Path(__file__).resolve().parent / "prompts" / "planner" / "100x_planner_prompt.txt"
-        if not tmpl_path.exists():
-            # Fallback to inline template (should not happen in prod)
-            template_str = "{{ role }}\n\nContext:\n  last_tool_used: {{ last_tool }}\n  tool_stats: {{ tool_stats }}\n  failure_count: {{ failure_count }}\n  college: {{ college }}\n  essay_prompt: {{ essay_prompt }}\n  recent_chat:\n{% for line in recent_chat %}    - {{ line }}\n{% endfor %}\nAvailable tools: {{ tools }}\n\nINSTRUCTIONS: 1) decide plan 2) output JSON only.\nUser message:\n{{ user_input }}\nJSON RESPONSE ONLY:"
-        else:
-            template_str = tmpl_path.read_text(encoding="utf-8")
+        template_str, tmpl = _load_template()
 
-        if Template is not None:
-            tmpl = Template(template_str)
+        if tmpl is not None:
             rendered = tmpl.render(
                 role="You are PlannerGPT-v2, the strategic architect turning user intent into an optimal sequence of tool calls.",
                 last_tool=last_tool,
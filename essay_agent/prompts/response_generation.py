@@ -13,7 +13,7 @@ from typing import Any, Dict, List, Optional, Set
 from dataclasses import dataclass
 import difflib
 
-from essay_agent.llm_client import get_chat_llm, call_llm
+from essay_agent.llm_client import get_chat_llm, acall_llm
 from essay_agent.response_parser import safe_parse
 
 logger = logging.getLogger(__name__)
@@ -138,7 +138,7 @@ class IntelligentResponseGenerator:
         )
         
         # Generate response with LLM
-        response = call_llm(self.llm, generation_prompt, temperature=0.7, max_tokens=800)
+        response = await acall_llm(self.llm, generation_prompt, temperature=0.7, max_tokens=800)
         
         return response.strip()
     
@@ -195,7 +195,7 @@ class IntelligentResponseGenerator:
             conversation_context=self._get_conversation_context(context.conversation_history)
         )
         
-        response = call_llm(self.llm, alternative_prompt, temperature=0.8, max_tokens=800)
+        response = await acall_llm(self.llm, alternative_prompt, temperature=0.8, max_tokens=800)
         
         return response.strip()
     
@@ -225,7 +225,7 @@ class IntelligentResponseGenerator:
         Return the enhanced response:
         """
         
-        enhanced_response = call_llm(self.llm, integration_prompt, temperature=0.6, max_tokens=1000)
+        enhanced_response = await acall_llm(self.llm, integration_prompt, temperature=0.6, max_tokens=1000)
         
         return enhanced_response.strip()
     
@@ -252,7 +252,7 @@ class IntelligentResponseGenerator:
         Enhanced response:
         """
         
-        enhanced_response = call_llm(self.llm, school_enhancement_prompt, temperature=0.5, max_tokens=1000)
+        enhanced_response = await acall_llm(self.llm, school_enhancement_prompt, temperature=0.5, max_tokens=1000)
         
         return enhanced_response.strip()
     
@@ -21,7 +21,7 @@ from typing import Any, Dict, List, Optional, Set
 from dataclasses import dataclass
 from enum import Enum
 
-from essay_agent.llm_client import get_chat_llm, call_llm
+from essay_agent.llm_client import get_chat_llm, acall_llm_batched
 from essay_agent.tools import get_available_tools
 
 
@@ -684,7 +684,7 @@ class ComprehensiveToolSelector:
         """
         
         llm = get_chat_llm(temperature=0.2)
-        return call_llm(llm, prompt)
+        return await acall_llm_batched(llm, prompt, caller="tool_selection")
     
     def _parse_llm_tool_selection(self, response: str) -> List[str]:
         """Parse LLM response to extract tool names."""
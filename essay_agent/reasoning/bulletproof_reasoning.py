@@ -17,7 +17,7 @@ from typing import Any, Dict, Optional
 
 from pydantic import BaseModel, Field, ValidationError
 
-from essay_agent.llm_client import get_chat_llm, call_llm  # type: ignore
+from essay_agent.llm_client import acall_llm, get_chat_llm  # type: ignore
 from essay_agent.response_parser import safe_parse, pydantic_parser
 from essay_agent.tools import REGISTRY as TOOL_REGISTRY
 
@@ -79,7 +79,8 @@ class BulletproofReasoning:
 
         for attempt in range(1, self._MAX_RETRIES + 1):
             try:
-                raw = await self._apredict(prompt)
+                # Retries after a bad answer must not be served the same cached completion
+                raw = await self._apredict(prompt, fresh=attempt > 1)
                 # LangChain may return an AIMessage; extract .content for JSON parsing
                 if not isinstance(raw, str):
                     raw = getattr(raw, "content", str(raw))
@@ -162,11 +163,12 @@ class BulletproofReasoning:
         )
         return prompt
 
-    async def _apredict(self, prompt: str) -> str:  # noqa: D401
-        """Call LLM with unified interface supporting FakeListLLM in tests."""
-        # Some FakeListLLM implement .ainvoke, others only .invoke – unify
-        if hasattr(self.llm, "ainvoke"):
-            return await self.llm.ainvoke(prompt)  # type: ignore
-        # Fallback: run sync call in thread pool
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, lambda: call_llm(self.llm, prompt)) 
\ No newline at end of file
+    async def _apredict(self, prompt: str, *, fresh: bool = False) -> str:  # noqa: D401
+        """Call LLM through the shared client (rate limits, breaker, deadline, telemetry)."""
+        return await acall_llm(
+            self.llm,
+            prompt,
+            caller="bulletproof_reasoning",
+            structured=_ReasoningSchema,
+            cache=False if fresh else None,
+        )
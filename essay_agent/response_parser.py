@@ -13,6 +13,8 @@ from langchain.output_parsers import OutputFixingParser
 from langchain_core.output_parsers import BaseOutputParser
 from pydantic import BaseModel
 
+from essay_agent.llm.structured import record_repair
+from essay_agent.llm.telemetry import track_llm_call
 from essay_agent.llm_client import get_chat_llm
 
 
@@ -78,15 +80,22 @@ def safe_parse(parser: BaseOutputParser, text: str, retries: int = 3) -> Any:
             # range of LangChain releases without pinning to a specific minor
             # version.
 
+            fix_llm = get_chat_llm()
             try:
                 # Old style: (destination_parser, llm=...)
-                fixing_parser = OutputFixingParser.from_llm(parser, llm=get_chat_llm())
+                fixing_parser = OutputFixingParser.from_llm(parser, llm=fix_llm)
             except TypeError:
                 # New style: (llm, destination_parser)
-                fixing_parser = OutputFixingParser.from_llm(get_chat_llm(), parser)  # type: ignore[arg-type]
+                fixing_parser = OutputFixingParser.from_llm(fix_llm, parser)  # type: ignore[arg-type]
 
             try:
-                fixed_text = fixing_parser.parse(text)
+                # OutputFixingParser calls the model directly – record it as JSON repair
+                record_repair()
+                with track_llm_call(
+                    str(getattr(fix_llm, "model_name", None) or "fake"), text, site="json_repair"
+                ) as call:
+                    fixed_text = fixing_parser.parse(text)
+                    call.completion = str(fixed_text)
                 return safe_parse(parser, fixed_text, retries=retries - 1)
             except Exception:
                 # If fixing fails, try manual cleanup
@@ -113,6 +113,8 @@ except ModuleNotFoundError:
 # ---------------------------------------------------------------------------
 # U4-10A – Increase default timeout to 60 s for all tools --------------------
 # ---------------------------------------------------------------------------
+# Per-attempt timeouts are still shortened to the request deadline at call
+# time (see essay_agent.llm.deadline), so this floor never outlasts a request.
 
 for _tool in REGISTRY.values():
     if hasattr(_tool, "timeout") and _tool.timeout is not None and _tool.timeout < 60:  # type: ignore[attr-defined]
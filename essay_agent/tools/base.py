@@ -4,6 +4,7 @@ from __future__ import annotations
 import asyncio
 import functools
 import logging
+import os
 import time
 import traceback
 from abc import ABC
@@ -12,6 +13,10 @@ import re
 
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field, ValidationError
+from essay_agent.llm.budget import clamp_delay, record_attempt, spend_retry
+from essay_agent.llm.deadline import DeadlineExceeded, bound_timeout, expired
+from essay_agent.llm.rate_limiter import loop_running
+from essay_agent.llm.telemetry import call_site
 from essay_agent.llm_client import get_chat_llm
 from essay_agent.utils.json_repair import fix as repair_json
 from essay_agent.tools.errors import ToolError
@@ -52,7 +57,12 @@ def safe_model_to_dict(result: Any) -> Dict[str, Any]:
 class ValidatedTool(BaseTool, ABC):
     """Base class adding timeout & standardized error handling.
 
-    Subclasses implement ``_run`` and optionally ``_arun``.
+    Subclasses implement ``_run`` and optionally ``_arun``.  Async callers use
+    :meth:`acall`, which awaits a native ``_arun`` when present and otherwise
+    runs ``_run`` in a worker thread.
+
+    Inside a request deadline (:pymod:`essay_agent.llm.deadline`) each attempt's
+    timeout is shortened to the time left and no attempt starts after it.
     """
 
     # Tools will often return dicts that are already JSON-serialisable
@@ -72,65 +82,136 @@ class ValidatedTool(BaseTool, ABC):
     def __call__(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:  # type: ignore[override]
         """Synchronous entry point with exponential-backoff retry on failure."""
 
+        # LLM calls made by the tool are labelled with its name in telemetry
+        with call_site(f"tool:{self.name}"):
+            return self._call_with_retries(*args, **kwargs)
+
+    def _call_with_retries(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Sync retry loop behind :meth:`__call__`.
+
+        Off the event loop each attempt runs under ``asyncio.run`` with the
+        timeout and retries back off with ``time.sleep``.  A sync call made
+        *on* a running loop already blocks that loop for the whole of
+        ``_run``, and it cannot hand the work to :meth:`acall` because nothing
+        can await it there.  Backing off would only extend the stall for every
+        other task on the loop, so those retries start immediately.  They are
+        still capped by ``max_attempts``, the turn's retry budget and the
+        request deadline.  Async code should ``await tool.acall(...)``, which
+        backs off with ``asyncio.sleep``.
+        """
         attempt = 0
-        delay = 2.0  # seconds (doubles each retry, starting higher)
-        last_error = None
-        
+        last_error: Exception | None = None
+
         while attempt < self.max_attempts:
+            if expired():
+                return self._deadline_exceeded(last_error, *args, **kwargs)
+            record_attempt(f"tool:{self.name}")
+            timeout = bound_timeout(self.timeout)
+            on_loop = loop_running()
             try:
-                if self.timeout is not None:
-                    # Check if we're already in an async context
-                    try:
-                        loop = asyncio.get_running_loop()
-                        # We're in an async context, just use sync version for now
-                        # TODO: Implement proper async tool execution
-                        result = self._run(*args, **kwargs)
-                    except RuntimeError:
-                        # No running loop, create new one
-                        result = asyncio.run(
-                            asyncio.wait_for(self._arun_wrapper(*args, **kwargs), timeout=self.timeout)
-                        )
+                if timeout is not None and not on_loop:
+                    result = asyncio.run(
+                        asyncio.wait_for(self._arun_wrapper(*args, **kwargs), timeout=timeout)
+                    )
                 else:
+                    # Sync call from inside a running loop: we cannot block on
+                    # the loop we're running on.  Async callers should
+                    # ``await tool.acall(...)`` instead.
                     result = self._run(*args, **kwargs)
-
                 return {"ok": safe_model_to_dict(result), "error": None}
-            except asyncio.TimeoutError as exc:
+            except Exception as exc:  # noqa: BLE001
                 last_error = exc
                 attempt += 1
-                print(f"⏰ Tool '{self.name}' timed out on attempt {attempt}/{self.max_attempts}")
-                
-                if attempt >= self.max_attempts:
-                    # Provide graceful degradation for timeout errors
-                    fb = self._handle_timeout_fallback(*args, **kwargs)
-                    return {"ok": safe_model_to_dict(fb.get("ok")), "error": fb.get("error")}
-                    
+                final = self._after_failure(exc, attempt, *args, **kwargs)
+                if final is not None:
+                    return final
+
+            # No back-off on a running loop – see the docstring
+            if not on_loop:
+                time.sleep(self._backoff(attempt))
+
+        return {"ok": None, "error": safe_model_to_dict(_format_exc(last_error)) if last_error else "Unknown error"}
+
+    async def acall(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Async entry point mirroring :meth:`__call__` without blocking the loop.
+
+        Retries, back-off and timeout fallbacks behave exactly like the sync
+        wrapper, but each attempt awaits :meth:`_arun_wrapper` and back-off
+        uses ``asyncio.sleep`` so other requests keep being served.
+        """
+
+        with call_site(f"tool:{self.name}"):
+            return await self._acall_with_retries(*args, **kwargs)
+
+    async def _acall_with_retries(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        attempt = 0
+        last_error: Exception | None = None
+
+        while attempt < self.max_attempts:
+            if expired():
+                return self._deadline_exceeded(last_error, *args, **kwargs)
+            record_attempt(f"tool:{self.name}")
+            timeout = bound_timeout(self.timeout)
+            try:
+                coro = self._arun_wrapper(*args, **kwargs)
+                if timeout is not None:
+                    coro = asyncio.wait_for(coro, timeout=timeout)
+                result = await coro
+                return {"ok": safe_model_to_dict(result), "error": None}
             except Exception as exc:  # noqa: BLE001
                 last_error = exc
                 attempt += 1
-                print(f"⚠️  Tool '{self.name}' failed on attempt {attempt}/{self.max_attempts}: {type(exc).__name__}")
-                
-                if attempt >= self.max_attempts:
-                    return {"ok": None, "error": safe_model_to_dict(_format_exc(exc))}
-
-            # Exponential backoff with longer delays
-            if attempt < self.max_attempts:
-                import time, os
-                if os.getenv('ESSAY_AGENT_FAST_TEST', '0') == '1':
-                    # Skip real sleeping to keep tests fast
-                    print("🔄 Retrying immediately (FAST_TEST mode)...")
-                    time.sleep(0.01)
-                else:
-                    print(f"🔄 Retrying in {delay:.1f}s...")
-                    time.sleep(delay)
-                    delay = min(delay * 2, 16.0)  # cap the wait to 16s
+                final = self._after_failure(exc, attempt, *args, **kwargs)
+                if final is not None:
+                    return final
+
+            await asyncio.sleep(self._backoff(attempt))
 
         return {"ok": None, "error": safe_model_to_dict(_format_exc(last_error)) if last_error else "Unknown error"}
 
+    def _after_failure(self, exc: Exception, attempt: int, *args: Any, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """Log failed *attempt*; return the final result unless another attempt follows.
+
+        Shared by the sync and async wrappers: timeouts degrade to
+        :meth:`_handle_timeout_fallback` after the last attempt, other errors
+        to a formatted error, and every retry is drawn from the turn's budget.
+        """
+        if isinstance(exc, asyncio.TimeoutError):
+            logger.warning("Tool '%s' timed out on attempt %s/%s", self.name, attempt, self.max_attempts)
+            if attempt >= self.max_attempts:
+                # Provide graceful degradation for timeout errors
+                fb = self._handle_timeout_fallback(*args, **kwargs)
+                return {"ok": safe_model_to_dict(fb.get("ok")), "error": fb.get("error")}
+        else:
+            logger.warning(
+                "Tool '%s' failed on attempt %s/%s: %s", self.name, attempt, self.max_attempts, type(exc).__name__
+            )
+            if attempt >= self.max_attempts:
+                return {"ok": None, "error": safe_model_to_dict(_format_exc(exc))}
+
+        # Retries are drawn from the turn's budget – fail fast once spent
+        if not spend_retry(f"tool:{self.name}"):
+            return self._budget_exhausted(exc, *args, **kwargs)
+        return None
+
+    def _backoff(self, attempt: int) -> float:
+        """Seconds to wait after failed *attempt*: 2s doubling to 16s, within the deadline."""
+
+        if os.getenv("ESSAY_AGENT_FAST_TEST", "0") == "1":
+            # Skip real sleeping to keep tests fast
+            return 0.01
+        delay = clamp_delay(min(2.0 * 2 ** (attempt - 1), 16.0))
+        logger.info("Retrying tool '%s' in %.1fs", self.name, delay)
+        return delay
+
     async def ainvoke(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:  # type: ignore[override]
         try:
+            if expired():
+                raise DeadlineExceeded(f"Tool '{self.name}' not started: request deadline exceeded")
+            timeout = bound_timeout(self.timeout)
             coro = self._arun_wrapper(*args, **kwargs)
-            if self.timeout is not None:
-                coro = asyncio.wait_for(coro, timeout=self.timeout)
+            if timeout is not None:
+                coro = asyncio.wait_for(coro, timeout=timeout)
             result = await coro
             return {"ok": safe_model_to_dict(result), "error": None}
         except Exception as exc:  # noqa: BLE001
@@ -141,7 +222,10 @@ class ValidatedTool(BaseTool, ABC):
     # ------------------------------------------------------------------
 
     async def _arun_wrapper(self, *args: Any, **kwargs: Any):  # noqa: D401
-        # Default implementation delegates to sync _run in thread.
+        # Prefer a native ``_arun`` when the subclass provides one; otherwise
+        # run the sync ``_run`` in a worker thread so the loop stays free.
+        if type(self)._arun is not BaseTool._arun:
+            return await self._arun(*args, **kwargs)
         return await asyncio.to_thread(self._run, *args, **kwargs)
 
     def _handle_timeout_fallback(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
@@ -162,6 +246,24 @@ class ValidatedTool(BaseTool, ABC):
         
         return {"ok": fallback_result, "error": error_msg}
 
+    def _budget_exhausted(self, last_error: Exception | None, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Result returned when the turn's retry budget denies another attempt."""
+
+        logger.warning("Tool '%s' retry budget exhausted – failing fast", self.name)
+        if isinstance(last_error, asyncio.TimeoutError):
+            fb = self._handle_timeout_fallback(*args, **kwargs)
+            return {"ok": safe_model_to_dict(fb.get("ok")), "error": fb.get("error")}
+        return {"ok": None, "error": safe_model_to_dict(_format_exc(last_error)) if last_error else "Retry budget exhausted"}
+
+    def _deadline_exceeded(self, last_error: Exception | None, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        """Result returned when the request deadline passes before another attempt."""
+
+        logger.warning("Tool '%s' stopped – request deadline exceeded", self.name)
+        if last_error is None or isinstance(last_error, asyncio.TimeoutError):
+            fb = self._handle_timeout_fallback(*args, **kwargs)
+            return {"ok": safe_model_to_dict(fb.get("ok")), "error": fb.get("error")}
+        return {"ok": None, "error": safe_model_to_dict(_format_exc(last_error))}
+
     # ------------------------------------------------------------------
     # Shared helper for LLM + parser execution (used by many tools)
     # ------------------------------------------------------------------
@@ -204,6 +306,38 @@ class ValidatedTool(BaseTool, ABC):
 
         # Online path – actual LLM call ------------------------------------
         raw = call_llm(llm, prompt_text)
+        return self._parse_llm_output(raw, parser=parser, required_keys=required_keys)
+
+    async def _acall_llm_with_prompt_and_parser(
+        self,
+        llm,
+        *,
+        prompt_text: str,
+        parser,
+        required_keys: list[str] | None = None,
+    ) -> Dict[str, Any]:  # noqa: D401,E501
+        """Async variant of :meth:`_call_llm_with_prompt_and_parser`."""
+        import os
+        from essay_agent.llm_client import acall_llm
+
+        if os.getenv("ESSAY_AGENT_OFFLINE_TEST") == "1":
+            return self._call_llm_with_prompt_and_parser(
+                llm, prompt_text=prompt_text, parser=parser, required_keys=required_keys
+            )
+
+        raw = await acall_llm(llm, prompt_text)
+        return self._parse_llm_output(raw, parser=parser, required_keys=required_keys)
+
+    def _parse_llm_output(
+        self,
+        raw: str,
+        *,
+        parser,
+        required_keys: list[str] | None = None,
+    ) -> Dict[str, Any]:
+        """Parse *raw* LLM text with *parser*, repairing JSON when needed."""
+        from essay_agent.response_parser import safe_parse
+
         raw = _strip_fences(raw)
         # Debug raw LLM response when flag enabled -------------------------
         import os, textwrap
@@ -99,6 +99,34 @@ class BrainstormTool(ValidatedTool):
     # ------------------------------------------------------------------
     def _run(self, *, essay_prompt: str, profile: str, user_id: str | None = None, 
              college_id: str | None = None, **_: Any) -> Dict[str, Any]:  # type: ignore[override]
+        llm, rendered_prompt = self._prepare_call(essay_prompt, profile, user_id, college_id)
+        from essay_agent.llm_client import call_llm
+        raw = call_llm(
+            llm,
+            rendered_prompt,
+            max_tokens=3000,
+            structured=BrainstormResult
+        )
+        return self._parse_response(raw)
+
+    # ------------------------------------------------------------------
+    # Async execution
+    # ------------------------------------------------------------------
+    async def _arun(self, *, essay_prompt: str, profile: str, user_id: str | None = None,
+                    college_id: str | None = None, **_: Any) -> Dict[str, Any]:  # type: ignore[override]
+        llm, rendered_prompt = self._prepare_call(essay_prompt, profile, user_id, college_id)
+        from essay_agent.llm_client import acall_llm
+        raw = await acall_llm(
+            llm,
+            rendered_prompt,
+            max_tokens=3000,
+            structured=BrainstormResult
+        )
+        return self._parse_response(raw)
+
+    def _prepare_call(self, essay_prompt: str, profile: str, user_id: str | None,
+                      college_id: str | None) -> tuple[Any, str]:
+        """Validate inputs and return the ``(llm, rendered_prompt)`` pair."""
         # -------------------- Input validation -------------------------
         essay_prompt = str(essay_prompt).strip()
         profile = str(profile).strip()
@@ -119,7 +147,7 @@ class BrainstormTool(ValidatedTool):
             prompt_type, college_id
         )
 
-        # -------------------- LLM call --------------------------------
+        # -------------------- LLM selection --------------------------------
         import os, textwrap
         temp = float(os.getenv("ESSAY_AGENT_BRAINSTORM_TEMP", "0.15"))
         llm = get_chat_llm(temperature=temp)
@@ -127,14 +155,11 @@ class BrainstormTool(ValidatedTool):
         if os.getenv("ESSAY_AGENT_SHOW_PROMPTS", "0") == "1":
             preview = textwrap.shorten(rendered_prompt.replace("\n", " "), width=500, placeholder="…")
             print(f"\n=== BRAINSTORM PROMPT (temp={temp}) ===\n{preview}\n==============================\n")
-        from essay_agent.llm_client import call_llm
-        raw = call_llm(
-            llm,
-            rendered_prompt,
-            max_tokens=3000,
-            response_format={"type": "json_object"}
-        )
+        return llm, rendered_prompt
 
+    def _parse_response(self, raw: str) -> Dict[str, Any]:
+        """Parse the raw LLM response into a plain dict."""
+        import os
         # Optional raw response debug
         if os.getenv("ESSAY_AGENT_TOOL_RAW", "0") == "1":
             from essay_agent.utils.logging import debug_print
@@ -23,6 +23,7 @@ from essay_agent.response_parser import safe_parse, schema_parser
 
 # JSON schema used for validating the main LLM response -----------------------
 _SCHEMA = {
+    "title": "DraftResult",
     "type": "object",
     "properties": {
         "draft": {"type": "string"},
@@ -32,6 +33,7 @@ _SCHEMA = {
 
 # JSON schema for expansion responses ------------------------------------------
 _EXPANSION_SCHEMA = {
+    "title": "ExpansionResult",
     "type": "object",
     "properties": {
         "expanded_draft": {"type": "string"},
@@ -41,6 +43,7 @@ _EXPANSION_SCHEMA = {
 
 # JSON schema for trimming responses -------------------------------------------
 _TRIMMING_SCHEMA = {
+    "title": "TrimmingResult",
     "type": "object",
     "properties": {
         "trimmed_draft": {"type": "string"},
@@ -362,7 +365,7 @@ Suggested next step: Retry with simplified outline or manual drafting
 
         llm = get_chat_llm()
         from essay_agent.llm_client import call_llm
-        response: str = call_llm(llm, enhanced_prompt)
+        response: str = call_llm(llm, enhanced_prompt, structured=_SCHEMA)
 
         # Allow FakeListLLM deterministic fallback
         if isinstance(llm, FakeListLLM):
@@ -391,7 +394,7 @@ Suggested next step: Retry with simplified outline or manual drafting
 
         llm = get_chat_llm()
         from essay_agent.llm_client import call_llm
-        response: str = call_llm(llm, expansion_prompt)
+        response: str = call_llm(llm, expansion_prompt, structured=_EXPANSION_SCHEMA)
 
         parsed = safe_parse(schema_parser(_EXPANSION_SCHEMA), response)
         expanded_draft: str = str(parsed["expanded_draft"]).strip()
@@ -416,7 +419,7 @@ Suggested next step: Retry with simplified outline or manual drafting
 
         llm = get_chat_llm()
         from essay_agent.llm_client import call_llm
-        response: str = call_llm(llm, trimming_prompt)
+        response: str = call_llm(llm, trimming_prompt, structured=_TRIMMING_SCHEMA)
 
         parsed = safe_parse(schema_parser(_TRIMMING_SCHEMA), response)
         trimmed_draft: str = str(parsed["trimmed_draft"]).strip()
@@ -11,6 +11,8 @@ offline (``FakeListLLM``) or the response cannot be parsed as JSON.
 import json
 from typing import Any, Dict, List
 
+from pydantic import BaseModel
+
 from essay_agent.llm_client import chat
 from essay_agent.prompts.outline import OUTLINE_PROMPT
 from essay_agent.prompts.templates import render_template
@@ -21,6 +23,24 @@ from essay_agent.memory.user_profile_schema import EssayVersion
 from datetime import datetime
 
 
+# ---------------------------------------------------------------------------
+# Output schema – requested from the provider as structured output and used
+# to validate the response, so the two cannot drift apart
+# ---------------------------------------------------------------------------
+
+class OutlineSections(BaseModel):
+    hook: str
+    context: str
+    conflict: str
+    growth: str
+    reflection: str
+
+
+class OutlineResult(BaseModel):
+    outline: OutlineSections
+    estimated_word_count: int
+
+
 # ---------------------------------------------------------------------------
 # Helper utilities
 # ---------------------------------------------------------------------------
@@ -122,18 +142,14 @@ class OutlineTool(ValidatedTool):
                 debug_print(VERBOSE, f"Calling LLM for outline generation...")
             
             # Get LLM response
-            response = chat(rendered_prompt)
+            response = chat(rendered_prompt, structured=OutlineResult)
             
             if VERBOSE:
                 debug_print(VERBOSE, f"LLM response received: {len(response)} characters")
             
-            # Try to parse as JSON
+            # Parse and validate against the same schema requested from the provider
             try:
-                outline_data = json.loads(response)
-                
-                # Validate outline structure
-                if not isinstance(outline_data, dict) or "outline" not in outline_data:
-                    raise ValueError("Invalid outline format")
+                outline_data = OutlineResult.model_validate_json(response).model_dump()
                 
                 # Add keyword planning metadata
                 outline_data.update({
@@ -150,7 +166,7 @@ class OutlineTool(ValidatedTool):
                 
                 return outline_data
                 
-            except (json.JSONDecodeError, ValueError) as e:
+            except ValueError as e:  # pydantic.ValidationError included
                 if VERBOSE:
                     debug_print(VERBOSE, f"JSON parsing failed: {e}, using fallback")
                 
@@ -8,8 +8,6 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
-from langchain.llms.fake import FakeListLLM
-
 from essay_agent.tools import register_tool
 from essay_agent.tools.base import ValidatedTool
 from essay_agent.prompts.templates import render_template
@@ -22,6 +20,7 @@ from essay_agent.prompts.polish import POLISH_PROMPT
 # ---------------------------------------------------------------------------
 
 _SCHEMA = {
+    "title": "PolishResult",
     "type": "object",
     "properties": {
         "final_draft": {"type": "string"},
@@ -58,6 +57,27 @@ class PolishTool(ValidatedTool):
     # Sync execution
     # ------------------------------------------------------------------
     def _run(self, *, draft: str, word_count: int = 650, **_: Any) -> Dict[str, str]:  # type: ignore[override]
+        prompt = self._render_prompt(draft, word_count)
+
+        # -------------------- LLM call --------------------------------
+        llm = get_chat_llm()
+        from essay_agent.llm_client import call_llm
+        response: str = call_llm(llm, prompt, structured=_SCHEMA)
+        return self._parse_response(response, word_count)
+
+    # ------------------------------------------------------------------
+    # Async execution
+    # ------------------------------------------------------------------
+    async def _arun(self, *, draft: str, word_count: int = 650, **_: Any) -> Dict[str, str]:  # type: ignore[override]
+        prompt = self._render_prompt(draft, word_count)
+
+        llm = get_chat_llm()
+        from essay_agent.llm_client import acall_llm
+        response: str = await acall_llm(llm, prompt, structured=_SCHEMA)
+        return self._parse_response(response, word_count)
+
+    def _render_prompt(self, draft: Any, word_count: int) -> str:
+        """Validate *draft* / *word_count* and render the polish prompt."""
         # -------------------- Input validation -------------------------
         from essay_agent.tools.errors import ToolError
         
@@ -88,19 +108,12 @@ class PolishTool(ValidatedTool):
             raise ValueError("word_count must be between 5 and 1000.")
 
         # -------------------- Render prompt ----------------------------
-        prompt = render_template(
+        return render_template(
             POLISH_PROMPT, draft=draft, word_count=word_count
         )
 
-        # -------------------- LLM call --------------------------------
-        llm = get_chat_llm()
-        from essay_agent.llm_client import call_llm
-        response: str = call_llm(llm, prompt)
-
-        # For FakeListLLM offline mode, response is deterministic string
-        if isinstance(llm, FakeListLLM):
-            pass  # no-op; parse normally
-
+    def _parse_response(self, response: str, word_count: int) -> Dict[str, Any]:
+        """Parse the LLM response and annotate word-count compliance."""
         # -------------------- Parse & validate -------------------------
         parsed = safe_parse(schema_parser(_SCHEMA), response)
         final_draft: str = str(parsed["final_draft"]).strip()
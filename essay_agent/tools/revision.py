@@ -7,15 +7,26 @@ specific focus (e.g. "tighten opening", "add vivid detail") and returns the
 revised draft plus a bullet-style changelog.
 """
 
-import json
 from typing import Any, Dict, List
 
+from pydantic import BaseModel, Field, ValidationError
+
 from essay_agent.llm_client import chat
 from essay_agent.prompts.revision import REVISION_PROMPT
 from essay_agent.prompts.templates import render_template
 from essay_agent.tools.base import ValidatedTool
 from essay_agent.tools import register_tool
 
+# ---------------------------------------------------------------------------
+# Output schema – requested from the provider as structured output and used
+# to validate the response, so the two cannot drift apart
+# ---------------------------------------------------------------------------
+
+class RevisionResult(BaseModel):
+    revised_draft: str
+    changes: List[str] = Field(..., min_length=1)
+
+
 # ---------------------------------------------------------------------------
 # Helper
 # ---------------------------------------------------------------------------
@@ -95,25 +106,18 @@ class RevisionTool(ValidatedTool):
             word_count=word_count or "N/A",
         )
 
-        raw = chat(prompt_rendered, temperature=0)
+        raw = chat(prompt_rendered, temperature=0, structured=RevisionResult)
 
         if raw == "FAKE_RESPONSE":
             return _build_stub(draft)
 
         try:
-            parsed: Dict[str, Any] = json.loads(raw)
-        except json.JSONDecodeError:
-            return _build_stub(draft)
-
-        # Basic validation --------------------------------------------------
-        if not isinstance(parsed.get("revised_draft"), str):
-            return _build_stub(draft)
-        changes = parsed.get("changes")
-        if not isinstance(changes, list) or not changes:
+            parsed: Dict[str, Any] = RevisionResult.model_validate_json(raw).model_dump()
+        except ValidationError:
             return _build_stub(draft)
 
-        # Ensure all change entries strings ---------------------------------
-        parsed["changes"] = [str(c).strip() for c in changes if str(c).strip()]
+        # Drop blank change entries -----------------------------------------
+        parsed["changes"] = [c.strip() for c in parsed["changes"] if c.strip()]
         if not parsed["changes"]:
             parsed["changes"] = _stub_changes()
 
@@ -279,7 +279,7 @@ class SmartOrchestrator:  # pylint: disable=too-few-public-methods
                         # Execute the tool with state
                         tool_class = tool_classes[tool_name]
                         tool = tool_class()
-                        result = tool._run(state)
+                        result = await asyncio.to_thread(tool._run, state)
                         
                         # Save updated state
                         manager.save_state(state)
@@ -6,6 +6,7 @@ Includes plagiarism detection, cliche identification, outline alignment, and fin
 
 from __future__ import annotations
 
+import asyncio
 import json
 import re
 import time
@@ -18,7 +19,7 @@ from pydantic import BaseModel, Field
 
 from essay_agent.tools.base import ValidatedTool
 from essay_agent.tools import register_tool
-from essay_agent.llm_client import call_llm, get_chat_llm
+from essay_agent.llm_client import acall_llm, call_llm, get_chat_llm
 from essay_agent.prompts.validation import (
     PLAGIARISM_DETECTION_PROMPT,
     CLICHE_DETECTION_PROMPT,
@@ -152,6 +153,14 @@ class BaseValidator(ABC):
     def validate(self, essay: str, context: Dict[str, Any]) -> ValidationResult:
         """Validate essay and return result."""
         pass
+
+    async def avalidate(self, essay: str, context: Dict[str, Any]) -> ValidationResult:
+        """Async variant of :meth:`validate` for use from workflow nodes.
+
+        Runs the (LLM-backed) sync implementation in a worker thread so the
+        event loop keeps serving other requests during the round-trip.
+        """
+        return await asyncio.to_thread(self.validate, essay, context)
     
     def _create_issue(self, issue_type: str, severity: ValidationSeverity, 
                      message: str, text_excerpt: str = "", line_number: Optional[int] = None, 
@@ -934,6 +943,18 @@ class ComprehensiveValidationTool(ValidatedTool):
     timeout: float = 60.0  # This is a complex, multi-check validation
 
     def _run(self, *, essay_text: str, essay_prompt: str, outline: str, **_: Any) -> Dict[str, Any]:
+        rendered_prompt = self._render_prompt(essay_text, essay_prompt, outline)
+        llm = get_chat_llm(temperature=0.1)
+        raw = call_llm(llm, rendered_prompt)
+        return self._parse(raw)
+
+    async def _arun(self, *, essay_text: str, essay_prompt: str, outline: str, **_: Any) -> Dict[str, Any]:
+        rendered_prompt = self._render_prompt(essay_text, essay_prompt, outline)
+        llm = get_chat_llm(temperature=0.1)
+        raw = await acall_llm(llm, rendered_prompt)
+        return self._parse(raw)
+
+    def _render_prompt(self, essay_text: str, essay_prompt: str, outline: str) -> str:
         essay_text = str(essay_text).strip()
         essay_prompt = str(essay_prompt).strip()
         outline = str(outline).strip()
@@ -941,17 +962,15 @@ class ComprehensiveValidationTool(ValidatedTool):
         if not essay_text or not essay_prompt or not outline:
             raise ValueError("essay_text, essay_prompt, and outline must not be empty.")
 
-        rendered_prompt = render_template(
+        return render_template(
             COMPREHENSIVE_VALIDATION_PROMPT,
             essay_text=essay_text,
             essay_prompt=essay_prompt,
             outline=outline,
         )
 
-        llm = get_chat_llm(temperature=0.1)
-        raw = call_llm(llm, rendered_prompt)
-
+    def _parse(self, raw: str) -> Dict[str, Any]:
         parser = pydantic_parser(ComprehensiveValidationResult)
         parsed = safe_parse(parser, raw)
         
-        return parsed.model_dump() 
\ No newline at end of file
+        return parsed.model_dump()
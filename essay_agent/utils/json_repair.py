@@ -125,6 +125,7 @@ def fix(raw_text: str, schema_text: str = "") -> str:  # noqa: D401
     # 4. Online – delegate to GPT repair pass ---------------------------
     # ------------------------------------------------------------------
     try:
+        from essay_agent.llm.structured import record_repair
         from essay_agent.llm_client import get_chat_llm, call_llm
 
         system_msg = (
@@ -139,7 +140,8 @@ def fix(raw_text: str, schema_text: str = "") -> str:  # noqa: D401
             messages.append({"role": "assistant", "content": f"SCHEMA:\n{schema_text}"})
 
         llm = get_chat_llm(model_name="gpt-3.5-turbo-0125", temperature=0.0)
-        repaired = call_llm(llm, messages)  # type: ignore[arg-type]
+        record_repair()  # counted against the calling site (e.g. ``tool:brainstorm``)
+        repaired = call_llm(llm, messages, caller="json_repair")  # type: ignore[arg-type]
         repaired = _strip_fences(repaired)
 
         # Debug output when requested -----------------------------------
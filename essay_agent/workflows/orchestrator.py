@@ -12,6 +12,7 @@ from dataclasses import dataclass
 from pathlib import Path
 
 from ..executor import EssayExecutor
+from ..llm.priority import BACKGROUND, BATCH, INTERACTIVE, priority
 from ..monitoring import (
     WorkflowMetrics, 
     ResourceManager, 
@@ -22,6 +23,9 @@ from ..monitoring import (
 )
 from ..utils.logging import tool_trace
 
+# WorkflowConfig.priority -> rate-limiter lane for the workflow's LLM calls.
+_LLM_LANES = {'high': INTERACTIVE, 'normal': BACKGROUND, 'low': BATCH}
+
 
 @dataclass
 class WorkflowConfig:
@@ -299,8 +303,10 @@ class WorkflowOrchestrator:
         self.metrics.record_tool_execution = monitored_record
         
         try:
-            # Execute the workflow
-            result = await self.executor.arun(workflow_config.prompt, context)
+            # Execute the workflow in its LLM priority lane (behind interactive
+            # chat traffic unless the workflow is marked high priority)
+            with priority(_LLM_LANES.get(workflow_config.priority, BACKGROUND)):
+                result = await self.executor.arun(workflow_config.prompt, context)
             return result
             
         finally:
@@ -6,6 +6,7 @@ Orchestrates plagiarism detection, cliche identification, outline alignment, and
 
 from __future__ import annotations
 
+import logging
 import time
 from typing import Any, Dict, List, Optional
 
@@ -19,6 +20,8 @@ from essay_agent.tools.validation_tools import (
 from essay_agent.models import EssayPlan, Phase
 from essay_agent.utils.logging import tool_trace
 
+logger = logging.getLogger(__name__)
+
 
 class QAValidationPipeline:
     """Pipeline for comprehensive essay QA validation."""
@@ -37,28 +40,53 @@ class QAValidationPipeline:
         """Run complete validation pipeline."""
         start_time = time.time()
         validator_results = {}
-        all_issues = []
-        total_score = 0.0
-        validators_run = 0
         
         for validator in self.validators:
             try:
                 # Run individual validator
                 result = validator.validate(essay, context)
-                validator_results[validator.name] = result
-                all_issues.extend(result.issues)
-                total_score += result.score
-                validators_run += 1
-                
-                # Stop early if critical failure and early stopping is enabled
-                critical_issues = [issue for issue in result.issues if issue.severity == ValidationSeverity.CRITICAL]
-                if self.early_stopping and critical_issues:
-                    break
-                    
             except Exception as e:
-                print(f"Validator {validator.name} failed: {e}")
+                logger.warning("Validator %s failed: %s", validator.name, e)
                 # Continue with other validators
                 continue
+            validator_results[validator.name] = result
+            if self._should_stop(result):
+                break
+        
+        return self._summarize(validator_results, start_time)
+
+    async def arun_validation(self, essay: str, context: Dict[str, Any]) -> ComprehensiveValidationResult:
+        """Async variant of :meth:`run_validation` used by workflow nodes.
+
+        Validators are awaited one at a time so early stopping still skips the
+        remaining LLM calls after a critical failure.
+        """
+        start_time = time.time()
+        validator_results = {}
+
+        for validator in self.validators:
+            try:
+                result = await validator.avalidate(essay, context)
+            except Exception as e:
+                logger.warning("Validator %s failed: %s", validator.name, e)
+                continue
+            validator_results[validator.name] = result
+            if self._should_stop(result):
+                break
+
+        return self._summarize(validator_results, start_time)
+
+    def _should_stop(self, result: ValidationResult) -> bool:
+        """Stop early if critical failure and early stopping is enabled."""
+        return self.early_stopping and any(
+            issue.severity == ValidationSeverity.CRITICAL for issue in result.issues
+        )
+
+    def _summarize(self, validator_results: Dict[str, ValidationResult], start_time: float) -> ComprehensiveValidationResult:
+        """Aggregate per-validator results into the pipeline's overall result."""
+        all_issues = [issue for result in validator_results.values() for issue in result.issues]
+        validators_run = len(validator_results)
+        total_score = sum(result.score for result in validator_results.values())
         
         # Calculate overall results
         overall_score = total_score / validators_run if validators_run > 0 else 0.0
@@ -155,7 +183,7 @@ class QAValidationNode(WorkflowNode):
             context = self._prepare_validation_context(state)
             
             # Run validation
-            result = self.pipeline.run_validation(essay_text, context)
+            result = await self.pipeline.arun_validation(essay_text, context)
             
             # Convert result to dict for state updates
             return {
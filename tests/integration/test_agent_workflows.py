@@ -149,7 +149,7 @@ class TestCompleteReActWorkflows:
                 call_count += 1
                 return response
             
-            mock_llm.apredict = mock_predict
+            mock_llm.ainvoke = mock_predict
             mock_get_llm.return_value = mock_llm
             
             # Mock tool registry
@@ -186,7 +186,7 @@ class TestCompleteReActWorkflows:
         """Test context continuity across multiple conversation turns."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = mock_llm_responses["conversation_response"]
+            mock_llm.ainvoke.return_value = mock_llm_responses["conversation_response"]
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
@@ -244,7 +244,7 @@ class TestCompleteReActWorkflows:
                 else:
                     return "Generated response based on tool execution"
             
-            mock_llm.apredict = mock_predict
+            mock_llm.ainvoke = mock_predict
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
@@ -293,7 +293,7 @@ class TestCompleteReActWorkflows:
                 else:
                     return mock_llm_responses["error_recovery"]
             
-            mock_llm.apredict = mock_predict
+            mock_llm.ainvoke = mock_predict
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
@@ -330,7 +330,7 @@ class TestCompleteReActWorkflows:
         """Test memory system integration throughout workflow steps."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = mock_llm_responses["brainstorm_reasoning"]
+            mock_llm.ainvoke.return_value = mock_llm_responses["brainstorm_reasoning"]
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
@@ -372,7 +372,7 @@ class TestCompleteReActWorkflows:
         """Test performance metrics tracking throughout workflows."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = mock_llm_responses["conversation_response"]
+            mock_llm.ainvoke.return_value = mock_llm_responses["conversation_response"]
             mock_get_llm.return_value = mock_llm
             
             agent = EssayReActAgent(temp_user_id)
@@ -456,7 +456,7 @@ class TestWorkflowIntegrationScenarios:
                 else:
                     return """{"response_type": "conversation", "confidence": 0.7}"""
             
-            mock_llm.apredict = mock_predict
+            mock_llm.ainvoke = mock_predict
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
@@ -503,7 +503,7 @@ class TestWorkflowIntegrationScenarios:
         """Test handling of concurrent or rapidly sequential requests."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = """{"response_type": "conversation", "confidence": 0.8}"""
+            mock_llm.ainvoke.return_value = """{"response_type": "conversation", "confidence": 0.8}"""
             mock_get_llm.return_value = mock_llm
             
             agent = EssayReActAgent(temp_user_id)
@@ -529,7 +529,7 @@ class TestWorkflowIntegrationScenarios:
         """Test workflow state persistence across agent recreations."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = """{"response_type": "conversation", "confidence": 0.8}"""
+            mock_llm.ainvoke.return_value = """{"response_type": "conversation", "confidence": 0.8}"""
             mock_get_llm.return_value = mock_llm
             
             # First agent session
@@ -565,7 +565,7 @@ class TestCrossComponentIntegration:
         """Test integration between reasoning engine and action executor."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = """{
+            mock_llm.ainvoke.return_value = """{
                 "context_understanding": "User needs help",
                 "reasoning": "Should use brainstorm tool",
                 "chosen_tool": "brainstorm",
@@ -600,7 +600,7 @@ class TestCrossComponentIntegration:
         """Test memory system integration throughout complete workflows."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = """{"response_type": "conversation", "confidence": 0.8}"""
+            mock_llm.ainvoke.return_value = """{"response_type": "conversation", "confidence": 0.8}"""
             mock_get_llm.return_value = mock_llm
             
             agent = EssayReActAgent(temp_user_id)
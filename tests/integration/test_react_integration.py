@@ -82,7 +82,7 @@ class TestReActIntegration:
                 else:
                     return mock_llm_responses["response_generation"]
             
-            mock_llm.apredict = mock_predict
+            mock_llm.ainvoke = mock_predict
             mock_get_llm.return_value = mock_llm
             
             # Mock the brainstorm tool
@@ -140,7 +140,7 @@ class TestReActIntegration:
                     else:
                         return "You're doing great! Take it one step at a time."
             
-            mock_llm.apredict = mock_predict
+            mock_llm.ainvoke = mock_predict
             mock_get_llm.return_value = mock_llm
             
             # Mock tools
@@ -187,7 +187,7 @@ class TestReActIntegration:
                 else:
                     raise Exception("LLM service temporarily unavailable")
             
-            mock_llm.apredict = mock_predict
+            mock_llm.ainvoke = mock_predict
             mock_get_llm.return_value = mock_llm
             
             # Mock failing tool
@@ -213,7 +213,7 @@ class TestReActIntegration:
         """Test tool validation and execution pathways."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = mock_llm_responses["brainstorm_reasoning"]
+            mock_llm.ainvoke.return_value = mock_llm_responses["brainstorm_reasoning"]
             mock_get_llm.return_value = mock_llm
             
             # Mock tool registry with validation
@@ -246,7 +246,7 @@ class TestReActIntegration:
         """Test performance metrics tracking across interactions."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = mock_llm_responses["conversation_reasoning"]
+            mock_llm.ainvoke.return_value = mock_llm_responses["conversation_reasoning"]
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
@@ -295,7 +295,7 @@ class TestReActIntegration:
                     observed_contexts.append("has_essay_state")
                 return mock_llm_responses["conversation_reasoning"]
             
-            mock_llm.apredict = mock_predict
+            mock_llm.ainvoke = mock_predict
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
@@ -337,7 +337,7 @@ class TestReActIntegration:
                 else:
                     return mock_llm_responses["conversation_reasoning"]  # Conversation
             
-            mock_llm.apredict = mock_predict
+            mock_llm.ainvoke = mock_predict
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
@@ -370,7 +370,7 @@ async def test_react_agent_memory_integration(temp_user_id):
     # This test uses more real components to test actual integration
     with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
         mock_llm = AsyncMock()
-        mock_llm.apredict.return_value = """{
+        mock_llm.ainvoke.return_value = """{
             "context_understanding": "User greeting",
             "reasoning": "User is starting conversation",
             "response_type": "conversation",
@@ -405,7 +405,7 @@ class TestReActStressScenarios:
         """Test handling of rapid sequential messages."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = mock_llm_responses["conversation_reasoning"]
+            mock_llm.ainvoke.return_value = mock_llm_responses["conversation_reasoning"]
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
@@ -437,7 +437,7 @@ class TestReActStressScenarios:
         """Test extended conversation session."""
         with patch('essay_agent.llm_client.get_chat_llm') as mock_get_llm:
             mock_llm = AsyncMock()
-            mock_llm.apredict.return_value = mock_llm_responses["conversation_reasoning"]
+            mock_llm.ainvoke.return_value = mock_llm_responses["conversation_reasoning"]
             mock_get_llm.return_value = mock_llm
             
             with patch('essay_agent.agent.tools.tool_registry.ENHANCED_REGISTRY') as mock_registry:
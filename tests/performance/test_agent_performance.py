@@ -134,7 +134,7 @@ class TestReActAgentPerformance:
             return '{"response_type": "conversation", "confidence": 0.8}'
         
         mock_llm = AsyncMock()
-        mock_llm.apredict = fast_predict
+        mock_llm.ainvoke = fast_predict
         return mock_llm
     
     @pytest.mark.performance
@@ -300,7 +300,7 @@ class TestConcurrentPerformance:
             return '{"response_type": "conversation", "confidence": 0.8}'
         
         mock_llm = AsyncMock()
-        mock_llm.apredict = fast_predict
+        mock_llm.ainvoke = fast_predict
         return mock_llm
     
     @pytest.mark.performance
@@ -474,7 +474,7 @@ class TestPerformanceRegression:
             return '{"response_type": "conversation", "confidence": 0.8}'
         
         mock_llm = AsyncMock()
-        mock_llm.apredict = predict
+        mock_llm.ainvoke = predict
         return mock_llm
     
     @pytest.mark.performance
@@ -0,0 +1,106 @@
+"""End-to-end turn latency with context extraction overlapped with reasoning.
+
+Each turn replays an extraction and a reasoning latency (modelled on recorded
+sessions, scaled down 10x so the test stays fast) through the real
+``EssayReActAgent.handle_message`` with a real ``AgentMemory`` on a scratch
+profile store; retrieval indexing, acting and responding are stubbed.  Some
+turns reveal a core value, so the extraction changes a profile field
+reasoning reads and the overlapped path has to re-run reasoning.
+
+The same turns run sequentially (``overlap_extraction = False``, the old
+order) and overlapped; p50/p95 of the end-to-end turn time are compared.
+
+Run with ``pytest tests/performance/test_context_overlap.py -s`` to see the
+numbers.
+"""
+import asyncio
+import statistics
+import time
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from essay_agent.agent.core.react_agent import EssayReActAgent
+
+# (extraction seconds, reasoning seconds, extraction adds a core value)
+RECORDED_TURNS = [
+    (0.09, 0.14, False), (0.07, 0.12, False), (0.11, 0.16, True), (0.08, 0.13, False),
+    (0.10, 0.18, False), (0.06, 0.11, False), (0.12, 0.15, False), (0.09, 0.20, False),
+    (0.08, 0.12, False), (0.13, 0.17, True), (0.07, 0.14, False), (0.10, 0.13, False),
+    (0.09, 0.16, False), (0.08, 0.12, False), (0.11, 0.19, False), (0.07, 0.13, False),
+    (0.10, 0.15, False), (0.09, 0.14, False), (0.12, 0.18, False), (0.08, 0.12, False),
+]
+
+
+def _agent():
+    from essay_agent.agent.memory.agent_memory import AgentMemory
+
+    with patch('essay_agent.agent.memory.agent_memory.ContextRetriever'), \
+         patch('essay_agent.agent.memory.agent_memory.MemoryIndexer'):
+        memory = AgentMemory("benchmark_user")
+    with patch('essay_agent.agent.core.react_agent.AgentMemory', return_value=memory), \
+         patch('essay_agent.agent.core.react_agent.PromptBuilder'), \
+         patch('essay_agent.agent.core.react_agent.PromptOptimizer'), \
+         patch('essay_agent.agent.core.react_agent.ReasoningEngine'), \
+         patch('essay_agent.agent.core.react_agent.ActionExecutor'):
+        agent = EssayReActAgent("benchmark_user")
+
+    agent.school_injector = Mock(extract_school_from_input=Mock(return_value=None))
+    agent._act = AsyncMock(return_value=Mock(action_type="conversation", success=True))
+    agent._respond = AsyncMock(return_value="ok")
+    agent._update_interaction_memory = AsyncMock()
+    agent._update_tracking_attributes = Mock()
+    return agent
+
+
+async def _replay(overlap):
+    agent = _agent()
+    agent.overlap_extraction = overlap
+    durations = []
+
+    for i, (extract_s, reason_s, adds_value) in enumerate(RECORDED_TURNS):
+        async def extract(existing_profile, extract_s=extract_s, adds_value=adds_value, i=i, **_):
+            await asyncio.sleep(extract_s)
+            update = {"interests": ["robotics"]}
+            if adds_value:
+                update["core_values"] = [{"value": f"Value {i} ({overlap})", "description": ""}]
+            return Mock(new_experiences=[], new_interests=[], new_background=[], new_goals=[],
+                        updated_profile={**existing_profile, **update}, integration_summary="")
+
+        async def reason(reason_s=reason_s, **_):
+            await asyncio.sleep(reason_s)
+            return Mock(response_type="conversation", confidence=0.9)
+
+        agent.context_extractor = Mock(extract_and_update_context=extract)
+        agent.reasoning_engine.reason_about_action = AsyncMock(side_effect=reason)
+
+        start = time.perf_counter()
+        await agent.handle_message(f"turn {i}")
+        durations.append(time.perf_counter() - start)
+
+    return durations, agent.extraction_stats
+
+
+def _p(durations, q):
+    return statistics.quantiles(durations, n=100, method="inclusive")[q - 1]
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_overlapped_extraction_cuts_turn_latency(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "memory_store").mkdir()
+    sequential, _ = await _replay(overlap=False)
+    overlapped, stats = await _replay(overlap=True)
+
+    seq_p50, seq_p95 = _p(sequential, 50), _p(sequential, 95)
+    ovl_p50, ovl_p95 = _p(overlapped, 50), _p(overlapped, 95)
+    print(
+        f"\n{len(RECORDED_TURNS)} turns: sequential p50 {seq_p50 * 1000:.0f} ms / p95 {seq_p95 * 1000:.0f} ms; "
+        f"overlapped p50 {ovl_p50 * 1000:.0f} ms / p95 {ovl_p95 * 1000:.0f} ms "
+        f"(saving p50 {1 - ovl_p50 / seq_p50:.0%} / p95 {1 - ovl_p95 / seq_p95:.0%}, "
+        f"{stats['reasoning_reruns']} reasoning re-runs)"
+    )
+    assert stats["reasoning_reruns"] == sum(1 for *_, sets in RECORDED_TURNS if sets)
+    # Re-run turns cost an extra reasoning pass, so only the median is asserted
+    assert ovl_p50 < seq_p50 * 0.75
@@ -0,0 +1,94 @@
+"""Connection reuse of the shared HTTP pool against the local mock server.
+
+The mock server runs on a real localhost socket (uvicorn in a background
+thread) so TCP connections are actually opened.  The same sequence of chat
+calls – each through a freshly built ``ChatOpenAI``, as happens when the
+client pool builds one per configuration – is made twice:
+
+* every client on its own ``httpx`` client (the old behaviour);
+* every client on :func:`essay_agent.llm.http_pool.get_http_pool`'s clients.
+
+The server counts distinct client connections; the pool's own trace counters
+must agree that connections were reused.
+
+Run with ``pytest tests/performance/test_http_pool_reuse.py -s`` to see the
+numbers.
+"""
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+uvicorn = pytest.importorskip("uvicorn")
+langchain_openai = pytest.importorskip("langchain_openai")
+
+from essay_agent.llm.http_pool import HttpPool, HttpPoolConfig  # noqa: E402
+from essay_agent.llm.mock_server import create_app  # noqa: E402
+
+CALLS = 24
+CONCURRENCY = 4
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def mock_server():
+    app = create_app("instant")
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 10
+    while not server.started and time.time() < deadline:
+        time.sleep(0.02)
+    yield f"http://127.0.0.1:{port}/v1", app.state.mock
+    server.should_exit = True
+    thread.join(timeout=5)
+
+
+async def _run(base_url, http_kwargs):
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i):
+        async with semaphore:
+            llm = langchain_openai.ChatOpenAI(
+                model_name="gpt-4o", openai_api_key="mock", openai_api_base=base_url, max_retries=0, **http_kwargs()
+            )
+            return (await llm.ainvoke(f"Select tools for request {i}")).content
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(CALLS)))
+    return time.perf_counter() - start
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_shared_pool_reuses_connections(mock_server):
+    base_url, state = mock_server
+
+    cold_time = await _run(base_url, lambda: {"http_async_client": httpx.AsyncClient()})
+    cold = state.stats()["connections"]
+
+    state.reset()
+    pool = HttpPool(HttpPoolConfig(max_keepalive=CONCURRENCY))
+    warm_time = await _run(base_url, pool.openai_kwargs)
+    warm = state.stats()["connections"]
+    stats = pool.stats()
+
+    print(
+        f"\n{CALLS} calls, {CONCURRENCY} concurrent: per-client httpx {cold} connections in {cold_time:.2f}s; "
+        f"shared pool {warm} connections in {warm_time:.2f}s "
+        f"(pool saw {stats['requests']} requests, {stats['connections']} connects, reuse {stats['reuse_ratio']:.0%})"
+    )
+    assert cold == CALLS
+    assert warm <= CONCURRENCY
+    assert stats["requests"] == CALLS
+    assert stats["connections"] == warm
+    assert stats["reuse_ratio"] >= 1 - CONCURRENCY / CALLS
@@ -0,0 +1,75 @@
+"""Load test: micro-batched tool-selection prompts against the local mock server.
+
+Sixty-four concurrent users each issue one small tool-selection prompt while
+the client may hold only four requests open at once (the per-model
+concurrency window).  Without micro-batching the prompts go out in sixteen
+waves; with it, prompts that arrive while one is in flight are combined into
+a handful of multi-item requests.  Every user must get the same answer either
+way.
+
+Run with ``pytest tests/performance/test_micro_batch_load.py -s`` to see the
+numbers.
+"""
+import asyncio
+import time
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+langchain_openai = pytest.importorskip("langchain_openai")
+
+import essay_agent.llm_client as llm_client  # noqa: E402
+from essay_agent.llm.micro_batch import MicroBatcher  # noqa: E402
+from essay_agent.llm.mock_server import MockProfile, create_app  # noqa: E402
+from essay_agent.llm.rate_limiter import ModelLimits, RateLimiter  # noqa: E402
+
+USERS = 64
+CONCURRENCY = 4
+LATENCY_MS = 100
+
+PROMPTS = [
+    f'Select the best tools. USER REQUEST: "help me {verb} my essay ({i})". Return JSON array of tool names.'
+    for i, verb in enumerate(["outline", "polish", "brainstorm", "draft"] * (USERS // 4))
+]
+
+
+async def _run(monkeypatch, enabled):
+    app = create_app(MockProfile(latency_ms=LATENCY_MS))
+    limits = ModelLimits(rpm=1_000_000, tpm=1_000_000_000, initial_concurrency=CONCURRENCY, max_concurrency=CONCURRENCY)
+    monkeypatch.setattr(llm_client, "_LIMITER", RateLimiter({"gpt-4o": limits}, default=limits))
+    monkeypatch.setattr(llm_client, "_MICRO_BATCHER", MicroBatcher(window=0.005, max_items=16, enabled=enabled))
+    monkeypatch.setattr(llm_client._ROUTER, "enabled", False)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://mock") as http:
+        llm = langchain_openai.ChatOpenAI(
+            model_name="gpt-4o",
+            openai_api_key="mock",
+            openai_api_base="http://mock/v1",
+            http_async_client=http,
+            max_retries=0,
+        )
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(llm_client.acall_llm_batched(llm, prompt, caller="tool_selection", cache=False) for prompt in PROMPTS)
+        )
+        elapsed = time.perf_counter() - start
+    return elapsed, app.state.mock.stats()["requests"], results
+
+
+@pytest.mark.performance
+@pytest.mark.load_test
+@pytest.mark.asyncio
+async def test_micro_batching_throughput_gain(monkeypatch):
+    plain_time, plain_requests, plain_results = await _run(monkeypatch, enabled=False)
+    batched_time, batched_requests, batched_results = await _run(monkeypatch, enabled=True)
+
+    print(
+        f"\n{USERS} prompts, window {CONCURRENCY}, {LATENCY_MS} ms/request: "
+        f"individual {plain_requests} requests in {plain_time:.2f}s ({USERS / plain_time:.0f}/s); "
+        f"micro-batched {batched_requests} requests in {batched_time:.2f}s ({USERS / batched_time:.0f}/s); "
+        f"gain x{plain_time / batched_time:.1f}"
+    )
+    assert batched_results == plain_results
+    assert plain_requests == USERS
+    assert batched_requests <= USERS // 4
+    assert plain_time / batched_time >= 2.0
@@ -0,0 +1,66 @@
+"""Micro-benchmark: per-turn tokenization cost before and after the shared tokenizer.
+
+One simulated agent turn counts the same system prompt, profile block and
+recent history from several components (prompt builder, context retriever,
+context window manager, ``llm_client.count_tokens``).  "Before" mirrors the old
+behaviour – an encoding resolved per call / per component and no memoization –
+while "after" goes through a single :class:`Tokenizer`.
+
+Run with ``pytest tests/performance/test_tokenizer_benchmark.py -s`` to see
+the numbers.
+"""
+import time
+
+import pytest
+
+from essay_agent.llm.tokenizer import Tokenizer
+
+tiktoken = pytest.importorskip("tiktoken")
+
+SYSTEM_PROMPT = "You are an expert college essay coach. " * 60
+PROFILE_BLOCK = "Name: Alex. Intended major: Computer Science. Activities: robotics, debate. " * 20
+HISTORY = [f"user: draft feedback request {i} about my why-major essay" for i in range(12)]
+TURNS = 50
+
+
+def _turn_texts(turn: int) -> list[str]:
+    return [SYSTEM_PROMPT, PROFILE_BLOCK, *HISTORY, f"user: new message for turn {turn}"]
+
+
+def _before(turns: int) -> float:
+    start = time.perf_counter()
+    for turn in range(turns):
+        texts = _turn_texts(turn)
+        # llm_client.count_tokens resolved the encoding on every call
+        for text in texts:
+            len(tiktoken.encoding_for_model("gpt-4").encode(text))
+        # ContextRetriever / ContextWindowManager re-encoded with their own encoder
+        enc = tiktoken.get_encoding("cl100k_base")
+        for _ in range(2):
+            for text in texts:
+                len(enc.encode(text))
+    return (time.perf_counter() - start) / turns
+
+
+def _after(turns: int) -> float:
+    tok = Tokenizer()
+    tok.count("warm up")  # encoding load is a one-off per process in both cases
+    start = time.perf_counter()
+    for turn in range(turns):
+        texts = _turn_texts(turn)
+        for text in texts:
+            tok.count(text)
+        for _ in range(2):
+            tok.count_many(texts)
+    return (time.perf_counter() - start) / turns
+
+
+@pytest.mark.performance
+def test_shared_tokenizer_reduces_per_turn_cost():
+    tiktoken.get_encoding("cl100k_base")  # exclude first BPE download/load
+    before = _before(TURNS)
+    after = _after(TURNS)
+
+    print(f"\ntokenization per turn: before={before * 1000:.3f}ms after={after * 1000:.3f}ms "
+          f"speed-up={before / after:.1f}x")
+    assert after < before
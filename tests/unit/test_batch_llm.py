@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import essay_agent.llm_client as llm_client
+from essay_agent.llm.telemetry import call_site, current_call_site
+
+
+class CountingLLM:
+    """Echo client that tracks peak concurrency and fails on 'bad' prompts."""
+
+    model_name = "batch-test-model"
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.sites = []
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.sites.append(current_call_site())
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def invoke(self, prompt, **kwargs):
+        self._enter()
+        try:
+            time.sleep(0.02)
+            if "bad" in prompt:
+                raise ValueError(f"cannot answer {prompt}")
+            return SimpleNamespace(content=prompt.upper())
+        finally:
+            self._exit()
+
+    async def ainvoke(self, prompt, **kwargs):
+        self._enter()
+        try:
+            await asyncio.sleep(0.02)
+            if "bad" in prompt:
+                raise ValueError(f"cannot answer {prompt}")
+            return SimpleNamespace(content=prompt.upper())
+        finally:
+            self._exit()
+
+
+PROMPTS = [f"prompt {i}" for i in range(9)] + ["bad prompt"] + [f"prompt {i}" for i in range(9, 12)]
+
+
+def test_batch_call_llm_keeps_order_bounds_concurrency_and_partial_results():
+    llm = CountingLLM()
+
+    with call_site("qa"):
+        results = llm_client.batch_call_llm(llm, PROMPTS, max_concurrency=3, cache=False)
+
+    assert [r for r in results if isinstance(r, str)] == [p.upper() for p in PROMPTS if "bad" not in p]
+    assert isinstance(results[9], ValueError)
+    assert len(results) == len(PROMPTS)
+    assert 1 < llm.peak <= 3
+    # Context set by the caller reaches every worker thread
+    assert set(llm.sites) == {"qa"}
+
+
+@pytest.mark.asyncio
+async def test_abatch_call_llm_keeps_order_bounds_concurrency_and_partial_results():
+    llm = CountingLLM()
+
+    results = await llm_client.abatch_call_llm(llm, PROMPTS, max_concurrency=4, cache=False, caller="eval:turn")
+
+    assert results[:9] == [p.upper() for p in PROMPTS[:9]]
+    assert isinstance(results[9], ValueError)
+    assert results[10:] == [p.upper() for p in PROMPTS[10:]]
+    assert 1 < llm.peak <= 4
+    assert set(llm.sites) == {"eval:turn"}
+
+
+@pytest.mark.asyncio
+async def test_empty_batches():
+    assert llm_client.batch_call_llm(CountingLLM(), []) == []
+    assert await llm_client.abatch_call_llm(CountingLLM(), []) == []
@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from essay_agent.llm.cassette import RECORD, REPLAY, Cassette, CassetteLLM, CassetteMissError
+
+
+class _StubChat:
+    """Minimal chat client returning queued replies with token usage."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+
+    def _next(self):
+        self.calls += 1
+        return AIMessage(
+            content=self.replies.pop(0),
+            response_metadata={"token_usage": {"prompt_tokens": 3, "completion_tokens": 2}},
+        )
+
+    def invoke(self, prompt, **kwargs):
+        return self._next()
+
+    async def ainvoke(self, prompt, **kwargs):
+        return self._next()
+
+    async def astream(self, prompt, **kwargs):
+        for word in self.replies.pop(0).split(" "):
+            yield AIMessage(content=word + " ")
+
+
+CONFIG = {"model_name": "gpt-4o", "temperature": 0.2}
+
+
+def _record(path, replies, prompts):
+    inner = _StubChat(replies)
+    llm = CassetteLLM(Cassette(str(path), RECORD), CONFIG, inner)
+    for prompt in prompts:
+        llm.invoke(prompt)
+    return inner
+
+
+def test_record_then_replay_is_byte_exact(tmp_path):
+    path = tmp_path / "session.jsonl"
+    reply = '{"ideas": ["café", "  spaced  "]}\n'
+    _record(path, [reply], ["Brainstorm please"])
+
+    entry = json.loads(path.read_text().splitlines()[0])
+    assert entry["usage"] == {"prompt_tokens": 3, "completion_tokens": 2}
+    assert entry["latency"] >= 0
+
+    replay = CassetteLLM(Cassette(str(path), REPLAY, latency_scale=0), CONFIG)
+    result = replay.invoke("Brainstorm please")
+    assert isinstance(result, AIMessage)
+    assert result.content == reply
+
+
+def test_replay_sleeps_for_scaled_latency(tmp_path):
+    path = tmp_path / "session.jsonl"
+    _record(path, ["hello"], ["prompt"])
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    lines[0]["latency"] = 2.0
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+
+    slept = []
+    llm = CassetteLLM(Cassette(str(path), REPLAY, latency_scale=0.5, sleep=slept.append), CONFIG)
+    assert llm.predict("prompt") == "hello"
+    assert slept == [1.0]
+
+
+def test_repeated_prompts_replay_in_recorded_order(tmp_path):
+    path = tmp_path / "session.jsonl"
+    _record(path, ["first", "second"], ["same", "same"])
+
+    llm = CassetteLLM(Cassette(str(path), REPLAY, latency_scale=0), CONFIG)
+    assert [llm.predict("same") for _ in range(3)] == ["first", "second", "second"]
+
+    llm.cassette.rewind()
+    assert llm.predict("same") == "first"
+
+
+def test_config_and_kwargs_are_part_of_the_key(tmp_path):
+    path = tmp_path / "session.jsonl"
+    _record(path, ["cool"], ["prompt"])
+
+    hotter = CassetteLLM(Cassette(str(path), REPLAY, latency_scale=0), {**CONFIG, "temperature": 0.9})
+    assert hotter.predict("prompt") == "FAKE_RESPONSE"
+    assert hotter.cassette.stats()["misses"] == 1
+
+
+def test_strict_miss_raises(tmp_path):
+    path = tmp_path / "session.jsonl"
+    _record(path, ["x"], ["known"])
+
+    llm = CassetteLLM(Cassette(str(path), REPLAY, strict=True, latency_scale=0), CONFIG)
+    with pytest.raises(CassetteMissError):
+        llm.invoke("unknown")
+
+
+def test_replay_requires_existing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette(str(tmp_path / "missing.jsonl"), REPLAY)
+
+
+def test_async_record_stream_and_replay(tmp_path):
+    path = tmp_path / "session.jsonl"
+    inner = _StubChat(["streamed reply"])
+    recorder = CassetteLLM(Cassette(str(path), RECORD), CONFIG, inner)
+
+    async def record():
+        return [chunk.content async for chunk in recorder.astream("stream me")]
+
+    assert "".join(asyncio.run(record())) == "streamed reply "
+
+    slept = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    replay = CassetteLLM(Cassette(str(path), REPLAY, async_sleep=fake_sleep), CONFIG)
+
+    async def play():
+        direct = await replay.ainvoke("stream me")
+        replay.cassette.rewind()
+        streamed = [chunk.content async for chunk in replay.astream("stream me")]
+        return direct.content, streamed
+
+    direct, streamed = asyncio.run(play())
+    assert direct == "streamed reply "
+    assert streamed == ["streamed reply "]
+    assert len(slept) == 2
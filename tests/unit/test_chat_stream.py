@@ -0,0 +1,120 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import essay_agent.agents.response_enhancer as response_enhancer
+import essay_agent.frontend.server as server
+from essay_agent.agent_autonomous import AutonomousEssayAgent
+
+
+class StreamingStubAgent:
+    user_id = "stream_user"
+
+    def __init__(self):
+        self.turns = []
+
+    async def handle_message_stream(self, message):
+        for text in ("Great ", "story ", "idea!"):
+            yield {"type": "token", "text": text}
+        self.turns.append(message)
+        yield {"type": "done", "response": "Great story idea!"}
+
+
+def _events(body: str):
+    for frame in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        yield lines["event"], json.loads(lines["data"])
+
+
+def test_chat_stream_pushes_tokens_then_done(monkeypatch):
+    stub = StreamingStubAgent()
+    saved = []
+
+    async def fake_save():
+        saved.append(True)
+
+    monkeypatch.setattr(server, "get_unified_agent", lambda user_id, ctx: stub)
+    monkeypatch.setattr(server, "save_essay_conversation_internal", fake_save)
+
+    client = TestClient(server.app)
+    resp = client.post("/chat/stream", json={"message": "brainstorm please", "user_id": "stream_user"})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = list(_events(resp.text))
+    assert [e for e, _ in events] == ["token", "token", "token", "done"]
+    assert "".join(d["text"] for e, d in events if e == "token") == "Great story idea!"
+    assert events[-1][1]["response"] == "Great story idea!"
+    # Turn is persisted once, after the stream completes
+    assert stub.turns and saved == [True]
+    assert server.debug_state["chat_history"][-1]["agent"] == "Great story idea!"
+
+
+class _Memory:
+    def __init__(self):
+        self.messages = []
+
+    def add_message(self, role, text):
+        self.messages.append((role, text))
+
+    def learn(self, turn):
+        pass
+
+    def get(self, key, default=None):
+        return default
+
+
+def _streaming_agent():
+    agent = AutonomousEssayAgent.__new__(AutonomousEssayAgent)
+    agent.interaction_count = 0
+    agent.memory = _Memory()
+
+    async def begin_turn(user_input):
+        return {}
+
+    async def respond_stream(action_result, user_input):
+        for text in ("Nice ", "draft."):
+            yield text
+
+    agent._begin_turn = begin_turn
+    agent._respond_stream = respond_stream
+    return agent
+
+
+async def _turn(agent):
+    return [event async for event in agent.handle_message_stream("hello")]
+
+
+@pytest.mark.asyncio
+async def test_streamed_tokens_join_to_the_enhanced_response(monkeypatch):
+    prompts = []
+
+    async def fake_stream(llm, prompt, **kwargs):
+        prompts.append(prompt)
+        for text in ("  What ", "a nice ", "draft!", " \n"):
+            yield text
+
+    monkeypatch.setattr(response_enhancer, "_OFFLINE", False)
+    monkeypatch.setattr(response_enhancer, "get_chat_llm", lambda **kwargs: object())
+    monkeypatch.setattr(response_enhancer, "stream_llm", fake_stream)
+    agent = _streaming_agent()
+
+    events = await _turn(agent)
+
+    tokens = "".join(e["text"] for e in events if e["type"] == "token")
+    assert events[-1] == {"type": "done", "response": "What a nice draft!"}
+    assert tokens == events[-1]["response"]
+    assert "Nice draft." in prompts[0]
+    # Memory keeps the reply as composed, like the non-streaming turn
+    assert agent.memory.messages == [("assistant", "Nice draft.")]
+
+
+@pytest.mark.asyncio
+async def test_streamed_tokens_pass_through_when_enhancer_is_off(monkeypatch):
+    monkeypatch.setattr(response_enhancer, "_OFFLINE", True)
+
+    events = await _turn(_streaming_agent())
+
+    assert [e["text"] for e in events if e["type"] == "token"] == ["Nice ", "draft."]
+    assert events[-1] == {"type": "done", "response": "Nice draft."}
@@ -0,0 +1,56 @@
+import threading
+
+from essay_agent.llm.client_pool import ClientPool, make_key
+
+
+def test_make_key_is_order_independent():
+    assert make_key(model="m", temperature=0.2) == make_key(temperature=0.2, model="m")
+    assert make_key(model="m", temperature=0.2) != make_key(model="m", temperature=0.3)
+    # Unhashable values are frozen rather than rejected
+    assert make_key(stop=["a", "b"], extra={"x": [1]}) == make_key(extra={"x": [1]}, stop=["a", "b"])
+
+
+def test_pool_hits_and_misses():
+    built = []
+    pool = ClientPool(lambda **kw: built.append(kw) or object(), maxsize=4)
+
+    a = pool.get(model="m", temperature=0.2)
+    b = pool.get(model="m", temperature=0.7)
+    assert pool.get(model="m", temperature=0.2) is a
+    assert pool.get(temperature=0.7, model="m") is b
+
+    assert len(built) == 2
+    stats = pool.stats()
+    assert stats == {"size": 2, "maxsize": 4, "hits": 2, "misses": 2, "evictions": 0, "hit_rate": 0.5}
+
+
+def test_pool_evicts_least_recently_used():
+    pool = ClientPool(lambda **kw: object(), maxsize=2)
+    first = pool.get(t=0)
+    pool.get(t=1)
+    pool.get(t=0)  # refresh t=0
+    pool.get(t=2)  # evicts t=1
+
+    assert pool.get(t=0) is first
+    assert pool.stats()["evictions"] == 1
+    assert len(pool) == 2
+
+
+def test_pool_concurrent_miss_keeps_single_instance():
+    gate = threading.Barrier(4)
+
+    pool = ClientPool(lambda **kw: object(), maxsize=4)
+    results = []
+
+    def worker():
+        gate.wait()
+        results.append(pool.get(model="m"))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(pool) == 1
+    assert pool.stats()["hits"] + pool.stats()["misses"] == 4
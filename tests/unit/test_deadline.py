@@ -0,0 +1,108 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+import essay_agent.llm_client as llm_client
+from essay_agent.agent.core.action_executor import ActionExecutionError, ActionExecutor
+from essay_agent.llm.budget import clamp_delay, retry_budget, spend_retry
+from essay_agent.llm.deadline import (
+    DeadlineExceeded,
+    bound_timeout,
+    check_deadline,
+    current_deadline,
+    expired,
+    parse_timeout,
+    request_deadline,
+)
+from essay_agent.tools.base import ValidatedTool
+
+
+def test_nested_deadline_only_tightens():
+    assert current_deadline() is None and bound_timeout(30) == 30
+    with request_deadline(5) as outer:
+        with request_deadline(60) as inner:
+            assert inner == outer
+        with request_deadline(0.5):
+            assert bound_timeout(30) <= 0.5
+        assert 4 < bound_timeout(30) <= 5
+        assert bound_timeout(None) <= 5
+    assert current_deadline() is None
+
+
+def test_parse_timeout_header_values():
+    assert parse_timeout("30") == 30.0
+    assert parse_timeout(None) is None
+    assert parse_timeout("soon") is None and parse_timeout("-1") is None
+
+
+def test_expired_deadline_denies_retries_and_clamps_sleep():
+    with retry_budget(max_retries=10, deadline=0), request_deadline(0.2):
+        assert clamp_delay(8) <= 0.2
+        assert spend_retry("llm")
+        time.sleep(0.25)
+        assert expired() and not spend_retry("llm")
+        with pytest.raises(DeadlineExceeded):
+            check_deadline()
+
+
+class _Slow(ValidatedTool):
+    name: str = "slow"
+    description: str = "Sleeps past any deadline"
+    timeout: float = 60.0
+    max_attempts: int = 3
+    calls: int = 0
+
+    async def _arun(self, **_):
+        self.calls += 1
+        await asyncio.sleep(5)
+
+
+def test_tool_attempts_stop_at_deadline():
+    tool = _Slow()
+
+    async def main():
+        with request_deadline(0.1):
+            return await tool.acall()
+
+    start = time.perf_counter()
+    out = asyncio.run(main())
+    assert time.perf_counter() - start < 1.0
+    assert tool.calls == 1
+    assert out["ok"]["fallback_reason"] == "timeout"
+
+
+def test_executor_timeout_bounded_by_deadline():
+    registry = MagicMock()
+    registry.get_tool_description.return_value = None
+    registry.get_tool.return_value = _Slow()
+    executor = ActionExecutor(registry, MagicMock())
+
+    async def main():
+        with request_deadline(0.1):
+            await executor.execute_tool("brainstorm", {})
+
+    start = time.perf_counter()
+    with pytest.raises(ActionExecutionError, match="deadline"):
+        asyncio.run(main())
+    assert time.perf_counter() - start < 1.0
+
+
+def test_async_llm_call_cut_off_without_retry(monkeypatch):
+    class Hanging:
+        calls = 0
+
+        async def ainvoke(self, prompt, **kwargs):
+            Hanging.calls += 1
+            await asyncio.sleep(5)
+
+    monkeypatch.setattr(llm_client._ROUTER, "enabled", False)
+
+    async def main():
+        with request_deadline(0.1):
+            await llm_client.acall_llm(Hanging(), "hi", cache=False)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+    assert Hanging.calls == 1
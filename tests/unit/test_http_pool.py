@@ -0,0 +1,78 @@
+import logging
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from essay_agent.llm import http_pool  # noqa: E402
+from essay_agent.llm.http_pool import HttpPool, HttpPoolConfig, model_fields  # noqa: E402
+
+
+def _ok(request):
+    return httpx.Response(200, json={"path": request.url.path})
+
+
+def _pool(**config):
+    return HttpPool(HttpPoolConfig(**config), transport=(httpx.MockTransport(_ok), httpx.MockTransport(_ok)))
+
+
+def test_config_from_env(monkeypatch):
+    monkeypatch.setenv("ESSAY_AGENT_HTTP_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("ESSAY_AGENT_HTTP_KEEPALIVE_EXPIRY", "5")
+    monkeypatch.setenv("ESSAY_AGENT_HTTP2", "1")
+
+    cfg = HttpPoolConfig.from_env()
+
+    assert cfg.max_connections == 7 and cfg.keepalive_expiry == 5.0 and cfg.http2 is True
+    assert cfg.max_keepalive == 20
+
+
+@pytest.mark.asyncio
+async def test_one_client_pair_shared_and_requests_counted():
+    pool = _pool()
+    sync_client, async_client = pool.clients()
+
+    assert pool.clients() == (sync_client, async_client)
+    assert sync_client.get("http://mock/v1/models").json() == {"path": "/v1/models"}
+    await async_client.get("http://mock/v1/models")
+
+    stats = pool.stats()
+    assert stats["requests"] == 2 and stats["built"] is True
+    # Mock transports open no sockets, so nothing was connected
+    assert stats["connections"] == 0 and stats["reuse_ratio"] == 1.0
+
+
+def test_trace_counts_connections_and_handshakes():
+    pool = _pool()
+    for _ in range(4):
+        pool._count("requests")
+    pool._trace("connection.connect_tcp.complete", {})
+    pool._trace("connection.start_tls.complete", {})
+    pool._trace("http11.send_request_headers.complete", {})
+
+    stats = pool.stats()
+    assert (stats["connections"], stats["tls_handshakes"], stats["reuse_ratio"]) == (1, 1, 0.75)
+
+
+def test_openai_kwargs_respect_class_fields():
+    pool = _pool()
+
+    assert set(pool.openai_kwargs()) == {"http_client", "http_async_client"}
+    assert set(pool.openai_kwargs(fields={"http_client", "model"})) == {"http_client"}
+
+    class _V1:
+        __fields__ = {"http_client": None}
+
+    assert model_fields(_V1) == {"http_client"}
+
+
+def test_http2_without_h2_falls_back(monkeypatch, caplog):
+    monkeypatch.setattr(http_pool, "http2_available", lambda: False)
+    pool = HttpPool(HttpPoolConfig(http2=True))
+
+    with caplog.at_level(logging.WARNING):
+        kwargs = pool._client_kwargs(httpx)
+
+    assert kwargs["http2"] is False
+    assert "h2" in caplog.text
+    assert kwargs["limits"].max_keepalive_connections == 20
@@ -0,0 +1,106 @@
+import json
+import random
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from essay_agent.agent.core.intent_classifier import (
+    CONVERSATION,
+    LOCAL_INTENT,
+    IntentClassifier,
+    evaluate,
+    load_reasoning_logs,
+    split,
+)
+
+_TEMPLATES = {
+    "brainstorm": ["brainstorm stories for {s}", "give me essay ideas for {s}", "help me think of topics for {s}"],
+    "shorten_text": ["make it shorter", "cut this down to {n} words", "trim my {s} essay please"],
+    "polish": ["polish this", "polish my {s} draft", "clean up the grammar in my essay"],
+    "outline": ["outline my {s} essay", "create an outline for this story", "structure my essay for {s}"],
+    CONVERSATION: ["thanks!", "what do you think about {s}?", "hi there", "that sounds good"],
+}
+_SCHOOLS = ["Stanford", "MIT", "Harvard", "Yale", "Berkeley", "Princeton"]
+
+
+def _chains(n=300, seed=1):
+    rng = random.Random(seed)
+    chains = []
+    for _ in range(n):
+        label = rng.choice(sorted(_TEMPLATES))
+        text = rng.choice(_TEMPLATES[label]).format(s=rng.choice(_SCHOOLS), n=rng.choice([150, 250, 500]))
+        step = {"step_number": 1, "thought": "", "confidence": 0.8, "context_used": [],
+                "tool_considered": None if label == CONVERSATION else label}
+        chains.append({"user_input": text, "reasoning_steps": [step],
+                       "final_action": "conversation" if label == CONVERSATION else "tool_execution",
+                       "success": True})
+    # Chains logged before the tool was recorded carry no label
+    chains.append({"user_input": "old turn", "reasoning_steps": [], "final_action": "tool_execution"})
+    return chains
+
+
+def test_load_logs_and_held_out_tradeoff(tmp_path):
+    (tmp_path / "alex.reasoning_history.json").write_text(json.dumps(_chains()))
+
+    pairs = load_reasoning_logs([tmp_path])
+    assert len(pairs) == 300 and ("old turn", "tool_execution") not in pairs
+
+    train, held_out = split(pairs, holdout=0.2, seed=0)
+    model = IntentClassifier().fit(train)
+    report = evaluate(model, held_out, thresholds=(0.5, 0.85))
+
+    assert report["turns"] == 60
+    strict = report["thresholds"][1]
+    assert strict["coverage"] >= 0.6 and strict["accuracy"] >= 0.95
+    assert report["thresholds"][0]["coverage"] >= strict["coverage"]
+    assert report["latency_us"] < 5000
+
+
+def test_load_logs_skips_turns_the_classifier_decided(tmp_path):
+    chains = _chains(n=20)
+    for chain in chains[:5]:
+        chain["reasoning_steps"][0]["context_used"] = [LOCAL_INTENT]
+    (tmp_path / "alex.reasoning_history.json").write_text(json.dumps(chains))
+
+    pairs = load_reasoning_logs([tmp_path])
+
+    assert len(pairs) == 15
+    assert pairs == load_reasoning_logs([tmp_path / "alex.reasoning_history.json"])
+
+
+def test_decide_falls_through_when_unsure_and_round_trips(tmp_path):
+    model = IntentClassifier().fit(load_reasoning_logs([_write(tmp_path)]))
+
+    assert model.decide("polish my Stanford draft", 0.85)[0] == "polish"
+    assert model.decide("polish my Stanford draft", 1.01) is None
+
+    path = tmp_path / "model.json"
+    model.save(path)
+    loaded = IntentClassifier.load(path)
+    assert loaded.predict("brainstorm stories for MIT") == pytest.approx(model.predict("brainstorm stories for MIT"))
+
+
+def _write(tmp_path):
+    path = tmp_path / "sam.reasoning_history.json"
+    path.write_text(json.dumps(_chains(seed=2)))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_engine_skips_llm_when_classifier_confident(tmp_path, monkeypatch):
+    from essay_agent.agent.core.reasoning_engine import ReasoningEngine
+
+    model_path = tmp_path / "intent.json"
+    IntentClassifier().fit(load_reasoning_logs([_write(tmp_path)])).save(model_path)
+    monkeypatch.setenv("ESSAY_AGENT_INTENT_MODEL", str(model_path))
+
+    llm = Mock(ainvoke=AsyncMock(return_value="{}"))
+    builder = Mock(build_reasoning_prompt=AsyncMock(return_value={"prompt": "p", "version": "v"}))
+    with patch("essay_agent.agent.core.reasoning_engine.get_chat_llm", return_value=llm):
+        engine = ReasoningEngine(builder, Mock(track_performance=AsyncMock()))
+
+    result = await engine.reason_about_action("trim my Yale essay please", {})
+
+    assert result.chosen_tool == "shorten_text" and "local_intent" in result.context_flags
+    llm.ainvoke.assert_not_awaited()
+    assert engine.get_performance_metrics()["local_intent"] == {"decided": 1, "fell_through": 0}
@@ -0,0 +1,157 @@
+import asyncio
+import sqlite3
+
+import pytest
+from langchain_core.outputs import Generation
+
+from essay_agent.llm.cache import LLMCache, cache_key, cache_policy
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _cache(tmp_path, clock, **kwargs):
+    return LLMCache(str(tmp_path / "cache.sqlite"), clock=clock, **kwargs)
+
+
+def test_round_trip_and_counters(tmp_path, clock):
+    cache = _cache(tmp_path, clock)
+    assert cache.lookup("prompt", "llm") is None
+
+    cache.update("prompt", "llm", [Generation(text="answer " * 50)])
+    hit = cache.lookup("prompt", "llm")
+    assert hit[0].text == "answer " * 50
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["writes"] == 1
+    # Payloads are compressed: 350 chars of repetitive text store far smaller
+    assert 0 < stats["stored_bytes"] < 200
+    assert stats["bytes_read"] == stats["bytes_written"] == stats["stored_bytes"]
+
+
+def test_uses_wal_and_persists(tmp_path, clock):
+    cache = _cache(tmp_path, clock)
+    cache.update("p", "llm", [Generation(text="x")])
+    assert cache._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    cache.close()
+
+    reopened = _cache(tmp_path, clock)
+    assert reopened.stats()["entries"] == 1
+    assert reopened.lookup("p", "llm")[0].text == "x"
+
+
+def test_drops_legacy_langchain_table(tmp_path, clock):
+    legacy = sqlite3.connect(tmp_path / "cache.sqlite")
+    legacy.execute("CREATE TABLE full_llm_cache (prompt TEXT, llm TEXT, idx INTEGER, response TEXT)")
+    legacy.executemany("INSERT INTO full_llm_cache VALUES (?, 'llm', 0, ?)", [(str(i), "x" * 4096) for i in range(200)])
+    legacy.commit()
+    legacy.close()
+    before = (tmp_path / "cache.sqlite").stat().st_size
+
+    cache = _cache(tmp_path, clock)
+    tables = {row[0] for row in cache._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    assert tables == {"llm_cache"}
+    cache.close()
+    assert (tmp_path / "cache.sqlite").stat().st_size < before
+
+
+def test_ttl_expiry(tmp_path, clock):
+    cache = _cache(tmp_path, clock, ttl_seconds=60)
+    cache.update("p", "llm", [Generation(text="x")])
+    clock.now += 61
+    assert cache.lookup("p", "llm") is None
+    stats = cache.stats()
+    assert stats["expired"] == 1
+    assert stats["entries"] == 0
+
+
+def test_lru_eviction_by_entries(tmp_path, clock):
+    cache = _cache(tmp_path, clock, max_entries=10)
+    for i in range(10):
+        clock.now += 1
+        cache.update(f"p{i}", "llm", [Generation(text=str(i))])
+    # Touch p0 so it becomes most recently used
+    clock.now += 1
+    assert cache.lookup("p0", "llm") is not None
+
+    clock.now += 1
+    cache.update("p10", "llm", [Generation(text="10")])
+
+    stats = cache.stats()
+    assert stats["entries"] <= 10
+    assert stats["evictions"] >= 1
+    assert cache.lookup("p0", "llm") is not None
+    assert cache.lookup("p1", "llm") is None
+
+
+def test_byte_bound(tmp_path, clock):
+    import os
+
+    cache = _cache(tmp_path, clock, max_bytes=4_000)
+    for i in range(50):
+        clock.now += 1
+        # Incompressible payloads so each row is ~300 bytes
+        cache.update(f"p{i}", "llm", [Generation(text=os.urandom(150).hex())])
+    assert cache.stats()["stored_bytes"] <= 4_000
+
+
+def test_cache_policy_opt_out(tmp_path, clock):
+    cache = _cache(tmp_path, clock)
+    cache.update("p", "llm", [Generation(text="cached")])
+
+    with cache_policy(False):
+        assert cache.lookup("p", "llm") is None
+        cache.update("q", "llm", [Generation(text="fresh")])
+    assert cache.lookup("q", "llm") is None
+    assert cache.stats()["bypassed"] == 1
+
+    cache.enabled = False
+    with cache_policy(True):
+        assert cache.lookup("p", "llm")[0].text == "cached"
+
+
+def test_cache_policy_follows_worker_threads(tmp_path, clock):
+    cache = _cache(tmp_path, clock)
+    cache.update("p", "llm", [Generation(text="cached")])
+
+    async def main():
+        with cache_policy(False):
+            return await asyncio.to_thread(cache.lookup, "p", "llm")
+
+    assert asyncio.run(main()) is None
+
+
+def test_blank_completions_are_not_cached(tmp_path, clock):
+    cache = _cache(tmp_path, clock)
+    cache.update("p", "llm", [Generation(text="  ")])
+    assert cache.lookup("p", "llm") is None
+    assert cache.stats()["writes"] == 0
+
+
+def test_key_ignores_object_addresses():
+    a = '{"http_client": "<httpx.Client object at 0x7fccd9c4d2d0>"}'
+    b = '{"http_client": "<httpx.Client object at 0x7f0000000001>"}'
+    assert cache_key("p", a) == cache_key("p", b)
+    assert cache_key("p", a) != cache_key("q", a)
+
+
+def test_peek_counts_hits_but_not_misses(tmp_path, clock):
+    cache = _cache(tmp_path, clock)
+    assert cache.peek("p", "llm") is None  # the call's own lookup counts the miss
+    cache.update("p", "llm", [Generation(text="x")])
+    assert cache.peek("p", "llm")[0].text == "x"
+    with cache_policy(False):
+        assert cache.peek("p", "llm") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bypassed"]) == (1, 0, 0)
@@ -68,4 +68,160 @@ def test_llm_client_retry(monkeypatch):
     # Re-import chat function (decorator already applied)
     result = llm_client.chat("Retry test")
     assert result == "OK"
-    assert failing_llm.calls == 2 
\ No newline at end of file
+    assert failing_llm.calls == 2 
+
+def test_chat_llm_pool_reuses_clients_per_config(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    client = _reload_client(monkeypatch)
+
+    default = client.get_chat_llm()
+    creative = client.get_chat_llm(temperature=0.7)
+    repair = client.get_chat_llm(model_name="gpt-3.5-turbo-0125", temperature=0.0)
+
+    # Interleaved traffic keeps hitting the same three instances
+    for _ in range(3):
+        assert client.get_chat_llm() is default
+        assert client.get_chat_llm(temperature=0.7) is creative
+        assert client.get_chat_llm(model_name="gpt-3.5-turbo-0125", temperature=0.0) is repair
+
+    assert repair.model_name == "gpt-3.5-turbo-0125"
+    # Every pooled client shares one HTTP connection pool
+    assert default.http_client is creative.http_client is repair.http_client
+
+    stats = client.get_client_pool_stats()["chat"]
+    assert stats["misses"] == 3
+    assert stats["hits"] == 9
+
+
+@pytest.mark.asyncio
+async def test_acall_llm_does_not_block_event_loop():
+    import asyncio
+    import time
+
+    class SlowAsyncLLM:
+        model_name = "gpt-4o-mini"
+
+        async def ainvoke(self, prompt, **kwargs):
+            await asyncio.sleep(0.2)
+            return SimpleNamespace(content=f"echo: {prompt}")
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    start = time.monotonic()
+    results = await asyncio.gather(*(llm_client.acall_llm(SlowAsyncLLM(), f"p{i}") for i in range(5)))
+    elapsed = time.monotonic() - start
+    task.cancel()
+
+    assert results == [f"echo: p{i}" for i in range(5)]
+    # Five overlapping round-trips, not five sequential ones
+    assert elapsed < 0.6
+    assert ticks > 10
+
+
+@pytest.mark.asyncio
+async def test_acall_llm_runs_sync_only_clients_off_loop():
+    import asyncio
+    import time
+
+    class BlockingLLM:
+        model_name = "gpt-4o-mini"
+
+        def predict(self, prompt, **kwargs):
+            time.sleep(0.2)
+            return "OK"
+
+    start = time.monotonic()
+    results = await asyncio.gather(*(llm_client.acall_llm(BlockingLLM(), "x") for _ in range(3)))
+    assert results == ["OK"] * 3
+    assert time.monotonic() - start < 0.5
+
+
+def test_achat_offline(monkeypatch):
+    import asyncio
+
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    client = _reload_client(monkeypatch)
+    assert asyncio.run(client.achat("Hello")) == "FAKE_RESPONSE"
+
+
+def test_call_llm_cache_kwarg_scopes_policy():
+    from essay_agent.llm.cache import _CACHE_ENABLED
+
+    seen = []
+
+    class StrictLLM:
+        model_name = "gpt-4o-mini"
+
+        def invoke(self, prompt):  # no **kwargs – ``cache`` must not leak through
+            seen.append(_CACHE_ENABLED.get())
+            return "OK"
+
+    assert llm_client.call_llm(StrictLLM(), "x", cache=False) == "OK"
+    assert llm_client.call_llm(StrictLLM(), "x") == "OK"
+    assert seen == [False, None]
+
+
+@pytest.mark.asyncio
+async def test_stream_llm_yields_chunks_and_retries_before_first_token(monkeypatch):
+    from langchain_community.llms.fake import FakeStreamingListLLM
+
+    chunks = [c async for c in llm_client.stream_llm(FakeStreamingListLLM(responses=["hello"]), "x")]
+    assert chunks == list("hello")
+
+    class FlakyStreamLLM:
+        model_name = "gpt-4o-mini"
+        attempts = 0
+
+        async def astream(self, prompt, **kwargs):
+            FlakyStreamLLM.attempts += 1
+            if FlakyStreamLLM.attempts == 1:
+                raise ConnectionError("reset before first token")
+            for part in ("Hi", " there"):
+                yield SimpleNamespace(content=part)
+
+    real_sleep = llm_client.asyncio.sleep
+
+    async def no_sleep(_):
+        await real_sleep(0)
+
+    monkeypatch.setattr(llm_client, "_STREAM_ATTEMPTS", 2)
+    monkeypatch.setattr(llm_client.asyncio, "sleep", no_sleep)
+    chunks = [c async for c in llm_client.stream_llm(FlakyStreamLLM(), "x")]
+    assert chunks == ["Hi", " there"]
+    assert FlakyStreamLLM.attempts == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_skip_the_rate_limiter(monkeypatch, tmp_path):
+    from langchain.globals import get_llm_cache, set_llm_cache
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+    from essay_agent.llm.cache import LLMCache
+
+    cache = LLMCache(str(tmp_path / "cache.sqlite"))
+    previous = get_llm_cache()
+    set_llm_cache(cache)
+    monkeypatch.setattr(llm_client, "_CACHE", cache)
+    try:
+        llm = FakeListChatModel(responses=["first", "second"])
+        assert await llm_client.acall_llm(llm, "same prompt") == "first"
+
+        def no_quota(*args, **kwargs):
+            raise AssertionError("cache hit took rate-limiter quota")
+
+        monkeypatch.setattr(llm_client._LIMITER, "limit", no_quota)
+        monkeypatch.setattr(llm_client._LIMITER, "limit_sync", no_quota)
+        assert await llm_client.acall_llm(llm, "same prompt") == "first"
+        assert llm_client.call_llm(llm, "same prompt") == "first"
+    finally:
+        set_llm_cache(previous)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
@@ -0,0 +1,48 @@
+from essay_agent.llm.memo import MemoCache, memo_key
+
+
+def test_key_covers_full_prompt_and_params():
+    head = "You are an essay coach.\n" + "x" * 600
+    assert memo_key(head + "context A") != memo_key(head + "context B")
+    assert memo_key("Plan  my\r\nessay  ") == memo_key("Plan my\nessay")
+    assert memo_key("p", model="gpt-4o", temperature=0.2) != memo_key("p", model="gpt-4o", temperature=0.7)
+    assert memo_key("p", model="m", temperature=0) == memo_key("p", temperature=0, model="m")
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = MemoCache(max_entries=2, max_bytes=10_000, ttl_seconds=None)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # a is now most recent
+    cache.put("c", "3")
+    assert cache.get("b") is None and cache.get("a") == "1" and cache.get("c") == "3"
+
+    small = MemoCache(max_entries=100, max_bytes=30, ttl_seconds=None)
+    small.put("k1", "x" * 10)
+    small.put("k2", "y" * 10)
+    small.put("k3", "z" * 10)
+    assert len(small) == 2 and small.get("k1") is None
+    assert small.stats()["bytes"] <= 30
+    small.put("huge", "w" * 100)  # larger than the whole cache → not stored
+    assert small.get("huge") is None and len(small) == 2
+
+
+def test_ttl_expiry_and_metrics():
+    now = [0.0]
+    cache = MemoCache(ttl_seconds=10, clock=lambda: now[0])
+    cache.put("k", "v", cost_seconds=1.5)
+    assert cache.get("k") == "v"
+    assert cache.get("k") == "v"
+    now[0] = 11
+    assert cache.get("k") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expirations"], stats["entries"]) == (2, 1, 1, 0)
+    assert stats["hit_ratio"] == round(2 / 3, 4)
+    assert stats["saved_seconds"] == 3.0 and stats["avg_miss_cost_seconds"] == 1.5
+
+
+def test_disabled_cache_never_hits():
+    cache = MemoCache(enabled=False)
+    cache.put("k", "v")
+    assert cache.get("k") is None and len(cache) == 0
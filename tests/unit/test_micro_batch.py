@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+import pytest
+
+from essay_agent.llm.micro_batch import (
+    MicroBatcher,
+    build_batch_prompt,
+    parse_batch_response,
+    split_batch_prompt,
+)
+
+
+def test_batch_prompt_round_trip_and_parsing():
+    prompts = ['Pick tools for "outline my essay"', "Extract facts:\nI run cross-country"]
+    combined = build_batch_prompt(prompts)
+
+    assert combined.startswith("<micro_batch>")
+    assert split_batch_prompt(combined) == prompts
+
+    answer = "```json\n" + json.dumps({"results": [
+        {"id": 1, "response": {"activities": ["cross-country"]}},
+        {"id": 0, "response": '["outline"]'},
+        {"id": 7, "response": "out of range"},
+        {"id": "x", "response": "bad id"},
+    ]}) + "\n```"
+    assert parse_batch_response(answer, 2) == {0: '["outline"]', 1: '{"activities": ["cross-country"]}'}
+    assert parse_batch_response("not json at all", 2) == {}
+    assert parse_batch_response('{"results": "nope"}', 2) == {}
+
+
+class _Backend:
+    """Answers single prompts as ``single:<p>`` and batches via *batch_answer*."""
+
+    def __init__(self, batch_answer=None, fail_batch=False):
+        self.singles = []
+        self.batches = []
+        self.batch_answer = batch_answer
+        self.fail_batch = fail_batch
+
+    def single(self, prompt):
+        async def _call():
+            self.singles.append(prompt)
+            await asyncio.sleep(0.02)
+            return f"single:{prompt}"
+        return _call
+
+    async def send_batch(self, batch_prompt, count):
+        items = split_batch_prompt(batch_prompt)
+        self.batches.append(items)
+        await asyncio.sleep(0.02)
+        if self.fail_batch:
+            raise TimeoutError("batch too slow")
+        if self.batch_answer is not None:
+            return self.batch_answer(items)
+        return json.dumps({"results": [{"id": i, "response": f"batched:{p}"} for i, p in enumerate(items)]})
+
+
+async def _submit_many(batcher, backend, prompts, key="tool_selection"):
+    async def one(prompt, delay):
+        await asyncio.sleep(delay)
+        return await batcher.submit(key, prompt, backend.single(prompt), backend.send_batch)
+
+    # First call goes out alone; the rest arrive while it is in flight
+    return await asyncio.gather(*(one(p, 0 if i == 0 else 0.001) for i, p in enumerate(prompts)))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_request():
+    batcher = MicroBatcher(window=0.005, max_items=8)
+    backend = _Backend()
+
+    results = await _submit_many(batcher, backend, ["a", "b", "c", "d"])
+
+    assert results == ["single:a", "batched:b", "batched:c", "batched:d"]
+    assert backend.singles == ["a"]
+    assert backend.batches == [["b", "c", "d"]]
+    stats = batcher.stats()
+    assert stats["direct"] == 1 and stats["batches"] == 1 and stats["batched_items"] == 3
+    assert batcher._groups == {}
+
+
+@pytest.mark.asyncio
+async def test_missing_items_and_failed_batches_fall_back_to_single_calls():
+    def partial(items):
+        return json.dumps({"results": [{"id": 0, "response": f"batched:{items[0]}"}]})
+
+    backend = _Backend(batch_answer=partial)
+    results = await _submit_many(MicroBatcher(), backend, ["a", "b", "c"])
+    assert results == ["single:a", "batched:b", "single:c"]
+
+    backend = _Backend(fail_batch=True)
+    batcher = MicroBatcher()
+    results = await _submit_many(batcher, backend, ["a", "b", "c"])
+    assert results == ["single:a", "single:b", "single:c"]
+    assert batcher.stats()["fallbacks"] == 2
+
+
+@pytest.mark.asyncio
+async def test_max_items_flushes_early_and_keys_do_not_mix():
+    batcher = MicroBatcher(window=10.0, max_items=2)
+    backend = _Backend()
+
+    results = await asyncio.wait_for(_submit_many(batcher, backend, ["a", "b", "c"]), timeout=1.0)
+    assert results == ["single:a", "batched:b", "batched:c"]
+
+    other = _Backend()
+    mixed = await asyncio.gather(
+        batcher.submit("k1", "x", other.single("x"), other.send_batch),
+        batcher.submit("k2", "y", other.single("y"), other.send_batch),
+    )
+    assert mixed == ["single:x", "single:y"]
+
+
+@pytest.mark.asyncio
+async def test_disabled_batcher_always_calls_single():
+    backend = _Backend()
+    results = await _submit_many(MicroBatcher(enabled=False), backend, ["a", "b"])
+    assert results == ["single:a", "single:b"]
+    assert backend.batches == []
+
@@ -0,0 +1,95 @@
+import json
+
+from fastapi.testclient import TestClient
+from langchain_openai import ChatOpenAI
+
+from essay_agent.llm.mock_server import MockProfile, create_app, pick_response
+from essay_agent.prompts.brainstorm import BRAINSTORM_PROMPT
+from essay_agent.prompts.example_registry import EXAMPLE_REGISTRY
+
+
+def _chat(client, content, **extra):
+    return client.post(
+        "/v1/chat/completions",
+        json={"model": "gpt-4o", "messages": [{"role": "user", "content": content}], **extra},
+    )
+
+
+def test_prompt_with_example_block_gets_registry_example():
+    variables = {v: "x" for v in BRAINSTORM_PROMPT.input_variables}
+    tool, text = pick_response(BRAINSTORM_PROMPT.format(**variables))
+    assert tool == "brainstorm"
+    assert json.loads(text)["stories"]
+
+
+def test_tool_name_fallback_and_plain_text():
+    assert pick_response("Please polish this paragraph")[0] == "polish"
+    assert pick_response("Suggest stories for my essay")[0] == "suggest_stories"
+    assert pick_response("hello there")[0] == "text"
+
+
+def test_chat_completion_is_openai_shaped():
+    client = TestClient(create_app())
+    body = _chat(client, "Outline my essay").json()
+    assert body["object"] == "chat.completion"
+    assert json.loads(body["choices"][0]["message"]["content"])["outline"]
+    assert body["usage"]["total_tokens"] > 0
+    assert client.get("/mock/stats").json()["by_tool"] == {"outline": 1}
+
+
+def test_error_injection_returns_429_with_retry_after():
+    client = TestClient(create_app(MockProfile(rate_limit_rate=1.0, retry_after_s=3)))
+    response = _chat(client, "hi")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+
+    client.put("/mock/profile", json={"rate_limit_rate": 0.0, "server_error_rate": 1.0, "seed": 1})
+    assert _chat(client, "hi").status_code in (500, 502, 503)
+    assert client.get("/mock/stats").json()["server_errors"] == 1
+
+
+
+def test_unknown_preset_is_a_400_listing_valid_presets():
+    client = TestClient(create_app())
+    response = client.put("/mock/profile", json={"preset": "nope"})
+    assert response.status_code == 400
+    assert "realistic" in response.json()["error"]["message"]
+
+def test_streaming_emits_sse_chunks():
+    client = TestClient(create_app(MockProfile(chunk_chars=8)))
+    response = _chat(client, "Polish this", stream=True)
+    events = [line[6:] for line in response.text.splitlines() if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    text = "".join(json.loads(e)["choices"][0]["delta"].get("content", "") for e in events[:-1])
+    assert text == EXAMPLE_REGISTRY["polish"]
+    assert len(events) > 3
+
+
+def test_chat_openai_round_trip_through_mock():
+    client = TestClient(create_app(), base_url="http://mock")
+    llm = ChatOpenAI(
+        model_name="gpt-4o", openai_api_key="mock", openai_api_base="http://mock/v1", http_client=client, max_retries=0
+    )
+    reply = llm.invoke("Draft my essay")
+    assert json.loads(reply.content)["draft"]
+    assert reply.response_metadata["token_usage"]["completion_tokens"] > 0
+
+
+def test_embeddings_are_deterministic():
+    client = TestClient(create_app())
+    first = client.post("/v1/embeddings", json={"input": ["a", "b"], "dimensions": 8}).json()
+    second = client.post("/v1/embeddings", json={"input": ["a"], "dimensions": 8}).json()
+    assert first["data"][0]["embedding"] == second["data"][0]["embedding"]
+    assert len(first["data"]) == 2
+
+
+def test_micro_batched_prompt_gets_one_result_per_item():
+    from essay_agent.llm.micro_batch import build_batch_prompt, parse_batch_response
+
+    client = TestClient(create_app())
+    prompts = ["Please polish this paragraph", "hello there"]
+    body = _chat(client, build_batch_prompt(prompts)).json()
+
+    answers = parse_batch_response(body["choices"][0]["message"]["content"], 2)
+    assert answers == {i: pick_response(p)[1] for i, p in enumerate(prompts)}
+    assert client.get("/mock/stats").json()["by_tool"] == {"micro_batch": 1}
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from essay_agent.llm.router import ModelRouter, Route, replay_report
+
+
+def test_route_matching_size_limit_and_same_model():
+    router = ModelRouter({
+        "format_response": Route("mini", max_prompt_tokens=100),
+        "tool:*": Route("mini"),
+        "tool:draft*": Route("gpt-4o"),
+    })
+
+    assert router.route("format_response", "gpt-4o", 50).model == "mini"
+    assert router.route("format_response", "gpt-4o", 500) is None
+    assert router.route("tool:smart_autocomplete", "gpt-4o", 10).model == "mini"
+    # Longest prefix wins; a route to the caller's own model is a no-op
+    assert router.route("tool:draft", "gpt-4o", 10) is None
+    assert router.route("reasoning", "gpt-4o", 10) is None
+
+    sites = router.stats()["sites"]
+    assert sites["format_response"] == {"routed": 1, "too_large": 1, "fallbacks": 0}
+
+    router.enabled = False
+    assert router.route("format_response", "gpt-4o", 50) is None
+
+
+def test_routes_from_env(monkeypatch):
+    monkeypatch.setenv("ESSAY_AGENT_FAST_MODEL", "fast-1")
+    monkeypatch.setenv("ESSAY_AGENT_ROUTES", json.dumps({
+        "json_repair": None,
+        "tool:*": "fast-2",
+        "format_response": {"max_prompt_tokens": 10, "timeout": 2},
+    }))
+
+    router = ModelRouter.from_env()
+
+    assert "json_repair" not in router.routes
+    assert router.routes["context_extraction"].model == "fast-1"
+    assert router.routes["tool:*"] == Route("fast-2")
+    assert router.routes["format_response"] == Route("fast-1", max_prompt_tokens=10, timeout=2)
+
+
+class _Echo:
+    def __init__(self, model, delay=0.0, error=None):
+        self.model_name = model
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, prompt, **kwargs):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(content=f"{self.model_name}:{prompt}")
+
+    async def ainvoke(self, prompt, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(content=f"{self.model_name}:{prompt}")
+
+
+def _install(monkeypatch, fast, **route):
+    import essay_agent.llm_client as llm_client
+
+    router = ModelRouter(
+        {"format_response": Route("fast-model", **route)},
+        factory=lambda llm, r: fast,
+        routable=lambda llm: True,
+    )
+    monkeypatch.setattr(llm_client, "_ROUTER", router)
+    return llm_client, router
+
+
+def test_call_llm_routes_by_call_site(monkeypatch):
+    fast = _Echo("fast-model")
+    llm_client, _ = _install(monkeypatch, fast)
+    primary = _Echo("gpt-4o")
+
+    assert llm_client.call_llm(primary, "hi", caller="format_response", cache=False) == "fast-model:hi"
+    assert llm_client.call_llm(primary, "hi", caller="reasoning", cache=False) == "gpt-4o:hi"
+    assert fast.calls == 1 and primary.calls == 1
+
+
+def test_sync_timeout_falls_back_to_callers_model(monkeypatch):
+    fast = _Echo("fast-model", error=TimeoutError("slow"))
+    llm_client, router = _install(monkeypatch, fast, timeout=1.0)
+    primary = _Echo("gpt-4o")
+
+    assert llm_client.call_llm(primary, "hi", caller="format_response", cache=False) == "gpt-4o:hi"
+    assert router.stats()["sites"]["format_response"]["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_timeout_falls_back_to_callers_model(monkeypatch):
+    fast = _Echo("fast-model", delay=1.0)
+    llm_client, router = _install(monkeypatch, fast, timeout=0.05)
+    primary = _Echo("gpt-4o")
+
+    result = await llm_client.acall_llm(primary, "hi", caller="format_response", cache=False)
+
+    assert result == "gpt-4o:hi"
+    assert router.stats()["sites"]["format_response"]["fallbacks"] == 1
+
+
+def test_replay_report_latency_and_token_deltas():
+    def entry(site, model, prompt, latency, prompt_tokens, completion_tokens):
+        return {
+            "site": site, "model": model, "prompt": prompt, "response": "x", "latency": latency,
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens},
+        }
+
+    entries = [
+        entry("format_response", "gpt-4o", "p1", 2.0, 100, 20),
+        entry("format_response", "gpt-4o", "p2", 2.0, 100, 20),
+        entry("reasoning", "gpt-4o", "p3", 5.0, 1000, 50),
+        # The same prompt recorded on the fast model gives its real latency
+        entry("format_response", "mini", "p1", 0.5, 100, 20),
+    ]
+    router = ModelRouter({"format_response": Route("mini")})
+
+    report = replay_report(entries, router)
+
+    fmt = report["sites"]["format_response"]
+    assert fmt["routed"] == 2  # the "mini" recording is already on the routed model
+    # p1 uses its twin (0.5s); p2 scales by measured s/token (mini is 4x faster)
+    assert fmt["latency_before"] == pytest.approx(4.5)
+    assert fmt["latency_after"] == pytest.approx(0.5 + 0.5 + 0.5)
+    assert fmt["token_delta"] == {"gpt-4o": -240, "mini": 240}
+    assert report["sites"]["reasoning"]["latency_delta"] == 0
+    assert report["total"]["latency_delta"] == pytest.approx(-3.0)
@@ -0,0 +1,139 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from essay_agent.llm.priority import BACKGROUND, BATCH, INTERACTIVE, current_priority, priority
+from essay_agent.llm.rate_limiter import ModelLimits, RateLimiter, TokenBucket
+from essay_agent.llm.telemetry import Telemetry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(rpm=6000, tpm=1_000_000, concurrency=4):
+    limits = ModelLimits(rpm=rpm, tpm=tpm, initial_concurrency=concurrency, max_concurrency=concurrency)
+    return RateLimiter({"m": limits}, default=limits)
+
+
+def test_priority_context_nests_and_validates():
+    assert current_priority() == INTERACTIVE
+    with priority(BATCH):
+        with priority(BACKGROUND):
+            assert current_priority() == BACKGROUND
+        assert current_priority() == BATCH
+    assert current_priority() == INTERACTIVE
+    with pytest.raises(ValueError):
+        with priority("urgent"):
+            pass
+
+
+def test_try_take_never_dips_into_headroom():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=4, refill_per_second=1, clock=clock)
+
+    assert [bucket.try_take(1, keep=1) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_take(1, keep=1) == pytest.approx(1.0)
+    assert bucket.available == pytest.approx(1.0)
+    # Interactive reservations can still use the reserve
+    assert bucket.reserve() == 0.0
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_on_leftover_quota_only():
+    limiter = _limiter(rpm=4)
+
+    for _ in range(3):
+        await limiter.acquire("m", lane=BATCH)
+        limiter.release("m", lane=BATCH)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(limiter.acquire("m", lane=BATCH), timeout=0.1)
+
+    # The remaining quarter of the bucket is still there for a user turn
+    assert await asyncio.wait_for(limiter.acquire("m", lane=INTERACTIVE), timeout=0.1) < 0.05
+    limiter.release("m", lane=INTERACTIVE)
+    assert limiter.stats()["m"]["lanes"]["batch"]["queue_depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_jumps_queued_batch_work():
+    limiter = _limiter(concurrency=1)
+    await limiter.acquire("m", lane=INTERACTIVE)
+    order = []
+
+    async def waiter(lane):
+        await limiter.acquire("m", lane=lane)
+        order.append(lane)
+        await asyncio.sleep(0.03)
+        limiter.release("m", lane=lane)
+
+    batch = asyncio.create_task(waiter(BATCH))
+    await asyncio.sleep(0.05)
+    interactive = asyncio.create_task(waiter(INTERACTIVE))
+    await asyncio.sleep(0.01)
+
+    assert limiter.queue_depths() == {INTERACTIVE: 1, BACKGROUND: 0, BATCH: 1}
+    limiter.release("m", lane=INTERACTIVE)
+    await asyncio.gather(batch, interactive)
+
+    assert order == [INTERACTIVE, BATCH]
+    lanes = limiter.stats()["m"]["lanes"]
+    assert lanes["batch"]["acquired"] == 1 and lanes["interactive"]["acquired"] == 2
+    assert lanes["batch"]["max_wait_seconds"] > lanes["interactive"]["max_wait_seconds"]
+
+
+@pytest.mark.asyncio
+async def test_batch_limited_to_its_share_of_the_window():
+    limiter = _limiter(concurrency=4)
+    for _ in range(2):
+        await limiter.acquire("m", lane=BATCH)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(limiter.acquire("m", lane=BATCH), timeout=0.1)
+    await asyncio.wait_for(limiter.acquire("m", lane=INTERACTIVE), timeout=0.1)
+    assert limiter.stats()["m"]["lanes"]["batch"]["in_flight"] == 2
+
+
+def test_telemetry_splits_queue_wait_by_lane():
+    telemetry = Telemetry()
+    with telemetry.track("gpt-4o", "p") as call:
+        call.queue_wait = 0.002
+    with priority(BATCH):
+        with telemetry.track("gpt-4o", "p") as call:
+            call.queue_wait = 3.0
+
+    lanes = telemetry.lane_stats()
+    assert lanes["interactive"]["calls"] == 1 and lanes["batch"]["calls"] == 1
+    assert lanes["batch"]["queue_wait_seconds_sum"] == 3.0
+
+    text = telemetry.render_prometheus(queue_depths={INTERACTIVE: 0, BATCH: 5})
+    assert 'essay_agent_llm_lane_queue_wait_seconds_count{lane="batch"} 1' in text
+    assert "# TYPE essay_agent_llm_lane_queue_depth gauge" in text
+    assert 'essay_agent_llm_lane_queue_depth{lane="batch"} 5' in text
+
+
+@pytest.mark.asyncio
+async def test_batch_helpers_default_to_batch_lane():
+    import essay_agent.llm_client as llm_client
+
+    seen = []
+
+    class LaneLLM:
+        model_name = "lane-test-model"
+
+        async def ainvoke(self, prompt, **kwargs):
+            seen.append(current_priority())
+            return SimpleNamespace(content=prompt)
+
+    await llm_client.abatch_call_llm(LaneLLM(), ["a", "b"], cache=False)
+    with priority(BACKGROUND):
+        await llm_client.abatch_call_llm(LaneLLM(), ["c"], cache=False)
+    await llm_client.acall_llm(LaneLLM(), "d", cache=False)
+
+    assert seen == [BATCH, BATCH, BACKGROUND, INTERACTIVE]
+    assert "batch" in llm_client.get_priority_stats()["queue_wait"]
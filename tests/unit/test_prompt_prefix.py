@@ -0,0 +1,90 @@
+"""Static prompt blocks must form a byte-identical prefix across turns and users."""
+from types import SimpleNamespace
+
+import pytest
+
+from essay_agent.agent.prompt_builder import PromptBuilder
+from essay_agent.agent.prompts import CURRENT_TURN_MARKER
+from essay_agent.planner_prompt import PlannerPrompt, split_static_prefix
+
+
+def _tool(category, description):
+    return SimpleNamespace(
+        category=category,
+        description=description,
+        when_to_use=f"When the student needs {description.lower()}",
+        input_requirements=["user_input"],
+        confidence_threshold=0.7,
+    )
+
+
+TOOLS = {
+    "brainstorm": _tool("core_workflow", "Generate story ideas"),
+    "outline": _tool("core_workflow", "Structure a chosen story"),
+    "polish": _tool("refinement", "Final grammar and style pass"),
+}
+
+TURNS = [
+    ("alice", "Help me brainstorm ideas for my Stanford essay", [{"user": "hi", "agent": "hello"}]),
+    ("bob", "Can you outline my robotics story?", []),
+    ("alice", "Polish the conclusion please", [{"user": "draft done", "agent": "great"}] * 4),
+]
+
+
+def _prefix(prompt: str) -> str:
+    index = prompt.find(CURRENT_TURN_MARKER)
+    assert index > 0, "reasoning prompt lost its current-turn marker"
+    return prompt[:index]
+
+
+@pytest.mark.asyncio
+async def test_reasoning_prompt_prefix_is_stable_across_turns_and_users():
+    prompts = []
+    for i, (user, text, history) in enumerate(TURNS):
+        # Registry insertion order differs per builder; the catalog must not
+        registry = dict(reversed(TOOLS.items())) if i % 2 else dict(TOOLS)
+        builder = PromptBuilder(memory=None, tool_registry=registry)
+        context = {"user_profile": {"name": user}, "conversation_history": history}
+        result = await builder.build_reasoning_prompt(text, context)
+        prompts.append(result)
+
+    prefixes = {_prefix(r["prompt"]) for r in prompts}
+    assert len(prefixes) == 1
+    prefix = prefixes.pop()
+    assert "Generate story ideas" in prefix and "Respond in JSON format" in prefix
+    for (user, text, _), result in zip(TURNS, prompts):
+        assert text not in prefix
+        assert text in result["prompt"][len(prefix):]
+        assert result["static_prefix_chars"] == len(prefix)
+
+
+def test_tool_catalog_rebuilt_when_a_description_changes():
+    registry = dict(TOOLS)
+    builder = PromptBuilder(memory=None, tool_registry=registry)
+    assert "Generate story ideas" in builder._tool_descriptions()
+
+    registry["brainstorm"] = _tool("core_workflow", "Generate three story ideas")
+    catalog = builder._tool_descriptions()
+
+    assert "Generate three story ideas" in catalog and "Generate story ideas" not in catalog
+    assert builder._tool_descriptions() is catalog
+
+
+def test_planner_prompt_prefix_is_stable_across_turns_and_users():
+    planner = PlannerPrompt(["brainstorm", "outline", "polish"])
+    contexts = [
+        {"last_tool": "none", "recent_chat": [], "profile": {"college": "Stanford"}},
+        {"last_tool": "brainstorm", "recent_chat": ["hi", "need help"], "failure_count": 2,
+         "profile": {"college": "MIT", "essay_prompt": "Why us?"}},
+    ]
+
+    rendered = [
+        planner.build_prompt(text, ctx) for (_, text, _), ctx in zip(TURNS, contexts)
+    ]
+    splits = [split_static_prefix(prompt) for prompt in rendered]
+
+    assert splits[0][0] and splits[0][0] == splits[1][0]
+    for (_, text, _), (prefix, suffix) in zip(TURNS, splits):
+        assert text not in prefix
+        assert text in suffix
+    assert "MIT" in splits[1][1] and "MIT" not in splits[1][0]
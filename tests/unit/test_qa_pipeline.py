@@ -286,7 +286,7 @@ class TestQAValidationNode:
             execution_time=1.0
         )
         
-        with patch.object(self.node.pipeline, 'run_validation', return_value=mock_result):
+        with patch.object(self.node.pipeline, 'arun_validation', AsyncMock(return_value=mock_result)):
             result = await self.node.execute(state)
             
             assert result.phase == Phase.POLISHING
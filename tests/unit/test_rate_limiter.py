@@ -0,0 +1,217 @@
+import asyncio
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from essay_agent.llm.rate_limiter import (
+    AdaptiveConcurrency,
+    LoopBlockedError,
+    ModelLimits,
+    RateLimiter,
+    TokenBucket,
+    is_rate_limit_error,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_reservation_delay():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=2, refill_per_second=1, clock=clock)
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    # Third request must wait one refill interval, fourth two
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(2.0)
+
+    clock.now = 10.0
+    assert bucket.available == pytest.approx(2.0)
+
+
+def test_token_bucket_clamps_oversized_requests():
+    bucket = TokenBucket(capacity=100, refill_per_second=10, clock=FakeClock())
+    # Larger than capacity → wait for a full refill, not forever
+    assert bucket.reserve(100) == 0.0
+    assert bucket.reserve(10_000) == pytest.approx(10.0)
+
+
+def test_adaptive_concurrency_aimd():
+    window = AdaptiveConcurrency(initial=8, minimum=1, maximum=16)
+    window.on_rate_limited()
+    assert window.limit == 4
+    # Additive increase: roughly one slot per window of successes
+    for _ in range(5):
+        window.on_success()
+    assert window.limit == 5
+
+    for _ in range(10):
+        window.on_rate_limited()
+    assert window.limit == 1
+
+
+def test_concurrency_slots():
+    window = AdaptiveConcurrency(initial=2)
+    assert window.try_acquire()
+    assert window.try_acquire()
+    assert not window.try_acquire()
+    window.release()
+    assert window.try_acquire()
+
+
+def test_is_rate_limit_error():
+    class RateLimitError(Exception):
+        pass
+
+    class HTTPError(Exception):
+        status_code = 429
+
+    assert is_rate_limit_error(RateLimitError("slow down"))
+    assert is_rate_limit_error(HTTPError("x"))
+    assert is_rate_limit_error(Exception("Rate limit reached"))
+    assert not is_rate_limit_error(ValueError("bad prompt"))
+
+
+def test_model_prefix_lookup():
+    limiter = RateLimiter({"gpt-4o": ModelLimits(rpm=10, tpm=100), "gpt-4o-mini": ModelLimits(rpm=20, tpm=200)})
+    assert limiter.limits_for("gpt-4o-2024-08-06").rpm == 10
+    assert limiter.limits_for("gpt-4o-mini-2024").rpm == 20
+
+
+def test_from_env_overrides(monkeypatch):
+    monkeypatch.setenv("ESSAY_AGENT_RPM", "42")
+    monkeypatch.setenv("ESSAY_AGENT_TPM", "4200")
+    limiter = RateLimiter.from_env()
+    assert limiter.limits_for("gpt-4o").rpm == 42
+    assert limiter.limits_for("unknown-model").tpm == 4200
+
+
+@pytest.mark.asyncio
+async def test_async_acquire_does_not_block_event_loop():
+    limiter = RateLimiter({"m": ModelLimits(rpm=60, tpm=1_000_000)})
+    # Drain the request bucket so the next acquire has to wait ~1s
+    limiter._state("m").requests.reserve(60)
+
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    async with limiter.limit("m") as waited:
+        pass
+    task.cancel()
+
+    assert waited >= 0.9
+    # Loop kept running while we waited
+    assert ticks > 20
+    stats = limiter.stats()["m"]
+    assert stats["throttled"] == 1
+    assert stats["max_wait_seconds"] >= 0.9
+
+
+@pytest.mark.asyncio
+async def test_concurrent_async_callers_share_quota():
+    limiter = RateLimiter({"m": ModelLimits(rpm=6000, tpm=1_000_000, initial_concurrency=4)})
+    peak = 0
+    active = 0
+
+    async def call():
+        nonlocal peak, active
+        async with limiter.limit("m", tokens=10):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+    start = time.monotonic()
+    await asyncio.gather(*(call() for _ in range(8)))
+    elapsed = time.monotonic() - start
+
+    assert peak == 4
+    # Two waves of four, not eight sequential calls
+    assert elapsed < 0.15
+    assert limiter.stats()["m"]["successes"] == 8
+
+
+def test_rate_limited_release_shrinks_window():
+    limiter = RateLimiter({"m": ModelLimits(rpm=6000, tpm=1_000_000, initial_concurrency=8)})
+    with pytest.raises(RuntimeError):
+        with limiter.limit_sync("m"):
+            raise RuntimeError("Error code: 429 - rate limit exceeded")
+    stats = limiter.stats()["m"]
+    assert stats["rate_limited"] == 1
+    assert stats["concurrency_limit"] == 4
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sync_acquire_on_running_loop_never_sleeps():
+    limiter = RateLimiter({"m": ModelLimits(rpm=60, tpm=1_000_000)})
+    limiter._state("m").requests.reserve(60)  # bucket drained: next request in ~1s
+
+    start = time.monotonic()
+    with pytest.raises(LoopBlockedError) as info:
+        with limiter.limit_sync("m"):
+            pass
+    assert time.monotonic() - start < 0.05 and info.value.retry_in > 0.5
+    stats = limiter.stats()["m"]
+    assert stats["in_flight"] == 0 and stats["throttled"] == 1
+
+    limiter.reset()
+    with limiter.limit_sync("m") as waited:  # free quota is still usable on the loop
+        assert waited == 0.0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_refunds_reserved_quota():
+    limiter = RateLimiter({"m": ModelLimits(rpm=60, tpm=600, initial_concurrency=1)})
+    state = limiter._state("m")
+    await limiter.acquire("m", tokens=100)  # holds the only slot
+
+    waiter = asyncio.create_task(limiter.acquire("m", tokens=300))
+    await asyncio.sleep(0.05)
+    assert state.tokens.available < 250
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert state.tokens.available == pytest.approx(500, abs=5)
+    assert state.requests.available == pytest.approx(59, abs=0.1)
+    assert limiter.queue_depths()["interactive"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unified_state_tool_waits_for_quota_off_the_loop(monkeypatch):
+    from essay_agent.agent_autonomous import AutonomousEssayAgent
+
+    limiter = RateLimiter({"m": ModelLimits(rpm=600, tpm=1_000_000)})
+    limiter._state("m").requests.reserve(600)  # drained: next request in ~0.1s
+
+    class _Tool:
+        def _run(self, state):
+            with limiter.limit_sync("m") as waited:  # as the tool's sync call_llm does
+                return {"waited": waited}
+
+    state = Mock(get_context_summary=Mock(return_value={}))
+    manager = Mock(load_state=Mock(return_value=state))
+    monkeypatch.setattr("essay_agent.state_manager.EssayStateManager", lambda: manager)
+    agent = AutonomousEssayAgent.__new__(AutonomousEssayAgent)
+    agent.user_id = "sam"
+    agent.tools = {"smart_outline": _Tool()}
+    agent._latest_context = None
+
+    outcome = await agent._execute_with_unified_state("smart_outline", "outline it", {})
+
+    assert outcome["error"] is None and outcome["ok"]["waited"] > 0.05
+    manager.save_state.assert_called_once_with(state)
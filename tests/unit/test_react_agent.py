@@ -75,7 +75,7 @@ def mock_tool_registry():
 def mock_llm():
     """Mock LLM for testing."""
     llm = Mock()
-    llm.apredict = AsyncMock(return_value='{"context_understanding": "User wants help", "reasoning": "Should brainstorm", "response_type": "tool_execution", "chosen_tool": "brainstorm", "tool_args": {"topic": "test"}, "confidence": 0.8}')
+    llm.ainvoke = AsyncMock(return_value='{"context_understanding": "User wants help", "reasoning": "Should brainstorm", "response_type": "tool_execution", "chosen_tool": "brainstorm", "tool_args": {"topic": "test"}, "confidence": 0.8}')
     return llm
 
 
@@ -117,11 +117,34 @@ class TestReasoningEngine:
             assert engine.success_count == 1
             mock_prompt_optimizer.track_performance.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_reasoning_cache_shared_across_engines(self, mock_prompt_builder, mock_prompt_optimizer, mock_llm):
+        """A rebuilt engine reuses reasoning for an identical prompt; a different prompt misses."""
+        from essay_agent.llm.memo import MemoCache
+
+        shared = MemoCache()
+        with patch('essay_agent.agent.core.reasoning_engine.get_chat_llm', return_value=mock_llm), \
+             patch('essay_agent.agent.core.reasoning_engine.get_reasoning_cache', return_value=shared):
+            first = ReasoningEngine(mock_prompt_builder, mock_prompt_optimizer)
+            await first.reason_about_action("Help me brainstorm ideas", {})
+            second = ReasoningEngine(mock_prompt_builder, mock_prompt_optimizer)
+            cached = await second.reason_about_action("Help me brainstorm ideas", {})
+
+            mock_prompt_builder.build_reasoning_prompt.return_value = {
+                "prompt": "Test reasoning prompt with other context", "version": "test_v1"
+            }
+            await second.reason_about_action("Help me brainstorm ideas", {})
+
+        assert "cached" in cached.context_flags and cached.chosen_tool == "brainstorm"
+        assert mock_llm.ainvoke.await_count == 2
+        metrics = second.get_performance_metrics()
+        assert metrics["cache"]["hits"] == 1 and metrics["cache"]["misses"] == 2
+
     @pytest.mark.asyncio
     async def test_reason_about_action_llm_failure(self, mock_prompt_builder, mock_prompt_optimizer):
         """Test reasoning when LLM fails."""
         failing_llm = Mock()
-        failing_llm.apredict = AsyncMock(side_effect=Exception("LLM Error"))
+        failing_llm.ainvoke = AsyncMock(side_effect=Exception("LLM Error"))
         
         with patch('essay_agent.agent.core.reasoning_engine.get_chat_llm', return_value=failing_llm):
             engine = ReasoningEngine(mock_prompt_builder, mock_prompt_optimizer)
@@ -132,10 +155,28 @@ class TestReasoningEngine:
             assert engine.reasoning_count == 1
             assert engine.success_count == 0
     
+    @pytest.mark.asyncio
+    async def test_empty_completion_retried_once_uncached(self, mock_prompt_builder, mock_prompt_optimizer, mock_llm):
+        """A blank answer is asked for again with the response cache bypassed."""
+        acall = AsyncMock(side_effect=["  ", "Here's my helpful response!"])
+
+        with patch('essay_agent.agent.core.reasoning_engine.get_chat_llm', return_value=mock_llm), \
+             patch('essay_agent.agent.core.reasoning_engine.acall_llm', acall):
+            engine = ReasoningEngine(mock_prompt_builder, mock_prompt_optimizer)
+            response = await engine._call_llm_with_retry("prompt")
+
+            assert response == "Here's my helpful response!"
+            assert "cache" not in acall.await_args_list[0].kwargs
+            assert acall.await_args_list[1].kwargs["cache"] is False
+
+            acall.side_effect = ["", ""]
+            with pytest.raises(ReasoningError):
+                await engine._call_llm_with_retry("prompt")
+
     @pytest.mark.asyncio
     async def test_reason_about_response(self, mock_prompt_builder, mock_prompt_optimizer, mock_llm):
         """Test response generation."""
-        mock_llm.apredict = AsyncMock(return_value="Here's my helpful response!")
+        mock_llm.ainvoke = AsyncMock(return_value="Here's my helpful response!")
         
         with patch('essay_agent.agent.core.reasoning_engine.get_chat_llm', return_value=mock_llm):
             engine = ReasoningEngine(mock_prompt_builder, mock_prompt_optimizer)
@@ -426,6 +467,85 @@ class TestEssayReActAgent:
             assert isinstance(response, str)
             assert "technical difficulties" in response.lower()
     
+    @pytest.fixture
+    def agent_memory(self, tmp_path, monkeypatch):
+        """Real AgentMemory on a scratch profile store (retrieval/indexing stubbed)."""
+        from essay_agent.agent.memory.agent_memory import AgentMemory
+
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "memory_store").mkdir()
+        with patch('essay_agent.agent.memory.agent_memory.ContextRetriever'), \
+             patch('essay_agent.agent.memory.agent_memory.MemoryIndexer'):
+            memory = AgentMemory("test_user")
+        assert memory.hierarchical_memory is not None
+        return memory
+
+    @staticmethod
+    async def _overlapped_turn(memory, extracted_profile):
+        """Run observe/reason with a slow extractor; return (agent, events)."""
+        events = []
+
+        async def extract(existing_profile, **_):
+            events.append("extract:start")
+            await asyncio.sleep(0.05)
+            events.append("extract:end")
+            return Mock(new_experiences=[], new_interests=[], new_background=[], new_goals=[],
+                        updated_profile={**existing_profile, **extracted_profile}, integration_summary="")
+
+        async def reason(**_):
+            events.append("reason")
+            return Mock(response_type="conversation", confidence=0.9)
+
+        with patch('essay_agent.agent.core.react_agent.AgentMemory', return_value=memory), \
+             patch('essay_agent.agent.core.react_agent.PromptBuilder'), \
+             patch('essay_agent.agent.core.react_agent.PromptOptimizer'), \
+             patch('essay_agent.agent.core.react_agent.ReasoningEngine') as mock_reasoning_cls, \
+             patch('essay_agent.agent.core.react_agent.ActionExecutor'):
+            mock_reasoning_cls.return_value.reason_about_action = AsyncMock(side_effect=reason)
+
+            agent = EssayReActAgent("test_user")
+            agent.context_extractor = Mock(extract_and_update_context=extract)
+            agent.school_injector = Mock(extract_school_from_input=Mock(return_value=None))
+            await agent._observe_and_reason("I love robotics")
+            return agent, events
+
+    @pytest.mark.asyncio
+    async def test_extraction_overlaps_reasoning(self, agent_memory):
+        """Reasoning starts before extraction finishes; no re-run if nothing it reads changed."""
+        # The extractor's own keys are not part of the profile reasoning reads
+        agent, events = await self._overlapped_turn(agent_memory, {"interests": ["robotics"]})
+
+        assert events.index("reason") < events.index("extract:end")
+        assert events.count("reason") == 1
+        assert agent.extraction_stats == {"overlapped": 1, "reasoning_reruns": 0}
+
+    @pytest.mark.asyncio
+    async def test_reasoning_rerun_when_extraction_adds_core_value(self, agent_memory):
+        """A merged change to a profile field reasoning reads re-runs reasoning."""
+        agent, events = await self._overlapped_turn(
+            agent_memory, {"core_values": [{"value": "Curiosity", "description": "Takes things apart"}]}
+        )
+
+        assert events.count("reason") == 2
+        assert events.index("extract:end") < len(events) - 1 and events[-1] == "reason"
+        assert agent.extraction_stats["reasoning_reruns"] == 1
+        assert agent_memory.get_user_profile()["core_values"][0]["value"] == "Curiosity"
+
+    def test_reasoning_inputs_cover_school_and_essay_context(self, agent_memory):
+        """School detection and the essay prompt are part of what reasoning reads."""
+        with patch('essay_agent.agent.core.react_agent.AgentMemory', return_value=agent_memory), \
+             patch('essay_agent.agent.core.react_agent.PromptBuilder'), \
+             patch('essay_agent.agent.core.react_agent.PromptOptimizer'), \
+             patch('essay_agent.agent.core.react_agent.ReasoningEngine'), \
+             patch('essay_agent.agent.core.react_agent.ActionExecutor'):
+            agent = EssayReActAgent("test_user")
+
+        before = agent._reasoning_inputs()
+        assert set(before) >= {"core_values", "defining_moments", "essay_prompt", "college", "school_context"}
+        agent.scenario_context["school_context"] = {"name": "Stanford"}
+        after = agent._reasoning_inputs()
+        assert [f for f in after if before.get(f) != after[f]] == ["school_context"]
+
     def test_observe_context_success(self):
         """Test successful context observation."""
         with patch('essay_agent.agent.core.react_agent.AgentMemory') as mock_memory_cls, \
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from tenacity import retry, retry_if_exception
+
+import essay_agent.llm_client as llm_client
+from essay_agent.llm.deadline import DeadlineExceeded
+from essay_agent.llm.resilience import (
+    CLIENT,
+    DEADLINE,
+    RATE_LIMIT,
+    SERVER,
+    TIMEOUT,
+    UNKNOWN,
+    CircuitBreaker,
+    CircuitOpenError,
+    Hedger,
+    RetryPolicy,
+    classify_error,
+    retry_after,
+)
+
+
+class _StatusError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def test_classify_error_by_status_type_and_cause():
+    assert classify_error(_StatusError(429)) == RATE_LIMIT
+    assert classify_error(_StatusError(503)) == SERVER
+    assert classify_error(_StatusError(401)) == CLIENT
+    assert classify_error(asyncio.TimeoutError()) == TIMEOUT
+    assert classify_error(ValueError("bad json")) == UNKNOWN
+
+    try:
+        try:
+            raise _StatusError(502)
+        except _StatusError as exc:
+            raise RuntimeError("wrapped") from exc
+    except RuntimeError as wrapped:
+        assert classify_error(wrapped) == SERVER
+
+
+def test_deadline_is_not_a_provider_failure():
+    assert classify_error(DeadlineExceeded("out of time")) == DEADLINE
+    assert not RetryPolicy().should_retry(DeadlineExceeded())
+
+    breaker = CircuitBreaker("gpt", failure_threshold=1)
+    breaker.record_failure(DeadlineExceeded())
+    assert breaker.state == "closed"
+
+
+def test_retry_after_header_variants():
+    assert retry_after(_StatusError(429, {"retry-after": "7"})) == 7.0
+    assert retry_after(_StatusError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after(_StatusError(429)) is None
+
+
+def _run_with_policy(policy, fn):
+    return retry(retry=retry_if_exception(policy.should_retry), wait=lambda _: 0, stop=policy.stop)(fn)()
+
+
+def test_policy_retries_only_transient_errors():
+    policy = RetryPolicy(max_attempts={RATE_LIMIT: 3, SERVER: 2})
+    calls = {"n": 0}
+
+    def client_error():
+        calls["n"] += 1
+        raise _StatusError(400)
+
+    with pytest.raises(_StatusError):
+        _run_with_policy(policy, client_error)
+    assert calls["n"] == 1
+
+    calls["n"] = 0
+
+    def flaky():
+        calls["n"] += 1
+        if calls["n"] < 3:
+            raise _StatusError(429)
+        return "ok"
+
+    assert _run_with_policy(policy, flaky) == "ok"
+    assert calls["n"] == 3
+
+
+def test_policy_wait_prefers_retry_after():
+    policy = RetryPolicy(max_delay=5, jitter=0)
+    state = lambda exc, n: SimpleNamespace(attempt_number=n, outcome=SimpleNamespace(exception=lambda: exc))  # noqa: E731
+    assert policy.wait(state(_StatusError(429, {"retry-after": "3"}), 1)) == 3
+    assert policy.wait(state(_StatusError(429, {"retry-after": "60"}), 1)) == 5
+    assert policy.wait(state(_StatusError(503), 3)) == 2.0
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    now = [0.0]
+    breaker = CircuitBreaker("gpt", failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+
+    breaker.record_failure(_StatusError(400))  # client errors do not count
+    breaker.record_failure(_StatusError(500))
+    breaker.record_failure(_StatusError(500))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    now[0] = 11
+    breaker.before_call()  # single half-open probe
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_hedger_backup_wins_when_primary_is_slow():
+    hedger = Hedger(min_samples=1, max_hedge_ratio=1.0, min_delay=0.01)
+    hedger.observe("m", 0.01)
+    delays = iter([1.0, 0.0])
+
+    async def request():
+        await asyncio.sleep(next(delays))
+        return "done"
+
+    async def main():
+        start = time.perf_counter()
+        result = await hedger.run("m", request)
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(main())
+    assert result == "done"
+    assert elapsed < 0.5
+    assert hedger.stats()["hedge_wins"] == 1
+
+
+def test_client_errors_are_not_retried_by_llm_client():
+    class AuthFailLLM:
+        calls = 0
+
+        def invoke(self, prompt, **kwargs):
+            AuthFailLLM.calls += 1
+            raise _StatusError(401)
+
+    with pytest.raises(_StatusError):
+        llm_client.call_llm(AuthFailLLM(), "hello", cache=False)
+    assert AuthFailLLM.calls == 1
@@ -0,0 +1,155 @@
+import asyncio
+from dataclasses import replace
+
+import pytest
+from tenacity import RetryError
+
+import essay_agent.llm_client as llm_client
+from essay_agent.llm.budget import RetryBudget, current_budget, retry_budget, spend_retry
+from essay_agent.llm.deadline import DeadlineExceeded, request_deadline
+from essay_agent.tools.base import ValidatedTool
+
+
+def test_budget_denies_once_spent():
+    with retry_budget(max_retries=2, deadline=0) as budget:
+        assert spend_retry("llm") and spend_retry("tool:x")
+        assert not spend_retry("llm")
+    report = budget.report()
+    assert report["retries"] == 2 and report["denied"] == 1
+    assert report["by_layer"]["llm"] == {"attempts": 0, "retries": 1, "denied": 1}
+    assert current_budget() is None
+    assert spend_retry("llm")  # no budget → unlimited
+
+
+def test_nested_budget_draws_from_parent():
+    with retry_budget(max_retries=1, deadline=0) as task:
+        with retry_budget(max_retries=5, deadline=0) as turn:
+            assert spend_retry("llm")
+            assert not spend_retry("llm")  # parent exhausted
+        assert turn.retries == 1 and task.retries == 1
+
+
+def test_deadline_exhausts_budget_and_clamps_sleep():
+    now = [0.0]
+    budget = RetryBudget(max_retries=10, deadline=5, clock=lambda: now[0])
+    assert budget.clamp_delay(8) == 5
+    now[0] = 6
+    assert budget.exhausted
+    assert not budget.try_spend("llm")
+
+
+def test_request_deadline_is_the_only_clock_inside_a_request():
+    with request_deadline(30):
+        with retry_budget() as budget:
+            assert budget.remaining_time() is None
+    with request_deadline(0), retry_budget(deadline=5) as budget:
+        assert 4 < budget.remaining_time() <= 5
+
+
+def test_budget_follows_worker_threads():
+    async def main():
+        with retry_budget(max_retries=3, deadline=0) as budget:
+            await asyncio.to_thread(spend_retry, "tool:x")
+            return budget.retries
+
+    assert asyncio.run(main()) == 1
+
+
+class _AlwaysFails(ValidatedTool):
+    name: str = "always_fails"
+    description: str = "Raises every time"
+    timeout: float = None
+    max_attempts: int = 3
+    calls: int = 0
+
+    def _run(self, **_):
+        self.calls += 1
+        raise ValueError("boom")
+
+
+def test_tool_fails_fast_when_budget_spent(monkeypatch):
+    monkeypatch.setenv("ESSAY_AGENT_FAST_TEST", "1")
+    tool = _AlwaysFails()
+    with retry_budget(max_retries=0, deadline=0) as budget:
+        out = tool()
+    assert out["ok"] is None and out["error"] is not None
+    assert tool.calls == 1
+    assert budget.report()["by_layer"]["tool:always_fails"] == {"attempts": 1, "retries": 0, "denied": 1}
+
+
+def test_llm_retries_stop_at_turn_budget(monkeypatch):
+    class Flaky:
+        calls = 0
+
+        def invoke(self, prompt, **kwargs):
+            Flaky.calls += 1
+            raise ConnectionError("reset")
+
+    monkeypatch.setattr(llm_client, "_RETRY_POLICY", replace(llm_client._RETRY_POLICY, base_delay=0.0))
+    with retry_budget(max_retries=1, deadline=0) as budget:
+        with pytest.raises(RetryError):
+            llm_client.call_llm(Flaky(), "hi", cache=False)
+    assert Flaky.calls == 2
+    assert budget.report()["by_layer"]["llm"]["attempts"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_retries_draw_from_turn_budget(monkeypatch):
+    class FlakyStream:
+        model_name = "stream-budget-test"
+        calls = 0
+
+        async def astream(self, prompt, **kwargs):
+            FlakyStream.calls += 1
+            raise ConnectionError("reset")
+            yield  # pragma: no cover – makes this an async generator
+
+    async def drain():
+        return [text async for text in llm_client.stream_llm(FlakyStream(), "hi")]
+
+    monkeypatch.setattr(llm_client, "clamp_delay", lambda delay: 0.0)
+    with retry_budget(max_retries=1, deadline=0) as budget:
+        with pytest.raises(ConnectionError):
+            await drain()
+    assert FlakyStream.calls == 2
+    assert budget.report()["by_layer"]["llm"] == {"attempts": 2, "retries": 1, "denied": 1}
+    assert llm_client._breaker("stream-budget-test")._failures == 2
+
+    with request_deadline(0.001):
+        await asyncio.sleep(0.01)
+        with pytest.raises(DeadlineExceeded):
+            await drain()
+    assert FlakyStream.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_streamed_turn_runs_inside_a_retry_budget(monkeypatch):
+    import essay_agent.agents.response_enhancer as response_enhancer
+    from essay_agent.agent_autonomous import AutonomousEssayAgent
+
+    monkeypatch.setattr(response_enhancer, "_OFFLINE", True)
+
+    agent = AutonomousEssayAgent.__new__(AutonomousEssayAgent)
+    agent.interaction_count = 0
+    seen = []
+
+    async def begin_turn(user_input):
+        seen.append(current_budget())
+        spend_retry("llm")
+        return {}
+
+    async def respond_stream(action_result, user_input):
+        seen.append(current_budget())
+        yield "hi"
+
+    agent._begin_turn = begin_turn
+    agent._respond_stream = respond_stream
+    agent._remember_turn = lambda user_input, response, action_result: None
+    agent._tone = lambda: {}
+
+    events = [event async for event in agent.handle_message_stream("hello")]
+
+    assert events[-1] == {"type": "done", "response": "hi"}
+    assert seen[0] is not None and seen[0] is seen[1]
+    assert current_budget() is None
+    assert agent.last_turn_budget["by_layer"]["llm"]["retries"] == 1
@@ -25,4 +25,22 @@ def test_revision_bad_inputs():
     with pytest.raises(ValueError):
         tool(draft="", revision_focus="focus")
     with pytest.raises(ValueError):
-        tool(draft="draft", revision_focus="") 
\ No newline at end of file
+        tool(draft="draft", revision_focus="") 
+
+def test_revision_parses_with_the_requested_schema(monkeypatch):
+    from essay_agent.tools import revision
+
+    requested = []
+
+    def fake_chat(prompt, *, structured, **_):
+        requested.append(structured)
+        return '{"revised_draft": "Better.", "changes": [" Tightened opening ", " "]}'
+
+    monkeypatch.setattr(revision, "chat", fake_chat)
+    result = RevisionTool()(draft="draft", revision_focus="focus")
+    assert result == {"revised_draft": "Better.", "changes": ["Tightened opening"]}
+    assert requested == [revision.RevisionResult]
+
+    # Anything the schema rejects falls back to the stub
+    monkeypatch.setattr(revision, "chat", lambda *a, **k: '{"revised_draft": "Better.", "changes": []}')
+    assert RevisionTool()(draft="draft", revision_focus="focus")["revised_draft"] == "draft (revised)"
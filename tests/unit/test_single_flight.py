@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import essay_agent.llm_client as llm_client
+from essay_agent.llm.single_flight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = 0
+    gate = threading.Event()
+
+    def slow():
+        nonlocal calls
+        calls += 1
+        gate.wait(1)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("k", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["answer"] * 8
+    assert calls == 1
+    stats = flight.stats()
+    assert stats["upstream_calls"] == 1
+    assert stats["coalesced_calls"] == 7
+    assert stats["in_flight"] == 0
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    flight = SingleFlight()
+
+    def boom():
+        raise ValueError("upstream failed")
+
+    with pytest.raises(ValueError):
+        flight.do("k", boom)
+    # Nothing sticks around – the next call runs again
+    assert flight.do("k", lambda: "ok") == "ok"
+    assert flight.stats()["upstream_calls"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_coalescing_survives_waiter_cancellation():
+    flight = SingleFlight()
+    calls = 0
+
+    async def slow():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "answer"
+
+    first = asyncio.create_task(flight.ado("k", slow))
+    second = asyncio.create_task(flight.ado("k", slow))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "answer"
+    assert calls == 1
+    assert flight.stats()["coalesced_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_flight_is_cancelled_when_every_waiter_leaves():
+    flight = SingleFlight()
+    started, cancelled = 0, 0
+
+    async def slow():
+        nonlocal started, cancelled
+        started += 1
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+        return "answer"
+
+    waiters = [asyncio.create_task(flight.ado("k", slow)) for _ in range(2)]
+    await asyncio.sleep(0.01)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert (started, cancelled) == (1, 1)
+    assert flight.stats()["in_flight"] == 0
+
+    async def fast():
+        return "fresh"
+
+    assert await flight.ado("k", fast) == "fresh"  # a new flight, not the cancelled one
+
+
+@pytest.mark.asyncio
+async def test_acall_llm_coalesces_identical_requests():
+    class SlowLLM:
+        model_name = "gpt-4o-mini"
+        calls = 0
+
+        async def ainvoke(self, prompt, **kwargs):
+            SlowLLM.calls += 1
+            await asyncio.sleep(0.05)
+            return SimpleNamespace(content=f"echo: {prompt}")
+
+    llm = SlowLLM()
+    before = llm_client.get_single_flight_stats()["coalesced_calls"]
+
+    same = await asyncio.gather(*(llm_client.acall_llm(llm, "dup", temperature=0.2) for _ in range(4)))
+    other = await llm_client.acall_llm(llm, "dup", temperature=0.9)
+
+    assert same == ["echo: dup"] * 4
+    assert other == "echo: dup"
+    # One call for the four duplicates, one for the different params
+    assert SlowLLM.calls == 2
+    assert llm_client.get_single_flight_stats()["coalesced_calls"] - before == 3
+
+    # Callers asking for fresh completions are never merged
+    await asyncio.gather(*(llm_client.acall_llm(llm, "dup", cache=False) for _ in range(2)))
+    assert SlowLLM.calls == 4
+
+
+def test_call_llm_accepts_message_list_prompts():
+    class ListLLM:
+        model_name = "gpt-3.5-turbo"
+        calls = 0
+
+        def invoke(self, prompt, **kwargs):
+            ListLLM.calls += 1
+            return SimpleNamespace(content='{"ok": true}')
+
+    llm = ListLLM()
+    messages = [{"role": "system", "content": "Repair JSON"}, {"role": "assistant", "content": "{ok: true"}]
+
+    # json_repair's call shape: the list must not break the coalescing key
+    assert llm_client.call_llm(llm, messages, caller="json_repair") == '{"ok": true}'
+    assert ListLLM.calls == 1
+    same = [dict(m) for m in messages]
+    assert llm_client._flight_key(llm, messages, {}) == llm_client._flight_key(llm, same, {})
+    assert hash(llm_client._flight_key(llm, messages, {}))
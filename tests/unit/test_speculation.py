@@ -0,0 +1,154 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from essay_agent.agent.core.action_executor import ActionExecutor
+from essay_agent.agent.core.speculation import SpeculativeRun, Speculator, ToolPredictor
+from essay_agent.llm.telemetry import get_telemetry
+
+
+class _Executor:
+    """Executor double whose tool spends 100 prompt tokens, then takes *tool_seconds*."""
+
+    def __init__(self, tool_seconds=0.05):
+        self.tool_seconds = tool_seconds
+        self.calls = []
+        self.tool_registry = Mock(has_tool=Mock(return_value=True))
+
+    async def prepare_tool_args(self, tool_name, tool_args, reasoning):
+        return {**tool_args, "essay_prompt": "Describe a challenge"}
+
+    async def execute_tool(self, tool_name, tool_args):
+        self.calls.append(tool_name)
+        with get_telemetry().track("gpt-4o", "", site="tool") as call:
+            call.usage = {"input_tokens": 100, "output_tokens": 0}
+            await asyncio.sleep(self.tool_seconds)
+        return {tool_name: "result"}
+
+
+def _speculator(label="outline", probability=0.7):
+    classifier = Mock(predict=Mock(return_value=(label, probability)))
+    return Speculator(ToolPredictor(classifier, threshold=0.6))
+
+
+def test_predictor_uses_classifier_then_workflow_order():
+    selector = Mock(_get_workflow_aware_fallback=Mock(return_value=["outline"]))
+    unsure = Mock(predict=Mock(return_value=("outline", 0.4)))
+    other = Mock(predict=Mock(return_value=("polish", 0.4)))
+
+    assert ToolPredictor(Mock(predict=Mock(return_value=("draft", 0.9)))).predict("write it") == ("draft", 0.9)
+    assert ToolPredictor(Mock(predict=Mock(return_value=("conversation", 0.99)))).predict("thanks") is None
+    # Below threshold, but the classifier leans towards the step after brainstorm
+    assert ToolPredictor(unsure, selector, 0.6).predict("outline this", "brainstorm") == ("outline", 0.4)
+    assert ToolPredictor(unsure, selector, 0.6).predict("outline this", "draft") is None
+    assert ToolPredictor(other, selector, 0.6).predict("outline this", "brainstorm") is None
+    # Keywords alone are not enough
+    faint = Mock(predict=Mock(return_value=("outline", 0.2)))
+    assert ToolPredictor(faint, selector, 0.6).predict("outline this", "brainstorm") is None
+    assert ToolPredictor(None, selector, 0.6).predict("outline this", "brainstorm") is None
+
+
+def _real_executor():
+    return ActionExecutor(Mock(has_tool=Mock(return_value=True)), Mock(store_tool_execution=AsyncMock()))
+
+
+@pytest.mark.asyncio
+async def test_llm_shaped_args_match_on_material_args():
+    executor = _real_executor()
+    prompt = "Describe a challenge you faced."
+    speculative_args = await executor.prepare_tool_args(
+        "outline", {"user_input": "Outline my robotics story", "essay_prompt": prompt}, {"confidence": 0.7}
+    )
+    run = SpeculativeRun("outline", speculative_args, 0.7)
+
+    async def reasoned(tool_name, tool_args):
+        reasoning = {"chosen_tool": tool_name, "tool_args": tool_args, "confidence": 0.9}
+        return tool_name, await executor.prepare_tool_args(tool_name, tool_args, reasoning)
+
+    # Rephrased by the model, with extra arguments that do not change the outline
+    assert run.matches(*await reasoned("outline", {
+        "story": "outline my  robotics story.", "prompt": "describe a challenge you faced", "tone": "reflective",
+    }))
+    # The story left to the user's message, as the speculative run took it
+    assert run.matches(*await reasoned("outline", {"essay_prompt": prompt}))
+    assert not run.matches(*await reasoned("outline", {"chosen_story": "The time I quit piano", "essay_prompt": prompt}))
+    assert not run.matches(*await reasoned("outline", {"user_input": "Outline my robotics story", "word_limit": 500}))
+    assert not run.matches(*await reasoned("draft", {"essay_prompt": prompt}))
+
+
+@pytest.mark.asyncio
+async def test_hit_reuses_result_and_counts_saved_time():
+    speculator, executor = _speculator(), _Executor()
+
+    run = await speculator.start(executor, "outline my story")
+    await asyncio.sleep(0.03)  # reasoning in flight
+    hit, result = await speculator.claim(run, "outline", {"user_input": "outline my story",
+                                                          "essay_prompt": "Describe a challenge"})
+
+    assert hit and result == {"outline": "result"} and executor.calls == ["outline"]
+    stats = speculator.get_stats()
+    assert (stats["started"], stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0, 1.0)
+    assert 0.02 < stats["saved_seconds"] < 0.06 and stats["wasted_tokens"] == 0
+
+
+@pytest.mark.asyncio
+async def test_disagreement_cancels_and_counts_waste():
+    speculator, executor = _speculator(), _Executor(tool_seconds=5)
+
+    run = await speculator.start(executor, "outline my story")
+    await asyncio.sleep(0.02)
+    task = run.task
+    hit, _ = await speculator.claim(run, "draft", {"user_input": "outline my story"})
+
+    assert not hit and task.cancelled()
+    stats = speculator.get_stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (0, 1, 0.0)
+    assert stats["wasted_tokens"] == 100 and stats["wasted_seconds"] < 1
+    await speculator.cancel(run)  # already settled → no double count
+    assert speculator.get_stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_no_speculation_when_disabled_or_unsure():
+    executor = _Executor()
+    assert await _speculator(probability=0.3).start(executor, "hmm") is None
+    disabled = _speculator()
+    disabled.enabled = False
+    assert await disabled.start(executor, "outline my story") is None
+    assert executor.calls == []
+
+
+@pytest.mark.asyncio
+async def test_agent_turn_uses_speculative_tool_result():
+    from essay_agent.agent.core.react_agent import EssayReActAgent
+
+    # The model's own phrasing of the story the user asked about
+    reasoning = Mock(response_type="tool_execution", chosen_tool="outline", confidence=0.9,
+                     tool_args={"chosen_story": "Outline my story.", "tone": "warm"}, reasoning="")
+
+    async def reason(**_):
+        await asyncio.sleep(0.05)
+        return reasoning
+
+    with patch('essay_agent.agent.core.react_agent.AgentMemory'), \
+         patch('essay_agent.agent.core.react_agent.PromptBuilder'), \
+         patch('essay_agent.agent.core.react_agent.PromptOptimizer'), \
+         patch('essay_agent.agent.core.react_agent.ReasoningEngine') as mock_reasoning_cls:
+        mock_reasoning_cls.return_value.reason_about_action = AsyncMock(side_effect=reason)
+        agent = EssayReActAgent("test_user")
+
+    agent.overlap_extraction = False
+    agent._extract_and_update_context = AsyncMock()
+    agent._respond = AsyncMock(return_value="ok")
+    agent._update_interaction_memory = AsyncMock()
+    agent.speculator = _speculator()
+    executor = _real_executor()
+    executor.execute_tool = AsyncMock(return_value={"outline": "result"})
+    agent.action_executor = executor
+
+    assert await agent.handle_message("outline my story") == "ok"
+
+    executor.execute_tool.assert_awaited_once()
+    assert agent.last_execution_tools == ["outline"]
+    assert agent.get_session_metrics()["speculation"]["hits"] == 1
@@ -0,0 +1,120 @@
+import json
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+
+from essay_agent.llm import structured
+from essay_agent.llm.structured import ParseStats, parse_report, parses, response_format
+
+
+class _Ideas(BaseModel):
+    ideas: List[str]
+
+
+_DICT_SCHEMA = {"title": "Polish Result", "type": "object", "required": ["final_draft"]}
+
+
+def test_response_format_per_mode(monkeypatch):
+    fmt = response_format(_Ideas)
+    assert fmt["type"] == "json_schema"
+    assert fmt["json_schema"]["name"] == "_Ideas"
+    assert fmt["json_schema"]["schema"]["required"] == ["ideas"]
+    assert fmt["json_schema"]["strict"] is False
+
+    assert response_format(_DICT_SCHEMA)["json_schema"]["name"] == "Polish_Result"
+    assert response_format(_Ideas, mode="json") == {"type": "json_object"}
+
+    monkeypatch.setenv("ESSAY_AGENT_STRUCTURED_OUTPUT", "off")
+    assert response_format(_Ideas) is None
+    monkeypatch.setenv("ESSAY_AGENT_STRUCTURED_OUTPUT", "json")
+    assert response_format(_Ideas) == {"type": "json_object"}
+
+
+def test_parses_checks_json_and_schema():
+    assert parses('{"ideas": ["a"]}', _Ideas)
+    assert parses('```json\n{"ideas": []}\n```', _Ideas)
+    assert not parses('{"ideas": "a"}', _Ideas)
+    assert not parses("Sure! Here are some ideas: ...", _Ideas)
+    assert not parses('["a", "b"]')
+    assert parses('{"final_draft": "x"}', _DICT_SCHEMA)
+    assert not parses('{"draft": "x"}', _DICT_SCHEMA)
+
+
+def test_parse_stats_rates_per_site():
+    stats = ParseStats()
+    stats.record('{"ideas": []}', _Ideas, site="tool:brainstorm")
+    stats.record("not json", _Ideas, site="tool:brainstorm")
+    stats.record_repair("tool:brainstorm")
+    stats.record('{"ideas": []}', _Ideas, site="reasoning")
+
+    report = stats.stats()
+    assert report["sites"]["tool:brainstorm"] == {
+        "calls": 2, "failures": 1, "repairs": 1, "failure_rate": 0.5, "repair_rate": 0.5,
+    }
+    assert report["total"]["calls"] == 3
+    assert report["total"]["failure_rate"] == pytest.approx(1 / 3, abs=1e-4)
+
+
+def test_parse_report_over_cassette_entries():
+    def entry(site, prompt, response, **kwargs):
+        return {"site": site, "prompt": prompt, "response": response, "kwargs": kwargs}
+
+    before = [
+        entry("tool:outline", "Return JSON only", "Here you go: {bad"),
+        entry("tool:outline", "Return JSON only", '{"outline": {}}'),
+        entry("json_repair", "fix this", '{"outline": {}}'),
+        entry("reasoning", "Write a friendly reply", "Happy to help!"),
+    ]
+    after = [
+        entry("tool:outline", "Outline it", '{"outline": {}}', response_format={"type": "json_object"}),
+        entry("tool:outline", "Outline it", '{"outline": {}}', response_format={"type": "json_object"}),
+    ]
+
+    old, new = parse_report(before), parse_report(after)
+
+    assert old["sites"] == {"tool:outline": {
+        "calls": 2, "failures": 1, "repairs": 0, "failure_rate": 0.5, "repair_rate": 0.0,
+    }}
+    assert old["total"]["repairs"] == 1 and old["total"]["repair_rate"] == 0.5
+    assert new["total"]["failures"] == 0 and new["total"]["repairs"] == 0
+
+
+class _Recorder:
+    """Chat double that remembers the kwargs it was called with."""
+
+    def __init__(self, reply):
+        self.reply = reply
+        self.kwargs = []
+
+    def invoke(self, prompt, **kwargs):
+        from langchain_core.messages import AIMessage
+
+        self.kwargs.append(kwargs)
+        return AIMessage(content=self.reply)
+
+    async def ainvoke(self, prompt, **kwargs):
+        return self.invoke(prompt, **kwargs)
+
+
+def test_call_llm_sends_response_format_to_capable_clients(monkeypatch, tmp_path):
+    import essay_agent.llm_client as llm_client
+    from essay_agent.llm.cassette import RECORD, Cassette, CassetteLLM
+
+    monkeypatch.setattr(structured, "_STATS", ParseStats())
+    monkeypatch.setattr(llm_client._ROUTER, "enabled", False)
+    inner = _Recorder('{"ideas": ["robotics"]}')
+    capable = CassetteLLM(Cassette(str(tmp_path / "c.jsonl"), RECORD), {"model_name": "gpt-4o"}, inner)
+
+    text = llm_client.call_llm(capable, "Ideas as JSON", structured=_Ideas, caller="tool:brainstorm", cache=False)
+
+    assert json.loads(text) == {"ideas": ["robotics"]}
+    assert inner.kwargs[-1]["response_format"]["json_schema"]["name"] == "_Ideas"
+
+    # Plain test doubles are called without the extra kwarg but still counted
+    double = _Recorder("not json")
+    llm_client.call_llm(double, "Ideas as JSON", structured=_Ideas, caller="tool:brainstorm", cache=False)
+    assert double.kwargs == [{}]
+
+    site = llm_client.get_structured_output_stats()["sites"]["tool:brainstorm"]
+    assert site["calls"] == 2 and site["failures"] == 1
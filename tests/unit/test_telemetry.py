@@ -0,0 +1,135 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import essay_agent.llm_client as llm_client
+from essay_agent.llm.telemetry import Histogram, Telemetry, call_site, current_call_site, mark_cache_hit
+
+
+def test_histogram_buckets_and_quantiles():
+    hist = Histogram((0.1, 1.0, 10.0))
+    for value in (0.05, 0.5, 0.5, 2.0, 50.0):
+        hist.observe(value)
+
+    assert hist.cumulative() == [("0.1", 1), ("1.0", 3), ("10.0", 4), ("+Inf", 5)]
+    assert hist.count == 5
+    assert hist.quantile(0.5) == 1.0
+    assert hist.quantile(0.99) == float("inf")
+    assert Histogram((1.0,)).quantile(0.5) == 0.0
+
+
+def test_call_site_nests_and_resets():
+    assert current_call_site() == "unlabelled"
+    with call_site("tool:draft"):
+        with call_site("json_repair"):
+            assert current_call_site() == "json_repair"
+        assert current_call_site() == "tool:draft"
+    assert current_call_site() == "unlabelled"
+
+
+def test_track_records_tokens_wait_cache_hits_and_errors():
+    telemetry = Telemetry()
+
+    with call_site("reasoning"):
+        with telemetry.track("gpt-4o", "one two three") as call:
+            call.queue_wait = 0.0
+            mark_cache_hit()
+            call.set_response(SimpleNamespace(usage_metadata={"input_tokens": 11, "output_tokens": 7}))
+            call.completion = "ignored because usage was reported"
+
+    with pytest.raises(TimeoutError):
+        with telemetry.track("gpt-4o", "prompt", site="reasoning"):
+            raise TimeoutError("slow upstream")
+
+    telemetry.record_retry("gpt-4o", site="reasoning")
+    mark_cache_hit()  # outside a tracked call – no effect
+
+    stats = telemetry.stats()["reasoning"]["gpt-4o"]
+    assert stats["calls"] == 2
+    assert stats["cache_hits"] == 1
+    assert stats["errors"] == 1
+    assert stats["error_classes"] == {"timeout": 1}
+    assert stats["retries"] == 1
+    assert stats["prompt_tokens"] >= 11
+    assert stats["completion_tokens"] == 7
+
+
+def test_cached_prompt_tokens_and_prefix_ratio():
+    telemetry = Telemetry()
+    with telemetry.track("gpt-4o", "prompt", site="reasoning") as call:
+        call.set_response(SimpleNamespace(usage_metadata={
+            "input_tokens": 100, "output_tokens": 5, "input_token_details": {"cache_read": 80},
+        }))
+    with telemetry.track("gpt-4o", "prompt", site="reasoning") as call:
+        # Older OpenAI integrations only expose the raw token_usage block
+        call.set_response(SimpleNamespace(
+            usage_metadata={"input_tokens": 100, "output_tokens": 5},
+            response_metadata={"token_usage": {"prompt_tokens_details": {"cached_tokens": 40}}},
+        ))
+
+    stats = telemetry.stats()["reasoning"]["gpt-4o"]
+    assert stats["cached_prompt_tokens"] == 120
+    assert stats["cached_prefix_ratio"] == pytest.approx(0.6)
+    assert 'essay_agent_llm_cached_prompt_tokens_total{site="reasoning",model="gpt-4o"} 120' in telemetry.render_prometheus()
+
+
+def test_disabled_telemetry_records_nothing():
+    telemetry = Telemetry(enabled=False)
+    with telemetry.track("gpt-4o", "prompt") as call:
+        call.completion = "text"
+    telemetry.record_retry("gpt-4o")
+    assert telemetry.stats() == {}
+
+
+def test_prometheus_rendering():
+    telemetry = Telemetry()
+    with telemetry.track("gpt-4o", "hello", site='tool:"odd"') as call:
+        call.completion = "hi there"
+
+    text = telemetry.render_prometheus()
+
+    assert "# TYPE essay_agent_llm_requests_total counter" in text
+    assert 'essay_agent_llm_requests_total{site="tool:\\"odd\\"",model="gpt-4o"} 1' in text
+    assert "# TYPE essay_agent_llm_latency_seconds histogram" in text
+    assert 'essay_agent_llm_latency_seconds_bucket{site="tool:\\"odd\\"",model="gpt-4o",le="+Inf"} 1' in text
+    assert 'essay_agent_llm_queue_wait_seconds_count{site="tool:\\"odd\\"",model="gpt-4o"} 1' in text
+    assert text.endswith("\n")
+
+
+@pytest.mark.asyncio
+async def test_llm_client_labels_calls_by_caller():
+    class EchoLLM:
+        model_name = "telemetry-test-model"
+
+        async def ainvoke(self, prompt, **kwargs):
+            await asyncio.sleep(0)
+            return SimpleNamespace(content=f"echo {prompt}", usage_metadata={"input_tokens": 3, "output_tokens": 2})
+
+        def invoke(self, prompt, **kwargs):
+            return SimpleNamespace(content=f"echo {prompt}")
+
+    llm = EchoLLM()
+    await llm_client.acall_llm(llm, "async prompt", caller="context_extraction", cache=False)
+    with call_site("format_response"):
+        llm_client.call_llm(llm, "sync prompt", cache=False)
+
+    stats = llm_client.get_telemetry_stats()
+    extraction = stats["context_extraction"]["telemetry-test-model"]
+    assert extraction["calls"] == 1
+    assert extraction["prompt_tokens"] == 3 and extraction["completion_tokens"] == 2
+    assert stats["format_response"]["telemetry-test-model"]["calls"] == 1
+    assert 'site="context_extraction",model="telemetry-test-model"' in llm_client.render_metrics()
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    from fastapi.testclient import TestClient
+
+    import essay_agent.frontend.server as server
+
+    llm_client.call_llm(llm_client.FakeListLLM(responses=["ok"]), "metrics probe", caller="metrics_test")
+    resp = TestClient(server.app).get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    assert 'essay_agent_llm_requests_total{site="metrics_test",model="fake"}' in resp.text
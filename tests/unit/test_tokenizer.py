@@ -0,0 +1,144 @@
+import threading
+
+from essay_agent.llm.tokenizer import CHARS_PER_TOKEN, Tokenizer
+
+
+class _WordEncoding:
+    """Stand-in for a tiktoken encoding: one token per whitespace word."""
+
+    def __init__(self):
+        self.encode_calls = 0
+        self.batch_calls = 0
+
+    def encode_ordinary(self, text):
+        self.encode_calls += 1
+        return text.split()
+
+    def encode_ordinary_batch(self, texts):
+        self.batch_calls += 1
+        return [t.split() for t in texts]
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+
+def _tokenizer(**kwargs):
+    loads = []
+    enc = _WordEncoding()
+
+    def loader(name):
+        loads.append(name)
+        return enc
+
+    return Tokenizer(loader=loader, **kwargs), enc, loads
+
+
+def test_encoding_loads_once_and_counts_are_memoized():
+    tok, enc, loads = _tokenizer()
+
+    assert tok.count("you are a helpful assistant") == 5
+    assert tok.count("you are a helpful assistant") == 5
+    # gpt-4 and gpt-3.5-turbo share cl100k_base, so they share memo entries too
+    assert tok.count("you are a helpful assistant", "gpt-3.5-turbo") == 5
+
+    assert loads == ["cl100k_base"]
+    assert enc.encode_calls == 1
+    stats = tok.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert stats["encodings"] == {"cl100k_base": True}
+
+
+def test_memo_is_bounded_lru_and_skips_long_texts():
+    tok, enc, _ = _tokenizer(memo_size=2, memo_max_chars=20)
+
+    tok.count("a")
+    tok.count("b")
+    tok.count("a")  # refresh "a" so "b" is evicted next
+    tok.count("c")
+    assert tok.stats()["memo_entries"] == 2
+    calls = enc.encode_calls
+    tok.count("a")
+    assert enc.encode_calls == calls
+    tok.count("b")
+    assert enc.encode_calls == calls + 1
+
+    long_text = "word " * 50
+    tok.count(long_text)
+    tok.count(long_text)
+    assert (tok.encoding_name("gpt-4"), long_text) not in tok._memo
+
+
+def test_count_many_batches_only_misses():
+    tok, enc, _ = _tokenizer()
+    tok.count("system prompt here")
+
+    counts = tok.count_many(["system prompt here", "", "new user message", "x y"])
+
+    assert counts == [3, 0, 3, 2]
+    assert enc.batch_calls == 1
+    assert tok.count_many(["new user message", "x y"]) == [3, 2]
+    assert enc.batch_calls == 1
+
+
+def test_load_failure_falls_back_to_char_estimate_once():
+    attempts = []
+
+    def failing_loader(name):
+        attempts.append(name)
+        raise OSError("offline")
+
+    tok = Tokenizer(loader=failing_loader)
+    text = "x" * 40
+
+    assert tok.count(text) == 40 // CHARS_PER_TOKEN
+    assert tok.count_many([text, "y" * 8]) == [10, 2]
+    assert tok.truncate(text, 3) == "x" * (3 * CHARS_PER_TOKEN)
+    assert attempts == ["cl100k_base"]
+    assert tok.stats()["encodings"] == {"cl100k_base": False}
+
+
+def test_truncate_keeps_prefix_within_budget():
+    tok, _, _ = _tokenizer()
+
+    assert tok.truncate("one two three four", 2) == "one two"
+    assert tok.truncate("one two", 5) == "one two"
+    assert tok.truncate("one two", 0) == ""
+
+
+def test_concurrent_counting_is_consistent():
+    tok, _, loads = _tokenizer()
+    texts = [f"message number {i % 10}" for i in range(200)]
+    results = []
+
+    def worker():
+        results.append(tok.count_many(texts))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(r == [3] * 200 for r in results)
+    assert loads == ["cl100k_base"]
+    assert tok.stats()["memo_entries"] == 10
+
+
+def test_llm_client_count_tokens_uses_shared_tokenizer():
+    import essay_agent.llm_client as llm_client
+    from essay_agent.llm.tokenizer import get_tokenizer
+
+    before = get_tokenizer().stats()["hits"]
+    llm_client.count_tokens("shared tokenizer check")
+    llm_client.count_tokens("shared tokenizer check")
+
+    assert get_tokenizer().stats()["hits"] > before
+    assert llm_client.get_tokenizer_stats()["memo_entries"] >= 1
+
+
+def test_message_lists_are_counted_by_content():
+    tok, _, _ = _tokenizer()
+    messages = [{"role": "system", "content": "fix this json"}, {"role": "assistant", "content": "{bad"}]
+
+    assert tok.count(messages) == 4
+    assert tok.count_many([messages, "a b"]) == [4, 2]
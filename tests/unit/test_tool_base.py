@@ -23,4 +23,56 @@ def test_success():
     tool = SleepTool()
     out = tool(seconds=0.1)
     assert out["error"] is None
-    assert out["ok"]["slept"] == 0.1 
\ No newline at end of file
+    assert out["ok"]["slept"] == 0.1 
+
+class AsyncEchoTool(ValidatedTool):
+    name: str = "async_echo"
+    description: str = "Echo via a native coroutine"
+    timeout: float = 0.5
+
+    def _run(self, text: str = ""):
+        raise AssertionError("sync path should not be used by acall")
+
+    async def _arun(self, text: str = ""):
+        import asyncio
+        await asyncio.sleep(0)
+        return {"echo": text}
+
+
+def test_acall_prefers_native_arun():
+    import asyncio
+    out = asyncio.run(AsyncEchoTool().acall(text="hi"))
+    assert out == {"ok": {"echo": "hi"}, "error": None}
+
+
+def test_acall_runs_sync_tool_off_loop_with_timeout():
+    import asyncio
+    out = asyncio.run(SleepTool().acall(seconds=1.0))
+    # wait_for can cancel the await, so the timeout fallback kicks in
+    assert out["ok"]["fallback_reason"] == "timeout"
+
+
+class FlakyTool(ValidatedTool):
+    name: str = "flaky"
+    description: str = "Fails on the first call"
+    timeout: float = 0.5
+    calls: int = 0
+
+    def _run(self, text: str = ""):
+        self.calls += 1
+        if self.calls == 1:
+            raise ValueError("transient")
+        return {"echo": text}
+
+
+def test_sync_and_async_paths_share_retry_and_log(monkeypatch, caplog):
+    import asyncio
+    monkeypatch.setenv("ESSAY_AGENT_FAST_TEST", "1")
+
+    with caplog.at_level("WARNING", logger="essay_agent.tools.base"):
+        sync_out = FlakyTool()(text="hi")
+        async_out = asyncio.run(FlakyTool().acall(text="hi"))
+
+    assert sync_out == async_out == {"ok": {"echo": "hi"}, "error": None}
+    failures = [r for r in caplog.records if "failed on attempt 1/3" in r.getMessage()]
+    assert len(failures) == 2
@@ -0,0 +1,105 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from essay_agent.llm.tracing import TraceRecorder, current_span, render_waterfall, span, traced
+
+
+def _names(node):
+    return [child["name"] for child in node.get("children", [])]
+
+
+def test_spans_are_noops_outside_a_trace():
+    with span("orphan") as s:
+        assert s is None and current_span() is None
+
+
+@pytest.mark.asyncio
+async def test_turn_records_nested_and_concurrent_spans():
+    recorder = TraceRecorder(keep=5)
+
+    @traced("memory.load")
+    def load():
+        return "profile"
+
+    @traced()
+    async def fetch(delay):
+        await asyncio.sleep(delay)
+
+    with recorder.trace("turn", user_id="sam"):
+        assert load() == "profile"
+        with span("reason") as reason:
+            reason.set(path="llm")
+            await asyncio.gather(fetch(0.02), fetch(0.02))
+        with pytest.raises(ValueError):
+            with span("act"):
+                raise ValueError("boom")
+
+    (trace,) = recorder.recent()
+    assert trace["name"] == "turn" and trace["attrs"] == {"user_id": "sam"} and trace["trace_id"]
+    assert _names(trace) == ["memory.load", "reason", "act"]
+    reason, act = trace["children"][1], trace["children"][2]
+    assert reason["attrs"] == {"path": "llm"} and act["error"] == "ValueError"
+    first, second = reason["children"]
+    # Concurrent tasks are overlapping siblings, not a chain
+    assert first["name"].endswith("fetch") and abs(first["start_ms"] - second["start_ms"]) < 10
+    assert reason["duration_ms"] < 40 and trace["duration_ms"] >= reason["duration_ms"]
+
+    text = render_waterfall(trace, width=20)
+    assert len(text.splitlines()) == 6 and text.splitlines()[-1].endswith(" !")
+
+
+def test_ring_buffer_jsonl_and_nested_turns(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    recorder = TraceRecorder(keep=2, path=str(path))
+
+    for i in range(3):
+        with recorder.trace("request", n=i):
+            with recorder.trace("turn"):  # an agent turn inside a server request
+                pass
+
+    assert [t["attrs"]["n"] for t in recorder.recent()] == [1, 2]
+    assert [t["attrs"]["n"] for t in recorder.recent(1)] == [2]
+    assert _names(recorder.recent(1)[0]) == ["turn"]
+    lines = path.read_text().splitlines()
+    assert len(lines) == 3 and json.loads(lines[0])["attrs"] == {"n": 0}
+    assert recorder.stats()["recorded"] == 3
+
+    disabled = TraceRecorder(enabled=False)
+    with disabled.trace("turn") as root:
+        assert root is None
+    assert disabled.recent() == []
+
+
+@pytest.mark.asyncio
+async def test_agent_turn_waterfall(monkeypatch):
+    from essay_agent.agent.core import react_agent
+    from essay_agent.agent.core.react_agent import EssayReActAgent
+
+    recorder = TraceRecorder()
+    monkeypatch.setattr(react_agent, "trace_turn", recorder.trace)
+
+    with patch('essay_agent.agent.core.react_agent.AgentMemory'), \
+         patch('essay_agent.agent.core.react_agent.PromptBuilder'), \
+         patch('essay_agent.agent.core.react_agent.PromptOptimizer'), \
+         patch('essay_agent.agent.core.react_agent.ReasoningEngine') as mock_reasoning_cls, \
+         patch('essay_agent.agent.core.react_agent.ActionExecutor'):
+        mock_reasoning_cls.return_value.reason_about_action = AsyncMock(
+            return_value=Mock(response_type="conversation", confidence=0.9)
+        )
+        agent = EssayReActAgent("sam")
+
+    agent.context_extractor = Mock(extract_and_update_context=AsyncMock(return_value=None))
+    agent.school_injector = Mock(extract_school_from_input=Mock(return_value=None))
+    agent._act = AsyncMock(return_value=Mock(action_type="conversation", success=True))
+    agent._respond = AsyncMock(return_value="ok")
+
+    assert await agent.handle_message("help me brainstorm") == "ok"
+
+    (trace,) = recorder.recent()
+    assert trace["attrs"] == {"user_id": "sam", "interaction": 1}
+    names = _names(trace)
+    for phase in ("school_detection", "context_extraction", "observe", "reason", "memory_write"):
+        assert phase in names